@@ -27,8 +27,27 @@ elif [[ -f ".claude/settings.json" ]]; then
     CHECK_MODE="--project"
 fi
 
+# Keep daemon/dispatch/pipeline mode if the current settings were installed with them
+SETTINGS_FILE="$HOME/.claude/settings.json"
+if [[ "$CHECK_MODE" == "--project" ]]; then
+    SETTINGS_FILE="${CLAUDE_PROJECT_DIR:-.}/.claude/settings.json"
+fi
+MODE_FLAGS=""
+# In dispatch mode the PreToolUse hooks, guard-pipeline included, live in the
+# registry next to the settings file
+PRETOOLUSE_FILE="$SETTINGS_FILE"
+if grep -q "guard_dispatch.py" "$SETTINGS_FILE" 2>/dev/null; then
+    MODE_FLAGS="--dispatch"
+    PRETOOLUSE_FILE="$(dirname "$SETTINGS_FILE")/guard-dispatch.json"
+elif grep -q "guard_client.py" "$SETTINGS_FILE" 2>/dev/null; then
+    MODE_FLAGS="--daemon"
+fi
+if grep -q "guard_pipeline.py" "$PRETOOLUSE_FILE" 2>/dev/null; then
+    MODE_FLAGS="$MODE_FLAGS --pipeline"
+fi
+
 # Run the check (suppress stderr, we just want the result)
-if ! "$SETUP_SCRIPT" --check "$CHECK_MODE" >/dev/null 2>&1; then
+if ! "$SETUP_SCRIPT" --check "$CHECK_MODE" $MODE_FLAGS >/dev/null 2>&1; then
     echo ""
     echo "===================================================="
     echo "  rbw-claude-code: Hooks are out of sync!"
@@ -37,9 +56,9 @@ if ! "$SETUP_SCRIPT" --check "$CHECK_MODE" >/dev/null 2>&1; then
     echo "  Plugin hooks have changed. Run to update:"
     echo ""
     if [[ "$CHECK_MODE" == "--project" ]]; then
-        echo "    $SETUP_SCRIPT --project"
+        echo "    $SETUP_SCRIPT --project $MODE_FLAGS"
     else
-        echo "    $SETUP_SCRIPT"
+        echo "    $SETUP_SCRIPT $MODE_FLAGS"
     fi
     echo ""
     echo "===================================================="
@@ -0,0 +1,101 @@
+#!/usr/bin/env -S uv run --script
+# /// script
+# dependencies = ["cchooks"]
+# ///
+"""Benchmark guard hook latency by replaying a tool-call corpus.
+
+Usage:
+
+    guard_bench.py --synthetic 500 --output bench.json
+    guard_bench.py --corpus recorded.jsonl --mode in-process
+    guard_bench.py --synthetic 200 --write-corpus corpus.jsonl
+
+Prints a summary table to stderr and the full JSON report to stdout (or
+--output), so reports from two commits can be diffed.
+"""
+
+import argparse
+import json
+import sys
+
+from guardkit.bench import (
+    MODES,
+    SIDE_EFFECT_HOOKS,
+    discover_hooks,
+    format_summary,
+    load_corpus,
+    run_benchmark,
+    synthetic_corpus,
+    write_corpus,
+)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--corpus", action="append", default=[], help="JSONL corpus of hook payloads"
+    )
+    parser.add_argument(
+        "--synthetic", type=int, default=0, help="add N generated payloads"
+    )
+    parser.add_argument("--seed", type=int, default=0, help="seed for --synthetic")
+    parser.add_argument("--mode", choices=[*MODES, "both"], default="both")
+    parser.add_argument(
+        "--hook",
+        action="append",
+        default=[],
+        help="only hooks whose path contains this",
+    )
+    parser.add_argument(
+        "--include-side-effects",
+        action="store_true",
+        help="also replay hooks that format, type-check or revert commits",
+    )
+    parser.add_argument(
+        "--shebang",
+        action="store_true",
+        help="execute hook scripts directly (through uv) instead of with this interpreter",
+    )
+    parser.add_argument(
+        "--no-profile", action="store_true", help="skip per-pattern regex timing"
+    )
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    parser.add_argument("--write-corpus", help="write the payloads as JSONL and exit")
+    args = parser.parse_args()
+
+    payloads = [payload for path in args.corpus for payload in load_corpus(path)]
+    if args.synthetic:
+        payloads += synthetic_corpus(args.synthetic, seed=args.seed)
+    if not payloads:
+        parser.error("no payloads: pass --corpus and/or --synthetic")
+
+    if args.write_corpus:
+        write_corpus(args.write_corpus, payloads)
+        return 0
+
+    hooks = [
+        hook
+        for hook in discover_hooks()
+        if (args.include_side_effects or hook.script not in SIDE_EFFECT_HOOKS)
+        and (not args.hook or any(name in hook.script for name in args.hook))
+    ]
+    report = run_benchmark(
+        payloads,
+        hooks=hooks,
+        modes=MODES if args.mode == "both" else (args.mode,),
+        python=None if args.shebang else sys.executable,
+        profile=not args.no_profile,
+    )
+
+    print(format_summary(report), file=sys.stderr)
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
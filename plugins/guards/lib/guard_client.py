@@ -0,0 +1,105 @@
+#!/usr/bin/env -S python3 -S
+"""Thin hook client that forwards a PreToolUse payload to the guard daemon.
+
+Usage (as a hook command):
+
+    guard_client.py /path/to/plugins/guards/.../hooks/guard.py
+
+The hook payload is read from stdin and sent to guardd together with the guard
+script path. When the daemon is not running it is started in the background
+and this call runs the guard script directly, so a verdict never depends on
+the daemon being available. Set GUARDD_AUTOSTART=0 to disable auto-start.
+"""
+
+import json
+import os
+import socket
+import sys
+
+from guardkit.runtime import LIB_DIR, socket_path
+
+RESPONSE_TIMEOUT = 3.0
+
+
+def _ask_daemon(script: str, payload: object) -> dict | None:
+    """Return the daemon response, or None if the daemon is unavailable."""
+    request = json.dumps({"script": script, "payload": payload}).encode() + b"\n"
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(RESPONSE_TIMEOUT)
+    try:
+        sock.connect(socket_path())
+    except (FileNotFoundError, ConnectionRefusedError):
+        sock.close()
+        _start_daemon()
+        return None
+    except OSError:
+        sock.close()
+        return None
+
+    try:
+        sock.sendall(request)
+        chunks = []
+        while not chunks or not chunks[-1].endswith(b"\n"):
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+        return json.loads(b"".join(chunks))
+    except (OSError, ValueError):
+        return None
+    finally:
+        sock.close()
+
+
+def _start_daemon() -> None:
+    if os.environ.get("GUARDD_AUTOSTART", "1") == "0":
+        return
+    import subprocess
+
+    try:
+        subprocess.Popen(
+            [os.path.join(LIB_DIR, "guardd.py")],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+    except OSError:
+        pass
+
+
+def _run_directly(script: str, raw: bytes) -> int:
+    """Run the guard script as a normal hook and relay its output."""
+    import subprocess
+
+    result = subprocess.run([script], input=raw, capture_output=True, check=False)
+    sys.stdout.buffer.write(result.stdout)
+    sys.stderr.buffer.write(result.stderr)
+    return result.returncode
+
+
+def main() -> int:
+    if len(sys.argv) != 2:
+        print("Usage: guard_client.py <guard-script.py>", file=sys.stderr)
+        return 1
+
+    script = os.path.abspath(sys.argv[1])
+    raw = sys.stdin.buffer.read()
+    try:
+        payload = json.loads(raw)
+    except ValueError:
+        return _run_directly(script, raw)
+
+    response = _ask_daemon(script, payload)
+    if response is None or response.get("status") != "ok":
+        return _run_directly(script, raw)
+
+    reason = response.get("reason")
+    if reason:
+        print(reason, file=sys.stderr)
+        return 2
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
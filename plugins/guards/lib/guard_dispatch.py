@@ -0,0 +1,60 @@
+#!/usr/bin/env -S uv run --script
+# /// script
+# dependencies = ["cchooks"]
+# ///
+"""PreToolUse hook that runs every registered PreToolUse hook concurrently.
+
+Usage (as the only PreToolUse hook command):
+
+    guard_dispatch.py ~/.claude/guard-dispatch.json
+
+The registry file holds the PreToolUse entries that setup-hooks.sh --dispatch
+took out of settings.json. Matching guards run in-process and other commands
+as subprocesses; the first block wins (see guardkit.dispatch). Hooks that fail
+or time out are reported on stderr and do not block.
+"""
+
+import json
+import sys
+
+from guardkit.dispatch import Dispatcher, read_registry
+
+
+def main() -> int:
+    if len(sys.argv) != 2:
+        print("Usage: guard_dispatch.py <registry.json>", file=sys.stderr)
+        return 1
+
+    raw = sys.stdin.buffer.read()
+    try:
+        payload = json.loads(raw)
+    except ValueError:
+        payload = None
+    if not isinstance(payload, dict) or payload.get("hook_event_name") != "PreToolUse":
+        return 0
+
+    try:
+        registry = read_registry(sys.argv[1])
+    except (OSError, ValueError) as e:
+        # The guards cannot run, so no tool call may go through unchecked
+        print(
+            f"Guard registry unavailable ({e}); run scripts/setup-hooks.sh",
+            file=sys.stderr,
+        )
+        return 2
+
+    outcomes = Dispatcher(registry).run(payload, raw)
+    for outcome in outcomes:
+        if outcome.error:
+            print(
+                f"guard-dispatch: {outcome.hook.command}: {outcome.error}",
+                file=sys.stderr,
+            )
+    if outcomes and outcomes[-1].reason:
+        print(outcomes[-1].reason, file=sys.stderr)
+        return 2
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
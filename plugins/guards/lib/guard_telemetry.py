@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""Summarize guard hook telemetry recorded with GUARDS_TELEMETRY.
+
+Usage:
+
+    guard_telemetry.py
+    guard_telemetry.py --session "$SESSION_ID" --top 20
+    guard_telemetry.py --file /tmp/trace.jsonl --json
+
+Reads the trace file and its rotated backups and prints the slowest hooks
+(by total time spent), the hottest patterns and the verdict distribution.
+"""
+
+import argparse
+import json
+import sys
+
+from guardkit.telemetry import (
+    format_summary,
+    load_records,
+    summarize,
+    telemetry_path,
+    trace_files,
+)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--file", help="trace file (default: from GUARDS_TELEMETRY)")
+    parser.add_argument("--session", help="only records from this session id")
+    parser.add_argument("--top", type=int, default=10, help="rows per table")
+    parser.add_argument("--json", action="store_true", help="print the summary as JSON")
+    args = parser.parse_args()
+
+    path = args.file or telemetry_path()
+    if path is None:
+        parser.error("telemetry is disabled: pass --file or set GUARDS_TELEMETRY")
+
+    summary = summarize(
+        load_records(trace_files(path), session=args.session), top=args.top
+    )
+    if not summary["records"]:
+        print(f"no telemetry records in {path}", file=sys.stderr)
+        return 1
+    print(json.dumps(summary, indent=2) if args.json else format_summary(summary))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,18 @@
+#!/usr/bin/env -S uv run --script
+# /// script
+# dependencies = ["cchooks"]
+# ///
+"""Guard daemon: serves guard verdicts over a per-user Unix socket.
+
+Started on demand by guard_client.py and exits on its own after
+GUARDD_IDLE_TIMEOUT seconds (default 900) without requests.
+"""
+
+import os
+import sys
+
+from guardkit.daemon import DEFAULT_IDLE_TIMEOUT, run
+
+if __name__ == "__main__":
+    idle_timeout = float(os.environ.get("GUARDD_IDLE_TIMEOUT", DEFAULT_IDLE_TIMEOUT))
+    sys.exit(run(idle_timeout))
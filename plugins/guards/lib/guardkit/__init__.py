@@ -0,0 +1,5 @@
+"""Shared runtime for the guard hooks under plugins/guards.
+
+Everything in this package is stdlib-only so that it can be imported from
+thin hook entry points without a uv environment.
+"""
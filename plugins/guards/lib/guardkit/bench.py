@@ -0,0 +1,505 @@
+"""Latency benchmark for guard hooks, replaying recorded tool-call corpora.
+
+A corpus is a JSONL file with one hook payload per line, exactly as Claude
+Code sends it on stdin (``hook_event_name``, ``tool_name``, ``tool_input``
+and, for PostToolUse, ``tool_response``). :func:`synthetic_corpus` generates
+a realistic one when no recording is at hand.
+
+Every payload is replayed through every hook whose ``hooks.json`` event and
+matcher accept it, in up to two modes:
+
+- ``subprocess``: the hook script runs as a fresh process, as in production.
+  The wall time includes interpreter spawn, imports and evaluation.
+- ``in-process``: the guard's ``check(tool_name, tool_input)`` is called
+  directly, which is the evaluation time alone. Hooks without a ``check()``
+  (PostToolUse scripts) are subprocess-only.
+
+A third, profiled in-process pass attributes time to each regular expression
+the guard runs, including patterns compiled inside functions.
+
+Results are plain JSON (see :func:`run_benchmark`), so two runs can be
+compared across commits.
+"""
+
+from __future__ import annotations
+
+import glob
+import json
+import math
+import os
+import platform
+import random
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from collections.abc import Callable, Iterable, Sequence
+from typing import Any, NamedTuple
+
+from .linear import LinearPattern
+from .loader import import_script
+from .runtime import GUARDS_ROOT
+
+MODES = ("subprocess", "in-process")
+
+# Hooks that act on the workspace (format or type-check files, revert
+# commits). They are only replayed when explicitly requested.
+SIDE_EFFECT_HOOKS = frozenset(
+    {
+        "quality/python-format/hooks/format_python.py",
+        "quality/python-typecheck/hooks/typecheck.py",
+        "pipeline/hooks/post_edit_pipeline.py",
+        "policy/conventional-commits/hooks/post_validate_commit.py",
+    }
+)
+
+PERCENTILES = (50, 95, 99)
+
+_PLUGIN_ROOT_VARIABLE = re.compile(r"\$?\{CLAUDE_PLUGIN_ROOT\}")
+
+# Code objects of the linear-engine methods timed by profile_patterns
+_LINEAR_METHODS = {LinearPattern.search.__code__, LinearPattern.match.__code__}
+
+
+class HookSpec(NamedTuple):
+    """One hook registration from a plugin's hooks.json."""
+
+    event: str
+    matcher: str
+    script: str  # relative to plugins/guards
+
+    def matches(self, payload: dict) -> bool:
+        """True if Claude Code would run this hook for ``payload``."""
+        if payload.get("hook_event_name") != self.event:
+            return False
+        return (
+            not self.matcher
+            or re.fullmatch(self.matcher, payload.get("tool_name", "")) is not None
+        )
+
+
+def discover_hooks(guards_root: str = GUARDS_ROOT) -> list[HookSpec]:
+    """Return every Python hook registered under ``guards_root``.
+
+    Registrations are read from each plugin's ``hooks/hooks.json`` and from
+    the ``hooks`` block of its ``.claude-plugin/plugin.json``. A script
+    registered for several tools (protect-env) gets one entry whose matcher
+    is the union of its matchers.
+    """
+    specs: dict[tuple[str, str], list[str]] = {}
+    configs = [
+        *glob.glob(
+            os.path.join(guards_root, "**", "hooks", "hooks.json"), recursive=True
+        ),
+        *glob.glob(
+            os.path.join(guards_root, "**", ".claude-plugin", "plugin.json"),
+            recursive=True,
+        ),
+    ]
+    for config_path in sorted(configs):
+        plugin_root = os.path.dirname(os.path.dirname(config_path))
+        with open(config_path) as f:
+            config = json.load(f)
+        for event, groups in config.get("hooks", {}).items():
+            for group in groups:
+                for hook in group.get("hooks", []):
+                    command = hook.get("command", "")
+                    if hook.get("type") != "command" or not command.endswith(".py"):
+                        continue
+                    script = _PLUGIN_ROOT_VARIABLE.sub(lambda _: plugin_root, command)
+                    specs.setdefault(
+                        (event, os.path.relpath(script, guards_root)), []
+                    ).append(group.get("matcher", ""))
+    return [
+        HookSpec(
+            event, "" if "" in matchers else "|".join(dict.fromkeys(matchers)), script
+        )
+        for (event, script), matchers in specs.items()
+    ]
+
+
+def load_corpus(path: str) -> list[dict]:
+    """Read a JSONL corpus of hook payloads, skipping blank lines."""
+    payloads = []
+    with open(path) as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                payload = json.loads(line)
+            except ValueError as e:
+                raise ValueError(f"{path}:{line_number}: invalid JSON: {e}") from e
+            if not isinstance(payload, dict) or "hook_event_name" not in payload:
+                raise ValueError(f"{path}:{line_number}: not a hook payload")
+            payloads.append(payload)
+    return payloads
+
+
+def write_corpus(path: str, payloads: Iterable[dict]) -> None:
+    """Write payloads as a JSONL corpus."""
+    with open(path, "w") as f:
+        for payload in payloads:
+            f.write(json.dumps(payload) + "\n")
+
+
+# Synthetic corpus building blocks, weighted towards what agents actually run
+_DIRS = ("src", "tests", "plugins/core", "docs", "scripts")
+_MODULES = ("app", "models", "views", "utils", "config", "client", "parser")
+_WORDS = ("TODO", "def main", "import json", "class Config", "raise ValueError")
+
+_COMMANDS: tuple[tuple[int, str], ...] = (
+    (12, "git status"),
+    (8, "git diff --stat"),
+    (6, "git log --oneline -{n}"),
+    (6, 'git add {dir}/{module}.py && git commit -m "feat: add {module} support"'),
+    (2, "git push origin feature/{module}"),
+    (10, "ls -la {dir}"),
+    (10, "uv run pytest -q {dir}/test_{module}.py"),
+    (4, "uv run ruff check {dir}"),
+    (8, 'rg -n "{word}" {dir}'),
+    (6, "cat {dir}/{module}.py | head -{n}"),
+    (4, "gh pr view {n} --json title,body"),
+    (3, "gh api repos/owner/repo/pulls/{n}/comments"),
+    (2, "rm -rf /tmp/build-{n}"),
+    (2, "python -c 'import {module}; print({module}.__file__)'"),
+    (2, "cd {dir} && make test"),
+    (2, 'gemini -m gemini-3-pro-preview -p "review {dir}/{module}.py"'),
+    (
+        1,
+        "cat > /tmp/{module}.py <<'EOF'\n"
+        "import json\n\n\ndef main():\n    print(json.dumps({{'n': {n}}}))\n"
+        "EOF\npython /tmp/{module}.py",
+    ),
+)
+
+_FILE_TOOLS: tuple[tuple[int, str, str], ...] = (
+    (10, "Read", "{dir}/{module}.py"),
+    (3, "Read", "README.md"),
+    (1, "Read", ".env.example"),
+    (6, "Edit", "{dir}/{module}.py"),
+    (3, "Write", "{dir}/{module}.py"),
+    (1, "Write", "docs/{module}.md"),
+    (3, "Grep", "{word}"),
+    (2, "Glob", "{dir}/**/*.py"),
+)
+
+
+def _weighted(rng: random.Random, table: Sequence[tuple]) -> tuple:
+    return rng.choices(table, weights=[entry[0] for entry in table])[0]
+
+
+def _fill(rng: random.Random, template: str) -> str:
+    return template.format(
+        dir=rng.choice(_DIRS),
+        module=rng.choice(_MODULES),
+        word=rng.choice(_WORDS),
+        n=rng.randint(1, 200),
+    )
+
+
+def synthetic_corpus(
+    count: int, seed: int = 0, cwd: str = "/workspace/project"
+) -> list[dict]:
+    """Generate ``count`` realistic PreToolUse/PostToolUse payloads.
+
+    About two thirds are Bash calls. Each tool call appears as a PreToolUse
+    payload, and roughly half of them also as the matching PostToolUse one.
+    The same seed always yields the same corpus.
+    """
+    rng = random.Random(seed)
+    payloads: list[dict] = []
+    while len(payloads) < count:
+        if rng.random() < 0.65:
+            tool_name = "Bash"
+            command = _fill(rng, _weighted(rng, _COMMANDS)[1])
+            tool_input: dict[str, Any] = {
+                "command": command,
+                "description": "Run command",
+            }
+            tool_response: dict[str, Any] = {
+                "stdout": "ok\n",
+                "stderr": "",
+                "interrupted": False,
+            }
+        else:
+            _, tool_name, template = _weighted(rng, _FILE_TOOLS)
+            value = _fill(rng, template)
+            if tool_name == "Grep":
+                tool_input = {"pattern": value, "path": cwd}
+            elif tool_name == "Glob":
+                tool_input = {"pattern": value}
+            else:
+                tool_input = {"file_path": os.path.join(cwd, value)}
+                if tool_name == "Write":
+                    tool_input["content"] = "print('hello')\n"
+                elif tool_name == "Edit":
+                    tool_input.update(old_string="pass", new_string="return None")
+            tool_response = {"success": True}
+
+        base = {
+            "session_id": "bench",
+            "transcript_path": "/tmp/bench.jsonl",
+            "cwd": cwd,
+        }
+        payloads.append(
+            {
+                **base,
+                "hook_event_name": "PreToolUse",
+                "tool_name": tool_name,
+                "tool_input": tool_input,
+            }
+        )
+        if len(payloads) < count and rng.random() < 0.5:
+            payloads.append(
+                {
+                    **base,
+                    "hook_event_name": "PostToolUse",
+                    "tool_name": tool_name,
+                    "tool_input": tool_input,
+                    "tool_response": tool_response,
+                }
+            )
+    return payloads
+
+
+def percentiles(samples: Sequence[float]) -> dict[str, float] | None:
+    """Summarize latencies (ms) with nearest-rank percentiles, or None if empty."""
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    summary = {"n": len(ordered)}
+    for p in PERCENTILES:
+        summary[f"p{p}"] = ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+    summary["mean"] = sum(ordered) / len(ordered)
+    summary["max"] = ordered[-1]
+    return {k: round(v, 3) if isinstance(v, float) else v for k, v in summary.items()}
+
+
+def _timed_runs(
+    args: list[str], inputs: Iterable[str], cwd: str, env: dict
+) -> list[float]:
+    samples = []
+    for stdin in inputs:
+        start = time.perf_counter()
+        subprocess.run(
+            args, input=stdin, capture_output=True, text=True, cwd=cwd, env=env
+        )
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def _subprocess_env() -> dict[str, str]:
+    env = dict(os.environ)
+    # Measure evaluation, not cache hits from previous runs
+    env["GUARDS_VERDICT_CACHE"] = "0"
+    return env
+
+
+def measure_spawn(python: str, runs: int = 10) -> list[float]:
+    """Wall times (ms) of ``python -c pass``: the floor for any hook process."""
+    with tempfile.TemporaryDirectory() as cwd:
+        return _timed_runs([python, "-c", "pass"], [""] * runs, cwd, _subprocess_env())
+
+
+def measure_subprocess(
+    script: str, payloads: Sequence[dict], python: str | None = sys.executable
+) -> list[float]:
+    """Wall times (ms) of running ``script`` once per payload.
+
+    With ``python`` set the script runs under that interpreter; with None it
+    is executed directly, so its shebang (``uv run --script``) is included.
+    The working directory is a fresh empty directory.
+    """
+    args = [python, script] if python else [script]
+    with tempfile.TemporaryDirectory() as cwd:
+        inputs = (json.dumps({**payload, "cwd": cwd}) for payload in payloads)
+        return _timed_runs(args, inputs, cwd, _subprocess_env())
+
+
+def load_check(script: str) -> Callable[[str, dict], str | None] | None:
+    """Import a hook script and return its ``check()``, or None if it has none."""
+    module = import_script(script)
+    check = getattr(module, "check", None)
+    return check if callable(check) else None
+
+
+def measure_in_process(
+    check: Callable[[str, dict], str | None], payloads: Sequence[dict]
+) -> list[float]:
+    """Wall times (ms) of calling ``check`` once per payload."""
+    samples = []
+    for payload in payloads:
+        tool_name, tool_input = (
+            payload.get("tool_name", ""),
+            payload.get("tool_input", {}),
+        )
+        start = time.perf_counter()
+        check(tool_name, tool_input)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def profile_patterns(
+    check: Callable[[str, dict], str | None], payloads: Sequence[dict]
+) -> dict[str, dict[str, float]]:
+    """Time every regex method call made by ``check``, per pattern.
+
+    Uses a profile hook on C calls, so patterns compiled inside functions and
+    ``re.search(pattern, ...)`` calls are attributed as well, plus Python
+    calls to :mod:`~guardkit.linear` pattern methods. The hook adds overhead
+    to the check, so compare these numbers with each other rather than with
+    the latency figures.
+    """
+    totals: dict[str, list[float]] = {}
+    stack: list[tuple[str, float] | None] = []
+    linear_calls: dict[int, tuple[str, float]] = {}
+
+    def record(entry: tuple[str, float]) -> None:
+        elapsed = (time.perf_counter() - entry[1]) * 1000
+        stats = totals.setdefault(entry[0], [0, 0.0, 0.0])
+        stats[0] += 1
+        stats[1] += elapsed
+        stats[2] = max(stats[2], elapsed)
+
+    def profiler(frame: Any, event: str, arg: Any) -> None:
+        if event == "c_call":
+            owner = getattr(arg, "__self__", None)
+            if isinstance(owner, re.Pattern):
+                stack.append((str(owner.pattern), time.perf_counter()))
+            else:
+                stack.append(None)
+        elif event in ("c_return", "c_exception") and stack:
+            entry = stack.pop()
+            if entry is not None:
+                record(entry)
+        elif event == "call" and frame.f_code in _LINEAR_METHODS:
+            pattern = frame.f_locals["self"].pattern
+            linear_calls[id(frame)] = (pattern, time.perf_counter())
+        elif event == "return" and id(frame) in linear_calls:
+            record(linear_calls.pop(id(frame)))
+
+    for payload in payloads:
+        tool_name, tool_input = (
+            payload.get("tool_name", ""),
+            payload.get("tool_input", {}),
+        )
+        sys.setprofile(profiler)
+        try:
+            check(tool_name, tool_input)
+        finally:
+            sys.setprofile(None)
+        stack.clear()
+        linear_calls.clear()
+
+    ranked = sorted(totals.items(), key=lambda item: item[1][1], reverse=True)
+    return {
+        pattern: {
+            "calls": calls,
+            "total_ms": round(total, 4),
+            "max_ms": round(worst, 4),
+        }
+        for pattern, (calls, total, worst) in ranked
+    }
+
+
+def run_benchmark(
+    payloads: Sequence[dict],
+    hooks: Sequence[HookSpec] | None = None,
+    modes: Sequence[str] = MODES,
+    python: str | None = sys.executable,
+    guards_root: str = GUARDS_ROOT,
+    profile: bool = True,
+) -> dict[str, Any]:
+    """Replay ``payloads`` through ``hooks`` and return the JSON-ready report.
+
+    The report has an ``environment`` block, the interpreter ``spawn`` floor
+    and one entry per hook with latency percentiles per mode, the
+    subprocess-minus-evaluation ``overhead_p50_ms`` and per-pattern times.
+    """
+    if hooks is None:
+        hooks = [
+            h for h in discover_hooks(guards_root) if h.script not in SIDE_EFFECT_HOOKS
+        ]
+
+    spawn = measure_spawn(python or sys.executable) if "subprocess" in modes else []
+    report: dict[str, Any] = {
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "commit": _git_commit(guards_root),
+            "corpus_size": len(payloads),
+        },
+        "spawn": percentiles(spawn),
+        "hooks": {},
+    }
+
+    for hook in hooks:
+        script = os.path.join(guards_root, hook.script)
+        matching = [payload for payload in payloads if hook.matches(payload)]
+        entry: dict[str, Any] = {
+            "event": hook.event,
+            "matcher": hook.matcher,
+            "payloads": len(matching),
+        }
+
+        if "subprocess" in modes:
+            entry["subprocess"] = percentiles(
+                measure_subprocess(script, matching, python)
+            )
+
+        check = load_check(script) if hook.event == "PreToolUse" else None
+        if check and matching:
+            # Warm-up call, so lazily loaded rules count as startup, not evaluation
+            check(matching[0].get("tool_name", ""), matching[0].get("tool_input", {}))
+        if "in-process" in modes:
+            entry["in_process"] = (
+                percentiles(measure_in_process(check, matching)) if check else None
+            )
+        if entry.get("subprocess") and entry.get("in_process"):
+            entry["overhead_p50_ms"] = round(
+                entry["subprocess"]["p50"] - entry["in_process"]["p50"], 3
+            )
+        if profile and check:
+            entry["patterns"] = profile_patterns(check, matching)
+
+        report["hooks"][hook.script] = entry
+    return report
+
+
+def _git_commit(path: str) -> str | None:
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            cwd=path,
+            timeout=5,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return result.stdout.strip() or None
+
+
+def format_summary(report: dict[str, Any]) -> str:
+    """Render a report as a fixed-width table for terminals."""
+    lines = []
+    spawn = report.get("spawn")
+    if spawn:
+        lines.append(
+            f"interpreter spawn p50 {spawn['p50']:.1f} ms (floor for subprocess mode)"
+        )
+    header = f"{'hook':<58} {'n':>5} {'sub p50':>8} {'sub p95':>8} {'sub p99':>8} {'eval p50':>9} {'eval p99':>9}"
+    lines.append(header)
+    lines.append("-" * len(header))
+
+    def cell(stats: dict | None, key: str, width: int) -> str:
+        return f"{stats[key]:>{width}.2f}" if stats else f"{'-':>{width}}"
+
+    for script, entry in report["hooks"].items():
+        sub, evaluation = entry.get("subprocess"), entry.get("in_process")
+        lines.append(
+            f"{script:<58} {entry['payloads']:>5} {cell(sub, 'p50', 8)} {cell(sub, 'p95', 8)} "
+            f"{cell(sub, 'p99', 8)} {cell(evaluation, 'p50', 9)} {cell(evaluation, 'p99', 9)}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,55 @@
+"""Shared, lazily parsed view of a Bash command for guard rules."""
+
+from __future__ import annotations
+
+import re
+import shlex
+from functools import cached_property
+
+from .shell import Script, parse_script
+
+LINE_CONTINUATION = re.compile(r"\\\n\s*")
+
+
+class BashCommand:
+    """One Bash command string, parsed at most once and shared between rules.
+
+    Every property is computed on first access, so rules that only need the raw
+    text never pay for tokenizing it.
+    """
+
+    def __init__(self, text: str) -> None:
+        self.text = text
+
+    @cached_property
+    def lower(self) -> str:
+        """Lowercased command text for cheap keyword prefilters."""
+        return self.text.lower()
+
+    @cached_property
+    def normalized(self) -> str:
+        """Command text with backslash-newline continuations joined."""
+        return LINE_CONTINUATION.sub(" ", self.text)
+
+    @cached_property
+    def tokens(self) -> list[str] | None:
+        """shlex tokens of the command, or None if it cannot be tokenized."""
+        try:
+            return shlex.split(self.text)
+        except ValueError:
+            return None
+
+    @cached_property
+    def script(self) -> Script:
+        """Structured parse: pipelines, lists and unwrapped simple commands."""
+        return parse_script(self.text)
+
+    @cached_property
+    def wrapped_commands(self) -> list[str]:
+        """Inner command strings passed to ``sh -c`` or ``eval``, at any depth.
+
+        Empty if the command cannot be parsed completely.
+        """
+        if not self.script.complete:
+            return []
+        return list(self.script.wrapped_payloads)
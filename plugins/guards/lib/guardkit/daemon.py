@@ -0,0 +1,154 @@
+"""Long-lived guard server that evaluates PreToolUse guards in-process.
+
+Each guard script is imported once and its ``check(tool_name, tool_input)``
+function is called for every request, so interpreter startup, dependency
+resolution and regex compilation are paid once per daemon instead of once per
+tool call. Clients talk to the server over a Unix domain socket with one JSON
+request line and one JSON response line per connection:
+
+    request:  {"script": "/abs/path/to/guard.py", "payload": {...hook input...}}
+    response: {"status": "ok", "reason": "..." | null}
+              {"status": "fallback"}  (client must run the script itself)
+
+Checks that take a ``cwd`` keyword get the payload's working directory, since
+the daemon's own is unrelated to the session.
+"""
+
+from __future__ import annotations
+
+import fcntl
+import json
+import os
+import socketserver
+from collections.abc import Callable
+from types import ModuleType
+from typing import Any
+
+from .loader import ScriptLoader
+from .runtime import GUARDS_ROOT, runtime_dir, socket_path
+
+DEFAULT_IDLE_TIMEOUT = 900.0
+MAX_REQUEST_BYTES = 4 * 1024 * 1024
+
+FALLBACK: dict[str, Any] = {"status": "fallback"}
+
+
+class GuardRegistry:
+    """Serves guard scripts under ``guards_root`` and evaluates requests."""
+
+    def __init__(self, guards_root: str = GUARDS_ROOT) -> None:
+        self._root = os.path.realpath(guards_root)
+        self._loader = ScriptLoader()
+        self._wants_cwd: dict[Callable[..., str | None], bool] = {}
+
+    def _accepts_cwd(self, check: Callable[..., str | None]) -> bool:
+        wants_cwd = self._wants_cwd.get(check)
+        if wants_cwd is None:
+            code = getattr(check, "__code__", None)
+            count = code.co_argcount + code.co_kwonlyargcount if code else 0
+            wants_cwd = code is not None and "cwd" in code.co_varnames[:count]
+            self._wants_cwd[check] = wants_cwd
+        return wants_cwd
+
+    def load(self, script: str) -> ModuleType | None:
+        """Return the imported guard module, or None if it cannot be served."""
+        path = os.path.realpath(script)
+        if (
+            not path.endswith(".py")
+            or os.path.commonpath([path, self._root]) != self._root
+        ):
+            return None
+        return self._loader.load(path)
+
+    def evaluate(self, request: Any) -> dict[str, Any]:
+        """Evaluate one client request and return the response object."""
+        if not isinstance(request, dict):
+            return FALLBACK
+        payload = request.get("payload")
+        if (
+            not isinstance(payload, dict)
+            or payload.get("hook_event_name") != "PreToolUse"
+        ):
+            return FALLBACK
+        tool_input = payload.get("tool_input")
+        if not isinstance(tool_input, dict):
+            return FALLBACK
+
+        module = self.load(str(request.get("script", "")))
+        check = getattr(module, "check", None)
+        if not callable(check):
+            return FALLBACK
+
+        kwargs = {}
+        cwd = payload.get("cwd")
+        if isinstance(cwd, str) and os.path.isabs(cwd) and self._accepts_cwd(check):
+            kwargs["cwd"] = cwd
+        try:
+            reason = check(str(payload.get("tool_name", "")), tool_input, **kwargs)
+        except Exception as e:  # noqa: BLE001 - the script reports its own error
+            return {"status": "fallback", "error": repr(e)}
+        return {"status": "ok", "reason": reason or None}
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    server: GuardServer
+
+    def handle(self) -> None:
+        raw = self.rfile.readline(MAX_REQUEST_BYTES)
+        try:
+            request = json.loads(raw)
+        except ValueError:
+            response: dict[str, Any] = {"status": "error", "error": "invalid request"}
+        else:
+            response = self.server.registry.evaluate(request)
+        self.wfile.write(json.dumps(response).encode() + b"\n")
+
+
+class GuardServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Threaded Unix socket server that exits after ``idle_timeout`` seconds idle."""
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        path: str,
+        registry: GuardRegistry,
+        idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+    ) -> None:
+        self.registry = registry
+        self.timeout = idle_timeout
+        self._idle = False
+        super().__init__(path, _RequestHandler)
+        os.chmod(path, 0o600)
+
+    def handle_timeout(self) -> None:
+        self._idle = True
+
+    def serve_until_idle(self) -> None:
+        """Serve requests until no request arrives within the idle timeout."""
+        while not self._idle:
+            self.handle_request()
+
+
+def run(idle_timeout: float = DEFAULT_IDLE_TIMEOUT) -> int:
+    """Run the daemon for this user unless another instance already owns the socket."""
+    lock_file = open(os.path.join(runtime_dir(), "guardd.lock"), "w")  # noqa: SIM115
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        lock_file.close()
+        return 0
+
+    path = socket_path()
+    if os.path.exists(path):
+        os.unlink(path)  # stale socket from a daemon that did not shut down cleanly
+
+    server = GuardServer(path, GuardRegistry(), idle_timeout)
+    try:
+        server.serve_until_idle()
+    finally:
+        server.server_close()
+        if os.path.exists(path):
+            os.unlink(path)
+        lock_file.close()
+    return 0
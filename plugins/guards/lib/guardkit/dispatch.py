@@ -0,0 +1,284 @@
+"""Run every PreToolUse hook of a merged registry concurrently, first block wins.
+
+``setup-hooks.sh`` flattens every plugin's ``hooks.json`` into one settings
+file, so a Bash call normally starts each registered guard one after another,
+each as its own process. In dispatch mode the PreToolUse entries are written
+to a registry file instead (the ``hooks`` object of ``settings.json``) and a
+single hook, ``guard_dispatch.py``, runs the ones whose matcher matches the
+tool:
+
+- guard scripts under ``plugins/guards`` that define ``check()`` run
+  in-process on worker threads, through :class:`~guardkit.daemon.GuardRegistry`
+- any other command, or a guard that cannot be served in-process, runs as a
+  subprocess with the hook payload on stdin
+
+The dispatcher returns as soon as one hook blocks: queued hooks are not
+started and running subprocesses are killed. Each hook keeps its own
+``timeout``; a hook that exceeds it is abandoned and counts as allowing the
+call, as Claude Code treats a timed-out hook. When several hooks block before
+the dispatcher looks, the one registered first gives the reason.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import queue
+import re
+import signal
+import subprocess
+import threading
+import time
+from collections.abc import Iterable
+from typing import NamedTuple
+
+from .daemon import GuardRegistry
+from .runtime import GUARDS_ROOT
+
+# Claude Code's timeout for hooks that do not set one, in seconds
+DEFAULT_TIMEOUT = 60.0
+
+# Most hooks run at once; the rest wait for a free worker
+MAX_WORKERS = 16
+
+
+class Hook(NamedTuple):
+    command: str
+    timeout: float = DEFAULT_TIMEOUT
+
+
+class Outcome(NamedTuple):
+    # Position of the hook among those matching the call
+    index: int
+    hook: Hook
+    reason: str | None
+    # Why a hook that did not block failed, e.g. a timeout
+    error: str | None = None
+
+
+def read_registry(path: str) -> list[tuple[str, list[Hook]]]:
+    """Return ``(matcher, hooks)`` of each PreToolUse entry in a hooks file.
+
+    The file holds either a settings object with a ``hooks`` key or the hooks
+    object itself. Raises ValueError if it is malformed and OSError if it
+    cannot be read.
+    """
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    if isinstance(data, dict) and isinstance(data.get("hooks"), dict):
+        data = data["hooks"]
+    if not isinstance(data, dict):
+        raise ValueError(f"{path}: expected a hooks object")
+    entries = data.get("PreToolUse", [])
+    if not isinstance(entries, list):
+        raise ValueError(f"{path}: PreToolUse must be a list")
+
+    registry = []
+    for entry in entries:
+        if not isinstance(entry, dict) or not isinstance(entry.get("hooks", []), list):
+            raise ValueError(f"{path}: each PreToolUse entry needs a 'hooks' list")
+        hooks = [
+            Hook(hook["command"], float(hook.get("timeout", DEFAULT_TIMEOUT)))
+            for hook in entry.get("hooks", [])
+            if isinstance(hook, dict)
+            and hook.get("type", "command") == "command"
+            and isinstance(hook.get("command"), str)
+        ]
+        registry.append((str(entry.get("matcher", "")), hooks))
+    return registry
+
+
+def matches(matcher: str, tool_name: str) -> bool:
+    """True if a hook matcher (a tool name, ``A|B``, a regex or ``*``) selects the tool."""
+    if matcher in ("", "*"):
+        return True
+    try:
+        return re.fullmatch(matcher, tool_name) is not None
+    except re.error:
+        return matcher == tool_name
+
+
+def matching_hooks(
+    registry: Iterable[tuple[str, list[Hook]]], tool_name: str
+) -> list[Hook]:
+    """Return the hooks registered for ``tool_name`` in order, each command once."""
+    selected: dict[str, Hook] = {}
+    for matcher, hooks in registry:
+        if matches(matcher, tool_name):
+            for hook in hooks:
+                selected.setdefault(hook.command, hook)
+    return list(selected.values())
+
+
+def _block_reason(returncode: int, stdout: bytes, stderr: bytes) -> str | None:
+    """Return the block reason of a finished hook process, or None."""
+    if returncode == 2:
+        return stderr.decode(errors="replace").strip() or "Blocked by hook"
+    try:
+        output = json.loads(stdout) if stdout.strip() else None
+    except ValueError:
+        return None
+    if not isinstance(output, dict):
+        return None
+    specific = output.get("hookSpecificOutput")
+    if isinstance(specific, dict) and specific.get("permissionDecision") == "deny":
+        return str(specific.get("permissionDecisionReason") or "Blocked by hook")
+    if output.get("decision") == "block":
+        return str(output.get("reason") or "Blocked by hook")
+    return None
+
+
+class Dispatcher:
+    """Runs the hooks that match a tool call on worker threads."""
+
+    def __init__(
+        self,
+        registry: Iterable[tuple[str, list[Hook]]],
+        guards_root: str = GUARDS_ROOT,
+        max_workers: int = MAX_WORKERS,
+    ) -> None:
+        self.registry = list(registry)
+        self.max_workers = max_workers
+        self._guards = GuardRegistry(guards_root)
+
+    def _script(self, command: str) -> str | None:
+        """Return the guard script a command runs, if it can run in-process."""
+        script = os.path.expanduser(command.strip())
+        if " " in script or self._guards.load(script) is None:
+            return None
+        return script
+
+    def _run(
+        self, hook: Hook, payload: dict, raw: bytes, running: set, lock: threading.Lock
+    ) -> str | None:
+        """Evaluate one hook and return its block reason or None."""
+        script = self._script(hook.command)
+        if script is not None:
+            response = self._guards.evaluate({"script": script, "payload": payload})
+            if response.get("status") == "ok":
+                return response["reason"]
+
+        process = subprocess.Popen(
+            hook.command,
+            shell=True,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            cwd=payload.get("cwd") if os.path.isdir(str(payload.get("cwd"))) else None,
+            start_new_session=True,
+        )
+        with lock:
+            running.add(process)
+        try:
+            stdout, stderr = process.communicate(raw, timeout=hook.timeout)
+        except subprocess.TimeoutExpired:
+            _kill(process)
+            raise
+        finally:
+            with lock:
+                running.discard(process)
+        return _block_reason(process.returncode, stdout, stderr)
+
+    def run(self, payload: dict, raw: bytes | None = None) -> list[Outcome]:
+        """Run the hooks matching a PreToolUse payload until one blocks.
+
+        Returns the outcomes seen, a blocking one last. Hooks still queued or
+        running when it arrives are left out. ``raw`` is the payload as read
+        from stdin, passed on to subprocess hooks unchanged.
+        """
+        hooks = matching_hooks(self.registry, str(payload.get("tool_name", "")))
+        if raw is None:
+            raw = json.dumps(payload).encode()
+
+        results: queue.Queue[Outcome] = queue.Queue()
+        waiting: queue.Queue[int] = queue.Queue()
+        for index in range(len(hooks)):
+            waiting.put(index)
+        running: set[subprocess.Popen] = set()
+        lock = threading.Lock()
+        stop = threading.Event()
+        # Index -> deadline, set when a worker starts the hook
+        deadlines: dict[int, float] = {}
+
+        def work() -> None:
+            while not stop.is_set():
+                try:
+                    index = waiting.get_nowait()
+                except queue.Empty:
+                    return
+                hook = hooks[index]
+                with lock:
+                    deadlines[index] = time.monotonic() + hook.timeout
+                try:
+                    outcome = Outcome(
+                        index, hook, self._run(hook, payload, raw, running, lock)
+                    )
+                except subprocess.TimeoutExpired:
+                    outcome = _timed_out(index, hook)
+                except Exception as e:  # noqa: BLE001 - one broken hook must not stop the rest
+                    outcome = Outcome(index, hook, None, repr(e))
+                results.put(outcome)
+
+        def start_worker() -> None:
+            # Daemon threads, so a check that never returns cannot keep the hook alive
+            threading.Thread(target=work, daemon=True).start()
+
+        for _ in range(min(self.max_workers, len(hooks))):
+            start_worker()
+
+        outcomes: list[Outcome] = []
+        pending = set(range(len(hooks)))
+        try:
+            while pending:
+                with lock:
+                    started = [
+                        deadlines[index] for index in pending if index in deadlines
+                    ]
+                wait = max(0.0, min(started) - time.monotonic()) if started else None
+                try:
+                    batch = [results.get(timeout=wait)]
+                except queue.Empty:
+                    # In-process checks cannot be interrupted, only abandoned
+                    now = time.monotonic()
+                    with lock:
+                        expired = [
+                            i for i in pending if deadlines.get(i, now + 1) <= now
+                        ]
+                    for index in sorted(expired):
+                        pending.discard(index)
+                        outcomes.append(_timed_out(index, hooks[index]))
+                        # Replace the worker stuck in the abandoned check
+                        if not waiting.empty():
+                            start_worker()
+                    continue
+                while True:
+                    try:
+                        batch.append(results.get_nowait())
+                    except queue.Empty:
+                        break
+                batch = sorted(outcome for outcome in batch if outcome.index in pending)
+                for outcome in batch:
+                    pending.discard(outcome.index)
+                blocking = [outcome for outcome in batch if outcome.reason]
+                outcomes += [outcome for outcome in batch if not outcome.reason]
+                if blocking:
+                    outcomes.append(blocking[0])
+                    break
+        finally:
+            stop.set()
+            with lock:
+                for process in list(running):
+                    _kill(process)
+        return outcomes
+
+
+def _timed_out(index: int, hook: Hook) -> Outcome:
+    return Outcome(index, hook, None, f"timed out after {hook.timeout:g}s")
+
+
+def _kill(process: subprocess.Popen) -> None:
+    """Kill a hook process and everything it started."""
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except OSError:
+        pass
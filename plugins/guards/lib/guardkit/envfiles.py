@@ -0,0 +1,125 @@
+"""Symlink-aware classification of paths as environment files.
+
+protect-env and safety-guard block reads of ``.env`` files but allow
+templates such as ``.env.example``. Matching only the path as written misses
+links: ``config.txt -> .env`` reads the secrets under a harmless name. An
+:class:`EnvFileClassifier` compiles a guard's template and env rules into one
+:class:`~guardkit.prefilter.LiteralIndex` (templates first, so the first
+matching rule decides) and checks both the path as written and, for an
+existing path, its ``realpath``.
+
+A name alone is classified as today. A path is protected if either its name
+or the file it resolves to is an env file, so a link named ``.env.example``
+that points at ``.env`` is blocked as well.
+
+:func:`mentions_link` is the cheap test a hook runs before building any
+classifier: whether a command names an existing path that goes through a link.
+The module defers importing the prefilter to the first classifier, so hooks can
+import it on their fast path.
+
+Resolved results are memoized per path and the ``lstat``/``stat`` identity
+(device, inode, mtime) of the path and its target. Replacing a link or the
+file it points at changes the key, and a long-lived process (guardd, the
+guard pipeline) pays two ``stat`` calls for a path it has already seen.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+from collections.abc import Iterable
+
+SAFE = "safe"
+ENV = "env"
+
+# Memoized resolutions per classifier before the memo is cleared
+MAX_MEMO = 4096
+
+# Characters that can separate a path from the rest of a command
+_SEPARATORS = str.maketrans({char: " " for char in "|&;()`<>'\"="})
+
+
+def path_words(command: str) -> list[str]:
+    """Split ``command`` into the words that could be paths, ignoring quoting."""
+    return command.translate(_SEPARATORS).split()
+
+
+def mentions_link(command: str) -> bool:
+    """True if a word of ``command`` is an existing path that goes through a symlink."""
+    for word in path_words(command):
+        path = os.path.expanduser(word)
+        if os.path.lexists(path) and os.path.realpath(path) != os.path.abspath(path):
+            return True
+    return False
+
+
+class EnvFileClassifier:
+    """One guard's env-file and safe-template rules, compiled into one matcher."""
+
+    def __init__(
+        self,
+        env_patterns: Iterable[str],
+        safe_patterns: Iterable[str],
+        safe_flags: int = 0,
+    ) -> None:
+        from .prefilter import LiteralIndex
+
+        safe_prefix = "(?i:" if safe_flags & re.IGNORECASE else "(?:"
+        entries = [(f"{safe_prefix}{pattern})", SAFE) for pattern in safe_patterns]
+        entries += [(pattern, ENV) for pattern in env_patterns]
+        # Matched in linear time however long the path is
+        self._index = LiteralIndex(entries, linear=True)
+        self._memo: dict[tuple, str | None] = {}
+
+    def classify_name(self, path: str) -> str | None:
+        """Return SAFE, ENV or None for ``path`` as written."""
+        return self._index.first(path)
+
+    def is_env_name(self, path: str) -> bool:
+        """True if ``path`` as written is an env file and not a safe template."""
+        return self.classify_name(path) == ENV
+
+    def resolved_env_path(self, path: str, cwd: str | None = None) -> str | None:
+        """Return the env file an existing ``path`` resolves to, or None.
+
+        Only a path whose ``realpath`` differs from the path as written can
+        resolve to another name; others are left to :meth:`is_env_name`.
+        """
+        if not path:
+            return None
+        absolute = os.path.join(cwd or os.getcwd(), os.path.expanduser(path))
+        try:
+            link = os.lstat(absolute)
+            target = os.stat(absolute)
+        except (OSError, ValueError):
+            return None  # Missing, dangling or unreadable: nothing to resolve
+        key = (
+            absolute,
+            link.st_dev,
+            link.st_ino,
+            link.st_mtime_ns,
+            target.st_dev,
+            target.st_ino,
+            target.st_mtime_ns,
+        )
+        if key in self._memo:
+            return self._memo[key]
+
+        real = os.path.realpath(absolute)
+        resolved = None
+        if real != os.path.normpath(absolute) and self.is_env_name(real):
+            resolved = real
+        if len(self._memo) >= MAX_MEMO:
+            self._memo.clear()
+        self._memo[key] = resolved
+        return resolved
+
+    def protected(self, path: str, cwd: str | None = None) -> str | None:
+        """Describe the env file ``path`` names or links to, or None if allowed.
+
+        Returns ``path`` itself, or ``"path -> target"`` for a link.
+        """
+        if self.is_env_name(path):
+            return path
+        target = self.resolved_env_path(path, cwd)
+        return f"{path} -> {target}" if target else None
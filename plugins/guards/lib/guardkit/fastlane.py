@@ -0,0 +1,288 @@
+"""Fast lane that allows trivially safe Bash commands before any guard runs.
+
+Most agent Bash calls are read-only (``ls``, ``git status``, ``rg``,
+``uv run pytest``), yet each one is checked by every guard. The fast lane
+allows such a call in one pass when all of these hold:
+
+1. The command is a single simple command of plain words: no chaining,
+   pipes, substitution, expansion, quoting, globbing or redirection, no
+   mention of ``.env`` and no argument that is a path through a symlink
+   (protect-env follows those to env files).
+2. Its leading words and the shape of its arguments are in a trie of safe
+   commands, compiled from ``fast-lane.policy.toml``: ``"git log *"`` takes
+   any plain arguments, ``"git status -*"`` only flags, ``"pwd"`` none.
+3. No gate of any Bash rule matches it.
+
+The gates keep the lane from drifting apart from the guards. Each rule module
+defines ``fast_lane_gates(cwd)``, which returns its own pattern tables (a
+:class:`~guardkit.prefilter.LiteralIndex`) or patterns for a project, such
+that every plain-word command the rule can block matches one of them. A rule
+without it turns the lane off, and a trie entry that a rule blocks even
+without arguments is dropped with a warning.
+
+Compiling imports the rules. The result, the trie entries and every gate
+pattern with its prefilter literals, is saved as a JSON artifact under
+``fast-lane/`` in the runtime directory with the fingerprint it was built
+for, so a hook process answers from the artifact without importing a guard.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import sys
+from collections.abc import Callable, Iterable
+from typing import Any, NamedTuple
+
+from . import linear
+from .prefilter import LiteralIndex, required_literals
+from .runtime import runtime_dir
+
+# Bump when the artifact format changes
+ARTIFACT_VERSION = 1
+
+# A plain command: words of these characters separated by spaces
+PLAIN_COMMAND = re.compile(r"[\w./:=@%+,~^ -]+", re.ASCII)
+
+ANY_ARGUMENTS = "*"
+FLAG_ARGUMENTS = "-*"
+
+
+class Gate(NamedTuple):
+    pattern: str
+    flags: int
+    # Casefolded literals one of which any match contains, None if unknown
+    literals: frozenset[str] | None
+    # False for a pattern the linear engine cannot run
+    linear: bool = True
+
+
+def parse_entry(entry: str) -> tuple[tuple[str, ...], str]:
+    """Return the words and argument shape of a trie entry such as ``"git log *"``."""
+    words = entry.split()
+    shape = (
+        words.pop() if words and words[-1] in (ANY_ARGUMENTS, FLAG_ARGUMENTS) else ""
+    )
+    if not words or not PLAIN_COMMAND.fullmatch(" ".join(words)):
+        raise ValueError(f"invalid fast lane entry {entry!r}")
+    return tuple(words), shape
+
+
+class _Node:
+    __slots__ = ("children", "shapes")
+
+    def __init__(self) -> None:
+        self.children: dict[str, _Node] = {}
+        self.shapes: set[str] = set()
+
+
+class CommandTrie:
+    """Safe command prefixes, one node per word, with their argument shapes."""
+
+    def __init__(self, entries: Iterable[str] = ()) -> None:
+        self._root = _Node()
+        for entry in entries:
+            self.insert(entry)
+
+    def insert(self, entry: str) -> None:
+        words, shape = parse_entry(entry)
+        node = self._root
+        for word in words:
+            node = node.children.setdefault(word, _Node())
+        node.shapes.add(shape)
+
+    def accepts(self, words: list[str]) -> bool:
+        """True if a prefix of ``words`` is an entry whose shape fits the rest."""
+        node = self._root
+        for depth, word in enumerate(words, 1):
+            node = node.children.get(word)
+            if node is None:
+                return False
+            rest = words[depth:]
+            for shape in node.shapes:
+                if shape == ANY_ARGUMENTS or not rest:
+                    return True
+                if shape == FLAG_ARGUMENTS and all(arg.startswith("-") for arg in rest):
+                    return True
+        return False
+
+
+def plain_words(command: str, cwd: str | None = None) -> list[str] | None:
+    """Return the words of a plain simple command, or None if it is anything else."""
+    if not PLAIN_COMMAND.fullmatch(command) or ".env" in command.casefold():
+        return None
+    words = command.split()
+    for word in words:
+        path = os.path.join(cwd or os.getcwd(), os.path.expanduser(word))
+        if os.path.lexists(path) and os.path.realpath(path) != os.path.abspath(path):
+            return None
+    return words
+
+
+def gate_patterns(gate: Any) -> list[Gate]:
+    """Return the patterns of one item of ``fast_lane_gates()`` with their literals."""
+    if isinstance(gate, LiteralIndex):
+        found = [
+            (pattern.pattern, gate.flags, literals)
+            for (pattern, _value), literals in zip(
+                gate.entries, gate.literals, strict=True
+            )
+        ]
+    else:
+        pattern = getattr(gate, "pattern", gate)
+        flags = getattr(gate, "flags", 0) & ~re.UNICODE
+        found = [(pattern, flags, required_literals(pattern, flags))]
+
+    gates = []
+    for pattern, flags, literals in found:
+        try:
+            linear.compile(pattern, flags)
+        except linear.UnsupportedPatternError:
+            gates.append(Gate(pattern, flags, literals, linear=False))
+        else:
+            gates.append(Gate(pattern, flags, literals))
+    return gates
+
+
+class FastLane:
+    """A compiled command trie and the gates of every guard rule."""
+
+    def __init__(
+        self, entries: list[str], gates: list[Gate], enabled: bool = True
+    ) -> None:
+        self.entries = entries
+        self.gates = gates
+        self.enabled = enabled
+        self._trie = CommandTrie(entries)
+        groups: dict[tuple[int, bool], list[Gate]] = {}
+        for gate in gates:
+            groups.setdefault((gate.flags, gate.linear), []).append(gate)
+        self._indexes = [
+            LiteralIndex(
+                ((gate.pattern, None) for gate in group),
+                flags,
+                linear=is_linear,
+                literals=[gate.literals for gate in group],
+            )
+            for (flags, is_linear), group in groups.items()
+        ]
+
+    def allows(self, command: str, cwd: str | None = None) -> bool:
+        """True if ``command`` is trivially safe and no guard needs to see it."""
+        if not self.enabled:
+            return False
+        words = plain_words(command, cwd)
+        if not words or not self._trie.accepts(words):
+            return False
+        return not any(index.any(command) for index in self._indexes)
+
+
+DISABLED = FastLane([], [], enabled=False)
+
+
+def compile_fast_lane(
+    entries: Iterable[str],
+    rules: Iterable[Any],
+    probe: Callable[[str], str | None],
+    cwd: str | None = None,
+) -> FastLane:
+    """Build the fast lane from trie ``entries`` and the rule modules of a project.
+
+    ``probe`` returns the pipeline's block reason for a command; entries it
+    blocks without arguments are dropped.
+    """
+    gates: list[Gate] = []
+    for module in rules:
+        fast_lane_gates = getattr(module, "fast_lane_gates", None)
+        if not callable(fast_lane_gates):
+            return DISABLED
+        for gate in fast_lane_gates(cwd):
+            gates += gate_patterns(gate)
+
+    kept = []
+    for entry in entries:
+        try:
+            words, _shape = parse_entry(entry)
+        except ValueError as e:
+            print(f"guards: ignoring {e}", file=sys.stderr)
+            continue
+        if probe(" ".join(words)):
+            print(
+                f"guards: a guard blocks fast lane entry {entry!r}, dropped",
+                file=sys.stderr,
+            )
+            continue
+        kept.append(entry)
+    return FastLane(kept, gates)
+
+
+def artifact_path(rule_paths: list[str], cwd: str | None = None) -> str:
+    key = "\0".join([*rule_paths, cwd or os.getcwd()])
+    digest = hashlib.sha256(key.encode()).hexdigest()
+    return os.path.join(runtime_dir(), "fast-lane", f"{digest[:16]}.json")
+
+
+def _save_artifact(path: str, fingerprint: list, lane: FastLane) -> None:
+    data = {
+        "version": ARTIFACT_VERSION,
+        "fingerprint": fingerprint,
+        "enabled": lane.enabled,
+        "entries": lane.entries,
+        "gates": [
+            [
+                gate.pattern,
+                gate.flags,
+                gate.literals and sorted(gate.literals),
+                gate.linear,
+            ]
+            for gate in lane.gates
+        ],
+    }
+    try:
+        os.makedirs(os.path.dirname(path), mode=0o700, exist_ok=True)
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(temporary, path)
+    except OSError:
+        pass  # The next process compiles again
+
+
+def _load_artifact(path: str, fingerprint: list) -> FastLane | None:
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        if data["version"] != ARTIFACT_VERSION or data["fingerprint"] != fingerprint:
+            return None
+        gates = [
+            Gate(
+                pattern,
+                flags,
+                None if literals is None else frozenset(literals),
+                is_linear,
+            )
+            for pattern, flags, literals, is_linear in data["gates"]
+        ]
+        return FastLane(data["entries"], gates, data["enabled"])
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def load_fast_lane(
+    rule_paths: list[str],
+    fingerprint: list,
+    compile: Callable[[], FastLane],
+    cwd: str | None = None,
+) -> FastLane:
+    """Return the fast lane saved for ``fingerprint``, or ``compile()`` and save it."""
+    try:
+        path = artifact_path(rule_paths, cwd)
+    except OSError:
+        return compile()  # No usable runtime directory
+    lane = _load_artifact(path, fingerprint)
+    if lane is None:
+        lane = compile()
+        _save_artifact(path, fingerprint, lane)
+    return lane
@@ -0,0 +1,156 @@
+"""Per-session queue of edited Python files for batched ruff formatting.
+
+Formatting on every Write/Edit spawns ``uvx ruff format`` once per edit, so a
+multi-file refactor formats the same files over and over. In batch mode
+(``GUARDS_FORMAT_BATCH=1``) the python-format hook only appends the edited
+path to a queue file in the runtime directory, one per session. At ``Stop``
+and ``SubagentStop`` the queue is claimed with an atomic rename and
+formatted with one ``ruff format`` call over the deduplicated, still existing
+paths.
+
+Two optional thresholds force an early flush from PostToolUse:
+
+- ``GUARDS_FORMAT_BATCH_MAX_FILES``: flush once this many distinct files are
+  queued
+- ``GUARDS_FORMAT_BATCH_MAX_AGE``: flush once the oldest queued edit is this
+  many seconds old
+
+Each line of a queue file is ``<unix time>\\t<path>``, appended with a single
+``O_APPEND`` write so parallel hooks never interleave entries.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import subprocess
+import time
+
+from .runtime import runtime_dir
+
+RUFF_FORMAT_COMMAND = ("uvx", "ruff", "format")
+
+
+def batch_enabled() -> bool:
+    return os.environ.get("GUARDS_FORMAT_BATCH", "0") not in ("", "0")
+
+
+def _threshold(name: str) -> float:
+    try:
+        return float(os.environ.get(name, "0"))
+    except ValueError:
+        return 0.0
+
+
+def queue_path(session_id: str) -> str:
+    """Return the queue file for a session (ids are hashed into file names)."""
+    digest = hashlib.sha256(session_id.encode()).hexdigest()[:16]
+    return os.path.join(runtime_dir(), f"format-queue-{digest}")
+
+
+def enqueue(session_id: str, path: str) -> None:
+    """Append an edited file to the session's queue."""
+    line = f"{time.time():.3f}\t{os.path.abspath(path)}\n".encode()
+    fd = os.open(queue_path(session_id), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+    try:
+        os.write(fd, line)
+    finally:
+        os.close(fd)
+
+
+def try_enqueue(session_id: str, path: str) -> bool:
+    """Queue ``path``; False if the queue cannot be written (format it now instead)."""
+    try:
+        enqueue(session_id, path)
+    except OSError:
+        return False
+    return True
+
+
+def _read_entries(path: str) -> list[tuple[float, str]]:
+    try:
+        with open(path, encoding="utf-8") as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return []
+    entries = []
+    for line in lines:
+        stamp, _, file_path = line.partition("\t")
+        try:
+            entries.append((float(stamp), file_path))
+        except ValueError:
+            continue  # Torn write
+    return entries
+
+
+def pending(session_id: str) -> list[str]:
+    """Return the distinct queued files, in first-edit order."""
+    return list(
+        dict.fromkeys(path for _stamp, path in _read_entries(queue_path(session_id)))
+    )
+
+
+def should_flush(session_id: str, now: float | None = None) -> bool:
+    """True if a size or age threshold says to flush before the turn ends."""
+    max_files = _threshold("GUARDS_FORMAT_BATCH_MAX_FILES")
+    max_age = _threshold("GUARDS_FORMAT_BATCH_MAX_AGE")
+    if not max_files and not max_age:
+        return False
+    entries = _read_entries(queue_path(session_id))
+    if not entries:
+        return False
+    if max_files and len({path for _stamp, path in entries}) >= max_files:
+        return True
+    now = time.time() if now is None else now
+    return bool(max_age) and now - min(stamp for stamp, _path in entries) >= max_age
+
+
+def claim(session_id: str) -> list[str]:
+    """Take the session's queue, so that each queued edit is formatted once.
+
+    The queue file is renamed before it is read: edits queued meanwhile start
+    a new queue, and a concurrent flush finds nothing to claim.
+    """
+    path = queue_path(session_id)
+    claimed = f"{path}.{os.getpid()}"
+    try:
+        os.replace(path, claimed)
+    except OSError:
+        return []
+    try:
+        entries = _read_entries(claimed)
+    finally:
+        try:
+            os.unlink(claimed)
+        except OSError:
+            pass
+    return [
+        file_path
+        for file_path in dict.fromkeys(file_path for _stamp, file_path in entries)
+        if os.path.isfile(file_path)
+    ]
+
+
+def format_files(paths: list[str]) -> tuple[bool, str]:
+    """Run one ``ruff format`` over ``paths``; return ``(ok, output)``."""
+    result = subprocess.run(
+        [*RUFF_FORMAT_COMMAND, *paths],
+        check=False,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode == 0:
+        return True, result.stdout.strip()
+    return False, result.stderr.strip()
+
+
+def flush(session_id: str) -> str | None:
+    """Format everything queued for the session; return a report, or None if empty."""
+    paths = claim(session_id)
+    if not paths:
+        return None
+    ok, output = format_files(paths)
+    if not ok:
+        return f"Format warning: {output}"
+    summary = f"Formatted {len(paths)} file(s)"
+    return f"{summary}: {output}" if output else summary
@@ -0,0 +1,351 @@
+"""Read HEAD's commit straight from a repository's files, without the git CLI.
+
+post_validate_commit.py needs the hash and subject of the commit a Bash call
+just created. Running ``git log`` and ``git rev-parse`` costs two process
+starts; reading the same data takes a few file reads:
+
+- HEAD is resolved through symbolic refs, loose ref files and
+  ``packed-refs`` (per-worktree ``HEAD`` in the worktree's git dir, shared
+  refs in its ``commondir``)
+- a loose object is ``objects/xx/yyyy...``, zlib-deflated
+- a packed object is found in a version 2 ``pack-*.idx``: the fanout table
+  bounds the range of sorted object names starting with the first byte, which
+  is binary-searched for the offset into the ``.pack``. Deltified objects
+  (``OFS_DELTA``/``REF_DELTA``) are rebuilt from their base
+
+Layouts this reader does not implement raise UnsupportedRepositoryError, and
+callers run git instead: ``GIT_DIR`` and friends in the environment, reftable
+ref storage, SHA-256 repositories, version 1 pack indexes, and objects that
+are only reachable through alternates.
+"""
+
+from __future__ import annotations
+
+import mmap
+import os
+import re
+import struct
+import zlib
+
+# Environment variables that change where git looks for the repository
+GIT_ENVIRONMENT = (
+    "GIT_DIR",
+    "GIT_COMMON_DIR",
+    "GIT_OBJECT_DIRECTORY",
+    "GIT_ALTERNATE_OBJECT_DIRECTORIES",
+    "GIT_CEILING_DIRECTORIES",
+    "GIT_DISCOVERY_ACROSS_FILESYSTEM",
+)
+
+MAX_SYMREF_DEPTH = 5
+MAX_DELTA_CHAIN = 100
+
+OBJECT_TYPES = {1: "commit", 2: "tree", 3: "blob", 4: "tag"}
+OFS_DELTA = 6
+REF_DELTA = 7
+
+IDX_MAGIC = b"\377tOc"
+_SHA_RE = re.compile(r"[0-9a-f]{40}")
+_CONFIG_RE = re.compile(
+    r"^\s*(objectformat|refstorage)\s*=\s*(\S+)", re.IGNORECASE | re.MULTILINE
+)
+# Values of the extensions above that this reader handles
+_DEFAULT_FORMATS = {("objectformat", "sha1"), ("refstorage", "files")}
+
+
+class UnsupportedRepositoryError(RuntimeError):
+    """The repository layout is not handled here; ask the git CLI instead."""
+
+
+def find_git_dir(start: str) -> str:
+    """Return the git dir of the work tree containing ``start``."""
+    for name in GIT_ENVIRONMENT:
+        if os.environ.get(name):
+            raise UnsupportedRepositoryError(f"{name} is set")
+    directory = os.path.abspath(start)
+    while True:
+        dot_git = os.path.join(directory, ".git")
+        if os.path.isdir(dot_git):
+            return dot_git
+        if os.path.isfile(dot_git):
+            # Worktrees and submodules: "gitdir: <path>"
+            with open(dot_git, encoding="utf-8") as f:
+                content = f.read().strip()
+            if not content.startswith("gitdir:"):
+                raise UnsupportedRepositoryError(f"Unreadable {dot_git}")
+            return os.path.normpath(
+                os.path.join(directory, content[len("gitdir:") :].strip())
+            )
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            raise UnsupportedRepositoryError(f"No .git above {start}")
+        directory = parent
+
+
+class Repository:
+    """Refs and objects of one repository, read from its git dir."""
+
+    def __init__(self, git_dir: str) -> None:
+        self.git_dir = git_dir
+        self.common_dir = git_dir
+        try:
+            with open(os.path.join(git_dir, "commondir"), encoding="utf-8") as f:
+                self.common_dir = os.path.normpath(
+                    os.path.join(git_dir, f.read().strip())
+                )
+        except FileNotFoundError:
+            pass
+        self.objects_dir = os.path.join(self.common_dir, "objects")
+        self._check_format()
+
+    @classmethod
+    def discover(cls, start: str) -> Repository:
+        return cls(find_git_dir(start))
+
+    def _check_format(self) -> None:
+        if os.path.isdir(os.path.join(self.common_dir, "reftable")):
+            raise UnsupportedRepositoryError("reftable ref storage")
+        try:
+            with open(os.path.join(self.common_dir, "config"), encoding="utf-8") as f:
+                config = f.read()
+        except FileNotFoundError:
+            return
+        for key, value in _CONFIG_RE.findall(config):
+            if (key.lower(), value.lower()) not in _DEFAULT_FORMATS:
+                raise UnsupportedRepositoryError(f"{key} = {value}")
+
+    # Refs
+
+    def _loose_ref(self, name: str) -> str | None:
+        # Pseudo-refs and worktree-private refs live in the worktree's git dir
+        for base in dict.fromkeys((self.git_dir, self.common_dir)):
+            try:
+                with open(os.path.join(base, name), encoding="utf-8") as f:
+                    return f.read().strip()
+            except (FileNotFoundError, NotADirectoryError, IsADirectoryError):
+                continue
+        return None
+
+    def _packed_ref(self, name: str) -> str | None:
+        try:
+            with open(
+                os.path.join(self.common_dir, "packed-refs"), encoding="utf-8"
+            ) as f:
+                for line in f:
+                    if line.startswith(("#", "^")):
+                        continue
+                    sha, _, ref = line.rstrip("\n").partition(" ")
+                    if ref == name:
+                        return sha
+        except FileNotFoundError:
+            pass
+        return None
+
+    def resolve_ref(self, name: str = "HEAD") -> str | None:
+        """Return the object name ``name`` points to, or None for an unborn branch."""
+        for _ in range(MAX_SYMREF_DEPTH):
+            value = self._loose_ref(name)
+            if value is None:
+                value = self._packed_ref(name)
+            if value is None:
+                return None
+            if value.startswith("ref:"):
+                name = value[len("ref:") :].strip()
+                continue
+            if not _SHA_RE.fullmatch(value):
+                raise UnsupportedRepositoryError(
+                    f"Unreadable ref {name}: {value[:50]!r}"
+                )
+            return value
+        raise UnsupportedRepositoryError(f"Symbolic ref chain too deep at {name}")
+
+    # Objects
+
+    def read_object(self, sha: str) -> tuple[str, bytes]:
+        """Return ``(type, content)`` of the object named ``sha``."""
+        loose = os.path.join(self.objects_dir, sha[:2], sha[2:])
+        try:
+            with open(loose, "rb") as f:
+                raw = zlib.decompress(f.read())
+        except FileNotFoundError:
+            return self._read_packed(sha)
+        header, _, content = raw.partition(b"\0")
+        kind, _, _size = header.decode("ascii").partition(" ")
+        return kind, content
+
+    def _pack_indexes(self) -> list[str]:
+        pack_dir = os.path.join(self.objects_dir, "pack")
+        try:
+            names = os.listdir(pack_dir)
+        except FileNotFoundError:
+            return []
+        return sorted(
+            os.path.join(pack_dir, name) for name in names if name.endswith(".idx")
+        )
+
+    def _read_packed(self, sha: str) -> tuple[str, bytes]:
+        binary = bytes.fromhex(sha)
+        for idx_path in self._pack_indexes():
+            offset = find_in_index(idx_path, binary)
+            if offset is not None:
+                with open(idx_path[: -len(".idx")] + ".pack", "rb") as pack:
+                    return self._unpack(pack, offset, 0)
+        raise UnsupportedRepositoryError(
+            f"Object {sha} not found (alternates or missing)"
+        )
+
+    def _unpack(self, pack, offset: int, depth: int) -> tuple[str, bytes]:
+        if depth > MAX_DELTA_CHAIN:
+            raise UnsupportedRepositoryError("Delta chain too long")
+        pack.seek(offset)
+        byte = pack.read(1)[0]
+        kind = (byte >> 4) & 7
+        while byte & 0x80:  # Size varint; the inflated data carries its own length
+            byte = pack.read(1)[0]
+
+        if kind == OFS_DELTA:
+            byte = pack.read(1)[0]
+            distance = byte & 0x7F
+            while byte & 0x80:
+                byte = pack.read(1)[0]
+                distance = ((distance + 1) << 7) | (byte & 0x7F)
+            delta = _inflate(pack)
+            base_kind, base = self._unpack(pack, offset - distance, depth + 1)
+            return base_kind, apply_delta(base, delta)
+        if kind == REF_DELTA:
+            base_sha = pack.read(20).hex()
+            delta = _inflate(pack)
+            base_kind, base = self.read_object(base_sha)
+            return base_kind, apply_delta(base, delta)
+        if kind not in OBJECT_TYPES:
+            raise UnsupportedRepositoryError(f"Unknown pack object type {kind}")
+        return OBJECT_TYPES[kind], _inflate(pack)
+
+    # Commits
+
+    def head_commit(self) -> tuple[str, str] | None:
+        """Return ``(hash, subject)`` of HEAD, or None before the first commit."""
+        sha = self.resolve_ref("HEAD")
+        if sha is None:
+            return None
+        kind, content = self.read_object(sha)
+        if kind != "commit":
+            raise UnsupportedRepositoryError(f"HEAD is a {kind}")
+        return sha, commit_subject(content)
+
+
+def _inflate(pack) -> bytes:
+    decompressor = zlib.decompressobj()
+    chunks = []
+    while not decompressor.eof:
+        data = pack.read(8192)
+        if not data:
+            raise UnsupportedRepositoryError("Truncated pack")
+        chunks.append(decompressor.decompress(data))
+    return b"".join(chunks)
+
+
+def find_in_index(idx_path: str, binary: bytes) -> int | None:
+    """Return the pack offset of object ``binary`` in a version 2 index, or None."""
+    with (
+        open(idx_path, "rb") as f,
+        mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as idx,
+    ):
+        if idx[:4] != IDX_MAGIC or struct.unpack(">I", idx[4:8])[0] != 2:
+            raise UnsupportedRepositoryError(f"Unsupported pack index {idx_path}")
+        # fanout[b] counts the objects whose first byte is <= b
+        fanout = struct.unpack(">256I", idx[8 : 8 + 256 * 4])
+        count = fanout[255]
+        first = binary[0]
+        low = fanout[first - 1] if first else 0
+        high = fanout[first]
+
+        names = 8 + 256 * 4
+        while low < high:
+            middle = (low + high) // 2
+            name = idx[names + middle * 20 : names + (middle + 1) * 20]
+            if name < binary:
+                low = middle + 1
+            elif name > binary:
+                high = middle
+            else:
+                break
+        else:
+            return None
+
+        offsets = names + count * 24  # after the names and their CRC32s
+        offset = struct.unpack(
+            ">I", idx[offsets + middle * 4 : offsets + (middle + 1) * 4]
+        )[0]
+        if offset & 0x80000000:  # Index into the 64-bit offset table
+            large = offsets + count * 4 + (offset & 0x7FFFFFFF) * 8
+            offset = struct.unpack(">Q", idx[large : large + 8])[0]
+        return offset
+
+
+def _varint(data: bytes, position: int) -> tuple[int, int]:
+    value = shift = 0
+    while True:
+        byte = data[position]
+        position += 1
+        value |= (byte & 0x7F) << shift
+        shift += 7
+        if not byte & 0x80:
+            return value, position
+
+
+def apply_delta(base: bytes, delta: bytes) -> bytes:
+    """Rebuild an object from its base and a git delta."""
+    source_size, position = _varint(delta, 0)
+    target_size, position = _varint(delta, position)
+    if source_size != len(base):
+        raise UnsupportedRepositoryError("Delta does not match its base")
+    out = bytearray()
+    while position < len(delta):
+        opcode = delta[position]
+        position += 1
+        if opcode & 0x80:  # Copy from base: little-endian offset and size bytes
+            start = size = 0
+            for bit in range(4):
+                if opcode & (1 << bit):
+                    start |= delta[position] << (8 * bit)
+                    position += 1
+            for bit in range(3):
+                if opcode & (1 << (4 + bit)):
+                    size |= delta[position] << (8 * bit)
+                    position += 1
+            out += base[start : start + (size or 0x10000)]
+        elif opcode:  # Insert the next ``opcode`` bytes
+            out += delta[position : position + opcode]
+            position += opcode
+        else:
+            raise UnsupportedRepositoryError("Reserved delta opcode")
+    if len(out) != target_size:
+        raise UnsupportedRepositoryError("Delta produced the wrong size")
+    return bytes(out)
+
+
+def commit_subject(content: bytes) -> str:
+    """Return the subject of a commit object like ``git log --format=%s``.
+
+    The subject is the message's first paragraph with its lines joined by
+    spaces. As in git, trailing whitespace is dropped from each line and
+    leading whitespace is kept.
+    """
+    _headers, _, message = content.partition(b"\n\n")
+    lines = [
+        line.rstrip() for line in message.decode("utf-8", errors="replace").splitlines()
+    ]
+    while lines and not lines[0]:
+        lines.pop(0)
+    subject = []
+    for line in lines:
+        if not line:
+            break
+        subject.append(line)
+    return " ".join(subject)
+
+
+def head_commit(start: str) -> tuple[str, str] | None:
+    """Return ``(hash, subject)`` of HEAD in the work tree containing ``start``."""
+    return Repository.discover(start).head_commit()
@@ -0,0 +1,217 @@
+"""Stdlib-only hook input handling for fast hook entry points.
+
+Every hook runs as a fresh process per tool call, and most calls cannot
+concern a given hook (a ``git status`` for the gh-api guard, a ``Read`` for a
+Bash guard). Importing cchooks and compiling pattern tables for those calls is
+wasted startup, so hooks use this module instead:
+
+- :func:`skip_unless` reads the payload with :mod:`json` and exits 0 right
+  away when the event, tool or a required keyword does not match. Hooks call it
+  under ``if __name__ == "__main__"`` before their heavy imports.
+- :func:`run_pretooluse` evaluates a guard's ``check()``, passing the
+  payload's ``cwd`` to checks that accept it, and imports cchooks only when it
+  has to emit a block.
+
+Payloads that are not a well-formed hook event are never skipped: they are
+handed to cchooks, which reports them exactly as before.
+
+With ``GUARDS_TELEMETRY`` set, both functions also time the hook and record
+its verdict through :mod:`guardkit.telemetry`.
+"""
+
+from __future__ import annotations
+
+import io
+import json
+import os
+import sys
+import time
+
+# Hooks import this module first, so startup time is measured from here
+_STARTED = time.perf_counter()
+
+# typing costs several milliseconds to import; annotations only need it for
+# type checkers, which treat this name as True
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from collections.abc import Callable, Collection
+    from typing import Any, NoReturn
+
+
+class HookInput:
+    """The raw hook payload and its decoded JSON object (None if invalid)."""
+
+    __slots__ = ("raw", "data")
+
+    def __init__(self, raw: str) -> None:
+        self.raw = raw
+        try:
+            data = json.loads(raw)
+        except ValueError:
+            data = None
+        self.data: dict[str, Any] | None = data if isinstance(data, dict) else None
+
+    @property
+    def event(self) -> str:
+        return self.data.get("hook_event_name", "") if self.data else ""
+
+    @property
+    def tool_name(self) -> str:
+        return self.data.get("tool_name", "") if self.data else ""
+
+    @property
+    def tool_input(self) -> dict:
+        return self.data.get("tool_input", {}) if self.data else {}
+
+    @property
+    def cwd(self) -> str | None:
+        """The session's working directory, or None if absent or not absolute."""
+        cwd = self.data.get("cwd") if self.data else None
+        return cwd if isinstance(cwd, str) and os.path.isabs(cwd) else None
+
+    def is_event(self, event: str) -> bool:
+        """True for a well-formed tool event payload of the given type."""
+        return (
+            self.data is not None
+            and self.data.get("hook_event_name") == event
+            and isinstance(self.data.get("tool_name"), str)
+            and isinstance(self.data.get("tool_input"), dict)
+        )
+
+    def text(self, field: str) -> str:
+        """Return a string field of the tool input, or "" if absent."""
+        value = self.tool_input.get(field, "")
+        return value if isinstance(value, str) else ""
+
+    def context(self) -> Any:
+        """Build the cchooks context for this payload (imports cchooks)."""
+        from cchooks import create_context
+
+        return create_context(io.StringIO(self.raw))
+
+    def block(self, reason: str) -> NoReturn:
+        """Emit a PreToolUse block through cchooks."""
+        try:
+            context = self.context()
+        except Exception:
+            # The payload already parsed as a tool call; never let a cchooks
+            # validation error turn a block into a non-blocking failure.
+            print(reason, file=sys.stderr)
+            sys.exit(2)
+        context.output.exit_block(reason)
+
+
+_INPUT: HookInput | None = None
+
+# guardkit.telemetry.Trace while GUARDS_TELEMETRY is enabled
+_TRACE: Any = None
+
+
+def _start_trace() -> Any:
+    if os.environ.get("GUARDS_TELEMETRY", "") in ("", "0"):
+        return None
+    import atexit
+
+    from . import telemetry
+
+    trace = telemetry.start(sys.argv[0], _STARTED)
+    if trace is not None:
+        # Hooks that exit on their own are recorded when the process ends
+        atexit.register(trace.finish, "done")
+    return trace
+
+
+def _finish(verdict: str) -> None:
+    if _TRACE is not None:
+        _TRACE.finish(verdict)
+
+
+def read_hook_input() -> HookInput:
+    """Read the hook payload from stdin once per process."""
+    global _INPUT, _TRACE
+    if _INPUT is None:
+        _TRACE = _start_trace()
+        started = time.perf_counter()
+        _INPUT = HookInput(sys.stdin.read())
+        if _TRACE is not None:
+            _TRACE.parse = time.perf_counter() - started
+            _TRACE.payload(_INPUT.raw, _INPUT.data)
+    return _INPUT
+
+
+def skip_unless(
+    event: str,
+    tools: Collection[str],
+    keywords: Collection[str] = (),
+    field: str = "command",
+) -> HookInput:
+    """Exit 0 unless the call is an ``event`` for one of ``tools``.
+
+    With ``keywords``, also exit unless one of them occurs in the lowercased
+    ``field`` of the tool input. Keywords must be lowercase and necessary for
+    the hook to act. Payloads that are not a well-formed ``event`` are handed
+    to cchooks, which reports malformed input and lets other events pass.
+    """
+    hook = read_hook_input()
+    if not hook.is_event(event):
+        _finish("skip")
+        hook.context().output.exit_success()
+    if hook.tool_name not in tools:
+        _finish("skip")
+        sys.exit(0)
+    if keywords:
+        text = hook.text(field).lower()
+        if not any(keyword in text for keyword in keywords):
+            _finish("skip")
+            sys.exit(0)
+    if _TRACE is not None:
+        _TRACE.match_started = time.perf_counter()
+    return hook
+
+
+def run_pretooluse(check: Callable[[str, dict], str | None]) -> NoReturn:
+    """Run a guard's ``check()`` as a PreToolUse hook and exit."""
+    hook = read_hook_input()
+    if not hook.is_event("PreToolUse"):
+        _finish("skip")
+        hook.context().output.exit_success()
+    arguments = _arguments(check)
+    kwargs = {"cwd": hook.cwd} if hook.cwd and "cwd" in arguments else {}
+    if _TRACE is None:
+        reason = check(hook.tool_name, hook.tool_input, **kwargs)
+    else:
+        reason = _traced_check(check, hook, arguments, kwargs)
+    if reason:
+        _finish("block")
+        hook.block(reason)
+    _finish("allow")
+    sys.exit(0)
+
+
+def _arguments(check: Callable[..., str | None]) -> tuple[str, ...]:
+    """Names of the arguments ``check`` takes, looking through functools.partial."""
+    code = getattr(getattr(check, "func", check), "__code__", None)
+    return code.co_varnames[: code.co_argcount + code.co_kwonlyargcount] if code else ()
+
+
+def _traced_check(
+    check: Callable[..., str | None],
+    hook: HookInput,
+    arguments: tuple[str, ...],
+    kwargs: dict[str, Any],
+) -> str | None:
+    """Run ``check()``, timing the shell parse apart when it takes ``parsed``."""
+    _TRACE.match_started = None
+    if hook.tool_name == "Bash" and "parsed" in arguments:
+        from .command import BashCommand
+
+        started = time.perf_counter()
+        parsed = BashCommand(hook.text("command"))
+        parsed.script  # noqa: B018 - parse now so it is timed as parse, not match
+        _TRACE.parse += time.perf_counter() - started
+        kwargs["parsed"] = parsed
+    started = time.perf_counter()
+    try:
+        return check(hook.tool_name, hook.tool_input, **kwargs)
+    finally:
+        _TRACE.match = time.perf_counter() - started
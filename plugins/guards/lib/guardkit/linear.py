@@ -0,0 +1,508 @@
+"""Linear-time matching for guard pattern tables.
+
+Python's ``re`` is a backtracking engine: a pattern like ``find\\s+.*?-delete``
+retries its ``.*?`` from every start position, so a long command that almost
+matches costs quadratic time or worse. The guard tables only need to know
+*whether* a pattern matches, which a finite automaton answers in one pass.
+
+:func:`compile` accepts the regular subset of Python regex syntax (literals,
+classes, ``.``, groups, alternation, greedy and lazy repeats, ``^``, ``$``,
+``\\A``, ``\\Z``, ``\\b``, ``\\B`` and the i/s/m/x flags) and raises
+:class:`UnsupportedPatternError` at load time for anything that needs
+backtracking: lookarounds, backreferences, conditionals, atomic groups,
+possessive repeats and counted repeats above :data:`MAX_COUNTED_REPEAT`.
+
+Patterns are compiled to a Thompson NFA that is determinized lazily while
+matching: each DFA state is built on first use and cached, so a search costs
+one dict lookup per character once warm and at most one NFA step per
+character when not. The cache is bounded by :data:`MAX_CACHED_STATES` and
+flushed when full, which keeps memory constant without losing the O(n) bound.
+
+:meth:`LinearPattern.search` answers exactly what ``re.search`` would; the
+returned :class:`LinearMatch` has the same start as ``re``'s match, and ends
+at the shortest match from there (``re`` may prefer a longer greedy one).
+"""
+
+from __future__ import annotations
+
+import re
+import sys
+
+# Python versions whose private regex parser (``re._parser``) the engine is
+# tested against. On any other version, or if the parser cannot be imported,
+# AVAILABLE is False and :func:`compile` falls back to ``re.compile``: matching
+# stays exact, only the linear-time guarantee is lost.
+SUPPORTED_VERSIONS = ((3, 12), (3, 13))
+
+# Largest upper bound of a counted repeat like ``\s{0,20}``; each allowed
+# repetition is a copy of the repeated item in the automaton
+MAX_COUNTED_REPEAT = 100
+
+# DFA states cached per automaton before the cache is flushed
+MAX_CACHED_STATES = 2_000
+
+# Flags passed on to the single-character tests
+_ATOM_FLAGS = re.IGNORECASE | re.DOTALL | re.ASCII
+
+try:
+    if sys.version_info[:2] not in SUPPORTED_VERSIONS:
+        raise ImportError("re._parser is untested on this Python version")
+    import re._constants as sre_constants
+    import re._parser as sre_parser
+
+    _REPEATS = (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT)
+
+    _UNSUPPORTED = {
+        sre_constants.GROUPREF: "a backreference",
+        sre_constants.GROUPREF_EXISTS: "a conditional group (?(...)...)",
+        sre_constants.ATOMIC_GROUP: "an atomic group (?>...)",
+        sre_constants.POSSESSIVE_REPEAT: "a possessive repeat (*+, ++, ?+)",
+    }
+
+    _CATEGORIES = {
+        sre_constants.CATEGORY_DIGIT: r"\d",
+        sre_constants.CATEGORY_NOT_DIGIT: r"\D",
+        sre_constants.CATEGORY_SPACE: r"\s",
+        sre_constants.CATEGORY_NOT_SPACE: r"\S",
+        sre_constants.CATEGORY_WORD: r"\w",
+        sre_constants.CATEGORY_NOT_WORD: r"\W",
+    }
+except (ImportError, AttributeError):
+    AVAILABLE = False
+else:
+    AVAILABLE = True
+
+# What lies on one side of a position, for anchors and word boundaries
+_EDGE, _WORD, _NEWLINE, _FINAL_NEWLINE, _OTHER = range(5)
+
+# Symbol fed for a newline that ends the text, where ``$`` also matches
+_FINAL_SYMBOL = "\n$"
+
+_WORD_CHAR = re.compile(r"\w")
+
+# Single-character tests shared by every pattern, keyed by source and flags
+_CHAR_TESTS: dict[tuple[str, int], object] = {}
+
+# NFA node kinds
+_CHAR, _SPLIT, _ASSERT, _ACCEPT = range(4)
+
+# Transition results that end an early-stopping scan
+_MATCHED = object()
+_DEAD = object()
+
+
+class UnsupportedPatternError(ValueError):
+    """A pattern needs a feature that only a backtracking engine provides."""
+
+    def __init__(self, pattern: str, feature: str) -> None:
+        super().__init__(
+            f"pattern {pattern!r} uses {feature}, which the linear-time engine does not "
+            "support; rewrite it with plain classes, alternation and repeats"
+        )
+        self.pattern = pattern
+        self.feature = feature
+
+
+def _kind(symbol: str) -> int:
+    if symbol == _FINAL_SYMBOL:
+        return _FINAL_NEWLINE
+    if symbol == "\n":
+        return _NEWLINE
+    return _WORD if _WORD_CHAR.match(symbol) else _OTHER
+
+
+def _anchor(code: object, flags: int):
+    """Return a ``(before, after) -> bool`` test for a zero-width anchor."""
+    multiline = flags & re.MULTILINE
+    line_edges = (_EDGE, _NEWLINE, _FINAL_NEWLINE)
+    if code is sre_constants.AT_BEGINNING_STRING or (
+        code is sre_constants.AT_BEGINNING and not multiline
+    ):
+        return lambda before, after: before == _EDGE
+    if code is sre_constants.AT_BEGINNING:
+        return lambda before, after: before in line_edges
+    if code is sre_constants.AT_END_STRING:
+        return lambda before, after: after == _EDGE
+    if code is sre_constants.AT_END and not multiline:
+        return lambda before, after: after in (_EDGE, _FINAL_NEWLINE)
+    if code is sre_constants.AT_END:
+        return lambda before, after: after in line_edges
+    if code is sre_constants.AT_BOUNDARY:
+        return lambda before, after: (before == _WORD) != (after == _WORD)
+    if code is sre_constants.AT_NON_BOUNDARY:
+        return lambda before, after: (before == _WORD) == (after == _WORD)
+    raise ValueError(f"unexpected anchor {code}")
+
+
+def _class_source(items: list) -> str:
+    parts = []
+    for op, av in items:
+        if op is sre_constants.NEGATE:
+            parts.append("^")
+        elif op is sre_constants.LITERAL:
+            parts.append(re.escape(chr(av)))
+        elif op is sre_constants.RANGE:
+            parts.append(f"{re.escape(chr(av[0]))}-{re.escape(chr(av[1]))}")
+        elif op is sre_constants.CATEGORY:
+            parts.append(_CATEGORIES[av])
+        else:
+            raise ValueError(f"unexpected class item {op}")
+    return "[" + "".join(parts) + "]"
+
+
+def _validate(items: sre_parser.SubPattern | list, pattern: str) -> None:
+    """Raise :class:`UnsupportedPatternError` if ``items`` need backtracking."""
+    for op, av in items:
+        if op is sre_constants.SUBPATTERN:
+            _validate(av[-1], pattern)
+        elif op is sre_constants.BRANCH:
+            for alternative in av[1]:
+                _validate(alternative, pattern)
+        elif op in _REPEATS:
+            min_count, max_count, repeated = av
+            unbounded = max_count is sre_constants.MAXREPEAT
+            if min_count > MAX_COUNTED_REPEAT or (
+                not unbounded and max_count > MAX_COUNTED_REPEAT
+            ):
+                bound = "" if unbounded else max_count
+                raise UnsupportedPatternError(
+                    pattern,
+                    f"the counted repeat {{{min_count},{bound}}} "
+                    f"(limit {MAX_COUNTED_REPEAT}; use * or + instead)",
+                )
+            _validate(repeated, pattern)
+        elif op in (sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+            direction = "lookahead" if av[0] == 1 else "lookbehind"
+            negative = "negative " if op is sre_constants.ASSERT_NOT else ""
+            raise UnsupportedPatternError(pattern, f"a {negative}{direction}")
+        elif op in _UNSUPPORTED:
+            raise UnsupportedPatternError(pattern, _UNSUPPORTED[op])
+
+
+class _Builder:
+    """Build a Thompson NFA right to left from a validated pattern."""
+
+    def __init__(self, reverse: bool) -> None:
+        self.reverse = reverse
+        self.nodes: list[list] = [[_ACCEPT]]
+        self.has_anchors = False
+
+    def add(self, *node: object) -> int:
+        self.nodes.append(list(node))
+        return len(self.nodes) - 1
+
+    def char(self, source: str, flags: int, out: int) -> int:
+        key = (source, flags & _ATOM_FLAGS)
+        test = _CHAR_TESTS.get(key)
+        if test is None:
+            test = _CHAR_TESTS[key] = re.compile(source, key[1]).match
+        return self.add(_CHAR, test, out)
+
+    def sequence(self, items: list, flags: int, out: int) -> int:
+        # Built back to front, so each item is created knowing its successor;
+        # the reverse automaton reads the pattern from its end
+        for op, av in items if self.reverse else reversed(items):
+            out = self.item(op, av, flags, out)
+        return out
+
+    def item(self, op: object, av: object, flags: int, out: int) -> int:
+        if op is sre_constants.LITERAL:
+            return self.char(re.escape(chr(av)), flags, out)
+        if op is sre_constants.NOT_LITERAL:
+            return self.char(f"[^{re.escape(chr(av))}]", flags, out)
+        if op is sre_constants.ANY:
+            return self.char(".", flags, out)
+        if op is sre_constants.IN:
+            return self.char(_class_source(av), flags, out)
+        if op is sre_constants.SUBPATTERN:
+            _group, add_flags, del_flags, items = av
+            return self.sequence(items, (flags | add_flags) & ~del_flags, out)
+        if op is sre_constants.BRANCH:
+            return self.add(_SPLIT, [self.sequence(alt, flags, out) for alt in av[1]])
+        if op in _REPEATS:
+            return self.repeat(av, flags, out)
+        # Anything else was rejected by _validate
+        self.has_anchors = True
+        return self.add(_ASSERT, _anchor(av, flags), out)
+
+    def repeat(self, av: tuple, flags: int, out: int) -> int:
+        min_count, max_count, items = av
+        if max_count is sre_constants.MAXREPEAT:
+            loop = self.add(_SPLIT, [])
+            self.nodes[loop][1] = [self.sequence(items, flags, loop), out]
+            out = loop
+        else:
+            for _ in range(max_count - min_count):
+                out = self.add(_SPLIT, [self.sequence(items, flags, out), out])
+        for _ in range(min_count):
+            out = self.sequence(items, flags, out)
+        return out
+
+
+class _State(dict):
+    """A DFA state: its transitions keyed by symbol, plus the NFA nodes it stands for."""
+
+    __slots__ = ("kernel", "kind", "hits", "accepts_at_end")
+
+    def __init__(self, kernel: frozenset[int], kind: int) -> None:
+        super().__init__()
+        self.kernel = kernel
+        self.kind = kind  # what precedes the state in scan order
+        self.hits: set[str] = set()  # symbols before which a match ends
+        self.accepts_at_end: bool | None = None
+
+
+class _Automaton:
+    """A lazily built DFA over one NFA, scanning forward or backward."""
+
+    def __init__(self, builder: _Builder, start: int, unanchored: bool) -> None:
+        self.nodes = builder.nodes
+        self.reverse = builder.reverse
+        self.uses_kind = builder.has_anchors
+        self.start = frozenset({start})
+        self.unanchored = unanchored
+        self.states: dict[tuple[frozenset[int], int], _State] = {}
+
+    def initial(self, kind: int = _EDGE) -> _State:
+        return self.intern(self.start, kind)
+
+    def intern(self, kernel: frozenset[int], kind: int) -> _State:
+        key = (kernel, kind if self.uses_kind else _EDGE)
+        state = self.states.get(key)
+        if state is None:
+            if len(self.states) >= MAX_CACHED_STATES:
+                # Drop every cached transition so old states can be freed
+                for old in self.states.values():
+                    old.clear()
+                self.states.clear()
+            state = self.states[key] = _State(*key)
+        return state
+
+    def closure(
+        self, kernel: frozenset[int], before: int, after: int
+    ) -> tuple[list, bool]:
+        """Return the character nodes reachable without input and whether a match ends here."""
+        nodes = self.nodes
+        seen: set[int] = set()
+        stack = list(kernel)
+        chars = []
+        accepted = False
+        while stack:
+            index = stack.pop()
+            if index in seen:
+                continue
+            seen.add(index)
+            node = nodes[index]
+            kind = node[0]
+            if kind == _CHAR:
+                chars.append(node)
+            elif kind == _SPLIT:
+                stack.extend(node[1])
+            elif kind == _ASSERT:
+                if node[1](before, after):
+                    stack.append(node[2])
+            else:
+                accepted = True
+        return chars, accepted
+
+    def context(self, state: _State, kind: int) -> tuple[int, int]:
+        """Return ``(before, after)`` in text order for a state and the next symbol."""
+        return (kind, state.kind) if self.reverse else (state.kind, kind)
+
+    def step(self, state: _State, symbol: str, stop_at_match: bool) -> object:
+        kind = _kind(symbol) if self.uses_kind else _EDGE
+        chars, accepted = self.closure(state.kernel, *self.context(state, kind))
+        if accepted:
+            state.hits.add(symbol)
+            if stop_at_match:
+                state[symbol] = _MATCHED
+                return _MATCHED
+        char = symbol[0]
+        kernel = frozenset(node[2] for node in chars if node[1](char))
+        if self.unanchored:
+            kernel |= self.start
+        elif not kernel and stop_at_match:
+            state[symbol] = _DEAD
+            return _DEAD
+        following = state[symbol] = self.intern(kernel, kind)
+        return following
+
+    def accepts_at_end(self, state: _State) -> bool:
+        if state.accepts_at_end is None:
+            state.accepts_at_end = self.closure(
+                state.kernel, *self.context(state, _EDGE)
+            )[1]
+        return state.accepts_at_end
+
+    def first_end(self, text: str, pos: int = 0) -> int:
+        """Return where the first match found scanning forward from ``pos`` ends, or -1."""
+        state = self.initial(_kind(text[pos - 1]) if pos else _EDGE)
+        final = text.endswith("\n")
+        body = text[pos:-1] if final else text[pos:]
+        step = self.step
+        for i, symbol in enumerate(body, pos):
+            following = state.get(symbol)
+            if following is None:
+                following = step(state, symbol, True)
+            if following is _MATCHED:
+                return i
+            if following is _DEAD:
+                return -1
+            state = following
+        if final and pos < len(text):
+            following = state.get(_FINAL_SYMBOL)
+            if following is None:
+                following = step(state, _FINAL_SYMBOL, True)
+            if following is _MATCHED:
+                return len(text) - 1
+            if following is _DEAD:
+                return -1
+            state = following
+        return len(text) if self.accepts_at_end(state) else -1
+
+    def last_end(self, text: str) -> int:
+        """Scan ``text`` backward and return the leftmost position where a match ends, or -1."""
+        state = self.initial()
+        found = -1
+        step = self.step
+        for i in range(len(text) - 1, -1, -1):
+            symbol = (
+                _FINAL_SYMBOL if i == len(text) - 1 and text[i] == "\n" else text[i]
+            )
+            following = state.get(symbol)
+            if following is None:
+                following = step(state, symbol, False)
+            if symbol in state.hits:
+                found = i + 1
+            state = following
+        return 0 if self.accepts_at_end(state) else found
+
+
+class LinearMatch:
+    """A successful :meth:`LinearPattern.search`; the span is computed on first use."""
+
+    __slots__ = ("re", "string", "_span")
+
+    def __init__(
+        self, pattern: LinearPattern, string: str, span: tuple[int, int] | None = None
+    ) -> None:
+        self.re = pattern
+        self.string = string
+        self._span = span
+
+    def span(self) -> tuple[int, int]:
+        if self._span is None:
+            start = self.re._leftmost_start(self.string)
+            self._span = (start, self.re._shortest_end(self.string, start))
+        return self._span
+
+    def start(self) -> int:
+        return self.span()[0]
+
+    def end(self) -> int:
+        return self.span()[1]
+
+    def group(self, group: int = 0) -> str:
+        if group != 0:
+            raise IndexError("linear matches have no capture groups")
+        start, end = self.span()
+        return self.string[start:end]
+
+    def __repr__(self) -> str:
+        return f"<LinearMatch span={self.span()!r} match={self.group()!r}>"
+
+
+class LinearPattern:
+    """A pattern compiled for linear-time matching; see :func:`compile`."""
+
+    def __init__(self, pattern: str, flags: int = 0, validated: bool = False) -> None:
+        self.pattern = pattern
+        self._flags = flags
+        self._parsed: sre_parser.SubPattern | None = None
+        if not validated:
+            self._parse()
+        # Automata are built on first use: behind a literal prefilter most
+        # patterns of a table never run in a given process
+        self._searcher: _Automaton | None = None
+        self._matcher: _Automaton | None = None
+        self._backward: _Automaton | None = None
+
+    def _parse(self) -> sre_parser.SubPattern:
+        if self._parsed is None:
+            parsed = sre_parser.parse(self.pattern, self._flags)
+            _validate(parsed, self.pattern)
+            self._parsed = parsed
+        return self._parsed
+
+    @property
+    def flags(self) -> int:
+        return self._parse().state.flags
+
+    def _build(self, reverse: bool, unanchored: bool) -> _Automaton:
+        builder = _Builder(reverse)
+        start = builder.sequence(list(self._parse()), self.flags, 0)
+        return _Automaton(builder, start, unanchored)
+
+    def _leftmost_start(self, string: str) -> int:
+        # Where a match of the reversed pattern ends when reading backward
+        if self._backward is None:
+            self._backward = self._build(reverse=True, unanchored=True)
+        return self._backward.last_end(string)
+
+    def _shortest_end(self, string: str, pos: int = 0) -> int:
+        if self._matcher is None:
+            self._matcher = self._build(reverse=False, unanchored=False)
+        return self._matcher.first_end(string, pos)
+
+    def search(self, string: str) -> LinearMatch | None:
+        """Return a match if the pattern matches anywhere in ``string``."""
+        if self._searcher is None:
+            self._searcher = self._build(reverse=False, unanchored=True)
+        if self._searcher.first_end(string) < 0:
+            return None
+        return LinearMatch(self, string)
+
+    def match(self, string: str) -> LinearMatch | None:
+        """Return a match if the pattern matches at the start of ``string``."""
+        end = self._shortest_end(string)
+        if end < 0:
+            return None
+        return LinearMatch(self, string, (0, end))
+
+    def __repr__(self) -> str:
+        return f"linear.compile({self.pattern!r}, {self.flags!r})"
+
+
+def not_followed_by(*words: str) -> str:
+    """Return a regex for a position where none of ``words`` starts.
+
+    The regular replacement for a negative lookahead ``(?!word|...)`` over
+    literal words: it matches at the end of the text, or consumes characters
+    up to the first one where the text leaves every word. Use it where the
+    lookahead would be followed by nothing that must match at its position.
+    """
+    if not words or "" in words:
+        raise ValueError("not_followed_by needs non-empty words")
+    firsts = sorted({word[0] for word in words})
+    branches = [r"\Z", "[^" + "".join(map(re.escape, firsts)) + "]"]
+    for first in firsts:
+        rests = [word[1:] for word in words if word[0] == first]
+        if "" not in rests:
+            branches.append(re.escape(first) + not_followed_by(*rests))
+    return "(?:" + "|".join(branches) + ")"
+
+
+def compile(  # noqa: A001 - mirrors re.compile
+    pattern: str, flags: int = 0, validated: bool = False
+) -> LinearPattern | re.Pattern[str]:
+    """Compile ``pattern`` for linear-time matching.
+
+    Raises :class:`UnsupportedPatternError` if the pattern needs backtracking
+    and ``re.error`` if it is not a valid regex at all. With ``validated=True``
+    (a pattern already checked, e.g. by a compiled policy) parsing is deferred
+    to the first match. Where the engine is not :data:`AVAILABLE` this is
+    ``re.compile``.
+    """
+    if not AVAILABLE:
+        return re.compile(pattern, flags)
+    return LinearPattern(pattern, flags, validated)
@@ -0,0 +1,48 @@
+"""Import hook scripts by path and keep them fresh across edits."""
+
+from __future__ import annotations
+
+import importlib.util
+import os
+import threading
+from types import ModuleType
+
+
+def import_script(path: str) -> ModuleType | None:
+    """Import a hook script by path without running its __main__ block.
+
+    Returns None if the script cannot be imported (e.g. a missing dependency).
+    """
+    name = "guard_" + os.path.splitext(os.path.basename(path))[0].replace("-", "_")
+    spec = importlib.util.spec_from_file_location(name, path)
+    if spec is None or spec.loader is None:
+        return None
+    module = importlib.util.module_from_spec(spec)
+    try:
+        spec.loader.exec_module(module)
+    except Exception:  # noqa: BLE001 - callers fall back to running the script
+        return None
+    return module
+
+
+class ScriptLoader:
+    """Caches imported scripts and re-imports them when their mtime changes."""
+
+    def __init__(self) -> None:
+        self._modules: dict[str, tuple[int, ModuleType | None]] = {}
+        self._lock = threading.Lock()
+
+    def load(self, path: str) -> ModuleType | None:
+        """Return the imported module for ``path``, or None if unavailable."""
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+        with self._lock:
+            cached = self._modules.get(path)
+            if cached is not None and cached[0] == mtime:
+                return cached[1]
+            module = import_script(path)
+            self._modules[path] = (mtime, module)
+            return module
@@ -0,0 +1,184 @@
+"""Run several guard rule modules in one process against one shared parse.
+
+A rule module is any guard script exposing
+``check(tool_name, tool_input) -> str | None``. Rules that also accept a
+``parsed`` keyword receive the shared :class:`BashCommand`, so the command is
+tokenized once no matter how many rules inspect it, and rules that accept a
+``cwd`` keyword receive the working directory of the tool call. Evaluation
+stops at the first rule that returns a block reason. A rule that cannot be
+loaded or raises blocks the call with a reason naming it, and that verdict is
+not cached.
+
+A Bash command that the :mod:`~guardkit.fastlane` of its project allows,
+such as ``git status``, is allowed before any rule module is loaded. With a
+:class:`~guardkit.verdicts.VerdictCache`, a repeated tool call is answered
+from the cache without loading any rule module.
+"""
+
+from __future__ import annotations
+
+import os
+from collections.abc import Callable, Sequence
+
+from .command import BashCommand
+from .fastlane import DISABLED, FastLane, compile_fast_lane, load_fast_lane
+from .loader import ScriptLoader
+from .policy import PolicyError, config_files, load_policy
+from .runtime import GUARDS_ROOT
+from .verdicts import VerdictCache, policy_fingerprint, verdict_key
+
+# Guards registered for the Bash matcher, relative to plugins/guards.
+# Security rules run first so their reason wins when several rules would block.
+BASH_RULES = (
+    "security/safety-guard/hooks/safety_guard_bash.py",
+    "security/git-safety-guard/hooks/git_safety_guard.py",
+    "security/protect-env/hooks/protect_env.py",
+    "security/gh-api-guard/hooks/check-gh-api.py",
+    "policy/conventional-commits/hooks/conventional_commits.py",
+    "policy/enforce-uv/hooks/enforce_uv.py",
+    "policy/gemini-model-guard/hooks/check-gemini-model.py",
+)
+
+# Holds fast-lane.policy.toml, the commands allowed before any rule runs
+FAST_LANE_DIR = "pipeline/hooks"
+
+# Projects whose fast lane a pipeline keeps in memory; all are dropped past this
+MAX_FAST_LANES = 32
+
+
+class RuleLoadError(RuntimeError):
+    """A rule module could not be imported or has no check() function."""
+
+
+class GuardPipeline:
+    """Evaluates an ordered list of guard rule modules, first block wins."""
+
+    def __init__(
+        self,
+        rules: Sequence[str] = BASH_RULES,
+        guards_root: str = GUARDS_ROOT,
+        fast_lane_dir: str | None = None,
+    ) -> None:
+        self.rules = list(rules)
+        self.rule_paths = [os.path.join(guards_root, rule) for rule in rules]
+        self.fast_lane_dir = fast_lane_dir or os.path.join(guards_root, FAST_LANE_DIR)
+        self._loader = ScriptLoader()
+        self._keywords: dict[Callable[..., str | None], frozenset[str]] = {}
+        # Project directory -> (fingerprint, fast lane built for it)
+        self._fast_lanes: dict[str, tuple[list, FastLane]] = {}
+
+    def _check_function(
+        self, path: str
+    ) -> tuple[Callable[..., str | None], frozenset[str]]:
+        module = self._loader.load(path)
+        check = getattr(module, "check", None)
+        if not callable(check):
+            raise RuleLoadError(f"Guard rule {path} cannot be loaded or has no check()")
+        keywords = self._keywords.get(check)
+        if keywords is None:
+            code = check.__code__
+            arguments = code.co_varnames[: code.co_argcount + code.co_kwonlyargcount]
+            keywords = frozenset({"parsed", "cwd"}.intersection(arguments))
+            self._keywords[check] = keywords
+        return check, keywords
+
+    def fingerprint(self, cwd: str | None = None) -> str:
+        """Policy fingerprint of the rule scripts and the policy files they read in ``cwd``."""
+        return policy_fingerprint(self.rule_paths + config_files(self.rule_paths, cwd))
+
+    def fast_lane(
+        self, cwd: str | None = None, fingerprint: str | None = None
+    ) -> FastLane:
+        """The fast lane for these rules in project ``cwd``, disabled if it has no policy file.
+
+        Each project gets its own, since its overlays can make rules block more;
+        it is rebuilt when ``fingerprint`` or the fast lane policy changes.
+        """
+        cwd = cwd or os.getcwd()
+        try:
+            policy = load_policy("fast-lane", self.fast_lane_dir, cwd)
+        except PolicyError:
+            return DISABLED
+        key = [fingerprint or self.fingerprint(cwd), policy.fingerprint]
+        kept = self._fast_lanes.get(cwd)
+        if kept is not None and kept[0] == key:
+            return kept[1]
+        entries = policy.list("commands") if "commands" in policy.lists else []
+
+        def probe(command: str) -> str | None:
+            return self._evaluate("Bash", {"command": command}, cwd=cwd)
+
+        def compile() -> FastLane:
+            rules = [self._loader.load(path) for path in self.rule_paths]
+            return compile_fast_lane(entries, rules, probe, cwd)
+
+        lane = load_fast_lane(self.rule_paths, key, compile, cwd)
+        if len(self._fast_lanes) >= MAX_FAST_LANES:
+            self._fast_lanes.clear()
+        self._fast_lanes[cwd] = (key, lane)
+        return lane
+
+    def evaluate(
+        self,
+        tool_name: str,
+        tool_input: dict,
+        cache: VerdictCache | None = None,
+        cwd: str | None = None,
+    ) -> str | None:
+        """Return the first block reason from any rule, or None to allow.
+
+        Relative paths are resolved against ``cwd``, by default the current
+        directory.
+        """
+        fingerprint = parsed = None
+        if tool_name == "Bash":
+            command = tool_input.get("command", "")
+            fingerprint = self.fingerprint(cwd)
+            if self.fast_lane(cwd, fingerprint).allows(command, cwd):
+                return None
+            parsed = BashCommand(command)
+        if cache is None:
+            return self._evaluate(tool_name, tool_input, parsed, cwd)
+
+        key = verdict_key(
+            fingerprint or self.fingerprint(cwd), tool_name, tool_input, cwd, parsed
+        )
+        hit, reason = cache.lookup(key)
+        if not hit:
+            failed: list[str] = []
+            reason = self._evaluate(tool_name, tool_input, parsed, cwd, failed)
+            if not failed:
+                cache.store(key, reason)
+        return reason
+
+    def _evaluate(
+        self,
+        tool_name: str,
+        tool_input: dict,
+        parsed: BashCommand | None = None,
+        cwd: str | None = None,
+        failed: list[str] | None = None,
+    ) -> str | None:
+        """Run the rules in order; append the rules that raised to ``failed``."""
+        if tool_name == "Bash" and parsed is None:
+            parsed = BashCommand(tool_input.get("command", ""))
+
+        for rule, path in zip(self.rules, self.rule_paths):
+            try:
+                check, keywords = self._check_function(path)
+                kwargs: dict = {}
+                if "parsed" in keywords:
+                    kwargs["parsed"] = parsed
+                if "cwd" in keywords and cwd:
+                    kwargs["cwd"] = cwd
+                reason = check(tool_name, tool_input, **kwargs)
+            except Exception as e:  # noqa: BLE001 - a broken rule blocks instead of allowing
+                if failed is not None:
+                    failed.append(rule)
+                return (
+                    f"Guard rule {rule} failed: {e!r}\n"
+                    "The call is blocked until the rule is fixed."
+                )
+            if reason:
+                return reason
+        return None
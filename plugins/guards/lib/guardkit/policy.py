@@ -0,0 +1,422 @@
+"""Declarative guard policies compiled to cached artifacts.
+
+A guard's rules live in ``<name>.policy.toml`` next to its hook script instead
+of Python literals. A policy holds two kinds of entries:
+
+- lists of words, e.g. ``allowed_models = ["gemini-3-pro-preview"]``
+- pattern tables, searched through a linear-time
+  :class:`~guardkit.prefilter.LiteralIndex`::
+
+      [blocked]
+      flags = ["IGNORECASE"]          # optional, names of re flags
+
+      [[blocked.rules]]
+      id = "stash-drop"
+      pattern = 'git\\s+stash\\s+(drop|clear)'
+      reason = "git stash drop/clear permanently deletes saved work"
+
+  A table may list bare ``patterns = [...]`` instead of rules; each is its
+  own id and value. A rule's value is its ``reason``, or its pattern.
+
+Overlays use the same format and merge over the shipped policy, in order:
+the user's ``<name>.policy.toml`` in :func:`~guardkit.runtime.config_dir`,
+then the project's ``.claude/<name>.policy.toml``. An overlay extends lists
+and appends rules; a user overlay may also replace a rule by its id or drop
+it with ``enabled = false``. A project overlay only adds rules, and only to
+the blocking lists and tables the shipped policy names in
+``project_extends``: entries that allow a command (safe patterns, allowed
+models, fast lane commands) would let a cloned repository switch off a
+shipped block. An invalid overlay is skipped with a warning on stderr; an
+invalid shipped policy raises :class:`PolicyError`.
+
+Merging, validating every pattern for the linear engine and extracting the
+prefilter literals happen once per change. The result is saved as a JSON
+artifact under ``policies/`` in the runtime directory with a fingerprint
+(path, mtime and size of every layer). A hook process loads the artifact and
+builds its indexes without parsing a regex; patterns are parsed when they
+first run. Within a process, :func:`load_policy` returns the same
+:class:`Policy` until a layer's mtime or size changes, so guardd and the
+guard pipeline pick up edits without a restart.
+"""
+
+from __future__ import annotations
+
+import glob
+import hashlib
+import json
+import os
+import re
+import sys
+from typing import Any, NamedTuple
+
+from .runtime import config_dir, runtime_dir
+
+POLICY_SUFFIX = ".policy.toml"
+
+# Bump when the artifact format changes
+ARTIFACT_VERSION = 1
+
+# Policies kept per process before the memo is cleared
+MAX_LOADED = 64
+
+# List of the shipped policy naming what a project overlay may extend
+PROJECT_EXTENDS = "project_extends"
+
+# Flags a pattern table may set
+TABLE_FLAGS = {
+    "IGNORECASE": re.IGNORECASE,
+    "DOTALL": re.DOTALL,
+    "MULTILINE": re.MULTILINE,
+}
+
+
+class PolicyError(ValueError):
+    """A policy file is malformed or one of its patterns cannot be compiled."""
+
+
+class Rule(NamedTuple):
+    id: str
+    pattern: str
+    value: str
+    # Casefolded literals one of which any match contains, None if unknown
+    literals: frozenset[str] | None
+
+
+class RuleTable(NamedTuple):
+    flags: int
+    rules: tuple[Rule, ...]
+
+
+class Layer(NamedTuple):
+    path: str
+    # Overlays of a project may only add to blocking lists and tables
+    additive: bool = False
+
+
+class Policy:
+    """One guard's merged lists and pattern tables."""
+
+    def __init__(
+        self,
+        name: str,
+        fingerprint: list,
+        lists: dict[str, list[str]],
+        tables: dict[str, RuleTable],
+    ) -> None:
+        self.name = name
+        self.fingerprint = fingerprint
+        self.lists = lists
+        self.tables = tables
+        self._indexes: dict[str, Any] = {}
+
+    def list(self, name: str) -> list[str]:
+        return list(self.lists[name])
+
+    def patterns(self, table: str) -> list[str]:
+        return [rule.pattern for rule in self.tables[table].rules]
+
+    def pairs(self, table: str) -> list[tuple[str, str]]:
+        """Return ``(pattern, value)`` of each rule, in table order."""
+        return [(rule.pattern, rule.value) for rule in self.tables[table].rules]
+
+    def index(self, table: str):
+        """Return the table's linear-time LiteralIndex of ``(pattern, value)``."""
+        index = self._indexes.get(table)
+        if index is None:
+            from .prefilter import LiteralIndex
+
+            rules = self.tables[table].rules
+            index = LiteralIndex(
+                self.pairs(table),
+                self.tables[table].flags,
+                linear=True,
+                literals=[rule.literals for rule in rules],
+                ids=[rule.id for rule in rules],
+            )
+            self._indexes[table] = index
+        return index
+
+
+def policy_layers(
+    name: str, hooks_dir: str, cwd: str | None = None
+) -> tuple[Layer, ...]:
+    """Return the shipped policy file of ``name`` and its user and project overlays."""
+    filename = name + POLICY_SUFFIX
+    return (
+        Layer(os.path.join(hooks_dir, filename)),
+        Layer(os.path.join(config_dir(), filename)),
+        Layer(os.path.join(cwd or os.getcwd(), ".claude", filename), additive=True),
+    )
+
+
+def _signature(path: str) -> list[int] | None:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def _read(path: str) -> dict | None:
+    # Only compiling needs the TOML parser, loading an artifact does not
+    import tomllib
+
+    try:
+        with open(path, "rb") as f:
+            return tomllib.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, tomllib.TOMLDecodeError) as e:
+        raise PolicyError(f"{path}: {e}") from None
+
+
+def _strings(value: Any, where: str) -> list[str]:
+    if not isinstance(value, list) or not all(isinstance(item, str) for item in value):
+        raise PolicyError(f"{where} must be a list of strings")
+    return value
+
+
+def _table_rules(table: dict, where: str) -> list[dict]:
+    """Return the rule entries of a pattern table as ``{id, pattern, value, enabled}``."""
+    rules = [
+        {"id": pattern, "pattern": pattern, "value": pattern, "enabled": True}
+        for pattern in _strings(table.get("patterns", []), f"{where}.patterns")
+    ]
+    entries = table.get("rules", [])
+    if not isinstance(entries, list):
+        raise PolicyError(f"{where}.rules must be a list of tables")
+    for entry in entries:
+        if not isinstance(entry, dict) or not isinstance(entry.get("id"), str):
+            raise PolicyError(f"{where}.rules: each rule needs an 'id' string")
+        enabled = entry.get("enabled", True)
+        pattern = entry.get("pattern")
+        if enabled and not isinstance(pattern, str):
+            raise PolicyError(
+                f"{where}.rules: rule {entry['id']!r} needs a 'pattern' string"
+            )
+        reason = entry.get("reason", pattern)
+        if enabled and not isinstance(reason, str):
+            raise PolicyError(
+                f"{where}.rules: 'reason' of {entry['id']!r} must be a string"
+            )
+        rules.append(
+            {
+                "id": entry["id"],
+                "pattern": pattern,
+                "value": reason,
+                "enabled": bool(enabled),
+            }
+        )
+    unknown = set(table) - {"flags", "patterns", "rules"}
+    if unknown:
+        raise PolicyError(f"{where}: unknown keys {sorted(unknown)}")
+    return rules
+
+
+def _table_flags(table: dict, where: str) -> int:
+    flags = 0
+    for flag in _strings(table.get("flags", []), f"{where}.flags"):
+        if flag not in TABLE_FLAGS:
+            raise PolicyError(f"{where}.flags: unknown flag {flag!r}")
+        flags |= TABLE_FLAGS[flag]
+    return flags
+
+
+def _merge(data: dict, layer: Layer, lists: dict, tables: dict, base: bool) -> None:
+    """Merge one parsed policy file into ``lists`` and ``tables``."""
+    for key, value in data.items():
+        where = f"{layer.path}: {key}"
+        if layer.additive and key not in lists.get(PROJECT_EXTENDS, []):
+            raise PolicyError(
+                f"{where}: project policies can only extend blocking entries"
+            )
+        if isinstance(value, list):
+            if not base and key not in lists:
+                raise PolicyError(f"{where} is not a list of the policy")
+            merged = lists.setdefault(key, [])
+            merged += [item for item in _strings(value, where) if item not in merged]
+            continue
+        if not isinstance(value, dict):
+            raise PolicyError(f"{where} must be a list or a table")
+        if base:
+            tables[key] = {"flags": _table_flags(value, where), "rules": {}}
+        elif key not in tables:
+            raise PolicyError(f"{where} is not a table of the policy")
+        elif "flags" in value:
+            raise PolicyError(f"{where}: flags can only be set by the shipped policy")
+        rules = tables[key]["rules"]
+        for rule in _table_rules(value, where):
+            if rule["id"] in rules and layer.additive:
+                raise PolicyError(
+                    f"{where}: project policies cannot change rule {rule['id']!r}"
+                )
+            if not rule["enabled"]:
+                if layer.additive:
+                    raise PolicyError(f"{where}: project policies cannot disable rules")
+                rules.pop(rule["id"], None)
+                continue
+            rules[rule["id"]] = rule
+
+
+def _compile_table(name: str, table: dict, seen: dict) -> RuleTable:
+    """Validate a merged table; ``seen`` memoizes literals per (pattern, flags)."""
+    from . import linear
+    from .prefilter import required_literals
+
+    flags = table["flags"]
+    compiled = []
+    for rule in table["rules"].values():
+        key = (rule["pattern"], flags)
+        if key not in seen:
+            try:
+                linear.compile(rule["pattern"], flags)
+                seen[key] = required_literals(rule["pattern"], flags)
+            except (re.error, ValueError) as e:
+                raise PolicyError(f"{name}: rule {rule['id']!r}: {e}") from None
+        compiled.append(Rule(rule["id"], rule["pattern"], rule["value"], seen[key]))
+    return RuleTable(flags, tuple(compiled))
+
+
+def compile_policy(name: str, layers: tuple[Layer, ...]) -> Policy:
+    """Merge and validate the policy files of ``layers``.
+
+    Raises PolicyError if the shipped policy (the first layer) is missing or
+    invalid; invalid overlays are skipped with a warning.
+    """
+    fingerprint = [[layer.path, _signature(layer.path)] for layer in layers]
+    lists: dict[str, list[str]] = {}
+    tables: dict[str, dict] = {}
+    seen: dict[tuple[str, int], frozenset[str] | None] = {}
+    for position, layer in enumerate(layers):
+        base = position == 0
+        try:
+            data = _read(layer.path)
+            if data is None:
+                if base:
+                    raise PolicyError(f"{layer.path}: policy file not found")
+                continue
+            # Merge into copies so a bad overlay leaves no partial changes
+            merged_lists = {key: list(value) for key, value in lists.items()}
+            merged_tables = {
+                key: {"flags": value["flags"], "rules": dict(value["rules"])}
+                for key, value in tables.items()
+            }
+            _merge(data, layer, merged_lists, merged_tables, base)
+            compiled = {
+                key: _compile_table(key, value, seen)
+                for key, value in merged_tables.items()
+            }
+        except PolicyError as e:
+            if base:
+                raise
+            print(f"guards: ignoring policy overlay: {e}", file=sys.stderr)
+            continue
+        lists, tables = merged_lists, merged_tables
+    return Policy(name, fingerprint, lists, compiled)
+
+
+def artifact_path(name: str, layers: tuple[Layer, ...]) -> str:
+    digest = hashlib.sha256(
+        "\0".join(layer.path for layer in layers).encode()
+    ).hexdigest()
+    return os.path.join(runtime_dir(), "policies", f"{name}-{digest[:16]}.json")
+
+
+def _save_artifact(path: str, policy: Policy) -> None:
+    data = {
+        "version": ARTIFACT_VERSION,
+        "name": policy.name,
+        "fingerprint": policy.fingerprint,
+        "lists": policy.lists,
+        "tables": {
+            key: {
+                "flags": table.flags,
+                "rules": [
+                    [
+                        rule.id,
+                        rule.pattern,
+                        rule.value,
+                        rule.literals and sorted(rule.literals),
+                    ]
+                    for rule in table.rules
+                ],
+            }
+            for key, table in policy.tables.items()
+        },
+    }
+    try:
+        os.makedirs(os.path.dirname(path), mode=0o700, exist_ok=True)
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(temporary, path)
+    except OSError:
+        pass  # The next process compiles again
+
+
+def _load_artifact(path: str, name: str, fingerprint: list) -> Policy | None:
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        if data["version"] != ARTIFACT_VERSION or data["fingerprint"] != fingerprint:
+            return None
+        tables = {
+            key: RuleTable(
+                table["flags"],
+                tuple(
+                    Rule(
+                        rule_id,
+                        pattern,
+                        value,
+                        None if literals is None else frozenset(literals),
+                    )
+                    for rule_id, pattern, value, literals in table["rules"]
+                ),
+            )
+            for key, table in data["tables"].items()
+        }
+        return Policy(name, fingerprint, data["lists"], tables)
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+_loaded: dict[tuple[str, tuple[Layer, ...]], Policy] = {}
+
+
+def load_policy(name: str, hooks_dir: str, cwd: str | None = None) -> Policy:
+    """Return the compiled policy ``name`` for a project, recompiling only on change.
+
+    ``hooks_dir`` holds the shipped ``<name>.policy.toml``; ``cwd`` is the
+    project whose ``.claude/`` overlay applies (default: the working directory).
+    """
+    layers = policy_layers(name, hooks_dir, cwd)
+    fingerprint = [[layer.path, _signature(layer.path)] for layer in layers]
+    key = (name, layers)
+    policy = _loaded.get(key)
+    if policy is not None and policy.fingerprint == fingerprint:
+        return policy
+
+    try:
+        path = artifact_path(name, layers)
+    except OSError:
+        path = None  # No usable runtime directory: compile in memory
+    policy = _load_artifact(path, name, fingerprint) if path else None
+    if policy is None:
+        policy = compile_policy(name, layers)
+        if path and policy.fingerprint == fingerprint:
+            _save_artifact(path, policy)
+    if len(_loaded) >= MAX_LOADED:
+        _loaded.clear()
+    _loaded[key] = policy
+    return policy
+
+
+def config_files(script_paths: list[str], cwd: str | None = None) -> list[str]:
+    """Return the policy and route files that guard scripts may read, for fingerprints."""
+    directories = {os.path.dirname(path) for path in script_paths}
+    directories |= {config_dir(), os.path.join(cwd or os.getcwd(), ".claude")}
+    found = []
+    for directory in sorted(directories):
+        for pattern in ("*" + POLICY_SUFFIX, "*-routes.json"):
+            found += sorted(glob.glob(os.path.join(glob.escape(directory), pattern)))
+    return found
@@ -0,0 +1,188 @@
+"""Format-then-typecheck pipeline for edited Python files.
+
+python-format and python-typecheck run as independent hooks in no defined
+order, so pyright can check the file before ruff rewrites it. This stage runs
+both in order for each changed file: ``ruff format`` first, then pyright on the
+formatted text. Files are independent, so each one goes through the two steps
+on its own worker thread (the work is in subprocesses and the pyright server),
+and one combined report is returned in input order.
+
+The type-check is skipped when the formatted file parses to the same AST as
+the version checked less than ``STATE_TTL`` seconds ago under the same pyright
+config: a whitespace, comment or formatting only edit cannot change the file's
+own diagnostics. Its modules can still change what they import, which is why
+a check expires and a repeated result is reported as such, with its age, and
+never as a pass of the current run. The last checked AST fingerprint, config
+fingerprint and report of each file are kept under ``post-edit/`` in the
+runtime directory.
+"""
+
+from __future__ import annotations
+
+import ast
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple
+
+from .format_queue import format_files
+from .pyright import config_fingerprint, find_project_root, typecheck
+from .runtime import runtime_dir
+
+# Type checks are I/O bound (subprocesses, the pyright server), not CPU bound
+MAX_WORKERS = min(8, os.cpu_count() or 1)
+
+# Seconds a type-check result may be repeated for an unchanged AST; imported
+# modules may have changed since
+STATE_TTL = 300.0
+
+
+class FileResult(NamedTuple):
+    """Outcome of formatting and type-checking one file."""
+
+    path: str
+    format_output: str  # "" when ruff succeeded silently
+    formatted: bool
+    passed: bool | None  # None when the file could not be type-checked
+    typecheck_output: str
+    skipped: bool  # type-check skipped, report repeated from the last check
+    age: float = 0.0  # seconds since the repeated check ran
+
+
+def ast_fingerprint(source: str) -> str | None:
+    """Hash the AST of ``source`` without positions, or None if it does not parse."""
+    try:
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError):
+        return None
+    return hashlib.sha256(ast.dump(tree, include_attributes=False).encode()).hexdigest()
+
+
+def _state_path(path: str) -> str:
+    directory = os.path.join(runtime_dir(), "post-edit")
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    return os.path.join(
+        directory, hashlib.sha256(path.encode()).hexdigest()[:32] + ".json"
+    )
+
+
+def _config(path: str) -> list:
+    """JSON form of the pyright config fingerprint of ``path``'s project."""
+    return [
+        list(item) if item else None
+        for item in config_fingerprint(find_project_root(path))
+    ]
+
+
+def last_check(path: str, config: list) -> dict | None:
+    """Return ``{"fingerprint", "passed", "output", "checked"}`` of the last type-check.
+
+    None if there is none, it ran under another pyright config, or it is
+    older than ``STATE_TTL``.
+    """
+    try:
+        with open(_state_path(path)) as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(state, dict) or state.get("path") != path:
+        return None
+    if state.get("config") != config:
+        return None
+    checked = state.get("checked")
+    if (
+        not isinstance(checked, (int, float))
+        or not 0 <= time.time() - checked < STATE_TTL
+    ):
+        return None
+    return state
+
+
+def remember_check(
+    path: str, fingerprint: str, config: list, passed: bool, output: str
+) -> None:
+    state = {
+        "path": path,
+        "fingerprint": fingerprint,
+        "config": config,
+        "checked": time.time(),
+        "passed": passed,
+        "output": output,
+    }
+    try:
+        target = _state_path(path)
+        temporary = f"{target}.{os.getpid()}.tmp"
+        with open(temporary, "w") as f:
+            json.dump(state, f)
+        os.replace(temporary, target)
+    except OSError:
+        pass  # The next edit type-checks again
+
+
+def process_file(path: str) -> FileResult:
+    """Format ``path``, then type-check it unless its AST is unchanged."""
+    path = os.path.abspath(path)
+    formatted, format_output = format_files([path])
+
+    try:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            source = f.read()
+    except OSError as e:
+        return FileResult(path, format_output, formatted, None, str(e), False)
+
+    fingerprint = ast_fingerprint(source)
+    config = _config(path)
+    if fingerprint is not None:
+        previous = last_check(path, config)
+        if previous is not None and previous["fingerprint"] == fingerprint:
+            age = time.time() - previous["checked"]
+            return FileResult(
+                path,
+                format_output,
+                formatted,
+                previous["passed"],
+                previous["output"],
+                True,
+                age,
+            )
+
+    passed, output = typecheck(path)
+    if fingerprint is not None and passed is not None:
+        remember_check(path, fingerprint, config, passed, output)
+    return FileResult(path, format_output, formatted, passed, output, False)
+
+
+def run(paths: list[str], max_workers: int = MAX_WORKERS) -> list[FileResult]:
+    """Process distinct ``paths`` concurrently; results keep the input order."""
+    paths = list(dict.fromkeys(os.path.abspath(path) for path in paths))
+    if len(paths) <= 1 or max_workers <= 1:
+        return [process_file(path) for path in paths]
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(paths))) as pool:
+        return list(pool.map(process_file, paths))
+
+
+def format_report(results: list[FileResult]) -> str:
+    """Render one combined report for all files."""
+    lines = []
+    for result in results:
+        if result.formatted:
+            lines.append(f"Formatted: {result.path}")
+        else:
+            lines.append(f"Format warning: {result.format_output}")
+        if result.skipped and result.passed:
+            lines.append(
+                "Type check not re-run: code unchanged since it passed "
+                f"{result.age:.0f}s ago"
+            )
+        elif result.passed:
+            lines.append("Type check passed")
+        elif result.passed is None:
+            lines.append(f"Type check skipped: {result.typecheck_output}")
+        else:
+            note = ""
+            if result.skipped:
+                note = f" (from the check {result.age:.0f}s ago, code unchanged)"
+            lines.append(f"Type errors{note}:\n{result.typecheck_output}")
+    return "\n".join(lines)
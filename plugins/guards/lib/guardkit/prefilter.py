@@ -0,0 +1,198 @@
+"""Literal-keyword prefilter for ordered lists of guard regexes.
+
+Nearly every guard pattern requires some literal text to match (``rm``,
+``chmod``, ``git``...). At construction time :class:`LiteralIndex` extracts,
+for each pattern, a set of literals of which at least one must occur in any
+match. A command is then scanned once for all literals and only the patterns
+whose literals were seen are run, in their original order, so a benign command
+like ``ls -la`` never touches a guard regex.
+
+Literal extraction is conservative: if no requirement can be proven the pattern
+is always run. Matching is done on ``str.casefold()`` text so the prefilter is
+valid for case-sensitive and ``re.IGNORECASE`` patterns alike.
+
+With ``linear=True`` the patterns are compiled by :mod:`guardkit.linear`
+instead of ``re``, so a table that loads is guaranteed to search in linear time
+and a pattern that needs backtracking fails at import with
+:class:`~guardkit.linear.UnsupportedPatternError`.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+from collections.abc import Iterable, Iterator, Sequence
+from typing import Generic, TypeVar
+
+from . import linear as linear_engine
+
+if linear_engine.AVAILABLE:
+    from .linear import sre_constants, sre_parser
+
+T = TypeVar("T")
+
+
+def _best(candidates: list[frozenset[str]]) -> frozenset[str] | None:
+    """Pick the most selective requirement: longest shortest-literal, fewest alternatives."""
+    if not candidates:
+        return None
+    return max(candidates, key=lambda s: (min(map(len, s)), -len(s)))
+
+
+def _requirement(items: sre_parser.SubPattern | list) -> frozenset[str] | None:
+    """Return literals one of which every match of ``items`` must contain."""
+    candidates: list[frozenset[str]] = []
+    run: list[str] = []
+
+    def flush() -> None:
+        if run:
+            candidates.append(frozenset({"".join(run)}))
+            run.clear()
+
+    for op, av in items:
+        if op is sre_constants.LITERAL:
+            run.append(chr(av))
+            continue
+        if op is sre_constants.AT:
+            # Zero-width: does not break a run of adjacent literals
+            continue
+        flush()
+        if op is sre_constants.SUBPATTERN:
+            sub = _requirement(av[-1])
+        elif op is sre_constants.BRANCH:
+            alternatives = [_requirement(alt) for alt in av[1]]
+            sub = None if None in alternatives else frozenset().union(*alternatives)  # type: ignore[arg-type]
+        elif op in (
+            sre_constants.MAX_REPEAT,
+            sre_constants.MIN_REPEAT,
+            sre_constants.POSSESSIVE_REPEAT,
+        ):
+            min_count, _max_count, repeated = av
+            sub = _requirement(repeated) if min_count >= 1 else None
+        elif op is sre_constants.ATOMIC_GROUP:
+            sub = _requirement(av)
+        else:
+            sub = None
+        if sub:
+            candidates.append(sub)
+    flush()
+    return _best(candidates)
+
+
+def required_literals(pattern: str, flags: int = 0) -> frozenset[str] | None:
+    """Return casefolded literals one of which any match must contain, or None.
+
+    Always None where :data:`guardkit.linear.AVAILABLE` is False, as the
+    literals are read from ``re``'s private parser: every pattern then runs.
+    """
+    if not linear_engine.AVAILABLE:
+        re.compile(pattern, flags)
+        return None
+    requirement = _requirement(sre_parser.parse(pattern, flags))
+    if requirement is None or "" in requirement:
+        return None
+    return frozenset(literal.casefold() for literal in requirement)
+
+
+def _fired(name: str) -> None:
+    """Name the matched entry in the hook's telemetry record, if it is enabled."""
+    if os.environ.get("GUARDS_TELEMETRY", "") in ("", "0"):
+        return
+    from . import telemetry
+
+    telemetry.fired(name)
+
+
+class LiteralIndex(Generic[T]):
+    """Ordered ``(pattern, value)`` pairs searchable through a literal prefilter."""
+
+    def __init__(
+        self,
+        entries: Iterable[tuple[str, T]],
+        flags: int = 0,
+        linear: bool = False,
+        literals: Sequence[frozenset[str] | None] | None = None,
+        ids: Sequence[str] | None = None,
+    ) -> None:
+        """``literals`` are the :func:`required_literals` of each entry, if known.
+
+        Given with ``linear=True``, the patterns are taken as already validated
+        and are not parsed until they first run. ``ids`` name the entries in
+        telemetry; an entry without one is named by its pattern.
+        """
+        self.entries: list[tuple[re.Pattern[str] | linear_engine.LinearPattern, T]] = []
+        self.flags = flags
+        # Required literals of each entry, None where the entry always runs
+        self.literals: list[frozenset[str] | None] = []
+        self.ids = list(ids) if ids is not None else None
+        self._always: list[int] = []
+        self._by_literal: dict[str, list[int]] = {}
+
+        for i, (pattern, value) in enumerate(entries):
+            if not linear:
+                compiled = re.compile(pattern, flags)
+            else:
+                compiled = linear_engine.compile(
+                    pattern, flags, validated=literals is not None
+                )
+            self.entries.append((compiled, value))
+            required = (
+                required_literals(pattern, flags) if literals is None else literals[i]
+            )
+            self.literals.append(required)
+            if required is None:
+                self._always.append(i)
+                continue
+            for literal in required:
+                self._by_literal.setdefault(literal, []).append(i)
+
+        # One left-to-right pass: the lookahead reports the longest literal
+        # starting at each position; shorter literals starting there are its
+        # prefixes and are added back via _prefixes.
+        ordered = sorted(self._by_literal, key=len, reverse=True)
+        self._scanner = (
+            re.compile("(?=(" + "|".join(map(re.escape, ordered)) + "))")
+            if ordered
+            else None
+        )
+        self._prefixes = {
+            literal: [
+                other
+                for other in ordered
+                if other != literal and literal.startswith(other)
+            ]
+            for literal in ordered
+        }
+
+    def candidates(self, text: str) -> list[int]:
+        """Return indices of entries that may match ``text``, in entry order."""
+        selected = set(self._always)
+        if self._scanner is not None:
+            seen: set[str] = set()
+            for match in self._scanner.finditer(text.casefold()):
+                literal = match.group(1)
+                if literal not in seen:
+                    seen.add(literal)
+                    seen.update(self._prefixes[literal])
+            for literal in seen:
+                selected.update(self._by_literal[literal])
+        return sorted(selected)
+
+    def search(
+        self, text: str
+    ) -> Iterator[tuple[re.Match[str] | linear_engine.LinearMatch, T]]:
+        """Yield ``(match, value)`` for every entry matching ``text``, in entry order."""
+        for i in self.candidates(text):
+            pattern, value = self.entries[i]
+            match = pattern.search(text)
+            if match:
+                _fired(self.ids[i] if self.ids is not None else pattern.pattern)
+                yield match, value
+
+    def first(self, text: str) -> T | None:
+        """Return the value of the first matching entry, or None."""
+        return next((value for _match, value in self.search(text)), None)
+
+    def any(self, text: str) -> bool:
+        """Return True if any entry matches ``text``."""
+        return next(self.search(text), None) is not None
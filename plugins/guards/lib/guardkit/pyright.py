@@ -0,0 +1,584 @@
+"""Persistent pyright language-server sessions for the python-typecheck hook.
+
+A cold ``uvx pyright <file>`` resolves the tool and analyzes the whole import
+graph on every edit. Instead, ``pyrightd.py`` keeps one
+``pyright-langserver --stdio`` process per project alive and the hook asks it
+for one file's diagnostics over a per-user Unix socket:
+
+    request:  {"file": "/abs/path/to/module.py"}
+    response: {"status": "ok", "root": "...", "diagnostics": [...]}
+              {"status": "error", "error": "..."}  (hook runs pyright itself)
+
+For each request the server sends ``textDocument/didOpen`` (first time) or
+``textDocument/didChange`` with the file's current text and waits for the
+``textDocument/publishDiagnostics`` that answers it, so only that file is
+re-checked and reported. A project is the nearest directory with a
+``pyproject.toml``, ``pyrightconfig.json`` or ``.git``; its language server is
+restarted when either config file changes.
+
+One :func:`typecheck` takes at most ``CHECK_BUDGET`` seconds, well inside
+the 120 second hook timeout: waiting for a new server, its answer and the CLI
+fallback all share that budget, and the CLI is not started once it is spent.
+
+Set ``GUARDS_PYRIGHT_SERVER=0`` to always run the cold CLI.
+"""
+
+from __future__ import annotations
+
+import fcntl
+import json
+import os
+import socket
+import socketserver
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any
+from urllib.parse import unquote, urlparse
+
+from .runtime import LIB_DIR, runtime_dir
+
+SERVER_COMMAND = ("uvx", "--from", "pyright", "pyright-langserver", "--stdio")
+CLI_COMMAND = ("uvx", "pyright")
+
+CONFIG_FILES = ("pyproject.toml", "pyrightconfig.json")
+PROJECT_MARKERS = (*CONFIG_FILES, ".git")
+
+DEFAULT_IDLE_TIMEOUT = 900.0
+
+# Seconds one hook-side type-check may take in total, server and CLI together
+CHECK_BUDGET = 60.0
+
+# How long the hook waits for a freshly started server to listen
+STARTUP_WAIT = 5.0
+
+# The first check of a project includes its initial analysis; the hook stops
+# waiting for the answer when its budget is spent
+DIAGNOSTICS_TIMEOUT = CHECK_BUDGET - STARTUP_WAIT
+REQUEST_TIMEOUT = 30.0
+
+MAX_REQUEST_BYTES = 64 * 1024
+
+# LSP DiagnosticSeverity; hints (4) are editor-only and not reported
+SEVERITIES = {1: "error", 2: "warning", 3: "information"}
+
+
+class LspError(RuntimeError):
+    """The language server failed, exited or did not answer in time."""
+
+
+def _path_of(uri: str) -> str:
+    return os.path.realpath(unquote(urlparse(uri).path))
+
+
+class LspConnection:
+    """JSON-RPC over a language server's stdio, read by a background thread."""
+
+    def __init__(self, command: tuple[str, ...], cwd: str) -> None:
+        self.process = subprocess.Popen(
+            command,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            cwd=cwd,
+            start_new_session=True,
+        )
+        self._write_lock = threading.Lock()
+        self._changed = threading.Condition()
+        self._next_id = 0
+        self._responses: dict[int, dict] = {}
+        # Per real path: (publish count, document version, diagnostics)
+        self.published: dict[str, tuple[int, int | None, list]] = {}
+        self._reader = threading.Thread(target=self._read_loop, daemon=True)
+        self._reader.start()
+
+    @property
+    def alive(self) -> bool:
+        return self.process.poll() is None
+
+    def _send(self, message: dict) -> None:
+        body = json.dumps({"jsonrpc": "2.0", **message}).encode()
+        with self._write_lock:
+            try:
+                self.process.stdin.write(
+                    b"Content-Length: %d\r\n\r\n" % len(body) + body
+                )
+                self.process.stdin.flush()
+            except (OSError, ValueError) as e:
+                raise LspError(f"language server is gone: {e}") from e
+
+    def notify(self, method: str, params: dict) -> None:
+        self._send({"method": method, "params": params})
+
+    def request(
+        self, method: str, params: dict, timeout: float = REQUEST_TIMEOUT
+    ) -> Any:
+        with self._changed:
+            self._next_id += 1
+            request_id = self._next_id
+        self._send({"id": request_id, "method": method, "params": params})
+        response = self._wait(
+            lambda: self._responses.pop(request_id, None), timeout, method
+        )
+        if "error" in response:
+            raise LspError(f"{method} failed: {response['error']}")
+        return response.get("result")
+
+    def _wait(self, ready, timeout: float, what: str) -> Any:
+        deadline = time.monotonic() + timeout
+        with self._changed:
+            while True:
+                result = ready()
+                if result is not None:
+                    return result
+                remaining = deadline - time.monotonic()
+                if not self.alive:
+                    raise LspError(f"language server exited waiting for {what}")
+                if remaining <= 0:
+                    raise LspError(f"timed out waiting for {what}")
+                self._changed.wait(min(remaining, 1.0))
+
+    def wait_for_diagnostics(
+        self, path: str, after: int, version: int, timeout: float = DIAGNOSTICS_TIMEOUT
+    ) -> list:
+        """Return the first diagnostics for ``path`` published after ``after``."""
+
+        def ready() -> list | None:
+            count, published_version, diagnostics = self.published.get(
+                path, (0, None, [])
+            )
+            if count <= after or (
+                published_version is not None and published_version < version
+            ):
+                return None
+            return diagnostics
+
+        return self._wait(ready, timeout, f"diagnostics for {path}")
+
+    def _read_message(self) -> dict | None:
+        stream = self.process.stdout
+        length = None
+        while True:
+            line = stream.readline()
+            if not line:
+                return None
+            line = line.strip()
+            if not line:
+                break
+            name, _, value = line.partition(b":")
+            if name.strip().lower() == b"content-length":
+                length = int(value)
+        if length is None:
+            return None
+        return json.loads(stream.read(length))
+
+    def _read_loop(self) -> None:
+        try:
+            while True:
+                message = self._read_message()
+                if message is None:
+                    break
+                self._dispatch(message)
+        except (OSError, ValueError):
+            pass
+        finally:
+            with self._changed:
+                self._changed.notify_all()
+
+    def _dispatch(self, message: dict) -> None:
+        method = message.get("method")
+        if method is None:
+            with self._changed:
+                self._responses[message.get("id")] = message
+                self._changed.notify_all()
+        elif "id" in message:
+            self._answer(message)
+        elif method == "textDocument/publishDiagnostics":
+            params = message.get("params", {})
+            path = _path_of(params.get("uri", ""))
+            with self._changed:
+                count = self.published.get(path, (0,))[0] + 1
+                self.published[path] = (
+                    count,
+                    params.get("version"),
+                    params.get("diagnostics", []),
+                )
+                self._changed.notify_all()
+
+    def _answer(self, message: dict) -> None:
+        """Answer requests the server sends to the client."""
+        result: Any = None
+        if message["method"] == "workspace/configuration":
+            # No client-side settings: pyright falls back to the project config
+            result = [None for _item in message.get("params", {}).get("items", [])]
+        try:
+            self._send({"id": message["id"], "result": result})
+        except LspError:
+            pass
+
+    def close(self) -> None:
+        if self.alive:
+            try:
+                self.request("shutdown", {}, timeout=2.0)
+                self.notify("exit", {})
+                self.process.wait(timeout=2.0)
+            except (LspError, subprocess.TimeoutExpired):
+                pass
+        if self.alive:
+            self.process.kill()
+            self.process.wait()
+
+
+def find_project_root(path: str) -> str:
+    """Return the nearest ancestor of ``path`` with a project marker, or its directory."""
+    directory = os.path.dirname(os.path.realpath(path))
+    current = directory
+    while True:
+        if any(
+            os.path.exists(os.path.join(current, marker)) for marker in PROJECT_MARKERS
+        ):
+            return current
+        parent = os.path.dirname(current)
+        if parent == current:
+            return directory
+        current = parent
+
+
+def config_fingerprint(root: str) -> tuple:
+    """Size and mtime of each pyright config file of ``root`` (None if missing)."""
+    fingerprint = []
+    for name in CONFIG_FILES:
+        try:
+            stat = os.stat(os.path.join(root, name))
+        except OSError:
+            fingerprint.append(None)
+            continue
+        fingerprint.append((stat.st_size, stat.st_mtime_ns))
+    return tuple(fingerprint)
+
+
+class PyrightSession:
+    """One language server for one project root, restarted when its config changes."""
+
+    def __init__(self, root: str, command: tuple[str, ...] = SERVER_COMMAND) -> None:
+        self.root = root
+        self.command = command
+        self._lock = threading.Lock()
+        self._connection: LspConnection | None = None
+        self._config: tuple | None = None
+        self._versions: dict[str, int] = {}
+
+    def config_fingerprint(self) -> tuple:
+        return config_fingerprint(self.root)
+
+    def _connect(self) -> LspConnection:
+        config = self.config_fingerprint()
+        connection = self._connection
+        if connection is not None and connection.alive and config == self._config:
+            return connection
+        self.close()
+
+        connection = LspConnection(self.command, self.root)
+        root_uri = Path(self.root).as_uri()
+        try:
+            connection.request(
+                "initialize",
+                {
+                    "processId": os.getpid(),
+                    "rootUri": root_uri,
+                    "workspaceFolders": [
+                        {"uri": root_uri, "name": os.path.basename(self.root)}
+                    ],
+                    "capabilities": {
+                        "textDocument": {
+                            "publishDiagnostics": {"versionSupport": True}
+                        },
+                        "workspace": {"configuration": True, "workspaceFolders": True},
+                    },
+                },
+            )
+            connection.notify("initialized", {})
+        except LspError:
+            connection.close()
+            raise
+        self._connection, self._config = connection, config
+        self._versions = {}
+        return connection
+
+    def diagnostics(self, path: str) -> list[dict]:
+        """Sync ``path``'s current text to the server and return its diagnostics."""
+        path = os.path.realpath(path)
+        with open(path, encoding="utf-8", errors="replace") as f:
+            text = f.read()
+
+        with self._lock:
+            connection = self._connect()
+            uri = Path(path).as_uri()
+            version = self._versions.get(path, 0) + 1
+            after = connection.published.get(path, (0,))[0]
+            if version == 1:
+                connection.notify(
+                    "textDocument/didOpen",
+                    {
+                        "textDocument": {
+                            "uri": uri,
+                            "languageId": "python",
+                            "version": version,
+                            "text": text,
+                        }
+                    },
+                )
+            else:
+                connection.notify(
+                    "textDocument/didChange",
+                    {
+                        "textDocument": {"uri": uri, "version": version},
+                        "contentChanges": [{"text": text}],
+                    },
+                )
+            self._versions[path] = version
+            return connection.wait_for_diagnostics(path, after, version)
+
+    def close(self) -> None:
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+
+class SessionRegistry:
+    """Language-server sessions keyed by project root."""
+
+    def __init__(self, command: tuple[str, ...] = SERVER_COMMAND) -> None:
+        self.command = command
+        self._lock = threading.Lock()
+        self._sessions: dict[str, PyrightSession] = {}
+
+    def session(self, root: str) -> PyrightSession:
+        with self._lock:
+            session = self._sessions.get(root)
+            if session is None:
+                session = self._sessions[root] = PyrightSession(root, self.command)
+            return session
+
+    def evaluate(self, request: Any) -> dict[str, Any]:
+        """Answer one client request with the file's diagnostics."""
+        path = request.get("file") if isinstance(request, dict) else None
+        if not isinstance(path, str) or not os.path.isabs(path):
+            return {"status": "error", "error": "invalid request"}
+        root = find_project_root(path)
+        session = self.session(root)
+        try:
+            diagnostics = session.diagnostics(path)
+        except (OSError, LspError) as e:
+            session.close()
+            return {"status": "error", "error": str(e)}
+        return {"status": "ok", "root": root, "diagnostics": diagnostics}
+
+    def close(self) -> None:
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    server: PyrightServer
+
+    def handle(self) -> None:
+        raw = self.rfile.readline(MAX_REQUEST_BYTES)
+        try:
+            request = json.loads(raw)
+        except ValueError:
+            response: dict[str, Any] = {"status": "error", "error": "invalid request"}
+        else:
+            response = self.server.registry.evaluate(request)
+        self.wfile.write(json.dumps(response).encode() + b"\n")
+
+
+class PyrightServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Threaded Unix socket server that exits after ``idle_timeout`` seconds idle."""
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        path: str,
+        registry: SessionRegistry,
+        idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+    ) -> None:
+        self.registry = registry
+        self.timeout = idle_timeout
+        self._idle = False
+        super().__init__(path, _RequestHandler)
+        os.chmod(path, 0o600)
+
+    def handle_timeout(self) -> None:
+        self._idle = True
+
+    def serve_until_idle(self) -> None:
+        """Serve requests until no request arrives within the idle timeout."""
+        while not self._idle:
+            self.handle_request()
+
+
+def socket_path() -> str:
+    return os.path.join(runtime_dir(), "pyrightd.sock")
+
+
+def run(
+    idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+    command: tuple[str, ...] = SERVER_COMMAND,
+) -> int:
+    """Run the server for this user unless another instance already owns the socket."""
+    lock_file = open(os.path.join(runtime_dir(), "pyrightd.lock"), "w")  # noqa: SIM115
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        lock_file.close()
+        return 0
+
+    path = socket_path()
+    if os.path.exists(path):
+        os.unlink(path)  # stale socket from a server that did not shut down cleanly
+
+    registry = SessionRegistry(command)
+    server = PyrightServer(path, registry, idle_timeout)
+    try:
+        server.serve_until_idle()
+    finally:
+        server.server_close()
+        registry.close()
+        if os.path.exists(path):
+            os.unlink(path)
+        lock_file.close()
+    return 0
+
+
+def _ask_server(path: str, connect_timeout: float, deadline: float) -> dict | None:
+    """Ask the server for ``path``'s diagnostics, giving up at ``deadline`` (monotonic)."""
+    request = json.dumps({"file": path}).encode() + b"\n"
+    connect_deadline = min(time.monotonic() + connect_timeout, deadline)
+    while True:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(socket_path())
+            break
+        except (FileNotFoundError, ConnectionRefusedError):
+            sock.close()
+            if time.monotonic() >= connect_deadline:
+                return None
+            time.sleep(0.05)
+        except OSError:
+            sock.close()
+            return None
+
+    try:
+        sock.sendall(request)
+        chunks = []
+        while not chunks or not chunks[-1].endswith(b"\n"):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            sock.settimeout(remaining)
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+        return json.loads(b"".join(chunks))
+    except (OSError, ValueError):
+        return None
+    finally:
+        sock.close()
+
+
+def _start_server() -> None:
+    try:
+        subprocess.Popen(
+            [sys.executable, os.path.join(LIB_DIR, "pyrightd.py")],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+    except OSError:
+        pass
+
+
+def format_diagnostics(path: str, diagnostics: list[dict]) -> str:
+    """Render diagnostics like the pyright CLI does."""
+    lines = [path]
+    counts = dict.fromkeys(SEVERITIES.values(), 0)
+    for diagnostic in diagnostics:
+        severity = SEVERITIES.get(diagnostic.get("severity", 1))
+        if severity is None:
+            continue
+        counts[severity] += 1
+        start = diagnostic.get("range", {}).get("start", {})
+        rule = f" ({diagnostic['code']})" if diagnostic.get("code") else ""
+        lines.append(
+            f"  {path}:{start.get('line', 0) + 1}:{start.get('character', 0) + 1} - "
+            f"{severity}: {diagnostic.get('message', '')}{rule}"
+        )
+    lines.append(
+        f"{counts['error']} errors, {counts['warning']} warnings, "
+        f"{counts['information']} informations"
+    )
+    return "\n".join(lines)
+
+
+def check_file(path: str, deadline: float | None = None) -> tuple[bool, str] | None:
+    """Return ``(passed, report)`` from the language server, or None to use the CLI.
+
+    Starts the server in the background when it is not running yet, and stops
+    waiting at ``deadline`` (monotonic, by default ``CHECK_BUDGET`` from now).
+    """
+    if os.environ.get("GUARDS_PYRIGHT_SERVER", "1") == "0":
+        return None
+    if deadline is None:
+        deadline = time.monotonic() + CHECK_BUDGET
+    path = os.path.abspath(path)
+    response = _ask_server(path, 0, deadline)
+    if response is None and time.monotonic() < deadline:
+        _start_server()
+        response = _ask_server(path, STARTUP_WAIT, deadline)
+    if not response or response.get("status") != "ok":
+        return None
+    diagnostics = response.get("diagnostics", [])
+    passed = not any(diagnostic.get("severity", 1) == 1 for diagnostic in diagnostics)
+    return passed, format_diagnostics(path, diagnostics)
+
+
+def run_cli(path: str, timeout: float | None = None) -> tuple[bool | None, str]:
+    """Run a cold ``uvx pyright <path>``; return ``(passed, output)``.
+
+    ``passed`` is None if pyright did not finish within ``timeout`` seconds.
+    """
+    try:
+        result = subprocess.run(
+            [*CLI_COMMAND, path],
+            check=False,
+            capture_output=True,
+            text=True,
+            timeout=timeout,
+        )
+    except subprocess.TimeoutExpired:
+        return None, f"pyright did not finish within {timeout:.1f}s"
+    return result.returncode == 0, result.stdout
+
+
+def typecheck(path: str, budget: float = CHECK_BUDGET) -> tuple[bool | None, str]:
+    """Type-check one file through the language server, or the CLI if unavailable.
+
+    Takes at most ``budget`` seconds. ``passed`` is None if the file could not
+    be checked in that time; the CLI is not started when the server used it up.
+    """
+    deadline = time.monotonic() + budget
+    result = check_file(path, deadline)
+    if result is not None:
+        return result
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        return None, f"Type check did not finish within {budget:.1f}s"
+    return run_cli(path, remaining)
@@ -0,0 +1,241 @@
+"""Adversarial worst-case timing for guard regexes (ReDoS regression gate).
+
+Agents paste huge heredocs and generated scripts into Bash commands, so every
+guard pattern must stay fast on long inputs that almost match it. This module
+finds the patterns of a guard script and builds adversarial inputs for each
+one from the pattern's own structure:
+
+- **pumps**: for every repeat in the pattern (``\\s+``, ``.*?``,
+  ``.{0,1000}?``) the text leading up to it, followed by the repeated item
+  pumped to the target size and a character that stops the match completing
+- **near misses**: the shortest match minus its last piece, repeated, so the
+  engine retries from thousands of start positions
+- **fuzz**: seeded random sequences of the pattern's literal pieces joined by
+  shell separators
+
+:func:`worst_case` times a pattern over all of them at growing sizes and
+stops early once the budget is exceeded, so a catastrophic pattern fails fast
+instead of hanging the suite.
+"""
+
+from __future__ import annotations
+
+import random
+import re
+import re._constants as sre_constants
+import re._parser as sre_parser
+import time
+from collections.abc import Iterator
+from types import ModuleType
+from typing import NamedTuple
+
+from .linear import LinearPattern
+from .prefilter import LiteralIndex
+
+# Input sizes (characters) tried in order; the largest is the gate
+SIZES = (1_000, 10_000, 100_000)
+
+# Per search on the largest input, i.e. about 1 microsecond per character
+DEFAULT_BUDGET_MS = 100.0
+
+# Flags for patterns stored as plain strings: callers differ, and DOTALL lets
+# ``.`` run across heredoc lines, the worst case for backtracking
+STRING_PATTERN_FLAGS = re.IGNORECASE | re.DOTALL
+
+# Separators used to stitch fuzz inputs together
+_SEPARATORS = (" ", "  ", "\t", "\n", ";", " | ", " && ", "'", '"', "=", "/", "-", "$(")
+
+_REPEATS = (
+    sre_constants.MAX_REPEAT,
+    sre_constants.MIN_REPEAT,
+    sre_constants.POSSESSIVE_REPEAT,
+)
+
+_CATEGORY_SAMPLES = {
+    sre_constants.CATEGORY_SPACE: " ",
+    sre_constants.CATEGORY_NOT_SPACE: "a",
+    sre_constants.CATEGORY_DIGIT: "1",
+    sre_constants.CATEGORY_NOT_DIGIT: "a",
+    sre_constants.CATEGORY_WORD: "a",
+    sre_constants.CATEGORY_NOT_WORD: " ",
+}
+
+
+class GuardPattern(NamedTuple):
+    """A regex found in a guard script, named after where it lives."""
+
+    name: str  # e.g. "BLOCKED_PATTERNS[3]"
+    pattern: re.Pattern[str] | LinearPattern
+
+
+class WorstCase(NamedTuple):
+    """The slowest adversarial input found for a pattern."""
+
+    elapsed_ms: float
+    size: int
+    kind: str  # which generator produced the input
+
+    def describe(self) -> str:
+        return f"{self.elapsed_ms:.1f} ms on a {self.size}-char {self.kind} input"
+
+
+def guard_patterns(module: ModuleType) -> list[GuardPattern]:
+    """Return the regexes defined at module level in a guard script.
+
+    Covers compiled ``re`` and :mod:`~guardkit.linear` patterns,
+    :class:`LiteralIndex` entries and upper-case lists of pattern strings or
+    ``(pattern, reason)`` tuples. A pattern that is both in a list and in an
+    index built from it is reported once, with the index's flags and engine;
+    other strings are compiled with :data:`STRING_PATTERN_FLAGS`.
+    """
+    found: dict[str, GuardPattern] = {}
+    strings: list[tuple[str, str]] = []
+
+    for name, value in vars(module).items():
+        if not name.isupper():
+            continue
+        if isinstance(value, (re.Pattern, LinearPattern)):
+            found.setdefault(value.pattern, GuardPattern(name, value))
+        elif isinstance(value, LiteralIndex):
+            for i, (pattern, _value) in enumerate(value.entries):
+                found.setdefault(pattern.pattern, GuardPattern(f"{name}[{i}]", pattern))
+        elif isinstance(value, (list, tuple)):
+            for i, item in enumerate(value):
+                text = item[0] if isinstance(item, tuple) and item else item
+                if not isinstance(text, str):
+                    break
+                strings.append((f"{name}[{i}]", text))
+
+    for name, text in strings:
+        if text in found:
+            continue
+        try:
+            found[text] = GuardPattern(name, re.compile(text, STRING_PATTERN_FLAGS))
+        except re.error:
+            continue
+    return list(found.values())
+
+
+def _class_sample(items: list) -> str:
+    """Return a character matched by a character class."""
+    if items and items[0][0] is sre_constants.NEGATE:
+        excluded = {chr(av) for op, av in items[1:] if op is sre_constants.LITERAL}
+        return next(c for c in "ax1/ " if c not in excluded)
+    op, av = items[0]
+    if op is sre_constants.LITERAL:
+        return chr(av)
+    if op is sre_constants.RANGE:
+        return chr(av[0])
+    if op is sre_constants.CATEGORY:
+        return _CATEGORY_SAMPLES.get(av, "a")
+    return "a"
+
+
+def _pieces(items: sre_parser.SubPattern | list) -> list[str | tuple[str, int]]:
+    """Flatten a parsed pattern into literal text and ``(unit, min_count)`` repeats.
+
+    Branches take their first alternative; lookarounds and anchors add nothing.
+    """
+    pieces: list[str | tuple[str, int]] = []
+    for op, av in items:
+        if op is sre_constants.LITERAL:
+            pieces.append(chr(av))
+        elif op is sre_constants.NOT_LITERAL:
+            pieces.append("a" if av != ord("a") else "b")
+        elif op is sre_constants.ANY:
+            pieces.append("a")
+        elif op is sre_constants.IN:
+            pieces.append(_class_sample(av))
+        elif op is sre_constants.SUBPATTERN:
+            pieces.extend(_pieces(av[-1]))
+        elif op is sre_constants.ATOMIC_GROUP:
+            pieces.extend(_pieces(av))
+        elif op is sre_constants.BRANCH:
+            pieces.extend(_pieces(av[1][0]))
+        elif op in _REPEATS:
+            min_count, _max_count, repeated = av
+            unit = _render(_pieces(repeated)) or " "
+            pieces.append((unit, min_count))
+        elif op is sre_constants.GROUPREF:
+            pieces.append("A")
+    return pieces
+
+
+def _render(pieces: list[str | tuple[str, int]], pump: int = 1) -> str:
+    """Render pieces, repeating each repeat unit ``pump`` times (or its minimum)."""
+    return "".join(
+        piece if isinstance(piece, str) else piece[0] * max(pump, piece[1])
+        for piece in pieces
+    )
+
+
+def _fill(unit: str, size: int) -> str:
+    return (unit * (size // max(len(unit), 1) + 1))[:size]
+
+
+def adversarial_inputs(
+    pattern: re.Pattern[str], size: int, seed: int = 0
+) -> Iterator[tuple[str, str]]:
+    """Yield ``(kind, text)`` inputs of about ``size`` characters for ``pattern``."""
+    pieces = _pieces(sre_parser.parse(pattern.pattern, pattern.flags))
+    repeats = [i for i, piece in enumerate(pieces) if not isinstance(piece, str)]
+
+    for i in repeats:
+        prefix = _render(pieces[:i])
+        unit = pieces[i][0]  # type: ignore[index]
+        # One start, the repeat pumped almost to the end of the input, then a
+        # character no pattern expects so the match cannot complete
+        yield "pump", prefix + _fill(unit, size - len(prefix) - 1) + "\x00"
+        # Many starts, each with a short pump
+        yield "repeated pump", _fill(prefix + unit * 8 + " ", size)
+
+    skeleton = _render(pieces)
+    if len(pieces) > 1:
+        yield "near miss", _fill(_render(pieces[:-1]) + " ", size)
+    yield "skeleton", _fill(skeleton + "\n", size)
+
+    rng = random.Random(seed)
+    words = [_render([piece], pump=rng.randint(1, 4)) for piece in pieces] or ["a"]
+    chunks: list[str] = []
+    length = 0
+    while length < size:
+        chunk = rng.choice(words) + rng.choice(_SEPARATORS)
+        chunks.append(chunk)
+        length += len(chunk)
+    yield "fuzz", "".join(chunks)[:size]
+
+
+def time_search(pattern: re.Pattern[str], text: str, repeat: int = 1) -> float:
+    """Fastest wall time (ms) of ``pattern.search(text)`` over ``repeat`` runs."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        pattern.search(text)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def worst_case(
+    pattern: re.Pattern[str],
+    budget_ms: float = DEFAULT_BUDGET_MS,
+    sizes: tuple[int, ...] = SIZES,
+    seed: int = 0,
+) -> WorstCase:
+    """Return the slowest adversarial search for ``pattern``.
+
+    Sizes are tried smallest first and the search stops at the first input
+    over budget, so a quadratic or exponential pattern is reported without
+    being run on the largest inputs. An input over budget is re-timed and
+    only fails on its fastest run, so machine load alone does not fail it.
+    """
+    worst = WorstCase(0.0, 0, "none")
+    for size in sizes:
+        for kind, text in adversarial_inputs(pattern, size, seed):
+            elapsed = time_search(pattern, text)
+            if elapsed > budget_ms:
+                elapsed = time_search(pattern, text, repeat=3)
+            if elapsed > worst.elapsed_ms:
+                worst = WorstCase(elapsed, len(text), kind)
+            if elapsed > budget_ms:
+                return worst
+    return worst
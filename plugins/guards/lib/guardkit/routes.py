@@ -0,0 +1,219 @@
+"""Declarative route tables matched with a segment trie.
+
+gh-api-guard used to loop over a list of endpoint regexes. Its allowlist is
+now a route table: a JSON file whose ``routes`` each name a path pattern, the
+HTTP methods allowed on it and, optionally, the query parameters allowed::
+
+    {"routes": [
+        {"path": "repos/{owner}/{repo}/pulls/{number:int}/comments",
+         "methods": ["GET"], "query": ["per_page", "page"],
+         "description": "Inline PR comments"}
+    ]}
+
+A ``{name}`` segment matches any non-empty segment, ``{name:int}`` only
+digits and ``{name:sha}`` only lowercase hex. A route without ``query``
+accepts any parameter; an empty ``methods`` list disables the route.
+
+The patterns are compiled into a trie with one node per segment, so a lookup
+costs one dict access or wildcard test per segment of the path however many
+routes there are. Literal segments win over wildcards.
+
+Tables are layered: each file adds routes, and a route whose pattern (with
+wildcard names ignored) is already known replaces it. A layer may cap the
+methods it can grant, so a file checked into a project cannot allow writes.
+Compiled tables are cached per list of layers and rebuilt when a file's
+mtime or size changes.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from collections.abc import Callable, Iterable
+from typing import NamedTuple
+
+HEX_DIGITS = frozenset("0123456789abcdef")
+
+# Wildcard type -> test of a single path segment
+WILDCARD_TYPES: dict[str, Callable[[str], bool]] = {
+    "str": bool,
+    "int": str.isdecimal,
+    "sha": lambda segment: bool(segment) and HEX_DIGITS.issuperset(segment),
+}
+
+
+class RouteError(ValueError):
+    """A route table or one of its patterns is malformed."""
+
+
+class Route(NamedTuple):
+    pattern: str
+    methods: frozenset[str]
+    # None accepts any query parameter
+    query: frozenset[str] | None
+    description: str = ""
+
+
+class RouteLayer(NamedTuple):
+    path: str
+    # Methods routes of this layer may grant, None for any
+    max_methods: frozenset[str] | None = None
+
+
+def parse_segment(segment: str) -> tuple[str | None, str]:
+    """Return ``(None, literal)`` or ``(type, name)`` for a pattern segment."""
+    if not (segment.startswith("{") and segment.endswith("}")):
+        if not segment or "{" in segment or "}" in segment:
+            raise RouteError(f"Invalid route segment {segment!r}")
+        return None, segment
+    name, _, kind = segment[1:-1].partition(":")
+    kind = kind or "str"
+    if not name or kind not in WILDCARD_TYPES:
+        raise RouteError(f"Invalid route wildcard {segment!r}")
+    return kind, name
+
+
+def route_key(pattern: str) -> tuple[tuple[str | None, str], ...]:
+    """Identify a pattern by its literals and wildcard types, not wildcard names."""
+    return tuple(
+        (kind, "" if kind else value)
+        for kind, value in map(parse_segment, pattern.strip("/").split("/"))
+    )
+
+
+def parse_route(entry: object, source: str) -> Route:
+    """Validate one entry of a route table."""
+    if not isinstance(entry, dict) or not isinstance(entry.get("path"), str):
+        raise RouteError(f"{source}: each route needs a 'path' string")
+    pattern = entry["path"].strip("/")
+    try:
+        route_key(pattern)
+    except RouteError as e:
+        raise RouteError(f"{source}: {e}") from None
+
+    methods = entry.get("methods", ["GET"])
+    query = entry.get("query")
+    if not isinstance(methods, list) or not all(isinstance(m, str) for m in methods):
+        raise RouteError(f"{source}: 'methods' of {pattern} must be a list of strings")
+    if query is not None and (
+        not isinstance(query, list) or not all(isinstance(q, str) for q in query)
+    ):
+        raise RouteError(f"{source}: 'query' of {pattern} must be a list of strings")
+    return Route(
+        pattern=pattern,
+        methods=frozenset(method.upper() for method in methods),
+        query=None if query is None else frozenset(query),
+        description=str(entry.get("description", "")),
+    )
+
+
+def read_routes(path: str) -> list[Route]:
+    """Read the routes of a table file; a missing file has none."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return []
+    except (OSError, ValueError) as e:
+        raise RouteError(f"{path}: {e}") from None
+    if not isinstance(data, dict) or not isinstance(data.get("routes"), list):
+        raise RouteError(f"{path}: expected an object with a 'routes' list")
+    return [parse_route(entry, path) for entry in data["routes"]]
+
+
+class _Node:
+    __slots__ = ("literals", "wildcards", "route")
+
+    def __init__(self) -> None:
+        self.literals: dict[str, _Node] = {}
+        # (type, test, child) in insertion order
+        self.wildcards: list[tuple[str, Callable[[str], bool], _Node]] = []
+        self.route: Route | None = None
+
+
+class RouteTrie:
+    """Route patterns compiled into one trie of path segments."""
+
+    def __init__(self, routes: Iterable[Route] = ()) -> None:
+        self._root = _Node()
+        for route in routes:
+            self.insert(route)
+
+    def insert(self, route: Route) -> None:
+        """Add ``route``, replacing a route with the same pattern."""
+        node = self._root
+        for kind, value in route_key(route.pattern):
+            if kind is None:
+                node = node.literals.setdefault(value, _Node())
+                continue
+            for wildcard, _test, child in node.wildcards:
+                if wildcard == kind:
+                    node = child
+                    break
+            else:
+                child = _Node()
+                node.wildcards.append((kind, WILDCARD_TYPES[kind], child))
+                node = child
+        node.route = route
+
+    def match(self, path: str) -> Route | None:
+        """Return the route matching ``path`` (no leading slash or query), or None."""
+        segments = path.split("/")
+        # Depth-first, literals before wildcards
+        pending = [(self._root, 0)]
+        while pending:
+            node, depth = pending.pop()
+            if depth == len(segments):
+                if node.route is not None:
+                    return node.route
+                continue
+            segment = segments[depth]
+            for _kind, test, child in reversed(node.wildcards):
+                if test(segment):
+                    pending.append((child, depth + 1))
+            literal = node.literals.get(segment)
+            if literal is not None:
+                pending.append((literal, depth + 1))
+        return None
+
+
+def _signature(path: str) -> tuple[int, int] | None:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def compile_layers(layers: Iterable[RouteLayer]) -> RouteTrie:
+    """Merge the route files of ``layers``, later layers replacing earlier routes."""
+    trie = RouteTrie()
+    for layer in layers:
+        for route in read_routes(layer.path):
+            if layer.max_methods is not None:
+                route = route._replace(methods=route.methods & layer.max_methods)
+            trie.insert(route)
+    return trie
+
+
+# Compiled tables kept before the cache is cleared
+MAX_COMPILED = 64
+
+_compiled: dict[tuple[RouteLayer, ...], tuple[tuple, RouteTrie]] = {}
+
+
+def load_layers(layers: Iterable[RouteLayer]) -> RouteTrie:
+    """Return the compiled trie of ``layers``, recompiling when a file changed.
+
+    Raises RouteError if a file is malformed.
+    """
+    layers = tuple(layers)
+    signatures = tuple(_signature(layer.path) for layer in layers)
+    cached = _compiled.get(layers)
+    if cached is not None and cached[0] == signatures:
+        return cached[1]
+    trie = compile_layers(layers)
+    if len(_compiled) >= MAX_COMPILED:
+        _compiled.clear()
+    _compiled[layers] = (signatures, trie)
+    return trie
@@ -0,0 +1,50 @@
+"""Per-user runtime locations shared by the guard daemon and its clients.
+
+Uses os.path rather than pathlib/tempfile because guard_client.py imports this
+module on every tool call and must stay cheap to start.
+"""
+
+from __future__ import annotations
+
+import os
+
+APP_NAME = "rbw-guards"
+
+# plugins/guards (this file lives in plugins/guards/lib/guardkit/)
+GUARDS_ROOT = os.path.dirname(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+)
+LIB_DIR = os.path.join(GUARDS_ROOT, "lib")
+
+
+def runtime_dir() -> str:
+    """Return the private runtime directory for sockets and locks, creating it."""
+    path = os.environ.get("GUARDS_RUNTIME_DIR")
+    if not path:
+        xdg = os.environ.get("XDG_RUNTIME_DIR")
+        if xdg:
+            path = os.path.join(xdg, APP_NAME)
+        else:
+            tmp = os.environ.get("TMPDIR") or "/tmp"
+            path = os.path.join(tmp, f"{APP_NAME}-{os.getuid()}")
+
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    if os.stat(path).st_uid != os.getuid():
+        raise PermissionError(f"Guard runtime dir {path} is owned by another user")
+    return path
+
+
+def config_dir() -> str:
+    """Return the per-user directory for guard configuration files (not created)."""
+    path = os.environ.get("GUARDS_CONFIG_DIR")
+    if path:
+        return path
+    xdg = os.environ.get("XDG_CONFIG_HOME") or os.path.join(
+        os.path.expanduser("~"), ".config"
+    )
+    return os.path.join(xdg, APP_NAME)
+
+
+def socket_path() -> str:
+    """Return the Unix socket path the guard daemon listens on."""
+    return os.path.join(runtime_dir(), "guardd.sock")
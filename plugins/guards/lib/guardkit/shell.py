@@ -0,0 +1,838 @@
+"""Structured, cached parse of Bash command strings for guard rules.
+
+:func:`parse_script` turns a command string into a :class:`Script`: the
+top-level ``&&``/``||``/``;``/``&`` list of :class:`Pipeline` objects, whose
+stages are :class:`SimpleCommand` argv vectors or :class:`Group` subshells and
+brace groups. While parsing it also unwraps everything that hides another
+command:
+
+- env-var prefixes (``FOO=1 cmd``) and wrapper commands (``env``, ``timeout``,
+  ``nohup``, ``nice``, ``sudo``, ``xargs``...) - ``argv`` is the command that
+  actually runs, the prefixes are kept in ``env`` and ``wrappers``
+- ``bash -c``/``sh -c`` and ``eval`` payloads, command substitutions
+  (``$(...)``, backticks), process substitutions and heredocs fed to a shell,
+  which become nested scripts on the command (``SimpleCommand.nested``)
+
+``Script.commands`` flattens every simple command at any depth, so a guard can
+match on argv vectors in one pass instead of running regexes over the raw
+string. The parser is a single left-to-right scan; input that is not valid
+Bash is parsed best-effort and marks the script ``complete=False``.
+
+Parsed objects are cached and shared: treat them as read-only.
+"""
+
+from __future__ import annotations
+
+import re
+from collections.abc import Iterator
+from functools import cached_property, lru_cache
+
+# Nested payloads (bash -c inside eval inside $(...)...) deeper than this are
+# not parsed and mark the script incomplete
+MAX_DEPTH = 8
+
+# Likewise for subshells and brace groups nested deeper than this, counting
+# the groups around every enclosing payload
+MAX_GROUP_DEPTH = 32
+
+SHELLS = frozenset({"bash", "sh", "zsh", "dash", "ksh"})
+
+# Reserved words that can precede a command without being one
+_SKIP_WORDS = frozenset(
+    {
+        "if",
+        "then",
+        "else",
+        "elif",
+        "fi",
+        "do",
+        "done",
+        "while",
+        "until",
+        "!",
+        "esac",
+        "function",
+    }
+)
+
+# Wrapper commands: options that take a separate argument, and the number of
+# positional arguments before the wrapped command
+_WRAPPERS: dict[str, tuple[frozenset[str], int]] = {
+    "env": (frozenset({"-u", "--unset", "-C", "--chdir", "-S", "--split-string"}), 0),
+    "timeout": (frozenset({"-s", "--signal", "-k", "--kill-after"}), 1),
+    "nohup": (frozenset(), 0),
+    "nice": (frozenset({"-n", "--adjustment"}), 0),
+    "ionice": (frozenset({"-c", "--class", "-n", "--classdata", "-p", "-P", "-u"}), 0),
+    "exec": (frozenset({"-a"}), 0),
+    "time": (frozenset({"-f", "--format", "-o", "--output"}), 0),
+    "command": (frozenset(), 0),
+    "builtin": (frozenset(), 0),
+    "stdbuf": (frozenset({"-i", "-o", "-e", "--input", "--output", "--error"}), 0),
+    "strace": (
+        frozenset({"-o", "-e", "-p", "-s", "-u", "-E", "-a", "-P", "-X", "-I", "-b"}),
+        0,
+    ),
+    "ltrace": (frozenset({"-o", "-e", "-p", "-s", "-u", "-a", "-n", "-x", "-L"}), 0),
+    "sudo": (
+        frozenset(
+            {
+                "-u",
+                "-g",
+                "-C",
+                "-D",
+                "-h",
+                "-p",
+                "-r",
+                "-t",
+                "-U",
+                "-T",
+                "--user",
+                "--group",
+            }
+            | {"--chdir", "--host", "--prompt", "--role", "--type", "--other-user"}
+        ),
+        0,
+    ),
+    "xargs": (
+        frozenset(
+            {
+                "-I",
+                "-n",
+                "-P",
+                "-L",
+                "-d",
+                "-E",
+                "-s",
+                "-a",
+                "--max-args",
+                "--max-procs",
+            }
+            | {
+                "--max-lines",
+                "--delimiter",
+                "--eof",
+                "--max-chars",
+                "--arg-file",
+                "--replace",
+            }
+        ),
+        0,
+    ),
+}
+
+_ASSIGNMENT = re.compile(r"[A-Za-z_][A-Za-z0-9_]*(?:\[[^\]]*\])?\+?=")
+_REDIRECT = re.compile(r"&>>?|\d*(?:<<<|<<-|<<|<>|<&|>>|>&|>\||<|>)")
+_NUMERIC_ESCAPE = re.compile(r"x([0-9a-fA-F]{1,2})|([0-7]{1,3})")
+_BACKTICK_ESCAPE = re.compile(r"\\([`$\\])")
+_WORD_END = frozenset(" \t\n|&;()<>")
+_BLANKS = " \t"
+_ANSI_ESCAPES = {
+    "n": "\n",
+    "t": "\t",
+    "r": "\r",
+    "a": "\a",
+    "b": "\b",
+    "e": "\x1b",
+    "f": "\f",
+    "v": "\v",
+    "\\": "\\",
+    "'": "'",
+    '"': '"',
+    "?": "?",
+}
+
+
+class Redirect:
+    """A redirection such as ``> out``, ``2>&1``, ``<<EOF`` or ``<<< word``."""
+
+    __slots__ = ("op", "target", "body", "expands")
+
+    def __init__(
+        self, op: str, target: str, body: str | None = None, expands: bool = True
+    ) -> None:
+        self.op = op
+        self.target = target
+        self.body = body  # heredoc body or here-string
+        self.expands = expands  # False for quoted heredoc delimiters (<<'EOF')
+
+    def __repr__(self) -> str:
+        return f"Redirect({self.op!r}, {self.target!r})"
+
+
+class SimpleCommand:
+    """One simple command with its prefixes unwrapped."""
+
+    __slots__ = ("argv", "words", "env", "wrappers", "redirects", "nested", "context")
+
+    def __init__(
+        self,
+        argv: tuple[str, ...],
+        words: tuple[str, ...],
+        env: tuple[tuple[str, str], ...] = (),
+        wrappers: tuple[tuple[str, ...], ...] = (),
+        redirects: list[Redirect] | None = None,
+        nested: list[Script] | None = None,
+        context: tuple[str, ...] = (),
+    ) -> None:
+        self.argv = argv
+        self.words = words  # every word as written, dequoted, incl. env/wrappers
+        self.env = env
+        self.wrappers = wrappers  # e.g. ("timeout", "30"), outermost first
+        self.redirects = redirects if redirects is not None else []
+        self.nested = nested if nested is not None else []
+        self.context = context  # enclosing origins, outermost first
+
+    def __repr__(self) -> str:
+        return f"SimpleCommand({self.argv!r})"
+
+    @property
+    def name(self) -> str:
+        """Basename of the command that runs (``/usr/bin/git`` -> ``git``)."""
+        return self.argv[0].rsplit("/", 1)[-1] if self.argv else ""
+
+    @property
+    def args(self) -> tuple[str, ...]:
+        """Arguments after the command name."""
+        return self.argv[1:]
+
+
+class Group:
+    """A subshell ``( ... )`` or brace group ``{ ...; }`` used as a pipeline stage."""
+
+    __slots__ = ("kind", "script", "redirects")
+
+    def __init__(self, kind: str, script: Script) -> None:
+        self.kind = kind  # "subshell" or "group"
+        self.script = script
+        self.redirects: list[Redirect] = []
+
+
+class Pipeline:
+    """Stages joined by ``|``/``|&`` and the list operator that follows them."""
+
+    __slots__ = ("stages", "operator")
+
+    def __init__(self, stages: tuple[SimpleCommand | Group, ...]) -> None:
+        self.stages = stages
+        self.operator = ""  # "&&", "||", ";", "&", "\n" or "" at the end
+
+
+class Script:
+    """A parsed command list; nested scripts carry the construct they came from."""
+
+    def __init__(
+        self,
+        text: str,
+        pipelines: list[Pipeline],
+        origin: str = "",
+        complete: bool = True,
+    ) -> None:
+        self.text = text
+        self.pipelines = pipelines
+        # "", "-c", "eval", "$()", "``", "<()", "heredoc", "subshell" or "group"
+        self.origin = origin
+        self.complete = complete
+
+    def __repr__(self) -> str:
+        return f"Script({self.text!r}, origin={self.origin!r})"
+
+    @cached_property
+    def commands(self) -> tuple[SimpleCommand, ...]:
+        """Every simple command at any depth, in source order."""
+        return tuple(self._walk())
+
+    def _walk(self) -> Iterator[SimpleCommand]:
+        for pipeline in self.pipelines:
+            for stage in pipeline.stages:
+                if isinstance(stage, Group):
+                    yield from stage.script._walk()
+                    continue
+                yield stage
+                for nested in stage.nested:
+                    yield from nested._walk()
+
+    def find(self, name: str, *args: str) -> Iterator[SimpleCommand]:
+        """Yield commands named ``name`` whose arguments start with ``args``."""
+        for command in self.commands:
+            if command.name == name and command.args[: len(args)] == args:
+                yield command
+
+    @cached_property
+    def wrapped_payloads(self) -> tuple[str, ...]:
+        """Payload strings of every ``sh -c`` and ``eval`` at any depth."""
+        return tuple(
+            nested.text
+            for command in self.commands
+            for nested in command.nested
+            if nested.origin in ("-c", "eval")
+        )
+
+
+@lru_cache(maxsize=256)
+def parse_script(text: str) -> Script:
+    """Parse a Bash command string. Results are cached and must not be mutated."""
+    return _parse(text, "", (), 0)
+
+
+def _parse(text: str, origin: str, context: tuple[str, ...], depth: int) -> Script:
+    if depth > MAX_DEPTH:
+        return Script(text, [], origin, complete=False)
+    parser = _Parser(text, context, depth)
+    pipelines = parser.parse_list(None)
+    parser.finish()
+    return Script(text, pipelines, origin, parser.complete)
+
+
+class _Parser:
+    """Recursive-descent scanner over one source string."""
+
+    def __init__(self, text: str, context: tuple[str, ...], depth: int) -> None:
+        self.text = text
+        self.pos = 0
+        self.context = context
+        self.depth = depth
+        self.complete = True
+        self.pending_heredocs: list[Redirect] = []
+        self.commands: list[SimpleCommand] = []
+        self.word_nested: list[Script] = []
+
+    # -- structure -----------------------------------------------------------
+
+    def parse_list(self, terminator: str | None) -> list[Pipeline]:
+        """Parse pipelines until ``terminator`` (")" or "}") or end of text."""
+        text = self.text
+        pipelines: list[Pipeline] = []
+        while True:
+            self.skip_blanks()
+            if self.pos >= len(text):
+                if terminator is not None:
+                    self.complete = False
+                return pipelines
+            char = text[self.pos]
+            if char == "#":
+                self.skip_comment()
+                continue
+            if char == "\n":
+                self.pos += 1
+                self.read_heredoc_bodies()
+                self.set_operator(pipelines, "\n")
+                continue
+            if char == ")" or (char == "}" and terminator == "}" and self.at_word("}")):
+                self.pos += 1
+                if terminator is None:
+                    continue  # stray closer, e.g. a case pattern
+                if char == terminator:
+                    return pipelines
+                continue
+            for op in ("&&", "||", ";;", ";", "&"):
+                if text.startswith(op, self.pos) and not text.startswith(
+                    "&>", self.pos
+                ):
+                    self.pos += len(op)
+                    self.set_operator(pipelines, ";" if op == ";;" else op)
+                    break
+            else:
+                pipeline = self.parse_pipeline(terminator)
+                if pipeline is None:
+                    self.pos += 1  # unparseable character, skip it
+                else:
+                    pipelines.append(pipeline)
+
+    @staticmethod
+    def set_operator(pipelines: list[Pipeline], op: str) -> None:
+        if pipelines and not pipelines[-1].operator:
+            pipelines[-1].operator = op
+
+    def parse_pipeline(self, terminator: str | None) -> Pipeline | None:
+        text = self.text
+        stages: list[SimpleCommand | Group] = []
+        while True:
+            self.skip_blanks()
+            stage = self.parse_stage(terminator)
+            if stage is None:
+                break
+            stages.append(stage)
+            self.skip_blanks()
+            if text.startswith("||", self.pos) or not text.startswith("|", self.pos):
+                break
+            self.pos += 2 if text.startswith("|&", self.pos) else 1
+            while self.pos < len(text) and text[self.pos] in " \t\n":
+                self.pos += 1
+        return Pipeline(tuple(stages)) if stages else None
+
+    def parse_stage(self, terminator: str | None) -> SimpleCommand | Group | None:
+        text = self.text
+        if text.startswith("((", self.pos):
+            # Arithmetic command: not a command invocation, but substitutions in
+            # it run and are not parsed
+            end = text.find("))", self.pos)
+            end = len(text) if end == -1 else end + 2
+            if "$(" in text[self.pos : end] or "`" in text[self.pos : end]:
+                self.complete = False
+            self.pos = end
+            return self.parse_simple(terminator)
+        if text.startswith("(", self.pos):
+            self.pos += 1
+            return self.parse_group("subshell", ")")
+        if self.at_word("{"):
+            self.pos += 1
+            return self.parse_group("group", "}")
+        return self.parse_simple(terminator)
+
+    def parse_group(self, kind: str, closer: str) -> Group:
+        start = self.pos
+        if (
+            sum(origin in ("subshell", "group") for origin in self.context)
+            >= MAX_GROUP_DEPTH
+        ):
+            self.complete = False
+            self.pos = len(self.text)
+            return Group(kind, Script(self.text[start:], [], kind, complete=False))
+        inner = _Parser(self.text, (*self.context, kind), self.depth)
+        inner.pos = start
+        inner.pending_heredocs = self.pending_heredocs
+        inner.commands = self.commands
+        pipelines = inner.parse_list(closer)
+        self.pos = inner.pos
+        self.complete &= inner.complete
+        body = self.text[start : self.pos - 1] if inner.complete else self.text[start:]
+        group = Group(kind, Script(body, pipelines, kind, inner.complete))
+        while True:
+            self.skip_blanks()
+            redirect = self.read_redirect()
+            if redirect is None:
+                return group
+            group.redirects.append(redirect)
+
+    def parse_simple(self, terminator: str | None) -> SimpleCommand | None:
+        text = self.text
+        saved_nested, self.word_nested = self.word_nested, []
+        words: list[tuple[str, str]] = []
+        redirects: list[Redirect] = []
+        while True:
+            self.skip_blanks()
+            if self.pos >= len(text):
+                break
+            char = text[self.pos]
+            if char in "<>" and text.startswith("(", self.pos + 1):
+                words.append(self.read_process_substitution())
+                continue
+            redirect = self.read_redirect()
+            if redirect is not None:
+                redirects.append(redirect)
+                continue
+            if char == "#":
+                self.skip_comment()
+                break
+            if char in "\n;&|()":
+                break
+            if not words and terminator == "}" and self.at_word("}"):
+                break
+            word = self.read_word()
+            if word is None:
+                break
+            if not words and word[1] in _SKIP_WORDS:
+                continue
+            words.append(word)
+
+        nested, self.word_nested = self.word_nested, saved_nested
+        if not words and not redirects:
+            return None
+        command = self.build_command(words, redirects, nested)
+        self.commands.append(command)
+        return command
+
+    def build_command(
+        self,
+        words: list[tuple[str, str]],
+        redirects: list[Redirect],
+        nested: list[Script],
+    ) -> SimpleCommand:
+        values = [value for value, _raw in words]
+        env: list[tuple[str, str]] = []
+        i = 0
+        while i < len(words) and _ASSIGNMENT.match(words[i][1]):
+            name, _, value = values[i].partition("=")
+            env.append((name, value))
+            i += 1
+
+        argv = values[i:]
+        wrappers: list[tuple[str, ...]] = []
+        while argv:
+            unwrapped = _unwrap(argv)
+            if unwrapped is None:
+                break
+            wrapper, assignments, argv = unwrapped
+            wrappers.append(wrapper)
+            env.extend(assignments)
+
+        command = SimpleCommand(
+            argv=tuple(argv),
+            words=tuple(values),
+            env=tuple(env),
+            wrappers=tuple(wrappers),
+            redirects=redirects,
+            nested=nested,
+            context=self.context,
+        )
+        payload = _shell_payload(command)
+        if payload is not None:
+            origin, text = payload
+            self.add_nested(command, text, origin)
+        return command
+
+    def finish(self) -> None:
+        """Resolve heredocs once their bodies are known."""
+        if self.pending_heredocs:
+            self.complete = False
+            self.pending_heredocs.clear()
+        for command in self.commands:
+            for redirect in command.redirects:
+                if redirect.body is None or redirect.op == "<<<":
+                    continue
+                if redirect.expands:
+                    self.add_substitutions(command, redirect.body)
+            if command.name in SHELLS and _shell_script_arg(command) is None:
+                for redirect in command.redirects:
+                    if redirect.body is not None:
+                        self.add_nested(command, redirect.body, "heredoc")
+
+    def add_nested(self, command: SimpleCommand, text: str, origin: str) -> None:
+        script = _parse(text, origin, (*command.context, origin), self.depth + 1)
+        self.complete &= script.complete
+        command.nested.append(script)
+
+    def add_substitutions(self, command: SimpleCommand, body: str) -> None:
+        """Parse $(...) and `...` inside an expanding heredoc body."""
+        scanner = _Parser(body, command.context, self.depth)
+        saved, scanner.word_nested = scanner.word_nested, command.nested
+        while scanner.pos < len(body):
+            char = body[scanner.pos]
+            if char == "\\":
+                scanner.pos += 2
+            elif char == "$" or char == "`":
+                scanner.read_dollar_or_backtick([])
+            else:
+                scanner.pos += 1
+        scanner.word_nested = saved
+        self.complete &= scanner.complete
+
+    # -- lexing --------------------------------------------------------------
+
+    def skip_blanks(self) -> None:
+        text = self.text
+        while self.pos < len(text):
+            if text[self.pos] in _BLANKS:
+                self.pos += 1
+            elif text.startswith("\\\n", self.pos):
+                self.pos += 2
+            else:
+                return
+
+    def skip_comment(self) -> None:
+        end = self.text.find("\n", self.pos)
+        self.pos = len(self.text) if end == -1 else end
+
+    def at_word(self, word: str) -> bool:
+        """True if ``word`` stands alone at the current position."""
+        end = self.pos + len(word)
+        return self.text.startswith(word, self.pos) and (
+            end >= len(self.text) or self.text[end] in _WORD_END
+        )
+
+    def read_redirect(self) -> Redirect | None:
+        match = _REDIRECT.match(self.text, self.pos)
+        if match is None:
+            return None
+        op = match.group(0).lstrip("0123456789")
+        self.pos = match.end()
+        if (
+            op in (">&", "<&")
+            and self.pos < len(self.text)
+            and self.text[self.pos] == "-"
+        ):
+            self.pos += 1
+            return Redirect(op, "-")
+        self.skip_blanks()
+        word = self.read_word()
+        if word is None:
+            self.complete = False
+            return Redirect(op, "")
+        value, raw = word
+        if op in ("<<", "<<-"):
+            redirect = Redirect(op, value, expands=not any(c in raw for c in "'\"\\"))
+            self.pending_heredocs.append(redirect)
+            return redirect
+        if op == "<<<":
+            return Redirect(op, value, body=value)
+        return Redirect(op, value)
+
+    def read_heredoc_bodies(self) -> None:
+        text = self.text
+        for redirect in self.pending_heredocs:
+            strip_tabs = redirect.op == "<<-"
+            lines: list[str] = []
+            while True:
+                if self.pos >= len(text):
+                    self.complete = False
+                    break
+                end = text.find("\n", self.pos)
+                end = len(text) if end == -1 else end
+                line = text[self.pos : end]
+                self.pos = min(end + 1, len(text))
+                if (line.lstrip("\t") if strip_tabs else line) == redirect.target:
+                    break
+                lines.append(line)
+            redirect.body = "\n".join(lines)
+        self.pending_heredocs.clear()
+
+    def read_word(self) -> tuple[str, str] | None:
+        """Read one word; return (dequoted value, raw text) or None at a metachar."""
+        text = self.text
+        start = self.pos
+        out: list[str] = []
+        while self.pos < len(text):
+            char = text[self.pos]
+            if char in _WORD_END:
+                if char == "(" and out and text[start : self.pos].endswith("="):
+                    out.append(self.read_balanced("(", ")"))  # array assignment
+                    continue
+                break
+            if char == "\\":
+                if text.startswith("\\\n", self.pos):
+                    self.pos += 2
+                    continue
+                out.append(text[self.pos + 1 : self.pos + 2])
+                self.pos += 2
+            elif char == "'":
+                end = text.find("'", self.pos + 1)
+                if end == -1:
+                    self.complete = False
+                    end = len(text)
+                out.append(text[self.pos + 1 : end])
+                self.pos = end + 1
+            elif char == '"':
+                self.pos += 1
+                self.read_double_quoted(out)
+            elif char == "$" and text.startswith("$'", self.pos):
+                self.pos += 2
+                out.append(self.read_ansi_c())
+            elif char == "$" and text.startswith('$"', self.pos):
+                self.pos += 2
+                self.read_double_quoted(out)
+            elif char == "$" or char == "`":
+                self.read_dollar_or_backtick(out)
+            else:
+                out.append(char)
+                self.pos += 1
+        if self.pos == start:
+            return None
+        self.pos = min(self.pos, len(text))
+        return "".join(out), text[start : self.pos]
+
+    def read_double_quoted(self, out: list[str]) -> None:
+        text = self.text
+        while self.pos < len(text):
+            char = text[self.pos]
+            if char == '"':
+                self.pos += 1
+                return
+            if char == "\\" and self.pos + 1 < len(text):
+                following = text[self.pos + 1]
+                if following == "\n":
+                    pass
+                elif following in '$`"\\':
+                    out.append(following)
+                else:
+                    out.append("\\" + following)
+                self.pos += 2
+            elif char == "$" or char == "`":
+                self.read_dollar_or_backtick(out)
+            else:
+                out.append(char)
+                self.pos += 1
+        self.complete = False
+
+    def read_ansi_c(self) -> str:
+        text = self.text
+        out: list[str] = []
+        while self.pos < len(text):
+            char = text[self.pos]
+            if char == "'":
+                self.pos += 1
+                return "".join(out)
+            if char == "\\" and self.pos + 1 < len(text):
+                following = text[self.pos + 1]
+                hex_match = _NUMERIC_ESCAPE.match(text, self.pos + 1)
+                if following in _ANSI_ESCAPES:
+                    out.append(_ANSI_ESCAPES[following])
+                    self.pos += 2
+                elif hex_match:
+                    digits = hex_match.group(1) or hex_match.group(2)
+                    out.append(chr(int(digits, 16 if hex_match.group(1) else 8)))
+                    self.pos = hex_match.end()
+                else:
+                    out.append("\\" + following)
+                    self.pos += 2
+            else:
+                out.append(char)
+                self.pos += 1
+        self.complete = False
+        return "".join(out)
+
+    def read_dollar_or_backtick(self, out: list[str]) -> None:
+        """Read $(...), $((...)), ${...}, `...` or a plain $, keeping the raw text."""
+        text = self.text
+        start = self.pos
+        if text.startswith("$((", self.pos):
+            self.pos += 1
+            out.append("$" + self.read_balanced("(", ")"))
+        elif text.startswith("$(", self.pos):
+            self.pos += 2
+            script_start = self.pos
+            if self.depth + 1 > MAX_DEPTH:
+                self.complete = False
+                out.append(text[start:])
+                self.pos = len(text)
+                return
+            inner = _Parser(text, (*self.context, "$()"), self.depth + 1)
+            inner.pos = self.pos
+            pipelines = inner.parse_list(")")
+            inner.finish()
+            self.pos = inner.pos
+            self.complete &= inner.complete
+            end = self.pos - 1 if inner.complete else self.pos
+            self.word_nested.append(
+                Script(text[script_start:end], pipelines, "$()", inner.complete)
+            )
+            out.append(text[start : self.pos])
+        elif text.startswith("${", self.pos):
+            self.pos += 1
+            out.append("$" + self.read_balanced("{", "}"))
+        elif text.startswith("`", self.pos):
+            end = self.pos + 1
+            while end < len(text) and text[end] != "`":
+                end += 2 if text[end] == "\\" else 1
+            if end >= len(text):
+                self.complete = False
+                end = len(text)
+            body = _BACKTICK_ESCAPE.sub(r"\1", text[self.pos + 1 : end])
+            self.pos = min(end + 1, len(text))
+            script = _parse(body, "``", (*self.context, "``"), self.depth + 1)
+            self.complete &= script.complete
+            self.word_nested.append(script)
+            out.append(text[start : self.pos])
+        else:
+            out.append("$")
+            self.pos += 1
+
+    def read_process_substitution(self) -> tuple[str, str]:
+        start = self.pos
+        self.pos += 2
+        inner = _Parser(self.text, (*self.context, "<()"), self.depth + 1)
+        inner.pos = self.pos
+        pipelines = inner.parse_list(")")
+        inner.finish()
+        self.pos = inner.pos
+        self.complete &= inner.complete
+        end = self.pos - 1 if inner.complete else self.pos
+        self.word_nested.append(
+            Script(self.text[start + 2 : end], pipelines, "<()", inner.complete)
+        )
+        raw = self.text[start : self.pos]
+        return raw, raw
+
+    def read_balanced(self, opener: str, closer: str) -> str:
+        """Consume from an opener to its matching closer and return the raw text."""
+        text = self.text
+        start = self.pos
+        depth = 0
+        while self.pos < len(text):
+            char = text[self.pos]
+            if char == "\\":
+                self.pos += 2
+                continue
+            if char == opener:
+                depth += 1
+            elif char == closer:
+                depth -= 1
+                if depth == 0:
+                    self.pos += 1
+                    return text[start : self.pos]
+            self.pos += 1
+        self.complete = False
+        self.pos = len(text)
+        return text[start:]
+
+
+def _unwrap(
+    argv: list[str],
+) -> tuple[tuple[str, ...], list[tuple[str, str]], list[str]] | None:
+    """Strip one wrapper command; return (wrapper words, env assignments, rest)."""
+    name = argv[0].rsplit("/", 1)[-1]
+    spec = _WRAPPERS.get(name)
+    if spec is None:
+        return None
+    options_with_arg, positional = spec
+    assignments: list[tuple[str, str]] = []
+    i = 1
+    while i < len(argv):
+        arg = argv[i]
+        if arg == "--":
+            i += 1
+            break
+        if not arg.startswith("-") or arg == "-":
+            break
+        if name == "env" and arg in ("-S", "--split-string") and i + 1 < len(argv):
+            # env -S "cmd args": the string is split into the command line
+            argv = argv[:i] + argv[i + 1].split() + argv[i + 2 :]
+            continue
+        option = arg.split("=", 1)[0]
+        i += 2 if option in options_with_arg and "=" not in arg else 1
+    if name == "env":
+        while i < len(argv) and _ASSIGNMENT.match(argv[i]):
+            key, _, value = argv[i].partition("=")
+            assignments.append((key, value))
+            i += 1
+    i += positional
+    if i >= len(argv):
+        return None  # nothing wrapped, e.g. bare `env`
+    return tuple(argv[:i]), assignments, argv[i:]
+
+
+def _shell_options_end(command: SimpleCommand) -> tuple[int, bool]:
+    """Return (index of first operand, whether -c was given) for a shell command."""
+    argv = command.argv
+    has_c = False
+    i = 1
+    while i < len(argv):
+        arg = argv[i]
+        if arg == "--":
+            return i + 1, has_c
+        if arg in ("-o", "+o", "-O", "+O", "--rcfile", "--init-file"):
+            i += 2
+            continue
+        if not arg.startswith(("-", "+")) or arg in ("-", "+"):
+            break
+        if arg.startswith("-") and not arg.startswith("--") and "c" in arg[1:]:
+            has_c = True
+        i += 1
+    return i, has_c
+
+
+def _shell_script_arg(command: SimpleCommand) -> str | None:
+    """Return the -c payload or script file operand of a shell, if any."""
+    index, _has_c = _shell_options_end(command)
+    return command.argv[index] if index < len(command.argv) else None
+
+
+def _shell_payload(command: SimpleCommand) -> tuple[str, str] | None:
+    """Return (origin, text) for commands that run a string as shell code."""
+    if command.name in SHELLS:
+        index, has_c = _shell_options_end(command)
+        if has_c and index < len(command.argv):
+            return "-c", command.argv[index]
+        return None
+    if command.name == "eval" and len(command.argv) > 1:
+        return "eval", " ".join(command.argv[1:])
+    return None
@@ -0,0 +1,271 @@
+"""Optional JSONL trace of guard hook latency and decisions.
+
+Set ``GUARDS_TELEMETRY=1`` to append one record per hook process to
+``telemetry.jsonl`` in the per-user runtime directory, or set it to a file
+path to write there instead. Each record holds:
+
+- ``hook``: the script path relative to plugins/guards
+- ``event``, ``tool``, ``session`` and ``input_bytes`` from the payload
+- ``startup_ms``: imports and pattern compilation, i.e. everything before the
+  verdict that is neither ``parse_ms`` nor ``match_ms``
+- ``parse_ms``: reading and decoding the payload, plus the shared shell parse
+  when the hook's ``check()`` takes one
+- ``match_ms``: the hook's ``check()`` call; for hooks without one, everything
+  after the payload was found relevant
+- ``total_ms``, the ``verdict`` (``skip``, ``allow``, ``block`` or ``done``
+  for hooks that only give feedback) and ``pattern``, the last pattern-table
+  entry that matched: the rule id for policy tables, else the pattern source
+
+The file is rotated to ``.1``..``.3`` once it reaches
+``GUARDS_TELEMETRY_MAX_BYTES`` (default 5 MB). Records are written with a
+single ``O_APPEND`` write so concurrent hooks do not interleave lines, and any
+OSError drops the record: telemetry never changes a verdict.
+
+Hooks only import this module when telemetry is enabled.
+:func:`load_records` and :func:`summarize` back ``guard_telemetry.py``.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+
+from .runtime import GUARDS_ROOT, runtime_dir
+
+ENV_VAR = "GUARDS_TELEMETRY"
+
+DEFAULT_MAX_BYTES = 5 * 1024 * 1024
+
+# Rotated files kept next to the live one (telemetry.jsonl.1 is the newest)
+BACKUPS = 3
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+    from typing import Any
+
+
+def telemetry_path() -> str | None:
+    """Return the trace file configured by ``GUARDS_TELEMETRY``, or None if disabled."""
+    setting = os.environ.get(ENV_VAR, "")
+    if setting in ("", "0"):
+        return None
+    if setting == "1":
+        return os.path.join(runtime_dir(), "telemetry.jsonl")
+    return setting
+
+
+def max_bytes() -> int:
+    try:
+        return int(os.environ.get("GUARDS_TELEMETRY_MAX_BYTES", DEFAULT_MAX_BYTES))
+    except ValueError:
+        return DEFAULT_MAX_BYTES
+
+
+def rotate(path: str, limit: int, backups: int = BACKUPS) -> None:
+    """Shift ``path`` to ``path.1`` (and older files up) once it reaches ``limit`` bytes."""
+    try:
+        if os.stat(path).st_size < limit:
+            return
+    except OSError:
+        return
+    for i in range(backups - 1, 0, -1):
+        try:
+            os.replace(f"{path}.{i}", f"{path}.{i + 1}")
+        except OSError:
+            pass
+    try:
+        os.replace(path, f"{path}.1")
+    except OSError:
+        pass  # Another hook rotated it first
+
+
+def append_record(path: str, record: dict) -> None:
+    """Append one JSON line to ``path``, rotating it first if it is full."""
+    rotate(path, max_bytes())
+    line = (json.dumps(record, separators=(",", ":")) + "\n").encode()
+    try:
+        fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+        try:
+            os.write(fd, line)
+        finally:
+            os.close(fd)
+    except OSError:
+        pass
+
+
+class Trace:
+    """Timings and decision of the current hook process."""
+
+    __slots__ = ("path", "hook", "started", "record", "parse", "match", "match_started")
+
+    def __init__(self, path: str, script: str, started: float) -> None:
+        self.path = path
+        self.hook = os.path.relpath(os.path.realpath(script), GUARDS_ROOT)
+        self.started = started
+        self.record: dict[str, Any] = {}
+        self.parse = 0.0
+        self.match = 0.0
+        self.match_started: float | None = None
+
+    def payload(self, raw: str, data: dict | None) -> None:
+        data = data or {}
+        self.record.update(
+            event=data.get("hook_event_name"),
+            tool=data.get("tool_name"),
+            session=data.get("session_id"),
+            input_bytes=len(raw.encode()),
+        )
+
+    def finish(self, verdict: str) -> None:
+        """Write the record; only the first call per process counts."""
+        if "verdict" in self.record:
+            return
+        now = time.perf_counter()
+        if self.match_started is not None:
+            # The hook ran without a check(): its own work is the match time
+            self.match = now - self.match_started
+        total = now - self.started
+        self.record.update(
+            ts=round(time.time(), 3),
+            hook=self.hook,
+            startup_ms=round((total - self.parse - self.match) * 1000, 3),
+            parse_ms=round(self.parse * 1000, 3),
+            match_ms=round(self.match * 1000, 3),
+            total_ms=round(total * 1000, 3),
+            verdict=verdict,
+            pattern=self.record.get("pattern"),
+        )
+        append_record(self.path, self.record)
+
+
+_TRACE: Trace | None = None
+
+
+def start(script: str, started: float) -> Trace | None:
+    """Start tracing this process if telemetry is enabled."""
+    global _TRACE
+    try:
+        path = telemetry_path()
+    except OSError:
+        return None
+    if path is not None:
+        _TRACE = Trace(path, script, started)
+    return _TRACE
+
+
+def fired(rule: str) -> None:
+    """Record that a pattern-table entry matched (no-op unless tracing)."""
+    if _TRACE is not None:
+        _TRACE.record["pattern"] = rule
+
+
+def load_records(paths: Iterable[str], session: str | None = None) -> Iterator[dict]:
+    """Yield records from trace files, skipping torn or foreign lines."""
+    for path in paths:
+        try:
+            with open(path) as f:
+                lines = f.readlines()
+        except OSError:
+            continue
+        for line in lines:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if not isinstance(record, dict) or "hook" not in record:
+                continue
+            if session is None or record.get("session") == session:
+                yield record
+
+
+def trace_files(path: str, backups: int = BACKUPS) -> list[str]:
+    """Return a trace file and its rotated backups, oldest first."""
+    return [f"{path}.{i}" for i in range(backups, 0, -1)] + [path]
+
+
+def summarize(records: Iterable[dict], top: int = 10) -> dict[str, Any]:
+    """Aggregate records into slowest hooks, hottest patterns and verdict counts."""
+    from .bench import percentiles
+
+    totals: dict[str, list[float]] = {}
+    phases: dict[str, dict[str, float]] = {}
+    verdicts: dict[str, dict[str, int]] = {}
+    patterns: dict[str, dict[str, Any]] = {}
+    count = 0
+    for record in records:
+        count += 1
+        hook = record["hook"]
+        verdict = record.get("verdict", "unknown")
+        totals.setdefault(hook, []).append(record.get("total_ms", 0.0))
+        sums = phases.setdefault(
+            hook, {"startup_ms": 0.0, "parse_ms": 0.0, "match_ms": 0.0}
+        )
+        for phase in sums:
+            sums[phase] += record.get(phase, 0.0)
+        by_verdict = verdicts.setdefault(hook, {})
+        by_verdict[verdict] = by_verdict.get(verdict, 0) + 1
+        if record.get("pattern"):
+            entry = patterns.setdefault(
+                record["pattern"],
+                {"pattern": record["pattern"], "hooks": [], "fired": 0},
+            )
+            entry["fired"] += 1
+            entry.setdefault(verdict, 0)
+            entry[verdict] += 1
+            if hook not in entry["hooks"]:
+                entry["hooks"].append(hook)
+
+    hooks = []
+    for hook, samples in totals.items():
+        stats = percentiles(samples)
+        stats["total"] = round(sum(samples), 3)
+        for phase, value in phases[hook].items():
+            stats[f"mean_{phase}"] = round(value / len(samples), 3)
+        hooks.append({"hook": hook, **stats, "verdicts": verdicts[hook]})
+    hooks.sort(key=lambda entry: entry["total"], reverse=True)
+
+    overall: dict[str, int] = {}
+    for by_verdict in verdicts.values():
+        for verdict, n in by_verdict.items():
+            overall[verdict] = overall.get(verdict, 0) + n
+
+    return {
+        "records": count,
+        "verdicts": dict(sorted(overall.items(), key=lambda item: -item[1])),
+        "slowest_hooks": hooks[:top],
+        "hottest_patterns": sorted(
+            patterns.values(), key=lambda entry: -entry["fired"]
+        )[:top],
+    }
+
+
+def format_summary(summary: dict[str, Any]) -> str:
+    """Render a summary as fixed-width tables for terminals."""
+    lines = [f"{summary['records']} records"]
+    lines.append(
+        "verdicts: "
+        + ", ".join(f"{verdict} {n}" for verdict, n in summary["verdicts"].items())
+    )
+    lines.append("")
+    header = (
+        f"{'hook':<58} {'n':>5} {'total':>9} {'p50':>7} {'p95':>7} {'max':>7} "
+        f"{'startup':>8} {'parse':>6} {'match':>6}"
+    )
+    lines.append(header)
+    lines.append("-" * len(header))
+    for entry in summary["slowest_hooks"]:
+        lines.append(
+            f"{entry['hook']:<58} {entry['n']:>5} {entry['total']:>9.1f} {entry['p50']:>7.2f} "
+            f"{entry['p95']:>7.2f} {entry['max']:>7.2f} {entry['mean_startup_ms']:>8.2f} "
+            f"{entry['mean_parse_ms']:>6.2f} {entry['mean_match_ms']:>6.2f}"
+        )
+    if summary["hottest_patterns"]:
+        lines.append("")
+        lines.append(f"{'fired':>5} {'block':>5}  pattern")
+        for entry in summary["hottest_patterns"]:
+            lines.append(
+                f"{entry['fired']:>5} {entry.get('block', 0):>5}  {entry['pattern']}"
+            )
+    return "\n".join(lines)
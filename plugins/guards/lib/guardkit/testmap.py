@@ -0,0 +1,310 @@
+"""Persistent index from source modules to their test files.
+
+The test-reminder hook used to probe three fixed paths for
+``test_<module>.py``, missing ``testpaths``, ``tests/unit/...`` mirrors and
+``*_test.py`` naming. This index is built by one scan of the project (the
+nearest directory with a ``pyproject.toml``) that follows its pytest settings
+from ``[tool.pytest.ini_options]``:
+
+- ``testpaths``: only these directories are scanned (default: the project)
+- ``python_files``: test file globs (default ``test_*.py *_test.py``); the
+  part matched by ``*`` is the module name the test belongs to
+- ``norecursedirs``: directory globs that are not scanned, plus any
+  virtualenv (a directory holding ``pyvenv.cfg``)
+
+Test files are indexed by module name, so a lookup is one dict access. A test
+matches a source file when its directories, minus ``tests``/``test``/``unit``
+style folders, appear in order among the source file's directories (``src``
+and ``lib`` are ignored on both sides): ``tests/unit/pkg/test_mod.py``
+matches ``src/pkg/mod.py`` and ``pkg/sub/mod.py``, but not ``other/mod.py``.
+
+The index is saved as JSON under ``test-index/`` in the runtime directory
+together with the mtime of every scanned directory. Creating, deleting or
+renaming a file changes its directory's mtime, so when a lookup finds no test
+only the directories whose mtime changed are rescanned. A change to
+``pyproject.toml`` rebuilds the index.
+"""
+
+from __future__ import annotations
+
+import fnmatch
+import hashlib
+import json
+import os
+import re
+from typing import NamedTuple
+
+from .runtime import runtime_dir
+
+INDEX_VERSION = 1
+
+# pytest's defaults
+DEFAULT_PYTHON_FILES = ("test_*.py", "*_test.py")
+DEFAULT_NORECURSEDIRS = (
+    "*.egg", ".*", "_darcs", "build", "CVS", "dist", "node_modules", "venv", "{arch}"
+)  # fmt: skip
+
+# Folders that group tests without mirroring the source package layout
+TEST_FOLDERS = frozenset({"tests", "test", "unit", "integration", "functional", "e2e"})
+# Folders that hold packages without being part of their import path
+SOURCE_FOLDERS = frozenset({"src", "lib"})
+
+
+class PytestSettings(NamedTuple):
+    testpaths: tuple[str, ...]
+    python_files: tuple[str, ...]
+    norecursedirs: tuple[str, ...]
+
+
+def find_project_root(path: str) -> str | None:
+    """Return the nearest directory above ``path`` with a ``pyproject.toml``."""
+    directory = os.path.dirname(os.path.abspath(path))
+    while True:
+        if os.path.isfile(os.path.join(directory, "pyproject.toml")):
+            return directory
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            return None
+        directory = parent
+
+
+def _as_tuple(value, default: tuple[str, ...]) -> tuple[str, ...]:
+    # ini options accept a whitespace-separated string or a list
+    if isinstance(value, str):
+        return tuple(value.split())
+    if isinstance(value, list) and all(isinstance(item, str) for item in value):
+        return tuple(value)
+    return default
+
+
+def read_settings(root: str) -> PytestSettings:
+    """Read the pytest options of ``root/pyproject.toml``, with pytest's defaults."""
+    import tomllib
+
+    try:
+        with open(os.path.join(root, "pyproject.toml"), "rb") as f:
+            options = (
+                tomllib.load(f).get("tool", {}).get("pytest", {}).get("ini_options", {})
+            )
+    except (OSError, tomllib.TOMLDecodeError, AttributeError):
+        options = {}
+    if not isinstance(options, dict):
+        options = {}
+    return PytestSettings(
+        testpaths=_as_tuple(options.get("testpaths"), ()),
+        python_files=_as_tuple(options.get("python_files"), DEFAULT_PYTHON_FILES),
+        norecursedirs=_as_tuple(options.get("norecursedirs"), DEFAULT_NORECURSEDIRS),
+    )
+
+
+def module_pattern(python_files: tuple[str, ...]) -> re.Pattern[str]:
+    """Compile the test file globs into one regex capturing the module name."""
+    alternatives = []
+    for glob in python_files:
+        if "*" not in glob:
+            continue  # e.g. "check.py" names no module
+        head, _, tail = glob.partition("*")
+        tail = fnmatch.translate(tail).removeprefix("(?s:").removesuffix(")\\Z")
+        alternatives.append(f"{re.escape(head)}(?P<m{len(alternatives)}>.+?){tail}")
+    if not alternatives:
+        return re.compile(r"(?!)")
+    return re.compile("|".join(f"(?:{alternative})" for alternative in alternatives))
+
+
+def _module_of(pattern: re.Pattern[str], filename: str) -> str | None:
+    match = pattern.fullmatch(filename)
+    if match is None:
+        return None
+    return next(name for name in match.groups() if name is not None)
+
+
+def _config_fingerprint(root: str) -> list[int]:
+    try:
+        stat = os.stat(os.path.join(root, "pyproject.toml"))
+    except OSError:
+        return [0, 0]
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def index_path(root: str) -> str:
+    digest = hashlib.sha256(root.encode()).hexdigest()[:16]
+    return os.path.join(runtime_dir(), "test-index", f"{digest}.json")
+
+
+def _package_dirs(relpath: str, skip: frozenset[str] = frozenset()) -> list[str]:
+    parts = relpath.split("/")[:-1]
+    return [part for part in parts if part not in skip and part not in SOURCE_FOLDERS]
+
+
+def _mirrors(test_dirs: list[str], source_dirs: list[str]) -> bool:
+    # test_dirs appears in order within source_dirs
+    remaining = iter(source_dirs)
+    return all(part in remaining for part in test_dirs)
+
+
+class ModuleTestIndex:
+    """Test files of one project, keyed by the module name they test."""
+
+    def __init__(self, root: str, settings: PytestSettings) -> None:
+        self.root = root
+        self.settings = settings
+        self._pattern = module_pattern(settings.python_files)
+        # Relative directory -> its mtime_ns / the test files directly inside it
+        self.dirs: dict[str, int] = {}
+        self.tests: dict[str, list[str]] = {}
+        # Module name -> relative paths of its test files
+        self.modules: dict[str, list[str]] = {}
+        self.config = _config_fingerprint(root)
+
+    @classmethod
+    def build(cls, root: str) -> ModuleTestIndex:
+        index = cls(root, read_settings(root))
+        for testpath in index.settings.testpaths or (".",):
+            index._scan(os.path.normpath(testpath))
+        index._rebuild_modules()
+        return index
+
+    @classmethod
+    def load(cls, root: str) -> ModuleTestIndex:
+        """Load the saved index of ``root``, or build it if missing or stale."""
+        try:
+            with open(index_path(root), encoding="utf-8") as f:
+                data = json.load(f)
+            if data["version"] != INDEX_VERSION or data["root"] != root:
+                raise ValueError("Index of another version or project")
+            if data["config"] != _config_fingerprint(root):
+                raise ValueError("pyproject.toml changed")
+            index = cls(root, PytestSettings(*map(tuple, data["settings"])))
+            index.dirs = data["dirs"]
+            index.tests = data["tests"]
+            index.modules = data["modules"]
+        except (OSError, ValueError, KeyError, TypeError):
+            index = cls.build(root)
+            index.save()
+        return index
+
+    def save(self) -> None:
+        data = {
+            "version": INDEX_VERSION,
+            "root": self.root,
+            "config": self.config,
+            "settings": list(self.settings),
+            "dirs": self.dirs,
+            "tests": self.tests,
+            "modules": self.modules,
+        }
+        try:
+            path = index_path(self.root)
+            os.makedirs(os.path.dirname(path), mode=0o700, exist_ok=True)
+            temporary = f"{path}.{os.getpid()}.tmp"
+            with open(temporary, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(temporary, path)
+        except OSError:
+            pass  # The next run scans again
+
+    def _excluded(self, name: str) -> bool:
+        return any(fnmatch.fnmatch(name, glob) for glob in self.settings.norecursedirs)
+
+    def _forget(self, reldir: str) -> None:
+        prefix = "" if reldir == "." else reldir + "/"
+        for known in [d for d in self.dirs if d == reldir or d.startswith(prefix)]:
+            del self.dirs[known]
+            self.tests.pop(known, None)
+
+    def _scan(self, reldir: str) -> None:
+        """Record the tests in ``reldir``, and scan subdirectories not seen before.
+
+        Known subdirectories keep their entries; they are checked on their
+        own mtime.
+        """
+        pending = [reldir]
+        while pending:
+            current = pending.pop()
+            absolute = os.path.join(self.root, current)
+            try:
+                mtime = os.stat(absolute).st_mtime_ns
+                entries = list(os.scandir(absolute))
+            except OSError:
+                self._forget(current)
+                continue
+            if any(entry.name == "pyvenv.cfg" for entry in entries):
+                self._forget(current)
+                continue
+            self.dirs[current] = mtime
+            tests = []
+            for entry in entries:
+                try:
+                    is_dir = entry.is_dir(follow_symlinks=False)
+                except OSError:
+                    continue
+                if is_dir:
+                    child = os.path.normpath(os.path.join(current, entry.name))
+                    if child not in self.dirs and not self._excluded(entry.name):
+                        pending.append(child)
+                elif _module_of(self._pattern, entry.name) is not None:
+                    tests.append(entry.name)
+            if tests:
+                self.tests[current] = sorted(tests)
+            else:
+                self.tests.pop(current, None)
+
+    def _rebuild_modules(self) -> None:
+        self.modules = {}
+        for reldir, names in sorted(self.tests.items()):
+            for name in names:
+                relpath = name if reldir == "." else f"{reldir}/{name}"
+                module = _module_of(self._pattern, name)
+                if module is not None:
+                    self.modules.setdefault(module, []).append(relpath)
+
+    def refresh(self) -> bool:
+        """Rescan directories whose mtime changed; True if any did."""
+        changed = []
+        for reldir, mtime in self.dirs.items():
+            try:
+                current = os.stat(os.path.join(self.root, reldir)).st_mtime_ns
+            except OSError:
+                current = None
+            if current != mtime:
+                changed.append(reldir)
+        # Parents first: a removed directory takes its subdirectories with it
+        for reldir in sorted(changed, key=len):
+            if reldir in self.dirs:
+                self._scan(reldir)
+        if changed:
+            self._rebuild_modules()
+        return bool(changed)
+
+    def lookup(self, source: str) -> list[str]:
+        """Return the indexed tests (absolute paths) matching ``source``."""
+        relpath = os.path.relpath(os.path.abspath(source), self.root).replace(
+            os.sep, "/"
+        )
+        module = os.path.basename(relpath).removesuffix(".py")
+        source_dir = os.path.dirname(relpath)
+        source_dirs = _package_dirs(relpath)
+        return [
+            os.path.join(self.root, test)
+            for test in self.modules.get(module, ())
+            if os.path.dirname(test) == source_dir
+            or _mirrors(_package_dirs(test, TEST_FOLDERS), source_dirs)
+        ]
+
+    def tests_for(self, source: str) -> list[str]:
+        """Return the tests of ``source``; rescan changed directories if none is found."""
+        found = [path for path in self.lookup(source) if os.path.exists(path)]
+        if found:
+            return found
+        if self.refresh():
+            self.save()
+            found = self.lookup(source)
+        return found
+
+
+def find_tests(source: str) -> list[str] | None:
+    """Return the test files of ``source``, or None outside a pyproject.toml project."""
+    root = find_project_root(source)
+    if root is None:
+        return None
+    return ModuleTestIndex.load(root).tests_for(source)
@@ -0,0 +1,230 @@
+"""Shared on-disk cache of guard verdicts.
+
+Agents re-issue the same commands many times per session (``git status``,
+``uv run pytest -q``), and each call would otherwise load and run every guard
+again. :class:`VerdictCache` stores the verdict of a guard set in a SQLite
+database in the per-user runtime directory, keyed by a hash of:
+
+- the tool name and tool input (minus free-text fields no guard reads)
+- the working directory, and the identity of every existing path the call
+  names: its ``realpath`` and the device, inode and mtime of the path and its
+  target. Guards such as protect-env resolve symlinks, so ``cat config.txt``
+  is allowed until ``config.txt`` becomes a link to ``.env``; replacing the
+  link changes the key instead of replaying the old allow
+- a policy fingerprint: path, size and mtime of every guard script plus the
+  guardkit library and ``CACHE_VERSION``, so editing any pattern list
+  invalidates old verdicts without bookkeeping
+
+The database runs in WAL mode with a short busy timeout, so parallel hook
+processes can read and write it concurrently. Least-recently-used entries are
+evicted once the table grows past ``max_entries``. Any SQLite error is treated
+as a cache miss: the cache can make a guard skip work, never skip a check.
+
+Set ``GUARDS_VERDICT_CACHE=0`` to disable the cache, or to a file path to use
+a different database.
+"""
+
+from __future__ import annotations
+
+import glob
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from collections.abc import Iterable
+
+from .command import BashCommand
+from .envfiles import path_words
+from .runtime import LIB_DIR, runtime_dir
+
+# Bump when the key or verdict format changes
+CACHE_VERSION = 2
+
+DEFAULT_MAX_ENTRIES = 10_000
+
+# Tool input fields that no guard reads (Bash "description" is free text)
+IGNORED_INPUT_KEYS = frozenset({"description"})
+
+# Tool input fields that hold a path (Read, Edit, Write, Grep, NotebookEdit)
+PATH_INPUT_KEYS = ("file_path", "path", "notebook_path")
+
+# Rows are evicted when a new row id is a multiple of this
+_EVICT_EVERY = 64
+
+# Refresh a row's last-used time at most this often (seconds), so hits on hot
+# commands do not all turn into writes
+_TOUCH_INTERVAL = 60.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS verdicts (
+    key TEXT PRIMARY KEY,
+    reason TEXT,
+    used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS verdicts_used ON verdicts (used);
+"""
+
+
+def policy_fingerprint(paths: Iterable[str]) -> str:
+    """Fingerprint guard scripts and the guardkit library by path, size and mtime."""
+    digest = hashlib.sha256(f"v{CACHE_VERSION}".encode())
+    library = sorted(glob.glob(os.path.join(LIB_DIR, "guardkit", "*.py")))
+    for path in [*paths, *library]:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            digest.update(f"{path}:missing\0".encode())
+            continue
+        digest.update(f"{path}:{stat.st_size}:{stat.st_mtime_ns}\0".encode())
+    return digest.hexdigest()
+
+
+def named_paths(
+    tool_name: str, tool_input: dict, parsed: BashCommand | None = None
+) -> list[str]:
+    """Return every word of a tool call that may name a file, in order, without repeats.
+
+    For Bash these are the words of the raw text split at shell syntax, plus
+    every dequoted word and redirect target of the parsed command, so a quoted
+    path with spaces is included as a whole.
+    """
+    if tool_name != "Bash":
+        return [
+            value
+            for key in PATH_INPUT_KEYS
+            if isinstance(value := tool_input.get(key), str) and value
+        ]
+    command = tool_input.get("command", "")
+    if not isinstance(command, str):
+        return []
+    words = path_words(command)
+    for simple in (parsed or BashCommand(command)).script.commands:
+        words += simple.words
+        words += [redirect.target for redirect in simple.redirects]
+    return list(dict.fromkeys(words))
+
+
+def path_states(paths: Iterable[str], cwd: str) -> list[list]:
+    """Return the identity of each path in ``paths`` that exists, relative to ``cwd``.
+
+    A path's identity is its ``realpath`` and the device, inode and mtime of
+    the path itself (``lstat``) and of what it resolves to (``stat``); a
+    dangling link has only the former.
+    """
+    states = []
+    for path in paths:
+        try:
+            absolute = os.path.join(cwd, os.path.expanduser(path))
+            link = os.lstat(absolute)
+        except (OSError, ValueError):
+            continue  # Missing: no guard can resolve it either
+        state = [
+            path,
+            os.path.realpath(absolute),
+            link.st_dev,
+            link.st_ino,
+            link.st_mtime_ns,
+        ]
+        try:
+            target = os.stat(absolute)
+            state += [target.st_dev, target.st_ino, target.st_mtime_ns]
+        except OSError:
+            pass  # Dangling link
+        states.append(state)
+    return states
+
+
+def verdict_key(
+    fingerprint: str,
+    tool_name: str,
+    tool_input: dict,
+    cwd: str | None = None,
+    parsed: BashCommand | None = None,
+) -> str:
+    """Return the cache key for one tool call under one policy fingerprint.
+
+    Relative paths are resolved against ``cwd``, by default the current
+    directory.
+    """
+    cwd = cwd or os.getcwd()
+    relevant = {k: v for k, v in tool_input.items() if k not in IGNORED_INPUT_KEYS}
+    states = path_states(named_paths(tool_name, tool_input, parsed), cwd)
+    payload = json.dumps(
+        [fingerprint, tool_name, relevant, cwd, states],
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class VerdictCache:
+    """Bounded LRU map from verdict keys to block reasons (None means allow)."""
+
+    def __init__(self, path: str, max_entries: int = DEFAULT_MAX_ENTRIES) -> None:
+        self.path = path
+        self.max_entries = max_entries
+        self._db = sqlite3.connect(path, timeout=0.2, isolation_level=None)
+        try:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.executescript(_SCHEMA)
+        except sqlite3.Error:
+            self._db.close()
+            raise
+
+    def lookup(self, key: str) -> tuple[bool, str | None]:
+        """Return ``(hit, reason)``; errors and misses return ``(False, None)``."""
+        try:
+            row = self._db.execute(
+                "SELECT reason, used FROM verdicts WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return False, None
+            now = time.time()
+            if now - row[1] > _TOUCH_INTERVAL:
+                self._db.execute(
+                    "UPDATE verdicts SET used = ? WHERE key = ?", (now, key)
+                )
+        except sqlite3.Error:
+            return False, None
+        return True, row[0]
+
+    def store(self, key: str, reason: str | None) -> None:
+        """Record a verdict, evicting least-recently-used rows when over capacity."""
+        try:
+            cursor = self._db.execute(
+                "INSERT OR REPLACE INTO verdicts (key, reason, used) VALUES (?, ?, ?)",
+                (key, reason, time.time()),
+            )
+            if cursor.lastrowid and cursor.lastrowid % _EVICT_EVERY == 0:
+                self.evict()
+        except sqlite3.Error:
+            pass  # A lost write only costs a re-evaluation
+
+    def evict(self) -> None:
+        """Delete the least-recently-used rows beyond ``max_entries``."""
+        self._db.execute(
+            "DELETE FROM verdicts WHERE key IN "
+            "(SELECT key FROM verdicts ORDER BY used DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+
+    def __len__(self) -> int:
+        return self._db.execute("SELECT count(*) FROM verdicts").fetchone()[0]
+
+    def close(self) -> None:
+        self._db.close()
+
+
+def open_verdict_cache() -> VerdictCache | None:
+    """Open the cache configured by ``GUARDS_VERDICT_CACHE``, or None if disabled."""
+    setting = os.environ.get("GUARDS_VERDICT_CACHE", "")
+    if setting == "0":
+        return None
+    try:
+        path = setting or os.path.join(runtime_dir(), "verdicts.sqlite3")
+        return VerdictCache(path)
+    except (OSError, sqlite3.Error):
+        return None
@@ -0,0 +1,15 @@
+#!/usr/bin/env python3
+"""Pyright server: keeps a pyright language server alive per project.
+
+Started on demand by the python-typecheck hook and exits on its own after
+PYRIGHTD_IDLE_TIMEOUT seconds (default 900) without requests.
+"""
+
+import os
+import sys
+
+from guardkit.pyright import DEFAULT_IDLE_TIMEOUT, run
+
+if __name__ == "__main__":
+    idle_timeout = float(os.environ.get("PYRIGHTD_IDLE_TIMEOUT", DEFAULT_IDLE_TIMEOUT))
+    sys.exit(run(idle_timeout))
@@ -0,0 +1,46 @@
+"""Fixtures shared by the guardkit tests."""
+
+import os
+
+import pytest
+
+# Stands in for uvx: "ruff format" strips trailing whitespace in place and
+# "pyright" fails on files containing ERROR. Every call is logged.
+FAKE_UVX = """#!/bin/sh
+echo "$@" >> "$FAKE_UVX_LOG"
+if [ "$1" = "ruff" ]; then
+    shift 2
+    sed -i 's/[[:space:]]*$//' "$@"
+    echo "$# files reformatted"
+    exit 0
+fi
+if grep -q ERROR "$2"; then
+    echo "$2:1:1 - error: fake"
+    exit 1
+fi
+echo "0 errors"
+"""
+
+
+@pytest.fixture
+def runtime(tmp_path, monkeypatch):
+    """A private runtime directory; short, as Unix socket paths are limited to ~100 bytes."""
+    path = tmp_path / "rt"
+    path.mkdir(mode=0o700)
+    monkeypatch.setenv("GUARDS_RUNTIME_DIR", str(path))
+    return path
+
+
+@pytest.fixture
+def fake_uvx(tmp_path, monkeypatch, runtime):
+    """Put FAKE_UVX first on PATH and return the log of its calls."""
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    uvx = bin_dir / "uvx"
+    uvx.write_text(FAKE_UVX)
+    uvx.chmod(0o755)
+    log = tmp_path / "uvx.log"
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    monkeypatch.setenv("FAKE_UVX_LOG", str(log))
+    monkeypatch.setenv("GUARDS_PYRIGHT_SERVER", "0")
+    return log
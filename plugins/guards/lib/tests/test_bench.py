@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""Tests for the guard hook latency benchmark."""
+
+import json
+import re
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from guardkit.bench import (
+    SIDE_EFFECT_HOOKS,
+    HookSpec,
+    discover_hooks,
+    format_summary,
+    load_corpus,
+    percentiles,
+    profile_patterns,
+    run_benchmark,
+    synthetic_corpus,
+    write_corpus,
+)
+
+GUARDS_DIR = Path(__file__).resolve().parents[2]
+
+
+def bash(command: str, event: str = "PreToolUse") -> dict:
+    return {
+        "hook_event_name": event,
+        "tool_name": "Bash",
+        "tool_input": {"command": command},
+    }
+
+
+class TestCorpus:
+    """Test corpus loading and generation."""
+
+    def test_round_trip(self, tmp_path):
+        path = tmp_path / "corpus.jsonl"
+        payloads = synthetic_corpus(20)
+        write_corpus(str(path), payloads)
+        assert load_corpus(str(path)) == payloads
+
+    def test_blank_lines_skipped(self, tmp_path):
+        path = tmp_path / "corpus.jsonl"
+        path.write_text(json.dumps(bash("ls")) + "\n\n")
+        assert load_corpus(str(path)) == [bash("ls")]
+
+    def test_invalid_line_reports_position(self, tmp_path):
+        path = tmp_path / "corpus.jsonl"
+        path.write_text(json.dumps(bash("ls")) + "\n{not json\n")
+        with pytest.raises(ValueError, match=r"corpus\.jsonl:2"):
+            load_corpus(str(path))
+
+    def test_synthetic_is_deterministic(self):
+        assert synthetic_corpus(50, seed=3) == synthetic_corpus(50, seed=3)
+        assert synthetic_corpus(50, seed=3) != synthetic_corpus(50, seed=4)
+
+    def test_synthetic_payloads_are_complete(self):
+        payloads = synthetic_corpus(200)
+        assert len(payloads) == 200
+        events = {payload["hook_event_name"] for payload in payloads}
+        assert events == {"PreToolUse", "PostToolUse"}
+        for payload in payloads:
+            assert isinstance(payload["tool_input"], dict)
+            if payload["hook_event_name"] == "PostToolUse":
+                assert "tool_response" in payload
+
+
+class TestDiscovery:
+    """Test hook discovery from hooks.json."""
+
+    def test_finds_every_hook_script(self):
+        scripts = {hook.script for hook in discover_hooks()}
+        assert "security/safety-guard/hooks/safety_guard_bash.py" in scripts
+        assert "quality/test-reminder/hooks/reminder_hook.py" in scripts
+        assert SIDE_EFFECT_HOOKS <= scripts
+        for script in scripts:
+            assert (GUARDS_DIR / script).is_file()
+
+    def test_matchers_merged_per_script(self):
+        protect_env = [
+            h for h in discover_hooks() if h.script.endswith("protect_env.py")
+        ]
+        assert len(protect_env) == 1
+        assert set(protect_env[0].matcher.split("|")) == {"Bash", "Read", "Grep"}
+
+    def test_matcher(self):
+        hook = HookSpec("PostToolUse", "Write|Edit", "x.py")
+        assert hook.matches({"hook_event_name": "PostToolUse", "tool_name": "Edit"})
+        assert not hook.matches(
+            {"hook_event_name": "PostToolUse", "tool_name": "MultiEdit"}
+        )
+        assert not hook.matches({"hook_event_name": "PreToolUse", "tool_name": "Edit"})
+
+
+class TestStatistics:
+    """Test percentile summaries."""
+
+    def test_nearest_rank(self):
+        summary = percentiles([float(n) for n in range(1, 101)])
+        assert summary["p50"] == 50.0
+        assert summary["p95"] == 95.0
+        assert summary["p99"] == 99.0
+        assert summary["max"] == 100.0
+        assert summary["n"] == 100
+
+    def test_empty(self):
+        assert percentiles([]) is None
+
+
+class TestProfiling:
+    """Test per-pattern regex timing."""
+
+    def test_attributes_local_patterns(self):
+        def check(tool_name, tool_input):
+            re.search(r"rm\s+-rf", tool_input["command"])
+            re.compile(r"curl.*\|\s*sh").search(tool_input["command"])
+
+        patterns = profile_patterns(check, [bash("rm -rf /tmp/x"), bash("ls")])
+        assert patterns[r"rm\s+-rf"]["calls"] == 2
+        assert patterns[r"curl.*\|\s*sh"]["calls"] == 2
+
+
+class TestRunBenchmark:
+    """Test a full benchmark run on a small corpus."""
+
+    def test_report(self):
+        hooks = [
+            HookSpec(
+                "PreToolUse", "Bash", "security/gh-api-guard/hooks/check-gh-api.py"
+            ),
+            HookSpec(
+                "PostToolUse", "Write", "quality/test-reminder/hooks/reminder_hook.py"
+            ),
+        ]
+        payloads = [bash("gh api repos/o/r/pulls/1/comments"), bash("git status")]
+        report = run_benchmark(payloads, hooks=hooks)
+        json.dumps(report)
+
+        gh = report["hooks"]["security/gh-api-guard/hooks/check-gh-api.py"]
+        assert gh["payloads"] == 2
+        assert gh["subprocess"]["n"] == 2
+        assert gh["in_process"]["n"] == 2
+        assert "overhead_p50_ms" in gh
+        assert any("gh" in pattern for pattern in gh["patterns"])
+
+        reminder = report["hooks"]["quality/test-reminder/hooks/reminder_hook.py"]
+        assert reminder["payloads"] == 0
+        assert reminder["subprocess"] is None
+        assert report["spawn"]["n"] > 0
+        assert "check-gh-api.py" in format_summary(report)
+
+    def test_in_process_only(self):
+        hooks = [
+            HookSpec(
+                "PreToolUse",
+                "Bash",
+                "security/git-safety-guard/hooks/git_safety_guard.py",
+            )
+        ]
+        report = run_benchmark(
+            [bash("git reset --hard")], hooks=hooks, modes=("in-process",)
+        )
+        entry = report["hooks"][hooks[0].script]
+        assert "subprocess" not in entry
+        assert entry["in_process"]["n"] == 1
+        assert report["spawn"] is None
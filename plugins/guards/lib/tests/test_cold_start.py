@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""Cold-start budget for every guard hook.
+
+Each hook runs as a fresh process per tool call, so its startup cost is paid
+on every call it does not care about. These tests run each hook on such a
+call with ``python -S`` (no site-packages, so importing cchooks would fail)
+and check that it exits 0 within COLD_START_BUDGET_MS of a bare interpreter
+start. Set GUARDS_COLD_START_BUDGET_MS to change the budget on slow machines.
+"""
+
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+GUARDS_DIR = Path(__file__).resolve().parents[2]
+
+COLD_START_BUDGET_MS = float(os.environ.get("GUARDS_COLD_START_BUDGET_MS", "30"))
+
+# Runs per measurement; the fastest run is compared against the budget
+RUNS = 10
+
+
+def payload(event: str, tool_name: str, tool_input: dict, **extra) -> str:
+    return json.dumps(
+        {
+            "hook_event_name": event,
+            "session_id": "test",
+            "transcript_path": "/tmp/transcript.jsonl",
+            "cwd": "/tmp",
+            "tool_name": tool_name,
+            "tool_input": tool_input,
+            **extra,
+        }
+    )
+
+
+LS = {"command": "ls -la"}
+LS_OUTPUT = {"tool_response": {"stdout": "README.md\n", "stderr": ""}}
+
+# A call each hook must ignore, per hook script
+IRRELEVANT_CALLS = {
+    "pipeline/hooks/guard_pipeline.py": payload("PreToolUse", "Glob", {"pattern": "*"}),
+    "pipeline/hooks/post_edit_pipeline.py": payload(
+        "PostToolUse", "Write", {"file_path": "/tmp/README.md"}, tool_response={}
+    ),
+    "policy/conventional-commits/hooks/conventional_commits.py": payload(
+        "PreToolUse", "Bash", LS
+    ),
+    "policy/conventional-commits/hooks/post_validate_commit.py": payload(
+        "PostToolUse", "Bash", LS, **LS_OUTPUT
+    ),
+    "policy/enforce-uv/hooks/enforce_uv.py": payload(
+        "PreToolUse", "Glob", {"pattern": "*"}
+    ),
+    "policy/gemini-model-guard/hooks/check-gemini-model.py": payload(
+        "PreToolUse", "Bash", LS
+    ),
+    "policy/gemini-model-guard/hooks/post-check-gemini.py": payload(
+        "PostToolUse", "Bash", LS, **LS_OUTPUT
+    ),
+    "quality/clean-code-guard/hooks/check-clean-patterns.py": payload(
+        "PreToolUse", "Bash", LS
+    ),
+    "quality/python-format/hooks/format_python.py": payload(
+        "PostToolUse", "Write", {"file_path": "/tmp/README.md"}, tool_response={}
+    ),
+    "quality/python-typecheck/hooks/typecheck.py": payload(
+        "PostToolUse", "Edit", {"file_path": "/tmp/README.md"}, tool_response={}
+    ),
+    "quality/test-reminder/hooks/reminder_hook.py": payload(
+        "PostToolUse", "Write", {"file_path": "/tmp/README.md"}, tool_response={}
+    ),
+    "security/gh-api-guard/hooks/check-gh-api.py": payload("PreToolUse", "Bash", LS),
+    "security/git-safety-guard/hooks/git_safety_guard.py": payload(
+        "PreToolUse", "Bash", LS
+    ),
+    "security/protect-env/hooks/protect_env.py": payload("PreToolUse", "Bash", LS),
+    "security/safety-guard/hooks/safety_guard_bash.py": payload(
+        "PreToolUse", "Glob", {"pattern": "*"}
+    ),
+    "security/safety-guard/hooks/safety_guard_read.py": payload(
+        "PreToolUse", "Glob", {"pattern": "*"}
+    ),
+}
+
+
+def run_hook(args: list[str], stdin: str) -> subprocess.CompletedProcess:
+    env = {k: v for k, v in os.environ.items() if not k.startswith("PYTHON")}
+    env["GUARDS_VERDICT_CACHE"] = "0"
+    return subprocess.run(args, input=stdin, capture_output=True, text=True, env=env)
+
+
+def fastest_overhead_ms(
+    args: list[str], stdin: str
+) -> tuple[float, subprocess.CompletedProcess]:
+    """Return the hook's fastest wall time minus the fastest bare interpreter start.
+
+    Hook and baseline runs alternate, so a burst of machine load slows both.
+    """
+    best_hook = best_baseline = float("inf")
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        run_hook([sys.executable, "-S", "-c", "pass"], "")
+        best_baseline = min(best_baseline, time.perf_counter() - start)
+
+        start = time.perf_counter()
+        result = run_hook(args, stdin)
+        best_hook = min(best_hook, time.perf_counter() - start)
+    return (best_hook - best_baseline) * 1000, result
+
+
+def test_every_hook_has_a_budget():
+    scripts = {
+        path.relative_to(GUARDS_DIR).as_posix()
+        for path in GUARDS_DIR.glob("*/**/hooks/*.py")
+        if not path.name.startswith("test_")
+    }
+    assert scripts == set(IRRELEVANT_CALLS)
+
+
+@pytest.mark.parametrize("script", sorted(IRRELEVANT_CALLS))
+def test_cold_start_within_budget(script):
+    overhead, result = fastest_overhead_ms(
+        [sys.executable, "-S", str(GUARDS_DIR / script)], IRRELEVANT_CALLS[script]
+    )
+    assert result.returncode == 0, result.stderr
+    assert result.stdout == ""
+    assert overhead <= COLD_START_BUDGET_MS, (
+        f"{script} took {overhead:.1f} ms over interpreter start "
+        f"(budget {COLD_START_BUDGET_MS:.0f} ms)"
+    )
+
+
+def test_block_still_goes_through_cchooks():
+    result = run_hook(
+        [
+            sys.executable,
+            str(GUARDS_DIR / "security/gh-api-guard/hooks/check-gh-api.py"),
+        ],
+        payload("PreToolUse", "Bash", {"command": "gh repo delete owner/repo"}),
+    )
+    assert result.returncode == 2
+    assert "gh repo delete" in result.stderr
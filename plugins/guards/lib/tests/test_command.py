@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""Tests for the shared BashCommand parse."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from guardkit.command import BashCommand
+
+
+class TestBashCommand:
+    """Test lazily computed command views."""
+
+    def test_tokens(self):
+        assert BashCommand("gh api --jq '.[] | .body' x").tokens == [
+            "gh",
+            "api",
+            "--jq",
+            ".[] | .body",
+            "x",
+        ]
+
+    def test_unbalanced_quotes_have_no_tokens(self):
+        assert BashCommand("echo 'unterminated").tokens is None
+
+    def test_tokens_are_computed_once(self):
+        parsed = BashCommand("git status")
+        assert parsed.tokens is parsed.tokens
+
+    def test_normalized_joins_continuations(self):
+        assert BashCommand("gemini \\\n  -m x").normalized == "gemini  -m x"
+
+    def test_wrapped_commands(self):
+        parsed = BashCommand("bash -c 'git reset --hard' && eval \"rm -rf x\"")
+        assert parsed.wrapped_commands == ["git reset --hard", "rm -rf x"]
+
+    def test_wrapped_commands_without_tokens(self):
+        assert BashCommand("bash -c 'oops").wrapped_commands == []
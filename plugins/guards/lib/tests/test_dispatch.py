@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""Tests for the concurrent PreToolUse hook dispatcher."""
+
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from guardkit.dispatch import (
+    Dispatcher,
+    Hook,
+    matches,
+    matching_hooks,
+    read_registry,
+)
+
+LIB_DIR = Path(__file__).resolve().parents[1]
+
+GUARD_DISPATCH = LIB_DIR / "guard_dispatch.py"
+
+
+def payload(command: str, tool_name: str = "Bash", cwd: str = "/") -> dict:
+    return {
+        "hook_event_name": "PreToolUse",
+        "cwd": cwd,
+        "tool_name": tool_name,
+        "tool_input": {"command": command},
+    }
+
+
+@pytest.fixture
+def guards(tmp_path):
+    """A guards root with in-process guard scripts."""
+    root = tmp_path / "guards"
+    root.mkdir()
+    (root / "block_rm.py").write_text(
+        "def check(tool_name, tool_input):\n"
+        "    if 'rm' in tool_input.get('command', ''):\n"
+        "        return 'no rm'\n"
+        "    return None\n"
+    )
+    (root / "slow.py").write_text(
+        "import time\n\ndef check(tool_name, tool_input):\n    time.sleep(30)\n"
+    )
+    (root / "where.py").write_text(
+        "def check(tool_name, tool_input, cwd=None):\n    return f'cwd {cwd}'\n"
+    )
+    (root / "broken.py").write_text(
+        "def check(tool_name, tool_input):\n    raise KeyError\n"
+    )
+    return root
+
+
+def shell(script: str, timeout: float = 10) -> Hook:
+    return Hook(script, timeout)
+
+
+class TestRegistry:
+    """Test reading the merged registry and selecting hooks for a tool."""
+
+    def test_read_registry(self, tmp_path):
+        path = tmp_path / "registry.json"
+        path.write_text(
+            json.dumps(
+                {
+                    "hooks": {
+                        "PreToolUse": [
+                            {
+                                "matcher": "Bash",
+                                "hooks": [{"type": "command", "command": "a"}],
+                            },
+                            {
+                                "matcher": "Read|Grep",
+                                "hooks": [{"command": "b", "timeout": 5}],
+                            },
+                        ],
+                        "Stop": [{"hooks": [{"command": "c"}]}],
+                    }
+                }
+            )
+        )
+        registry = read_registry(str(path))
+        assert registry == [
+            ("Bash", [Hook("a", 60.0)]),
+            ("Read|Grep", [Hook("b", 5.0)]),
+        ]
+        path.write_text('{"PreToolUse": {}}')
+        with pytest.raises(ValueError):
+            read_registry(str(path))
+
+    @pytest.mark.parametrize(
+        ("matcher", "tool", "expected"),
+        [
+            ("Bash", "Bash", True),
+            ("Bash", "BashOutput", False),
+            ("Read|Grep", "Grep", True),
+            ("Notebook.*", "NotebookEdit", True),
+            ("*", "Write", True),
+            ("", "Write", True),
+            ("(", "(", True),
+        ],
+    )
+    def test_matches(self, matcher, tool, expected):
+        assert matches(matcher, tool) is expected
+
+    def test_each_command_once(self):
+        registry = [
+            ("Read", [Hook("env")]),
+            ("Bash", [Hook("git")]),
+            ("Bash|Read", [Hook("env")]),
+        ]
+        assert matching_hooks(registry, "Bash") == [Hook("git"), Hook("env")]
+
+
+class TestDispatch:
+    """Test running hooks concurrently with first-block short-circuit."""
+
+    def test_in_process_guard(self, guards):
+        dispatcher = Dispatcher(
+            [("Bash", [Hook(str(guards / "block_rm.py"))])], str(guards)
+        )
+        outcomes = dispatcher.run(payload("rm -rf build"))
+        assert outcomes[-1].reason == "no rm"
+        assert dispatcher.run(payload("ls")) == [
+            (0, Hook(str(guards / "block_rm.py")), None, None)
+        ]
+
+    def test_subprocess_hooks(self, guards):
+        registry = [
+            (
+                "Bash",
+                [shell("cat > /dev/null; exit 0"), shell("echo 'denied' >&2; exit 2")],
+            ),
+            (
+                "Read",
+                [
+                    shell(
+                        'cat > /dev/null; echo \'{"hookSpecificOutput": {'
+                        '"permissionDecision": "deny", '
+                        '"permissionDecisionReason": "json"}}\''
+                    )
+                ],
+            ),
+        ]
+        dispatcher = Dispatcher(registry, str(guards))
+        assert dispatcher.run(payload("ls"))[-1].reason == "denied"
+        assert dispatcher.run(payload("x", "Read"))[-1].reason == "json"
+        assert dispatcher.run(payload("x", "Write")) == []
+
+    def test_subprocess_gets_payload_and_cwd(self, guards, tmp_path):
+        hook = shell('grep -q \'"tool_name": "Bash"\' && pwd >&2 && exit 2')
+        outcome = Dispatcher([("Bash", [hook])], str(guards)).run(
+            payload("ls", cwd=str(tmp_path))
+        )
+        assert outcome[-1].reason == str(tmp_path)
+
+    def test_first_block_short_circuits(self, guards, tmp_path):
+        marker = tmp_path / "finished"
+        registry = [
+            (
+                "Bash",
+                [
+                    shell(f"sleep 5; touch {marker}"),
+                    Hook(str(guards / "slow.py")),
+                    Hook(str(guards / "block_rm.py")),
+                ],
+            )
+        ]
+        started = time.monotonic()
+        outcomes = Dispatcher(registry, str(guards)).run(payload("rm x"))
+        assert time.monotonic() - started < 2
+        assert outcomes == [(2, Hook(str(guards / "block_rm.py")), "no rm", None)]
+        time.sleep(0.2)
+        assert not marker.exists()
+
+    def test_queued_hooks_not_started_after_block(self, guards, tmp_path):
+        marker = tmp_path / "started"
+        registry = [
+            ("Bash", [Hook(str(guards / "block_rm.py")), shell(f"touch {marker}")])
+        ]
+        Dispatcher(registry, str(guards), max_workers=1).run(payload("rm x"))
+        assert not marker.exists()
+
+    def test_per_hook_timeouts(self, guards):
+        registry = [
+            (
+                "Bash",
+                [
+                    Hook("sleep 10", 0.3),
+                    Hook(str(guards / "slow.py"), 0.3),
+                    Hook("sleep 0.6; echo late >&2; exit 2", 5),
+                ],
+            )
+        ]
+        started = time.monotonic()
+        outcomes = Dispatcher(registry, str(guards), max_workers=2).run(payload("ls"))
+        assert time.monotonic() - started < 3
+        errors = {outcome.index: outcome.error for outcome in outcomes if outcome.error}
+        assert errors == {0: "timed out after 0.3s", 1: "timed out after 0.3s"}
+        # The third hook still ran once a worker was free, under its own timeout
+        assert outcomes[-1].reason == "late"
+
+    def test_cwd_and_failures(self, guards):
+        registry = [
+            (
+                "Bash",
+                [Hook(str(guards / "where.py")), shell("cat > /dev/null; exit 1")],
+            ),
+            ("Read", [Hook(str(guards / "broken.py"))]),
+        ]
+        dispatcher = Dispatcher(registry, str(guards))
+        assert dispatcher.run(payload("ls", cwd="/tmp"))[-1].reason == "cwd /tmp"
+        # A guard that raises in-process runs again as a script, which fails
+        outcomes = dispatcher.run(payload("x", "Read"))
+        assert all(outcome.reason is None for outcome in outcomes)
+
+
+def test_hook_process(guards, tmp_path):
+    registry = tmp_path / "registry.json"
+    registry.write_text(
+        json.dumps(
+            {
+                "hooks": {
+                    "PreToolUse": [
+                        {"matcher": "Bash", "hooks": [{"command": "exit 2"}]}
+                    ]
+                }
+            }
+        )
+    )
+    env = {k: v for k, v in os.environ.items() if not k.startswith("PYTHON")}
+
+    def run(path: Path, data: dict) -> subprocess.CompletedProcess:
+        return subprocess.run(
+            [sys.executable, str(GUARD_DISPATCH), str(path)],
+            input=json.dumps(data),
+            capture_output=True,
+            text=True,
+            env=env,
+        )
+
+    assert run(registry, payload("ls")).returncode == 2
+    assert run(registry, payload("x", "Read")).returncode == 0
+    missing = run(tmp_path / "missing.json", payload("ls"))
+    assert missing.returncode == 2
+    assert "setup-hooks.sh" in missing.stderr
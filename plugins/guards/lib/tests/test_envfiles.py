@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""Tests for symlink-aware env-file classification and the guards using it."""
+
+import importlib.util
+import json
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from guardkit.daemon import GuardRegistry
+from guardkit.envfiles import ENV, SAFE, EnvFileClassifier
+
+LIB_DIR = Path(__file__).resolve().parents[1]
+
+GUARDS_DIR = LIB_DIR.parent
+PROTECT_ENV = GUARDS_DIR / "security/protect-env/hooks/protect_env.py"
+SAFETY_READ = GUARDS_DIR / "security/safety-guard/hooks/safety_guard_read.py"
+
+
+def load(path: Path):
+    spec = importlib.util.spec_from_file_location(path.stem, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture
+def project(tmp_path):
+    (tmp_path / ".env").write_text("SECRET=1\n")
+    (tmp_path / ".env.example").write_text("SECRET=\n")
+    (tmp_path / "notes.txt").write_text("hello\n")
+    (tmp_path / "config.txt").symlink_to(".env")
+    (tmp_path / ".env.sample").symlink_to(".env")
+    (tmp_path / "template.txt").symlink_to(".env.example")
+    (tmp_path / "linked").symlink_to(tmp_path, target_is_directory=True)
+    return tmp_path
+
+
+@pytest.fixture
+def classifier():
+    return EnvFileClassifier(
+        [r"\.env$", r"\.env\.[^/]+$"], [r"\.env\.(example|sample)$"]
+    )
+
+
+class TestClassifier:
+    """Test one guard's rules compiled into one matcher."""
+
+    def test_names(self, classifier):
+        assert classifier.classify_name("/p/.env") == ENV
+        assert classifier.classify_name("/p/.env.local") == ENV
+        assert classifier.classify_name("/p/.env.example") == SAFE
+        assert classifier.classify_name("/p/README.md") is None
+
+    def test_safe_flags(self):
+        insensitive = EnvFileClassifier(
+            [r"\.env\.[^/]+$"], [r"\.env\.example$"], re.IGNORECASE
+        )
+        assert insensitive.classify_name("/p/.env.EXAMPLE") == SAFE
+        assert (
+            insensitive.classify_name("/p/.ENV.local") is None
+        )  # env rules keep their case
+
+    def test_links(self, classifier, project):
+        assert classifier.protected(str(project / ".env")) == str(project / ".env")
+        assert classifier.protected(str(project / "config.txt")) == (
+            f"{project / 'config.txt'} -> {project / '.env'}"
+        )
+        # A template name does not hide a link to the real file
+        assert classifier.protected(str(project / ".env.sample"))
+        assert classifier.protected(str(project / "linked" / ".env"))
+        assert classifier.protected(str(project / "template.txt")) is None
+        assert classifier.protected(str(project / "notes.txt")) is None
+        assert classifier.protected(str(project / "missing.txt")) is None
+
+    def test_relative_to_cwd(self, classifier, project):
+        assert classifier.resolved_env_path("config.txt", cwd=str(project))
+        assert classifier.resolved_env_path("config.txt", cwd=str(project / "linked"))
+
+    def test_memo_follows_retargeted_link(self, classifier, project):
+        link = project / "config.txt"
+        assert classifier.resolved_env_path(str(link))
+        link.unlink()
+        link.symlink_to("notes.txt")
+        assert classifier.resolved_env_path(str(link)) is None
+
+    def test_memoized(self, classifier, project, monkeypatch):
+        assert classifier.resolved_env_path(str(project / "config.txt"))
+        monkeypatch.setattr(os.path, "realpath", None)
+        assert classifier.resolved_env_path(str(project / "config.txt"))
+
+
+class TestProtectEnv:
+    """protect-env blocks links to env files for Read, Grep and Bash."""
+
+    @pytest.fixture
+    def guard(self):
+        return load(PROTECT_ENV)
+
+    def test_read_and_grep(self, guard, project):
+        link = str(project / "config.txt")
+        assert "config.txt -> " in guard.check("Read", {"file_path": link})
+        assert guard.check("Grep", {"pattern": "x", "path": link})
+        assert guard.check("Read", {"file_path": str(project / "template.txt")}) is None
+
+    @pytest.mark.parametrize(
+        "command",
+        [
+            "cat config.txt",
+            "head -n 3 ./config.txt",
+            "wc -l < config.txt",
+            "echo $(cat linked/config.txt)",
+            "sudo cat config.txt | grep SECRET",
+            "cp config.txt /tmp/out",
+        ],
+    )
+    def test_bash_links(self, guard, project, command):
+        assert guard.check("Bash", {"command": command}, cwd=str(project))
+
+    @pytest.mark.parametrize(
+        "command",
+        ["cat notes.txt", "cat template.txt", "ls -la config.txt", "git add ."],
+    )
+    def test_bash_allowed(self, guard, project, command):
+        assert guard.check("Bash", {"command": command}, cwd=str(project)) is None
+
+    def test_unparsed_bash_checks_every_word(self, guard, project):
+        command = "{ " * 400 + "cat config.txt" + "; }" * 400
+        assert "config.txt -> " in guard.check(
+            "Bash", {"command": command}, cwd=str(project)
+        )
+
+    def test_hook_process(self, project):
+        payload = {
+            "hook_event_name": "PreToolUse",
+            "session_id": "s",
+            "transcript_path": "/tmp/t",
+            "cwd": str(project),
+            "tool_name": "Bash",
+            "tool_input": {"command": "cat config.txt"},
+        }
+        env = {k: v for k, v in os.environ.items() if not k.startswith("PYTHON")}
+        result = subprocess.run(
+            [sys.executable, str(PROTECT_ENV)],
+            input=json.dumps(payload),
+            capture_output=True,
+            text=True,
+            cwd=project,
+            env=env,
+        )
+        assert result.returncode == 2
+        assert "config.txt -> " in result.stderr
+
+
+class TestSafetyGuardRead:
+    """safety-guard's Read hook blocks links to env files."""
+
+    def test_links(self, project):
+        guard = load(SAFETY_READ)
+        assert guard.check("Read", {"file_path": str(project / "config.txt")})
+        assert guard.check("Read", {"file_path": str(project / ".env.sample")})
+        assert guard.check("Read", {"file_path": str(project / "template.txt")}) is None
+        assert guard.check("Read", {"file_path": str(project / ".env.example")}) is None
+
+
+def test_daemon_passes_payload_cwd(project):
+    payload = {
+        "hook_event_name": "PreToolUse",
+        "cwd": str(project),
+        "tool_name": "Read",
+        "tool_input": {"file_path": "config.txt"},
+    }
+    response = GuardRegistry().evaluate(
+        {"script": str(SAFETY_READ), "payload": payload}
+    )
+    assert response["status"] == "ok"
+    assert "config.txt -> " in response["reason"]
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""Tests for the fast lane of trivially safe Bash commands."""
+
+import re
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from guardkit import policy as policy_module
+from guardkit.fastlane import (
+    CommandTrie,
+    FastLane,
+    compile_fast_lane,
+    gate_patterns,
+    parse_entry,
+    plain_words,
+)
+from guardkit.pipeline import GuardPipeline
+from guardkit.prefilter import LiteralIndex
+
+LIB_DIR = Path(__file__).resolve().parents[1]
+
+RULE = """\
+import re
+
+def fast_lane_gates(cwd=None):
+    return [re.compile(r"\\bdrop\\b")]
+
+def check(tool_name, tool_input):
+    global calls
+    calls = globals().get("calls", 0) + 1
+    if "drop" in tool_input.get("command", "").split():
+        return "no drop"
+    return None
+"""
+
+UNGATED_RULE = """\
+def check(tool_name, tool_input):
+    return None
+"""
+
+
+@pytest.fixture(autouse=True)
+def isolated_policies(tmp_path, monkeypatch, runtime):
+    monkeypatch.setenv("GUARDS_CONFIG_DIR", str(tmp_path / "user"))
+    monkeypatch.setattr(policy_module, "_loaded", {})
+
+
+@pytest.fixture
+def guards(tmp_path):
+    """A guards root with a gated rule and a fast lane policy."""
+    root = tmp_path / "guards"
+    root.mkdir()
+    (root / "rule.py").write_text(RULE)
+    (root / "ungated.py").write_text(UNGATED_RULE)
+    (root / "fast-lane.policy.toml").write_text(
+        'commands = ["ls *", "db drop", "db list -*"]\n'
+    )
+    return root
+
+
+def pipeline(root: Path, *rules: str) -> GuardPipeline:
+    return GuardPipeline(rules or ("rule.py",), str(root), fast_lane_dir=str(root))
+
+
+class TestTrie:
+    """Test trie entries and argument shapes."""
+
+    def test_parse_entry(self):
+        assert parse_entry("git log *") == (("git", "log"), "*")
+        assert parse_entry("git status -*") == (("git", "status"), "-*")
+        assert parse_entry("pwd") == (("pwd",), "")
+        for entry in ("*", "", "cat; rm *", "echo $HOME"):
+            with pytest.raises(ValueError):
+                parse_entry(entry)
+
+    def test_shapes(self):
+        trie = CommandTrie(["git log *", "git status -*", "pwd", "git branch"])
+        assert trie.accepts(["git", "log", "--oneline", "src"])
+        assert trie.accepts(["git", "status", "-s", "--branch"])
+        assert not trie.accepts(["git", "status", "src"])
+        assert trie.accepts(["pwd"])
+        assert not trie.accepts(["pwd", "-P"])
+        assert trie.accepts(["git", "branch"])
+        assert not trie.accepts(["git", "branch", "-D", "main"])
+        assert not trie.accepts(["git"])
+        assert not trie.accepts(["git", "push"])
+
+
+class TestPlainWords:
+    """Test the structural check that comes before the trie."""
+
+    @pytest.mark.parametrize(
+        "command",
+        [
+            "ls; rm -rf /",
+            "ls && rm x",
+            "ls | sh",
+            "cat $(which python)",
+            "cat `id`",
+            "echo $HOME",
+            "cat x > y",
+            "cat < y",
+            "ls *.py",
+            "cat 'a b'",
+            "ls\nrm x",
+            "cat .ENV.local",
+            "echo ünïcode",
+        ],
+    )
+    def test_rejects(self, command):
+        assert plain_words(command) is None
+
+    def test_symlinks(self, tmp_path):
+        (tmp_path / "real").write_text("")
+        (tmp_path / "link").symlink_to(tmp_path / "real")
+        assert plain_words("cat real missing", str(tmp_path)) == [
+            "cat",
+            "real",
+            "missing",
+        ]
+        assert plain_words("cat link", str(tmp_path)) is None
+
+
+class TestGates:
+    """Test gates taken from rule tables."""
+
+    def test_gate_patterns(self):
+        index = LiteralIndex([(r"\bgit\s+push\b", "push"), (r"(?=x)y", "lookahead")])
+        gates = gate_patterns(index)
+        assert [gate.literals for gate in gates] == [
+            frozenset({"push"}),
+            frozenset({"y"}),
+        ]
+        assert [gate.linear for gate in gates] == [True, False]
+        (gate,) = gate_patterns(re.compile("gemini", re.IGNORECASE))
+        assert gate.flags == re.IGNORECASE and gate.literals == frozenset({"gemini"})
+
+    def test_gates_reject(self):
+        lane = FastLane(["find *", "pytest *"], gate_patterns(re.compile(r"-delete\b")))
+        assert lane.allows("find . -name x")
+        assert not lane.allows("find . -delete")
+        assert not lane.allows("go test")
+
+    def test_rule_without_gates_disables(self, guards):
+        lane = pipeline(guards, "rule.py", "ungated.py").fast_lane()
+        assert not lane.enabled
+        assert not lane.allows("ls")
+
+    def test_blocked_entry_dropped(self, capsys):
+        lane = compile_fast_lane(
+            ["ls *", "db drop", "bad;"], [], lambda c: "no" * ("drop" in c)
+        )
+        assert lane.entries == ["ls *"]
+        assert "db drop" in capsys.readouterr().err
+
+
+def test_bash_rules_declare_gates():
+    lane = GuardPipeline().fast_lane()
+    assert lane.enabled and "git status *" in lane.entries
+    for command in (
+        "git status",
+        "git log --oneline -5",
+        "rg TODO src",
+        "uv run pytest -q",
+    ):
+        assert lane.allows(command)
+    for command in ("git branch -D main", "cat .env", "gh pr list", "echo gemini -m x"):
+        assert not lane.allows(command)
+
+
+class TestPipeline:
+    """Test the pipeline skipping its rules for fast lane commands."""
+
+    def test_skips_rules(self, guards):
+        guard = pipeline(guards)
+        assert guard.evaluate("Bash", {"command": "ls -la"}) is None
+        rule = guard._loader.load(str(guards / "rule.py"))
+        calls = rule.calls
+        assert guard.evaluate("Bash", {"command": "ls src"}) is None
+        assert rule.calls == calls
+        assert guard.evaluate("Bash", {"command": "ls drop"}) == "no drop"
+        assert guard.evaluate("Bash", {"command": "ls > x"}) is None
+        assert rule.calls == calls + 2
+
+    def test_artifact_reused(self, guards):
+        assert pipeline(guards).fast_lane().entries == ["ls *", "db list -*"]
+        fresh = pipeline(guards)
+        assert fresh.fast_lane().allows("db list -a")
+        assert fresh._loader._modules == {}
+
+        (guards / "fast-lane.policy.toml").write_text('commands = ["pwd"]\n')
+        assert pipeline(guards).fast_lane().entries == ["pwd"]
+
+    def test_without_policy(self, guards):
+        (guards / "fast-lane.policy.toml").unlink()
+        assert not pipeline(guards).fast_lane().enabled
+
+    def test_lane_per_project(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        project = tmp_path / "project"
+        (project / ".claude").mkdir(parents=True)
+        (project / ".claude/safety-guard-bash.policy.toml").write_text(
+            '[[blocked.rules]]\nid = "cat-secrets"\npattern = "cat\\\\s+secrets"\n'
+            'reason = "secrets stay unread"\n'
+        )
+        guard = GuardPipeline()
+        tool_input = {"command": "cat secrets"}
+        assert guard.evaluate("Bash", tool_input) is None
+        assert "secrets stay unread" in guard.evaluate(
+            "Bash", tool_input, cwd=str(project)
+        )
+        assert guard.fast_lane(str(project)) is not guard.fast_lane()
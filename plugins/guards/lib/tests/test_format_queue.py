@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""Tests for batched ruff formatting in the python-format hook."""
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from guardkit import format_queue
+from guardkit.format_queue import claim, enqueue, flush, pending, should_flush
+
+LIB_DIR = Path(__file__).resolve().parents[1]
+
+FORMAT_HOOK = LIB_DIR.parent / "quality/python-format/hooks/format_python.py"
+
+
+@pytest.fixture
+def sources(tmp_path):
+    files = []
+    for name in ("a.py", "b.py", "c.py"):
+        path = tmp_path / name
+        path.write_text("x=1\n")
+        files.append(str(path))
+    return files
+
+
+class TestQueue:
+    """Test queueing, thresholds and claiming."""
+
+    def test_pending_is_deduplicated_in_edit_order(self, runtime, sources):
+        a, b, _c = sources
+        for path in (b, a, b, a):
+            enqueue("s1", path)
+        assert pending("s1") == [b, a]
+        assert pending("other") == []
+
+    def test_claim_empties_queue_and_skips_deleted_files(self, runtime, sources):
+        a, b, c = sources
+        for path in sources:
+            enqueue("s1", path)
+        os.unlink(c)
+        assert claim("s1") == [a, b]
+        assert claim("s1") == []
+        assert pending("s1") == []
+
+    def test_no_threshold_never_flushes_early(self, runtime, sources):
+        for path in sources:
+            enqueue("s1", path)
+        assert not should_flush("s1")
+
+    def test_size_threshold(self, runtime, sources, monkeypatch):
+        monkeypatch.setenv("GUARDS_FORMAT_BATCH_MAX_FILES", "2")
+        enqueue("s1", sources[0])
+        enqueue("s1", sources[0])
+        assert not should_flush("s1")
+        enqueue("s1", sources[1])
+        assert should_flush("s1")
+
+    def test_age_threshold(self, runtime, sources, monkeypatch):
+        monkeypatch.setenv("GUARDS_FORMAT_BATCH_MAX_AGE", "30")
+        enqueue("s1", sources[0])
+        assert not should_flush("s1")
+        assert should_flush("s1", now=format_queue.time.time() + 31)
+
+    def test_torn_lines_are_ignored(self, runtime, sources):
+        enqueue("s1", sources[0])
+        with open(format_queue.queue_path("s1"), "a") as f:
+            f.write("not-a-stamp")
+        assert pending("s1") == [sources[0]]
+
+
+class TestFlush:
+    """Test one ruff call per flush."""
+
+    def test_flush_formats_all_files_at_once(self, runtime, sources, fake_uvx):
+        for path in sources + sources:
+            enqueue("s1", path)
+        assert flush("s1") == "Formatted 3 file(s): 3 files reformatted"
+        assert fake_uvx.read_text().splitlines() == [f"ruff format {' '.join(sources)}"]
+        assert flush("s1") is None
+
+
+def run_hook(payload: dict, env: dict) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, str(FORMAT_HOOK)],
+        input=json.dumps(payload),
+        capture_output=True,
+        text=True,
+        env=env,
+    )
+
+
+def edit(path: str, session: str = "s1") -> dict:
+    return {
+        "hook_event_name": "PostToolUse",
+        "session_id": session,
+        "transcript_path": "/tmp/transcript.jsonl",
+        "cwd": "/tmp",
+        "tool_name": "Edit",
+        "tool_input": {"file_path": path},
+        "tool_response": {},
+    }
+
+
+def stop(event: str = "Stop", session: str = "s1") -> dict:
+    return {
+        "hook_event_name": event,
+        "session_id": session,
+        "transcript_path": "/tmp/transcript.jsonl",
+        "cwd": "/tmp",
+        "stop_hook_active": False,
+    }
+
+
+class TestHook:
+    """Test the python-format hook in both modes."""
+
+    @pytest.fixture
+    def env(self, runtime, fake_uvx):
+        return {k: v for k, v in os.environ.items() if not k.startswith("PYTHON")}
+
+    def test_immediate_mode_formats_each_edit(self, env, sources, fake_uvx):
+        result = run_hook(edit(sources[0]), env)
+        assert result.returncode == 0
+        assert result.stdout.strip() == f"Formatted: {sources[0]}"
+        assert run_hook(stop(), env).stdout == ""
+        assert fake_uvx.read_text().splitlines() == [f"ruff format {sources[0]}"]
+
+    def test_batch_mode_flushes_at_stop(self, env, sources, fake_uvx):
+        env["GUARDS_FORMAT_BATCH"] = "1"
+        a, b, _c = sources
+        for path in (a, b, a):
+            assert (
+                run_hook(edit(path), env).stdout.strip()
+                == f"Queued for formatting: {path}"
+            )
+        assert not fake_uvx.exists()
+
+        result = run_hook(stop("SubagentStop"), env)
+        assert result.returncode == 0
+        assert result.stdout.startswith("Formatted 2 file(s)")
+        assert fake_uvx.read_text().splitlines() == [f"ruff format {a} {b}"]
+        assert run_hook(stop(), env).stdout == ""
+
+    def test_batch_threshold_flushes_early(self, env, sources, fake_uvx):
+        env.update(GUARDS_FORMAT_BATCH="1", GUARDS_FORMAT_BATCH_MAX_FILES="2")
+        run_hook(edit(sources[0]), env)
+        assert run_hook(edit(sources[1]), env).stdout.startswith("Formatted 2 file(s)")
+        assert len(fake_uvx.read_text().splitlines()) == 1
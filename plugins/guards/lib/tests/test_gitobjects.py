@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""Tests for reading refs and objects without the git CLI, compared to git."""
+
+import importlib.util
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from guardkit.gitobjects import (
+    Repository,
+    UnsupportedRepositoryError,
+    apply_delta,
+    commit_subject,
+    find_git_dir,
+    head_commit,
+)
+
+LIB_DIR = Path(__file__).resolve().parents[1]
+
+POST_VALIDATE = (
+    LIB_DIR.parent / "policy/conventional-commits/hooks/post_validate_commit.py"
+)
+
+GIT_ENV = {
+    "GIT_AUTHOR_NAME": "Test",
+    "GIT_AUTHOR_EMAIL": "test@example.com",
+    "GIT_COMMITTER_NAME": "Test",
+    "GIT_COMMITTER_EMAIL": "test@example.com",
+}
+
+
+def git(repo: Path, *args: str) -> str:
+    env = {k: v for k, v in os.environ.items() if not k.startswith("GIT_")} | GIT_ENV
+    result = subprocess.run(
+        ["git", "-c", "init.defaultBranch=main", *args],
+        cwd=repo,
+        env=env,
+        capture_output=True,
+        check=True,
+    )
+    return result.stdout.decode("utf-8", errors="replace").strip()
+
+
+def commit(repo: Path, message: str, lines: int = 200) -> None:
+    # Similar file contents across commits make git gc store deltas
+    (repo / "data.txt").write_text("".join(f"line {i}\n" for i in range(lines)))
+    git(repo, "add", "data.txt")
+    git(repo, "commit", "-q", "-m", message)
+
+
+def git_head(repo: Path) -> tuple[str, str]:
+    commit_hash, _, subject = git(repo, "log", "-1", "--format=%H%n%s").partition("\n")
+    return commit_hash, subject
+
+
+@pytest.fixture
+def repo(tmp_path):
+    path = tmp_path / "repo"
+    path.mkdir()
+    git(path, "init", "-q")
+    for i in range(12):
+        commit(path, f"feat: change {i}\n\nbody {i}", lines=200 + i)
+    return path
+
+
+def assert_objects_match_git(repo: Path) -> None:
+    reader = Repository.discover(str(repo))
+    for line in git(
+        repo, "cat-file", "--batch-all-objects", "--batch-check"
+    ).splitlines():
+        sha, kind, _size = line.split()
+        raw = subprocess.run(
+            ["git", "cat-file", kind, sha], cwd=repo, capture_output=True
+        )
+        assert reader.read_object(sha) == (kind, raw.stdout), sha
+
+
+class TestHead:
+    """HEAD's hash and subject match git log."""
+
+    def test_loose(self, repo):
+        assert head_commit(str(repo)) == git_head(repo)
+
+    def test_from_subdirectory(self, repo):
+        (repo / "pkg").mkdir()
+        assert head_commit(str(repo / "pkg")) == git_head(repo)
+
+    def test_packed_refs_and_objects(self, repo):
+        git(repo, "gc", "-q", "--aggressive")
+        assert not (repo / ".git/refs/heads/main").exists()
+        assert head_commit(str(repo)) == git_head(repo)
+
+    def test_detached(self, repo):
+        git(repo, "checkout", "-q", "HEAD~3")
+        assert head_commit(str(repo)) == git_head(repo)
+
+    def test_symbolic_ref_chain(self, repo):
+        git(repo, "symbolic-ref", "refs/heads/alias", "refs/heads/main")
+        git(repo, "symbolic-ref", "HEAD", "refs/heads/alias")
+        assert head_commit(str(repo)) == git_head(repo)
+
+    def test_worktree(self, repo, tmp_path):
+        git(repo, "worktree", "add", "-q", "-b", "side", str(tmp_path / "side"))
+        commit(tmp_path / "side", "fix: on the side")
+        assert head_commit(str(tmp_path / "side")) == git_head(tmp_path / "side")
+        assert head_commit(str(repo)) == git_head(repo)
+
+    def test_unborn_branch(self, tmp_path):
+        git(tmp_path, "init", "-q")
+        assert head_commit(str(tmp_path)) is None
+
+    def test_multiline_subject(self, repo):
+        commit(repo, "feat: first line\nsecond line\n\nbody")
+        assert head_commit(str(repo))[1] == "feat: first line second line"
+        assert head_commit(str(repo)) == git_head(repo)
+
+    def test_subject_keeps_leading_spaces(self, repo):
+        commit(repo, "   feat: indented  \n\tsecond line \n\nbody")
+        assert head_commit(str(repo))[1] == "   feat: indented \tsecond line"
+        assert head_commit(str(repo)) == git_head(repo)
+
+
+class TestObjects:
+    """Every object reads back like git cat-file."""
+
+    def test_loose_objects(self, repo):
+        assert_objects_match_git(repo)
+
+    def test_packed_and_deltified(self, repo):
+        git(repo, "gc", "-q", "--aggressive")
+        verify = git(
+            repo, "verify-pack", "-v", *map(str, repo.glob(".git/objects/pack/*.idx"))
+        )
+        # Lines of deltified objects carry a depth and a base name
+        assert any(len(line.split()) == 7 for line in verify.splitlines())
+        assert_objects_match_git(repo)
+
+    def test_apply_delta(self):
+        # Source size 5, target size 7: copy base[0:5], insert "!!"
+        delta = bytes([5, 7, 0x90, 5, 2]) + b"!!"
+        assert apply_delta(b"hello", delta) == b"hello!!"
+
+    def test_commit_subject_skips_signature(self):
+        content = (
+            b"tree 0000\ngpgsig -----BEGIN PGP SIGNATURE-----\n \n abc\n"
+            b" -----END PGP SIGNATURE-----\n\nfix: signed\n\nbody\n"
+        )
+        assert commit_subject(content) == "fix: signed"
+
+
+class TestUnsupported:
+    """Layouts left to the git CLI raise UnsupportedRepositoryError."""
+
+    def test_git_dir_environment(self, repo, monkeypatch):
+        monkeypatch.setenv("GIT_DIR", str(repo / ".git"))
+        with pytest.raises(UnsupportedRepositoryError):
+            find_git_dir(str(repo))
+
+    def test_reftable(self, repo):
+        git(repo, "config", "extensions.refStorage", "reftable")
+        with pytest.raises(UnsupportedRepositoryError):
+            head_commit(str(repo))
+
+    def test_object_only_in_alternate(self, repo, tmp_path):
+        clone = tmp_path / "clone"
+        git(tmp_path, "clone", "-q", "--shared", str(repo), str(clone))
+        assert (clone / ".git/objects/info/alternates").exists()
+        with pytest.raises(UnsupportedRepositoryError):
+            head_commit(str(clone))
+
+
+@pytest.fixture
+def post_validate():
+    spec = importlib.util.spec_from_file_location("post_validate_commit", POST_VALIDATE)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class TestPostValidateCommit:
+    """The conventional-commits PostToolUse hook reads HEAD with and without git."""
+
+    def test_reads_files(self, post_validate, repo, monkeypatch):
+        expected = git_head(repo)
+        monkeypatch.chdir(repo)
+        monkeypatch.setattr(post_validate.subprocess, "run", None)  # No git process
+        assert post_validate.get_latest_commit() == expected
+
+    def test_falls_back_to_git(self, post_validate, repo, monkeypatch):
+        monkeypatch.chdir(repo)
+        monkeypatch.setenv("GIT_DIR", str(repo / ".git"))
+        assert post_validate.get_latest_commit() == git_head(repo)
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""Tests for the guard daemon and its thin client."""
+
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from guardkit.daemon import GuardRegistry, GuardServer
+
+LIB_DIR = Path(__file__).resolve().parents[1]
+
+GUARDS_DIR = LIB_DIR.parent
+SAFETY_BASH = GUARDS_DIR / "security/safety-guard/hooks/safety_guard_bash.py"
+POST_VALIDATE = GUARDS_DIR / "policy/conventional-commits/hooks/post_validate_commit.py"
+
+
+def bash_payload(command: str) -> dict:
+    return {
+        "hook_event_name": "PreToolUse",
+        "tool_name": "Bash",
+        "tool_input": {"command": command},
+    }
+
+
+@pytest.fixture
+def server(runtime):
+    srv = GuardServer(str(runtime / "guardd.sock"), GuardRegistry(), idle_timeout=0.5)
+    thread = threading.Thread(target=srv.serve_until_idle, daemon=True)
+    thread.start()
+    yield srv, thread
+    thread.join(timeout=5)
+    srv.server_close()
+
+
+def ask(sock_path: Path, request: dict) -> dict:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(str(sock_path))
+        sock.sendall(json.dumps(request).encode() + b"\n")
+        return json.loads(sock.makefile("rb").readline())
+
+
+class TestGuardRegistry:
+    """Test in-process guard evaluation."""
+
+    def test_blocks_dangerous_command(self):
+        response = GuardRegistry().evaluate(
+            {"script": str(SAFETY_BASH), "payload": bash_payload("rm -rf /")}
+        )
+        assert response["status"] == "ok"
+        assert "rm -rf" in response["reason"]
+
+    def test_allows_safe_command(self):
+        response = GuardRegistry().evaluate(
+            {"script": str(SAFETY_BASH), "payload": bash_payload("ls -la")}
+        )
+        assert response == {"status": "ok", "reason": None}
+
+    def test_module_is_cached(self):
+        registry = GuardRegistry()
+        assert registry.load(str(SAFETY_BASH)) is registry.load(str(SAFETY_BASH))
+
+    def test_script_without_check_falls_back(self):
+        response = GuardRegistry().evaluate(
+            {"script": str(POST_VALIDATE), "payload": bash_payload("ls")}
+        )
+        assert response["status"] == "fallback"
+
+    def test_script_outside_guards_root_falls_back(self, tmp_path):
+        rogue = tmp_path / "rogue.py"
+        rogue.write_text("def check(tool_name, tool_input):\n    return 'x'\n")
+        response = GuardRegistry().evaluate(
+            {"script": str(rogue), "payload": bash_payload("ls")}
+        )
+        assert response["status"] == "fallback"
+
+    def test_non_pretooluse_event_falls_back(self):
+        payload = bash_payload("rm -rf /") | {"hook_event_name": "PostToolUse"}
+        response = GuardRegistry().evaluate(
+            {"script": str(SAFETY_BASH), "payload": payload}
+        )
+        assert response["status"] == "fallback"
+
+
+class TestGuardServer:
+    """Test the socket protocol and idle shutdown."""
+
+    def test_round_trip(self, server, runtime):
+        response = ask(
+            runtime / "guardd.sock",
+            {"script": str(SAFETY_BASH), "payload": bash_payload("rm -rf /")},
+        )
+        assert response["status"] == "ok"
+        assert response["reason"]
+
+    def test_socket_is_private(self, server, runtime):
+        assert (runtime / "guardd.sock").stat().st_mode & 0o077 == 0
+
+    def test_invalid_request(self, server, runtime):
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(str(runtime / "guardd.sock"))
+            sock.sendall(b"not json\n")
+            response = json.loads(sock.makefile("rb").readline())
+        assert response["status"] == "error"
+
+    def test_exits_when_idle(self, server):
+        _, thread = server
+        thread.join(timeout=5)
+        assert not thread.is_alive()
+
+
+class TestGuardClient:
+    """Test the client end to end against a running server."""
+
+    def run_client(self, command: str) -> subprocess.CompletedProcess:
+        return subprocess.run(
+            [sys.executable, "-S", str(LIB_DIR / "guard_client.py"), str(SAFETY_BASH)],
+            input=json.dumps(bash_payload(command)),
+            capture_output=True,
+            text=True,
+            env=os.environ | {"GUARDD_AUTOSTART": "0"},
+            check=False,
+        )
+
+    def test_client_blocks(self, server):
+        result = self.run_client("rm -rf /")
+        assert result.returncode == 2
+        assert "rm -rf" in result.stderr
+
+    def test_client_allows(self, server):
+        result = self.run_client("ls -la")
+        assert result.returncode == 0
+        assert result.stderr == ""
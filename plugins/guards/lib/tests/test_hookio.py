@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""Tests for the stdlib-only hook input fast path."""
+
+import io
+import json
+import sys
+from functools import partial
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from guardkit import hookio
+from guardkit.hookio import HookInput, run_pretooluse, skip_unless
+
+
+def payload(tool_name: str = "Bash", event: str = "PreToolUse", **tool_input) -> str:
+    return json.dumps(
+        {
+            "hook_event_name": event,
+            "session_id": "test",
+            "transcript_path": "/tmp/transcript.jsonl",
+            "cwd": "/tmp",
+            "tool_name": tool_name,
+            "tool_input": tool_input,
+        }
+    )
+
+
+@pytest.fixture
+def stdin(monkeypatch):
+    """Feed a payload to the hook as stdin."""
+
+    def feed(raw: str) -> None:
+        monkeypatch.setattr(hookio, "_INPUT", None)
+        monkeypatch.setattr(sys, "stdin", io.StringIO(raw))
+
+    return feed
+
+
+def exit_code(func, *args, **kwargs) -> int:
+    with pytest.raises(SystemExit) as exc:
+        func(*args, **kwargs)
+    return exc.value.code
+
+
+class TestHookInput:
+    """Test payload decoding."""
+
+    def test_fields(self):
+        hook = HookInput(payload("Bash", command="git status"))
+        assert hook.tool_name == "Bash"
+        assert hook.text("command") == "git status"
+        assert hook.text("missing") == ""
+        assert hook.is_event("PreToolUse")
+        assert not hook.is_event("PostToolUse")
+
+    def test_invalid_json(self):
+        hook = HookInput("not json")
+        assert hook.data is None
+        assert hook.tool_name == ""
+        assert not hook.is_event("PreToolUse")
+
+    def test_non_string_field(self):
+        assert HookInput(payload("Bash", command=["ls"])).text("command") == ""
+
+    def test_cwd(self):
+        assert HookInput(payload("Bash", command="ls")).cwd == "/tmp"
+        raw = json.loads(payload("Bash", command="ls"))
+        assert HookInput(json.dumps({**raw, "cwd": "relative"})).cwd is None
+        assert HookInput("not json").cwd is None
+
+    def test_stdin_read_once(self, stdin):
+        stdin(payload("Bash", command="ls"))
+        assert hookio.read_hook_input() is hookio.read_hook_input()
+
+
+class TestSkipUnless:
+    """Test the early exits."""
+
+    def test_other_tool_exits(self, stdin):
+        stdin(payload("Read", file_path="/tmp/x"))
+        assert exit_code(skip_unless, "PreToolUse", {"Bash"}) == 0
+
+    def test_missing_keyword_exits(self, stdin):
+        stdin(payload("Bash", command="ls -la"))
+        assert exit_code(skip_unless, "PreToolUse", {"Bash"}, keywords=("gh",)) == 0
+
+    def test_keyword_is_case_insensitive(self, stdin):
+        stdin(payload("Bash", command="GH api repos/o/r"))
+        hook = skip_unless("PreToolUse", {"Bash"}, keywords=("gh",))
+        assert hook.tool_name == "Bash"
+
+    def test_other_field(self, stdin):
+        stdin(payload("Write", event="PostToolUse", file_path="/src/app.py"))
+        hook = skip_unless(
+            "PostToolUse", {"Write"}, keywords=(".py",), field="file_path"
+        )
+        assert hook.text("file_path") == "/src/app.py"
+
+    def test_other_event_goes_through_cchooks(self, stdin):
+        raw = json.loads(payload("Bash", event="PostToolUse", command="gh api x"))
+        stdin(json.dumps({**raw, "tool_response": {"stdout": ""}}))
+        assert exit_code(skip_unless, "PreToolUse", {"Bash"}, keywords=("gh",)) == 0
+
+    def test_invalid_payload_goes_through_cchooks(self, stdin):
+        from cchooks.exceptions import CCHooksError
+
+        stdin("not json")
+        with pytest.raises(CCHooksError):
+            skip_unless("PreToolUse", {"Bash"})
+
+
+class TestRunPreToolUse:
+    """Test running a guard's check()."""
+
+    def test_allow(self, stdin):
+        stdin(payload("Bash", command="ls"))
+        assert exit_code(run_pretooluse, lambda tool_name, tool_input: None) == 0
+
+    def test_block(self, stdin, capsys):
+        stdin(payload("Bash", command="rm -rf /"))
+        assert (
+            exit_code(run_pretooluse, lambda tool_name, tool_input: "BLOCKED: rm") == 2
+        )
+        assert "BLOCKED: rm" in capsys.readouterr().err
+
+    def test_check_receives_tool_input(self, stdin):
+        seen = []
+        stdin(payload("Bash", command="git push"))
+        exit_code(run_pretooluse, lambda tool_name, tool_input: seen.append(tool_input))
+        assert seen == [{"command": "git push"}]
+
+    def test_check_receives_cwd(self, stdin):
+        seen = []
+
+        def check(tool_name, tool_input, cache=None, cwd=None):
+            seen.append((cache, cwd))
+
+        stdin(payload("Bash", command="ls"))
+        exit_code(run_pretooluse, partial(check, cache="cache"))
+        assert seen == [("cache", "/tmp")]
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""Tests for the linear-time pattern engine."""
+
+import random
+import re
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from guardkit import linear
+from guardkit.prefilter import LiteralIndex
+
+# Patterns covering every supported construct, matched against short random
+# texts over a small alphabet so that edge cases come up often
+DIFFERENTIAL_PATTERNS = [
+    r"a",
+    r"ab|cd",
+    r"^ab",
+    r"ab$",
+    r"\bgit\s+push\b",
+    r"x*",
+    r"(a|b)*c",
+    r"^$",
+    r"\Bb",
+    r"a.b",
+    r"[^a-c]+d",
+    r"(?i)AB",
+    r"(?m)^b",
+    r"(?m)a$",
+    r"a\Z",
+    r"\Aab",
+    r"a{2,3}b",
+    r"(ab){0,2}c",
+    r"a?",
+    r"\b",
+    r"[\w-]+=",
+    r"(?s)a.b",
+    r"c.*?d",
+    r"-" + linear.not_followed_by("-a", "b"),
+]
+ALPHABET = "abcd \n-=_"
+
+
+def random_texts(count: int, seed: int = 1):
+    rng = random.Random(seed)
+    for _ in range(count):
+        yield "".join(rng.choice(ALPHABET) for _ in range(rng.randint(0, 8)))
+
+
+class TestAgreesWithRe:
+    """Linear patterns answer exactly like re for search and match."""
+
+    @pytest.mark.parametrize("source", DIFFERENTIAL_PATTERNS)
+    def test_search_and_match(self, source):
+        expected, actual = re.compile(source), linear.compile(source)
+        for text in random_texts(2_000):
+            found, linear_found = expected.search(text), actual.search(text)
+            assert bool(found) == bool(linear_found), (source, text)
+            if found:
+                assert found.start() == linear_found.start(), (source, text)
+            assert bool(expected.match(text)) == bool(actual.match(text)), (
+                source,
+                text,
+            )
+
+    def test_match_object(self):
+        match = linear.compile(r"b+c").search("aabbbcbc")
+        assert match.span() == (2, 6)
+        assert match.group() == "bbbc"
+        assert match.group(0) == match.string[match.start() : match.end()]
+
+    def test_flags_from_pattern(self):
+        pattern = linear.compile(r"(?i)git", re.MULTILINE)
+        assert pattern.flags & re.IGNORECASE
+        assert pattern.flags & re.MULTILINE
+
+
+class TestUnsupported:
+    """Backtracking-only features are rejected when the pattern is compiled."""
+
+    @pytest.mark.parametrize(
+        ("source", "feature"),
+        [
+            (r"git(?=\s)", "lookahead"),
+            (r"(?<!x)y", "negative lookbehind"),
+            (r"(a)\1", "backreference"),
+            (r"(?>a)b", "atomic group"),
+            (r"a++", "possessive repeat"),
+            (r"a{0,1000}", "counted repeat {0,1000}"),
+        ],
+    )
+    def test_error_names_feature(self, source, feature):
+        with pytest.raises(
+            linear.UnsupportedPatternError, match=re.escape(feature)
+        ) as error:
+            linear.compile(source)
+        assert error.value.pattern == source
+        assert isinstance(error.value, ValueError)
+
+    def test_literal_index_rejects_at_load_time(self):
+        with pytest.raises(linear.UnsupportedPatternError):
+            LiteralIndex([(r"rm(?!\s+-i)", "rm")], linear=True)
+
+
+class TestNotFollowedBy:
+    """not_followed_by is the regular replacement for a negative lookahead."""
+
+    @pytest.mark.parametrize(
+        "words", [("-staged",), ("-abort", "-continue", "-skip"), ("=",)]
+    )
+    def test_matches_lookahead(self, words):
+        lookahead = re.compile("-(?!" + "|".join(map(re.escape, words)) + ")")
+        replacement = linear.compile("-" + linear.not_followed_by(*words))
+        rng = random.Random(2)
+        texts = [f"-{word}" for word in words] + [f"-{word[:-1]}" for word in words]
+        texts += [
+            "".join(rng.choice("-=abcegkinorstu") for _ in range(9))
+            for _ in range(2_000)
+        ]
+        for text in texts:
+            assert bool(lookahead.search(text)) == bool(replacement.search(text)), text
+
+    def test_rejects_empty_word(self):
+        with pytest.raises(ValueError):
+            linear.not_followed_by("abort", "")
+
+
+class TestLinearTime:
+    """Inputs that make re backtrack quadratically stay linear."""
+
+    def test_lazy_dot_near_miss(self):
+        pattern = linear.compile(r"find\s+.*?-delete", re.DOTALL)
+        text = "find " * 20_000
+        start = time.perf_counter()
+        assert pattern.search(text) is None
+        assert time.perf_counter() - start < 1.0
+
+    def test_state_cache_is_bounded(self):
+        pattern = linear.compile(r"(a|b)*a[ab]{12}c")
+        text = "".join(random.Random(3).choice("ab") for _ in range(50_000))
+        assert pattern.search(text) is None
+        assert len(pattern._searcher.states) <= linear.MAX_CACHED_STATES
+
+
+class TestParserFallback:
+    """The engine reads re's private parser only on the versions it is tested on."""
+
+    def test_engine_on_supported_versions(self):
+        supported = sys.version_info[:2] in linear.SUPPORTED_VERSIONS
+        assert linear.AVAILABLE is supported
+        assert isinstance(linear.compile("a"), linear.LinearPattern) is supported
+
+    def test_missing_parser_falls_back_to_re(self):
+        script = """
+import re, sys
+sys.modules["re._parser"] = None
+from guardkit import linear
+from guardkit.prefilter import LiteralIndex, required_literals
+assert not linear.AVAILABLE
+assert isinstance(linear.compile(r"git(?=\\s)"), re.Pattern)
+assert required_literals("rm") is None
+index = LiteralIndex([(r"rm\\s+-rf", "rm"), (r"git\\s+push", "push")], linear=True)
+assert index.first("ls; rm -rf /") == "rm"
+assert index.first("ls -la") is None
+"""
+        lib = Path(__file__).resolve().parents[1]
+        result = subprocess.run(
+            [sys.executable, "-c", script],
+            cwd=lib,
+            capture_output=True,
+            text=True,
+            check=False,
+        )
+        assert result.returncode == 0, result.stderr
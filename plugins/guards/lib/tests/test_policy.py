@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""Tests for declarative guard policies, their overlays and cached artifacts."""
+
+import importlib.util
+import os
+import sys
+import tomllib
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from guardkit import policy as policy_module
+from guardkit.policy import (
+    Layer,
+    PolicyError,
+    artifact_path,
+    compile_policy,
+    config_files,
+    load_policy,
+    policy_layers,
+)
+
+LIB_DIR = Path(__file__).resolve().parents[1]
+
+GUARDS_DIR = LIB_DIR.parent
+SAFETY_BASH = GUARDS_DIR / "security/safety-guard/hooks/safety_guard_bash.py"
+GIT_SAFETY = GUARDS_DIR / "security/git-safety-guard/hooks/git_safety_guard.py"
+
+SHIPPED = """\
+project_extends = ["blocked"]
+words = ["cat", "head"]
+
+[blocked]
+flags = ["IGNORECASE"]
+
+[[blocked.rules]]
+id = "drop"
+pattern = 'drop\\s+table'
+reason = "drops a table"
+
+[[blocked.rules]]
+id = "truncate"
+pattern = 'truncate\\s+table'
+reason = "truncates a table"
+
+[safe]
+patterns = ['^select\\b']
+"""
+
+
+def load(path: Path):
+    spec = importlib.util.spec_from_file_location(path.stem, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture
+def dirs(tmp_path, monkeypatch, runtime):
+    """Return (hooks, user, project) directories with the shipped test policy."""
+    hooks, user, project = tmp_path / "hooks", tmp_path / "user", tmp_path / "project"
+    for directory in (hooks, user, project / ".claude"):
+        directory.mkdir(parents=True)
+    (hooks / "db.policy.toml").write_text(SHIPPED)
+    monkeypatch.setenv("GUARDS_CONFIG_DIR", str(user))
+    monkeypatch.setattr(policy_module, "_loaded", {})
+    return hooks, user, project
+
+
+def touch(path: Path, text: str) -> None:
+    """Write ``text`` with a fresh mtime, whatever the filesystem's resolution."""
+    mtime = path.stat().st_mtime_ns + 10**9 if path.exists() else None
+    path.write_text(text)
+    if mtime:
+        os.utime(path, ns=(mtime, mtime))
+
+
+class TestMerge:
+    """Test merging overlays over a shipped policy."""
+
+    def test_shipped(self, dirs):
+        hooks, _, project = dirs
+        policy = load_policy("db", str(hooks), str(project))
+        assert policy.list("words") == ["cat", "head"]
+        assert policy.pairs("blocked") == [
+            (r"drop\s+table", "drops a table"),
+            (r"truncate\s+table", "truncates a table"),
+        ]
+        assert policy.patterns("safe") == [r"^select\b"]
+        assert policy.index("blocked").first("DROP  TABLE users") == "drops a table"
+        assert policy.index("safe").any("select 1")
+
+    def test_user_overlay(self, dirs):
+        hooks, user, project = dirs
+        (user / "db.policy.toml").write_text(
+            'words = ["less", "cat"]\n'
+            '[[blocked.rules]]\nid = "drop"\npattern = "drop\\\\s+database"\nreason = "db"\n'
+            '[[blocked.rules]]\nid = "truncate"\nenabled = false\n'
+        )
+        policy = load_policy("db", str(hooks), str(project))
+        assert policy.list("words") == ["cat", "head", "less"]
+        assert policy.pairs("blocked") == [(r"drop\s+database", "db")]
+
+    def test_project_overlay_is_additive(self, dirs, capsys):
+        hooks, _, project = dirs
+        (project / ".claude/db.policy.toml").write_text(
+            '[[blocked.rules]]\nid = "delete"\npattern = "delete\\\\s+from"\n'
+        )
+        policy = load_policy("db", str(hooks), str(project))
+        assert policy.pairs("blocked")[-1] == (r"delete\s+from", r"delete\s+from")
+
+        overlay = '[[blocked.rules]]\nid = "drop"\nenabled = false\n'
+        touch(project / ".claude/db.policy.toml", overlay)
+        policy = load_policy("db", str(hooks), str(project))
+        assert len(policy.pairs("blocked")) == 2
+        assert "project policies cannot" in capsys.readouterr().err
+
+    @pytest.mark.parametrize(
+        ("hooks_dir", "name", "overlay"),
+        [
+            (
+                "security/safety-guard/hooks",
+                "safety-guard-bash",
+                "[safe]\npatterns = ['rm']",
+            ),
+            (
+                "security/git-safety-guard/hooks",
+                "git-safety-guard",
+                "[safe]\npatterns = ['git']",
+            ),
+            (
+                "policy/conventional-commits/hooks",
+                "conventional-commits",
+                "[safe_argument_commands]\npatterns = ['^git']",
+            ),
+            (
+                "policy/conventional-commits/hooks",
+                "conventional-commits",
+                "[other_commit_commands]\npatterns = ['git\\s+commit']",
+            ),
+            (
+                "policy/gemini-model-guard/hooks",
+                "gemini-model-guard",
+                "allowed_models = ['gemini-2.0-flash']",
+            ),
+            ("pipeline/hooks", "fast-lane", "commands = ['rm *']"),
+            (
+                "security/protect-env/hooks",
+                "protect-env",
+                "file_reading_commands = ['(']",
+            ),
+            (
+                "security/safety-guard/hooks",
+                "safety-guard-bash",
+                "project_extends = ['safe']",
+            ),
+        ],
+    )
+    def test_project_overlay_cannot_extend_allowing_entries(
+        self, dirs, tmp_path, hooks_dir, name, overlay
+    ):
+        _, _, project = dirs
+        shipped = compile_policy(name, policy_layers(name, str(GUARDS_DIR / hooks_dir)))
+        layer = Layer(str(project / f".claude/{name}.policy.toml"), additive=True)
+        data = tomllib.loads(overlay)
+        with pytest.raises(PolicyError, match="can only extend blocking entries"):
+            policy_module._merge(data, layer, dict(shipped.lists), {}, base=False)
+
+    @pytest.mark.parametrize(
+        "overlay",
+        [
+            "words = [",
+            "other = ['x']",
+            "[blocked]\nflags = ['DOTALL']",
+            "[[blocked.rules]]\nid = 'x'\npattern = '(a)\\1'",
+            "[[blocked.rules]]\npattern = 'x'",
+        ],
+    )
+    def test_invalid_overlay_skipped(self, dirs, capsys, overlay):
+        hooks, user, project = dirs
+        (user / "db.policy.toml").write_text(overlay)
+        policy = load_policy("db", str(hooks), str(project))
+        assert len(policy.pairs("blocked")) == 2
+        assert "ignoring policy overlay" in capsys.readouterr().err
+
+    def test_invalid_shipped_policy_raises(self, dirs):
+        hooks, _, project = dirs
+        (hooks / "db.policy.toml").write_text("[blocked]\npatterns = ['(']\n")
+        with pytest.raises(PolicyError, match="db.policy.toml|blocked"):
+            compile_policy("db", policy_layers("db", str(hooks), str(project)))
+        with pytest.raises(PolicyError, match="not found"):
+            compile_policy(
+                "missing", policy_layers("missing", str(hooks), str(project))
+            )
+
+
+class TestArtifact:
+    """Test reusing compiled policies across processes and reloading on change."""
+
+    def test_artifact_reused(self, dirs, monkeypatch):
+        hooks, _, project = dirs
+        first = load_policy("db", str(hooks), str(project))
+        layers = policy_layers("db", str(hooks), str(project))
+        assert os.path.exists(artifact_path("db", layers))
+
+        # A new process compiles nothing: no regex is parsed to load the policy
+        monkeypatch.setattr(policy_module, "_loaded", {})
+        monkeypatch.setattr(policy_module, "compile_policy", None)
+        second = load_policy("db", str(hooks), str(project))
+        assert second is not first
+        assert second.pairs("blocked") == first.pairs("blocked")
+        assert second.index("blocked").first("drop table t") == "drops a table"
+
+    def test_reloaded_when_changed(self, dirs):
+        hooks, _, project = dirs
+        first = load_policy("db", str(hooks), str(project))
+        assert load_policy("db", str(hooks), str(project)) is first
+        touch(hooks / "db.policy.toml", SHIPPED.replace("drops a table", "gone"))
+        policy = load_policy("db", str(hooks), str(project))
+        assert policy.index("blocked").first("drop table t") == "gone"
+
+    def test_config_files(self, dirs):
+        hooks, user, project = dirs
+        (user / "gh-api-routes.json").write_text("{}")
+        (project / ".claude/db.policy.toml").write_text("")
+        found = config_files([str(hooks / "db.py")], str(project))
+        assert {os.path.basename(path) for path in found} == {
+            "db.policy.toml",
+            "gh-api-routes.json",
+        }
+        assert len(found) == 3
+
+
+def test_hook_honors_project_overlay(tmp_path, monkeypatch, runtime):
+    project = tmp_path / "project"
+    (project / ".claude").mkdir(parents=True)
+    monkeypatch.setenv("GUARDS_CONFIG_DIR", str(tmp_path / "user"))
+    guard = load(SAFETY_BASH)
+    command = {"command": "terraform destroy -auto-approve"}
+    assert guard.check("Bash", command, cwd=str(project)) is None
+
+    (project / ".claude/safety-guard-bash.policy.toml").write_text(
+        '[[blocked.rules]]\nid = "terraform-destroy"\n'
+        'pattern = "terraform\\\\s+destroy"\nreason = "terraform destroy is blocked here"\n'
+    )
+    assert "terraform destroy" in guard.check("Bash", command, cwd=str(project))
+    assert guard.check("Bash", command, cwd=str(tmp_path)) is None
+
+
+@pytest.mark.parametrize(
+    ("path", "overlay", "commands"),
+    [
+        (SAFETY_BASH, "[safe]\npatterns = ['rm']\n", ["rm -rf /"]),
+        (
+            GIT_SAFETY,
+            "[safe]\npatterns = ['git']\n",
+            ["git push --force origin main", "git reset --hard"],
+        ),
+    ],
+)
+def test_project_safe_patterns_do_not_unblock(
+    tmp_path, monkeypatch, runtime, path, overlay, commands
+):
+    project = tmp_path / "project"
+    (project / ".claude").mkdir(parents=True)
+    monkeypatch.setenv("GUARDS_CONFIG_DIR", str(tmp_path / "user"))
+    guard = load(path)
+    (project / ".claude" / f"{guard.POLICY_NAME}.policy.toml").write_text(overlay)
+    for command in commands:
+        assert guard.check("Bash", {"command": command}, cwd=str(project))
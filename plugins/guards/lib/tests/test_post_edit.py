@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""Tests for the format-then-typecheck post-edit pipeline."""
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from guardkit import post_edit
+from guardkit.post_edit import ast_fingerprint, format_report, process_file
+
+LIB_DIR = Path(__file__).resolve().parents[1]
+
+POST_EDIT_HOOK = LIB_DIR.parent / "pipeline/hooks/post_edit_pipeline.py"
+
+
+def calls(log: Path, tool: str) -> list[str]:
+    return [line for line in log.read_text().splitlines() if line.startswith(tool)]
+
+
+class TestFingerprint:
+    """Test AST fingerprints."""
+
+    def test_layout_and_comments_do_not_count(self):
+        reformatted = "# note\nx = [\n    1,\n    2,\n]\n"
+        assert ast_fingerprint("x = [1,2]\n") == ast_fingerprint(reformatted)
+
+    def test_code_changes_count(self):
+        assert ast_fingerprint("x = 1\n") != ast_fingerprint("x = 2\n")
+
+    def test_syntax_error(self):
+        assert ast_fingerprint("def (:\n") is None
+
+
+class TestProcessFile:
+    """Test formatting then type-checking one file."""
+
+    def test_formats_before_type_check(self, tmp_path, fake_uvx):
+        module = tmp_path / "mod.py"
+        module.write_text("x = 1   \n")
+        result = process_file(str(module))
+        assert result.formatted
+        assert result.passed
+        assert not result.skipped
+        assert module.read_text() == "x = 1\n"
+        log = fake_uvx.read_text().splitlines()
+        assert log == [f"ruff format {module}", f"pyright {module}"]
+
+    def test_whitespace_only_edit_skips_type_check(self, tmp_path, fake_uvx):
+        module = tmp_path / "mod.py"
+        module.write_text("x = ERROR\n")
+        first = process_file(str(module))
+        assert first.passed is False
+
+        module.write_text("x = ERROR  # same code\n\n")
+        second = process_file(str(module))
+        assert second.skipped
+        assert second.passed is False
+        assert second.typecheck_output == first.typecheck_output
+        assert len(calls(fake_uvx, "pyright")) == 1
+
+        module.write_text("x = 1\n")
+        third = process_file(str(module))
+        assert not third.skipped
+        assert third.passed
+        assert len(calls(fake_uvx, "pyright")) == 2
+
+    def test_config_change_checks_again(self, tmp_path, fake_uvx):
+        (tmp_path / "pyproject.toml").write_text("[tool.pyright]\n")
+        module = tmp_path / "mod.py"
+        module.write_text("x = 1\n")
+        process_file(str(module))
+
+        (tmp_path / "pyproject.toml").write_text(
+            '[tool.pyright]\ntypeCheckingMode = "strict"\n'
+        )
+        assert not process_file(str(module)).skipped
+        assert len(calls(fake_uvx, "pyright")) == 2
+
+    def test_stored_check_expires(self, tmp_path, fake_uvx, monkeypatch):
+        module = tmp_path / "mod.py"
+        module.write_text("x = 1\n")
+        process_file(str(module))
+        assert process_file(str(module)).skipped
+
+        monkeypatch.setattr(post_edit, "STATE_TTL", 0.0)
+        assert not process_file(str(module)).skipped
+        assert len(calls(fake_uvx, "pyright")) == 2
+
+    def test_unparsable_file_is_always_checked(self, tmp_path, fake_uvx):
+        module = tmp_path / "broken.py"
+        module.write_text("def (:\n")
+        process_file(str(module))
+        process_file(str(module))
+        assert len(calls(fake_uvx, "pyright")) == 2
+
+
+class TestRun:
+    """Test the worker pool and the combined report."""
+
+    def test_results_in_input_order(self, tmp_path, fake_uvx):
+        paths = []
+        for i in range(6):
+            path = tmp_path / f"m{i}.py"
+            path.write_text("x = ERROR\n" if i == 3 else f"x = {i}\n")
+            paths.append(str(path))
+        results = post_edit.run(paths + paths[:2], max_workers=4)
+        assert [result.path for result in results] == paths
+        assert [result.passed for result in results] == [
+            True,
+            True,
+            True,
+            False,
+            True,
+            True,
+        ]
+        assert len(calls(fake_uvx, "pyright")) == 6
+
+    def test_report(self, tmp_path, fake_uvx):
+        good, bad = tmp_path / "good.py", tmp_path / "bad.py"
+        good.write_text("x = 1\n")
+        bad.write_text("x = ERROR\n")
+        report = format_report(post_edit.run([str(good), str(bad)]))
+        assert report.splitlines()[:3] == [
+            f"Formatted: {good}",
+            "Type check passed",
+            f"Formatted: {bad}",
+        ]
+        assert f"Type errors:\n{bad}:1:1 - error: fake" in report
+
+    def test_unfinished_check_is_not_remembered(self, tmp_path, fake_uvx, monkeypatch):
+        monkeypatch.setattr(
+            post_edit,
+            "typecheck",
+            lambda path: (None, "Type check did not finish within 60.0s"),
+        )
+        module = tmp_path / "mod.py"
+        module.write_text("x = 1\n")
+        report = format_report(post_edit.run([str(module)]))
+        assert "Type check skipped: Type check did not finish within 60.0s" in report
+        assert not process_file(str(module)).skipped
+
+    def test_repeated_pass_is_not_reported_as_current(self, tmp_path, fake_uvx):
+        module = tmp_path / "mod.py"
+        module.write_text("x = 1\n")
+        post_edit.run([str(module)])
+        report = format_report(post_edit.run([str(module)]))
+        assert "Type check passed" not in report
+        assert "Type check not re-run: code unchanged since it passed" in report
+
+
+def run_hook(payload: dict) -> subprocess.CompletedProcess:
+    env = {k: v for k, v in os.environ.items() if not k.startswith("PYTHON")}
+    payload = {
+        "session_id": "s1",
+        "transcript_path": "/tmp/t",
+        "cwd": "/tmp",
+        **payload,
+    }
+    return subprocess.run(
+        [sys.executable, str(POST_EDIT_HOOK)],
+        input=json.dumps(payload),
+        capture_output=True,
+        text=True,
+        env=env,
+    )
+
+
+def edit(path: Path) -> dict:
+    return {
+        "hook_event_name": "PostToolUse",
+        "tool_name": "Write",
+        "tool_input": {"file_path": str(path)},
+        "tool_response": {},
+    }
+
+
+class TestHook:
+    """Test the post-edit pipeline hook."""
+
+    def test_single_edit(self, tmp_path, fake_uvx):
+        module = tmp_path / "mod.py"
+        module.write_text("x = 1 \n")
+        result = run_hook(edit(module))
+        assert result.returncode == 0, result.stderr
+        assert result.stdout.splitlines() == [
+            f"Formatted: {module}",
+            "Type check passed",
+        ]
+
+    def test_batch_processes_queue_at_stop(self, tmp_path, fake_uvx, monkeypatch):
+        monkeypatch.setenv("GUARDS_FORMAT_BATCH", "1")
+        modules = [tmp_path / "a.py", tmp_path / "b.py"]
+        for module in modules:
+            module.write_text("x = 1\n")
+            assert run_hook(edit(module)).stdout.startswith("Queued")
+        assert not fake_uvx.exists()
+
+        result = run_hook({"hook_event_name": "Stop", "stop_hook_active": False})
+        assert result.returncode == 0, result.stderr
+        assert result.stdout.count("Type check passed") == 2
+        assert len(calls(fake_uvx, "ruff")) == 2
+
+    def test_stop_without_batch_mode_does_nothing(self, fake_uvx):
+        result = run_hook({"hook_event_name": "Stop", "stop_hook_active": False})
+        assert (result.returncode, result.stdout) == (0, "")
@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""Tests for persistent pyright sessions, against a fake language server."""
+
+import os
+import socket
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from guardkit import pyright
+from guardkit.pyright import (
+    PyrightServer,
+    PyrightSession,
+    SessionRegistry,
+    check_file,
+    find_project_root,
+    format_diagnostics,
+    typecheck,
+)
+
+LIB_DIR = Path(__file__).resolve().parents[1]
+
+# Speaks just enough LSP: logs every method to $FAKE_LSP_LOG and reports one
+# error per line containing "ERROR", plus one for an unrelated file
+FAKE_SERVER = r"""
+import json, os, sys
+
+def read():
+    length = None
+    while True:
+        line = sys.stdin.buffer.readline()
+        if not line:
+            sys.exit(0)
+        if not line.strip():
+            break
+        name, _, value = line.partition(b":")
+        if name.lower() == b"content-length":
+            length = int(value)
+    return json.loads(sys.stdin.buffer.read(length))
+
+def send(message):
+    body = json.dumps({"jsonrpc": "2.0", **message}).encode()
+    sys.stdout.buffer.write(b"Content-Length: %d\r\n\r\n" % len(body) + body)
+    sys.stdout.buffer.flush()
+
+def publish(uri, version, text):
+    diagnostics = [
+        {"range": {"start": {"line": i, "character": 4}}, "severity": 1,
+         "message": "bad line", "code": "reportFake"}
+        for i, line in enumerate(text.splitlines()) if "ERROR" in line
+    ]
+    send({"method": "textDocument/publishDiagnostics",
+          "params": {"uri": uri + "_other.py", "diagnostics": [{"severity": 1}]}})
+    send({"method": "textDocument/publishDiagnostics",
+          "params": {"uri": uri, "version": version, "diagnostics": diagnostics}})
+
+while True:
+    message = read()
+    method = message.get("method")
+    with open(os.environ["FAKE_LSP_LOG"], "a") as log:
+        log.write(f"{os.getpid()} {method}\n")
+    if method == "initialize":
+        send({"id": 99, "method": "workspace/configuration", "params": {"items": [{}]}})
+        send({"id": message["id"], "result": {"capabilities": {}}})
+    elif method == "shutdown":
+        send({"id": message["id"], "result": None})
+    elif method == "exit":
+        sys.exit(0)
+    elif method == "textDocument/didOpen":
+        document = message["params"]["textDocument"]
+        publish(document["uri"], document["version"], document["text"])
+    elif method == "textDocument/didChange":
+        params = message["params"]
+        text = params["contentChanges"][0]["text"]
+        publish(params["textDocument"]["uri"], params["textDocument"]["version"], text)
+"""
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    root = tmp_path / "project"
+    (root / "pkg").mkdir(parents=True)
+    (root / "pyproject.toml").write_text("[project]\nname = 'demo'\n")
+    monkeypatch.setenv("FAKE_LSP_LOG", str(tmp_path / "lsp.log"))
+    return root
+
+
+@pytest.fixture
+def command(tmp_path):
+    script = tmp_path / "fake_langserver.py"
+    script.write_text(FAKE_SERVER)
+    return (sys.executable, str(script))
+
+
+def methods(tmp_path: Path) -> list[str]:
+    """Methods the fake server received; "None" is a reply to one of its requests."""
+    return [line.split()[1] for line in (tmp_path / "lsp.log").read_text().splitlines()]
+
+
+def server_pids(tmp_path: Path) -> set[str]:
+    return {line.split()[0] for line in (tmp_path / "lsp.log").read_text().splitlines()}
+
+
+class TestSession:
+    """Test one project's language-server session."""
+
+    def test_diagnostics_for_edited_file_only(self, project, command):
+        module = project / "pkg" / "mod.py"
+        module.write_text("x = 1\ny = ERROR\n")
+        session = PyrightSession(str(project), command)
+        try:
+            (diagnostic,) = session.diagnostics(str(module))
+        finally:
+            session.close()
+        assert diagnostic["range"]["start"]["line"] == 1
+
+    def test_open_then_change(self, project, command, tmp_path):
+        module = project / "pkg" / "mod.py"
+        module.write_text("ERROR\n")
+        session = PyrightSession(str(project), command)
+        try:
+            assert len(session.diagnostics(str(module))) == 1
+            module.write_text("fixed\n")
+            assert session.diagnostics(str(module)) == []
+        finally:
+            session.close()
+        log = methods(tmp_path)
+        # The workspace/configuration request sent during initialize is answered
+        assert log[:3] == ["initialize", "None", "initialized"]
+        assert log.count("initialize") == 1
+        assert log.index("textDocument/didOpen") < log.index("textDocument/didChange")
+        assert log[-2:] == ["shutdown", "exit"]
+
+    def test_restarts_when_config_changes(self, project, command, tmp_path):
+        module = project / "pkg" / "mod.py"
+        module.write_text("ok\n")
+        session = PyrightSession(str(project), command)
+        try:
+            session.diagnostics(str(module))
+            session.diagnostics(str(module))
+            (project / "pyrightconfig.json").write_text('{"strict": ["."]}')
+            session.diagnostics(str(module))
+        finally:
+            session.close()
+        assert methods(tmp_path).count("initialize") == 2
+        assert len(server_pids(tmp_path)) == 2
+        # The restarted server gets the file opened again
+        assert methods(tmp_path).count("textDocument/didOpen") == 2
+
+    def test_dead_server_raises(self, project, tmp_path):
+        module = project / "pkg" / "mod.py"
+        module.write_text("ok\n")
+        session = PyrightSession(str(project), (sys.executable, "-c", "pass"))
+        with pytest.raises(pyright.LspError):
+            session.diagnostics(str(module))
+
+
+class TestProjectRoot:
+    """Test project discovery."""
+
+    def test_nearest_marker(self, project):
+        assert find_project_root(str(project / "pkg" / "mod.py")) == str(project)
+
+    def test_no_marker_uses_directory(self, tmp_path):
+        loose = tmp_path / "loose"
+        loose.mkdir()
+        # tmp_path may sit inside a git checkout; only assert when it does not
+        root = find_project_root(str(loose / "a.py"))
+        assert root == str(loose) or os.path.exists(os.path.join(root, ".git"))
+
+
+class TestServer:
+    """Test the socket server and the hook-side client."""
+
+    @pytest.fixture
+    def server(self, runtime, command):
+        registry = SessionRegistry(command)
+        srv = PyrightServer(str(runtime / "pyrightd.sock"), registry, idle_timeout=0.5)
+        thread = threading.Thread(target=srv.serve_until_idle, daemon=True)
+        thread.start()
+        yield srv
+        thread.join(timeout=5)
+        srv.server_close()
+        registry.close()
+
+    def test_check_file(self, server, project):
+        module = project / "pkg" / "mod.py"
+        module.write_text("ERROR here\n")
+        passed, report = check_file(str(module))
+        assert not passed
+        assert f"{module}:1:5 - error: bad line (reportFake)" in report
+        assert report.endswith("1 errors, 0 warnings, 0 informations")
+
+        module.write_text("fine\n")
+        assert check_file(str(module)) == (
+            True,
+            f"{module}\n0 errors, 0 warnings, 0 informations",
+        )
+
+    def test_invalid_request(self):
+        assert SessionRegistry().evaluate({"file": "relative.py"})["status"] == "error"
+        assert SessionRegistry().evaluate(["not", "a", "dict"])["status"] == "error"
+
+    def test_disabled(self, monkeypatch, project):
+        monkeypatch.setenv("GUARDS_PYRIGHT_SERVER", "0")
+        assert check_file(str(project / "pkg" / "mod.py")) is None
+
+
+class TestBudget:
+    """Test that one type-check stays within its time budget."""
+
+    @pytest.fixture
+    def silent_server(self, runtime):
+        """A pyright socket that accepts requests and never answers them."""
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        listener.bind(pyright.socket_path())
+        listener.listen()
+        yield listener
+        listener.close()
+
+    @pytest.fixture
+    def cli_calls(self, monkeypatch):
+        calls = []
+        monkeypatch.setattr(
+            pyright, "run_cli", lambda *args: calls.append(args) or (True, "")
+        )
+        return calls
+
+    def test_silent_server_skips_cli(self, silent_server, cli_calls, project):
+        module = project / "pkg" / "mod.py"
+        module.write_text("x = 1\n")
+        started = time.monotonic()
+        passed, output = typecheck(str(module), budget=0.5)
+        assert time.monotonic() - started < 2
+        assert passed is None
+        assert "did not finish within" in output
+        assert cli_calls == []
+
+    def test_cli_gets_remaining_budget(self, monkeypatch, project):
+        monkeypatch.setenv("GUARDS_PYRIGHT_SERVER", "0")
+        sleeper = (sys.executable, "-c", "import time; time.sleep(30)")
+        monkeypatch.setattr(pyright, "CLI_COMMAND", sleeper)
+        module = project / "pkg" / "mod.py"
+        module.write_text("x = 1\n")
+        started = time.monotonic()
+        passed, output = typecheck(str(module), budget=0.5)
+        assert time.monotonic() - started < 5
+        assert passed is None
+        assert output.startswith("pyright did not finish within 0.")
+
+    def test_waits_fit_hook_timeout(self):
+        assert pyright.CHECK_BUDGET <= 60
+        assert (
+            pyright.STARTUP_WAIT + pyright.DIAGNOSTICS_TIMEOUT <= pyright.CHECK_BUDGET
+        )
+
+
+def test_format_skips_hints():
+    diagnostics = [
+        {
+            "range": {"start": {"line": 0, "character": 0}},
+            "severity": 2,
+            "message": "w",
+        },
+        {
+            "range": {"start": {"line": 3, "character": 1}},
+            "severity": 4,
+            "message": "unused",
+        },
+    ]
+    assert format_diagnostics("/p/a.py", diagnostics).splitlines() == [
+        "/p/a.py",
+        "  /p/a.py:1:1 - warning: w",
+        "0 errors, 1 warnings, 0 informations",
+    ]
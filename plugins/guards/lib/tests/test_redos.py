@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""Adversarial worst-case timing for every guard regex (ReDoS regression gate).
+
+Every module-level pattern of every guard hook is searched against inputs
+built to make it backtrack (see guardkit.redos), at up to 100 KB, and must
+finish within its budget. Patterns known to be superlinear are listed in
+KNOWN_SUPERLINEAR and skipped until they are rewritten; new patterns and
+edits to other patterns are gated.
+"""
+
+import re
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from guardkit.loader import import_script
+from guardkit.redos import (
+    DEFAULT_BUDGET_MS,
+    adversarial_inputs,
+    guard_patterns,
+    worst_case,
+)
+
+GUARDS_DIR = Path(__file__).resolve().parents[2]
+
+# Per-pattern budgets (ms per search on the largest input) for patterns that
+# legitimately need more than DEFAULT_BUDGET_MS, keyed by script then pattern
+PATTERN_BUDGETS_MS: dict[str, dict[str, float]] = {}
+
+# Patterns whose worst case grows quadratically with the input today. Each
+# entry is a known regression-gate failure: remove it once the pattern runs
+# in linear time (pattern tables do, through guardkit.linear).
+KNOWN_SUPERLINEAR = {
+    "policy/gemini-model-guard/hooks/check-gemini-model.py": {
+        r"xargs\s+(?:-[^\s]*\s+)*(?:[^\s|;&]+\s+)*gemini\b",
+    },
+}
+
+
+def collect_patterns() -> list:
+    params = []
+    for script in sorted(GUARDS_DIR.glob("*/**/hooks/*.py")):
+        if script.name.startswith("test_"):
+            continue
+        relative = script.relative_to(GUARDS_DIR).as_posix()
+        module = import_script(str(script))
+        if module is None:
+            continue
+        known = KNOWN_SUPERLINEAR.get(relative, set())
+        for found in guard_patterns(module):
+            marks = []
+            if found.pattern.pattern in known:
+                marks.append(pytest.mark.skip(reason="known superlinear pattern"))
+            params.append(
+                pytest.param(
+                    relative,
+                    found.pattern,
+                    id=f"{script.name}::{found.name}",
+                    marks=marks,
+                )
+            )
+    return params
+
+
+@pytest.mark.parametrize(("script", "pattern"), collect_patterns())
+def test_pattern_within_budget(script, pattern):
+    budget = PATTERN_BUDGETS_MS.get(script, {}).get(pattern.pattern, DEFAULT_BUDGET_MS)
+    worst = worst_case(pattern, budget_ms=budget)
+    assert worst.elapsed_ms <= budget, (
+        f"{pattern.pattern!r}: {worst.describe()} (budget {budget} ms)"
+    )
+
+
+def test_known_superlinear_patterns_exist():
+    """Every KNOWN_SUPERLINEAR entry must still name a real guard pattern."""
+    for script, known in KNOWN_SUPERLINEAR.items():
+        module = import_script(str(GUARDS_DIR / script))
+        assert module is not None, script
+        patterns = {found.pattern.pattern for found in guard_patterns(module)}
+        assert known <= patterns, f"{script}: stale entries {known - patterns}"
+
+
+class TestGenerator:
+    """Test the adversarial input generator itself."""
+
+    def test_catastrophic_pattern_detected(self):
+        worst = worst_case(re.compile(r"(a+)+$"), budget_ms=1.0, sizes=(18,))
+        assert worst.elapsed_ms > 1.0
+        assert worst.kind == "pump"
+
+    def test_quadratic_pattern_detected(self):
+        worst = worst_case(re.compile(r"find\s+.*?-delete", re.DOTALL), budget_ms=20.0)
+        assert worst.elapsed_ms > 20.0
+        assert worst.size <= 10_000
+
+    def test_linear_pattern_passes(self):
+        worst = worst_case(re.compile(r"\bgit\s+status\b"))
+        assert worst.elapsed_ms <= DEFAULT_BUDGET_MS
+        assert worst.size == 100_000
+
+    def test_inputs_have_requested_size(self):
+        pattern = re.compile(r"(curl|wget)\s+.{0,1000}?\|\s*(ba|z)?sh")
+        inputs = list(adversarial_inputs(pattern, 5_000))
+        kinds = {kind for kind, _text in inputs}
+        assert {"pump", "repeated pump", "near miss", "skeleton", "fuzz"} <= kinds
+        assert all(len(text) <= 5_000 for _kind, text in inputs)
+        assert any(text.startswith("curl ") for _kind, text in inputs)
+
+    def test_fuzz_is_deterministic(self):
+        pattern = re.compile(r"rm\s+-rf\s+/")
+        first = dict(adversarial_inputs(pattern, 2_000, seed=7))["fuzz"]
+        assert first == dict(adversarial_inputs(pattern, 2_000, seed=7))["fuzz"]
+
+
+class TestGuardPatterns:
+    """Test pattern discovery in guard scripts."""
+
+    def test_finds_function_level_patterns_hoisted_to_module(self):
+        module = import_script(
+            str(GUARDS_DIR / "quality/clean-code-guard/hooks/check-clean-patterns.py")
+        )
+        names = {found.name for found in guard_patterns(module)}
+        assert {"PYTHON_C_PATTERN", "VAR_ASSIGN_PATTERN", "DISABLE_PATTERN"} <= names
+
+    def test_index_and_list_reported_once(self):
+        module = import_script(
+            str(GUARDS_DIR / "security/safety-guard/hooks/safety_guard_bash.py")
+        )
+        found = guard_patterns(module)
+        sources = [item.pattern.pattern for item in found]
+        assert len(sources) == len(set(sources))
+        assert len(found) == len(module.BLOCKED_PATTERNS) + len(module.SAFE_PATTERNS)
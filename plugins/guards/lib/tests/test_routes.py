@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""Tests for declarative route tables and their segment trie."""
+
+import json
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from guardkit.routes import (
+    Route,
+    RouteError,
+    RouteLayer,
+    RouteTrie,
+    compile_layers,
+    load_layers,
+    parse_route,
+)
+
+LIB_DIR = Path(__file__).resolve().parents[1]
+
+GH_API_ROUTES = LIB_DIR.parent / "security/gh-api-guard/hooks/gh-api-routes.json"
+
+
+def route(pattern: str, methods=("GET",), query=None) -> Route:
+    return parse_route(
+        {"path": pattern, "methods": list(methods), "query": query}, "test"
+    )
+
+
+def write_routes(path: Path, *entries: dict) -> str:
+    path.write_text(json.dumps({"routes": list(entries)}))
+    return str(path)
+
+
+class TestTrie:
+    """Test matching paths segment by segment."""
+
+    def test_typed_wildcards(self):
+        trie = RouteTrie([
+            route("repos/{owner}/{repo}/pulls/{n:int}"),
+            route("repos/{owner}/{repo}/commits/{sha:sha}/comments"),
+        ])  # fmt: skip
+        assert (
+            trie.match("repos/a/b/pulls/12").pattern
+            == "repos/{owner}/{repo}/pulls/{n:int}"
+        )
+        assert trie.match("repos/a/b/pulls/x") is None
+        assert trie.match("repos/a/b/commits/0ff1ce/comments")
+        assert trie.match("repos/a/b/commits/HEAD/comments") is None
+        assert trie.match("repos/a//pulls/12") is None
+        assert trie.match("repos/a/b/pulls/12/extra") is None
+
+    def test_literal_before_wildcard(self):
+        trie = RouteTrie([
+            route("repos/{owner}/{repo}/pulls/{n:int}"),
+            route("repos/{owner}/{repo}/pulls/comments"),
+            route("repos/{owner}/{repo}/{section}/{n:int}/files"),
+        ])  # fmt: skip
+        assert trie.match("repos/a/b/pulls/comments").pattern.endswith("pulls/comments")
+        # Falls back to the wildcard branch when the literal one dead-ends
+        assert trie.match("repos/a/b/pulls/3/files").pattern.endswith("{n:int}/files")
+
+    def test_replace_ignores_wildcard_names(self):
+        trie = RouteTrie(
+            [route("repos/{owner}/{repo}"), route("repos/{o}/{r}", ["GET", "POST"])]
+        )
+        assert trie.match("repos/a/b").methods == {"GET", "POST"}
+
+    @pytest.mark.parametrize(
+        "pattern", ["repos/{}/x", "repos/{a:float}", "a/b{c}", "a//b"]
+    )
+    def test_invalid_patterns(self, pattern):
+        with pytest.raises(RouteError):
+            route(pattern)
+
+    def test_shipped_table_matches_old_patterns(self):
+        trie = compile_layers([RouteLayer(str(GH_API_ROUTES))])
+        for path in [
+            "repos/o/r",
+            "repos/o/r/pulls",
+            "repos/o/r/pulls/1/comments",
+            "repos/o/r/pulls/1/reviews/2/comments",
+            "repos/o/r/issues/comments/3",
+            "repos/{owner}/{repo}/issues/4/comments",
+            "repos/o/r/commits/abc123/comments",
+        ]:
+            assert trie.match(path), path
+        for path in [
+            "user",
+            "repos/o/r/collaborators",
+            "repos/o/r/pulls/x",
+            "repos/o/r/",
+        ]:
+            assert trie.match(path) is None, path
+
+
+class TestLayers:
+    """Test merging route files and reloading them when they change."""
+
+    def test_later_layers_replace_and_cap(self, tmp_path):
+        base = write_routes(tmp_path / "base.json", {"path": "a/{x}"}, {"path": "b"})
+        user = write_routes(
+            tmp_path / "user.json", {"path": "a/{y}", "methods": ["GET", "POST"]}
+        )
+        project = write_routes(
+            tmp_path / "project.json",
+            {"path": "c", "methods": ["DELETE", "GET"]},
+            {"path": "b", "methods": []},
+        )
+        trie = compile_layers([
+            RouteLayer(base),
+            RouteLayer(user),
+            RouteLayer(project, frozenset({"GET"})),
+            RouteLayer(str(tmp_path / "missing.json")),
+        ])  # fmt: skip
+        assert trie.match("a/1").methods == {"GET", "POST"}
+        assert trie.match("c").methods == {"GET"}
+        assert trie.match("b").methods == frozenset()
+
+    def test_reloaded_when_changed(self, tmp_path):
+        path = tmp_path / "routes.json"
+        layers = [RouteLayer(write_routes(path, {"path": "a"}))]
+        first = load_layers(layers)
+        assert load_layers(layers) is first
+        write_routes(path, {"path": "a"}, {"path": "bb"})
+        os.utime(path, ns=(1, 1))
+        assert load_layers(layers).match("bb")
+
+    @pytest.mark.parametrize(
+        "content",
+        [
+            "{",
+            "[]",
+            '{"routes": [{"methods": ["GET"]}]}',
+            '{"routes": [{"path": "a", "query": "x"}]}',
+        ],
+    )
+    def test_malformed_file(self, tmp_path, content):
+        path = tmp_path / "routes.json"
+        path.write_text(content)
+        with pytest.raises(RouteError, match="routes.json"):
+            compile_layers([RouteLayer(str(path))])
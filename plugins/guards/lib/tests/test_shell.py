@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""Tests for the structured shell parser."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from guardkit.command import BashCommand
+from guardkit.shell import MAX_GROUP_DEPTH, Group, parse_script
+
+
+def argvs(text: str) -> list[tuple[str, ...]]:
+    return [command.argv for command in parse_script(text).commands]
+
+
+class TestLists:
+    """Test pipelines and command lists."""
+
+    def test_simple_command(self):
+        assert argvs("git status --short") == [("git", "status", "--short")]
+
+    def test_list_operators(self):
+        script = parse_script("make && make test || echo failed; ls & wait")
+        assert [p.operator for p in script.pipelines] == ["&&", "||", ";", "&", ""]
+
+    def test_pipeline_stages(self):
+        script = parse_script("cat f | grep -v x |& sort")
+        assert len(script.pipelines) == 1
+        assert [s.argv[0] for s in script.pipelines[0].stages] == [
+            "cat",
+            "grep",
+            "sort",
+        ]
+
+    def test_newlines_separate_commands(self):
+        assert argvs("cd a\ngit push") == [("cd", "a"), ("git", "push")]
+
+    def test_line_continuation(self):
+        assert argvs("git \\\n  push -f") == [("git", "push", "-f")]
+
+    def test_subshell_and_group(self):
+        script = parse_script("(cd a && make) > log; { git status; }")
+        stages = [p.stages[0] for p in script.pipelines]
+        assert isinstance(stages[0], Group) and stages[0].kind == "subshell"
+        assert stages[0].redirects[0].target == "log"
+        assert [c.context for c in script.commands] == [
+            ("subshell",),
+            ("subshell",),
+            ("group",),
+        ]
+
+    def test_reserved_words_skipped(self):
+        assert argvs("if git diff --quiet; then echo ok; fi") == [
+            ("git", "diff", "--quiet"),
+            ("echo", "ok"),
+        ]
+
+    def test_comment(self):
+        assert argvs("echo hi # rm -rf /") == [("echo", "hi")]
+
+    def test_deep_groups_are_incomplete(self):
+        for opener, closer in (("{ ", "; }"), ("( ", " )")):
+            assert parse_script(
+                opener * MAX_GROUP_DEPTH + "ls" + closer * MAX_GROUP_DEPTH
+            ).complete
+            script = parse_script(opener * 400 + "git push -f" + closer * 400)
+            assert not script.complete
+            assert script.commands == ()
+
+    def test_groups_count_across_payloads(self):
+        depth = MAX_GROUP_DEPTH // 2 + 1
+        inner = "{ " * depth + "ls" + "; }" * depth
+        assert not parse_script(
+            "{ " * depth + f"echo $({inner})" + "; }" * depth
+        ).complete
+
+    def test_arithmetic_substitution_is_incomplete(self):
+        assert parse_script("(( i + 1 ))").complete
+        assert not parse_script("(( $(git push -f) ))").complete
+
+
+class TestWords:
+    """Test quoting and expansions."""
+
+    def test_quotes_removed(self):
+        assert argvs("""echo 'a b' "c d" e\\ f""") == [("echo", "a b", "c d", "e f")]
+
+    def test_escapes_in_double_quotes(self):
+        assert argvs('echo "a \\"b\\" \\$x \\n"') == [("echo", 'a "b" $x \\n')]
+
+    def test_ansi_c_quoting(self):
+        assert argvs("echo $'a\\tb\\x41'") == [("echo", "a\tbA")]
+
+    def test_expansions_kept_verbatim(self):
+        assert argvs('echo "$HOME" ${X:-y}') == [("echo", "$HOME", "${X:-y}")]
+
+    def test_quoted_operators_are_literal(self):
+        assert argvs("gh api --jq '.[] | .body' x") == [
+            ("gh", "api", "--jq", ".[] | .body", "x")
+        ]
+
+    def test_unterminated_quote_is_incomplete(self):
+        script = parse_script("echo 'oops")
+        assert not script.complete
+        assert script.commands[0].argv == ("echo", "oops")
+
+
+class TestUnwrapping:
+    """Test env prefixes, wrappers and nested scripts."""
+
+    def test_env_prefix(self):
+        (command,) = parse_script("FOO=1 BAR='a b' git push").commands
+        assert command.argv == ("git", "push")
+        assert command.env == (("FOO", "1"), ("BAR", "a b"))
+
+    def test_wrappers(self):
+        (command,) = parse_script(
+            "timeout -s KILL 30 env X=1 nohup nice -n 5 git push -f"
+        ).commands
+        assert command.argv == ("git", "push", "-f")
+        assert command.wrappers == (
+            ("timeout", "-s", "KILL", "30"),
+            ("env", "X=1"),
+            ("nohup",),
+            ("nice", "-n", "5"),
+        )
+        assert command.env == (("X", "1"),)
+
+    def test_xargs(self):
+        commands = parse_script("find . -name '*.pyc' | xargs -0 -n 1 rm -f").commands
+        assert commands[1].argv == ("rm", "-f")
+        assert commands[1].wrappers == (("xargs", "-0", "-n", "1"),)
+
+    def test_bare_wrapper_is_the_command(self):
+        assert argvs("env") == [("env",)]
+
+    def test_path_to_command(self):
+        assert parse_script("/usr/bin/git push").commands[0].name == "git"
+
+    def test_bash_c(self):
+        script = parse_script("sudo -u root bash -lc 'git reset --hard && rm -rf x'")
+        assert [c.argv for c in script.commands[1:]] == [
+            ("git", "reset", "--hard"),
+            ("rm", "-rf", "x"),
+        ]
+        assert script.commands[1].context == ("-c",)
+        assert script.wrapped_payloads == ("git reset --hard && rm -rf x",)
+
+    def test_eval_joins_arguments(self):
+        script = parse_script("eval git push --force")
+        assert script.commands[1].argv == ("git", "push", "--force")
+        assert script.wrapped_payloads == ("git push --force",)
+
+    def test_command_substitution(self):
+        script = parse_script('echo "$(rm -rf x)" `shred y`')
+        assert script.commands[0].argv == ("echo", "$(rm -rf x)", "`shred y`")
+        assert [(c.argv, c.context) for c in script.commands[1:]] == [
+            (("rm", "-rf", "x"), ("$()",)),
+            (("shred", "y"), ("``",)),
+        ]
+
+    def test_process_substitution(self):
+        assert argvs("diff <(ls a) b")[1] == ("ls", "a")
+
+    def test_nesting(self):
+        script = parse_script("""bash -c "eval 'echo \\$(git push -f)'" """)
+        assert script.commands[-1].argv == ("git", "push", "-f")
+        assert script.commands[-1].context == ("-c", "eval", "$()")
+
+
+class TestRedirectsAndHeredocs:
+    """Test redirections and heredoc bodies."""
+
+    def test_redirects(self):
+        (command,) = parse_script("make >out 2>&1 <in").commands
+        assert command.argv == ("make",)
+        assert [(r.op, r.target) for r in command.redirects] == [
+            (">", "out"),
+            (">&", "1"),
+            ("<", "in"),
+        ]
+
+    def test_heredoc_body(self):
+        script = parse_script("cat <<'EOF' > f\n$(whoami)\nEOF\necho done")
+        cat, echo = script.commands
+        assert cat.redirects[0].body == "$(whoami)"
+        assert not cat.redirects[0].expands
+        assert echo.argv == ("echo", "done")
+
+    def test_expanding_heredoc_substitutions(self):
+        assert argvs("cat <<EOF\n$(whoami)\nEOF")[1] == ("whoami",)
+
+    def test_heredoc_fed_to_shell(self):
+        script = parse_script("bash <<-EOF\n\tgit push -f\n\tEOF")
+        assert script.commands[1].argv == ("git", "push", "-f")
+        assert script.commands[1].context == ("heredoc",)
+
+    def test_heredoc_in_substitution(self):
+        text = "git commit -m \"$(cat <<'EOF'\nfeat: x\n\nbody\nEOF\n)\""
+        script = parse_script(text)
+        assert script.complete
+        assert script.commands[0].argv[3].startswith("$(cat <<'EOF'")
+
+    def test_unterminated_heredoc_is_incomplete(self):
+        assert not parse_script("cat <<EOF\nbody").complete
+
+
+class TestCaching:
+    """Test shared parse results."""
+
+    def test_parse_is_cached(self):
+        assert parse_script("git status") is parse_script("git status")
+
+    def test_bash_command_script(self):
+        parsed = BashCommand("cd a && git push")
+        assert list(parsed.script.find("git", "push")) == [parsed.script.commands[1]]
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""Tests for hook telemetry records and their aggregation."""
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from guardkit import telemetry
+from guardkit.telemetry import (
+    append_record,
+    format_summary,
+    load_records,
+    rotate,
+    summarize,
+    trace_files,
+)
+
+LIB_DIR = Path(__file__).resolve().parents[1]
+
+GUARDS_DIR = LIB_DIR.parent
+SAFETY_BASH = "security/safety-guard/hooks/safety_guard_bash.py"
+GIT_SAFETY = "security/git-safety-guard/hooks/git_safety_guard.py"
+REMINDER = "quality/test-reminder/hooks/reminder_hook.py"
+
+
+def payload(tool_name: str, event: str = "PreToolUse", **tool_input) -> str:
+    return json.dumps(
+        {
+            "hook_event_name": event,
+            "session_id": "session-1",
+            "transcript_path": "/tmp/transcript.jsonl",
+            "cwd": "/tmp",
+            "tool_name": tool_name,
+            "tool_input": tool_input,
+            **({"tool_response": {}} if event == "PostToolUse" else {}),
+        }
+    )
+
+
+def run_hook(script: str, stdin: str, trace: Path) -> int:
+    env = {k: v for k, v in os.environ.items() if not k.startswith("PYTHON")}
+    env.update(GUARDS_TELEMETRY=str(trace), GUARDS_VERDICT_CACHE="0")
+    result = subprocess.run(
+        [sys.executable, str(GUARDS_DIR / script)],
+        input=stdin,
+        capture_output=True,
+        text=True,
+        env=env,
+        cwd="/tmp",
+    )
+    return result.returncode
+
+
+@pytest.fixture
+def trace(tmp_path):
+    return tmp_path / "telemetry.jsonl"
+
+
+class TestHookRecords:
+    """Hooks write one record per process when telemetry is enabled."""
+
+    def test_block_names_pattern(self, trace):
+        assert run_hook(SAFETY_BASH, payload("Bash", command="rm -rf /"), trace) == 2
+        (record,) = load_records([str(trace)])
+        assert record["hook"] == SAFETY_BASH
+        assert record["verdict"] == "block"
+        assert record["pattern"] == "rm-recursive-force"
+        assert record["tool"] == "Bash"
+        assert record["session"] == "session-1"
+        assert record["input_bytes"] > len("rm -rf /")
+        phases = record["startup_ms"] + record["parse_ms"] + record["match_ms"]
+        assert phases == pytest.approx(record["total_ms"], abs=0.01)
+
+    def test_allow_and_skip(self, trace):
+        assert run_hook(SAFETY_BASH, payload("Bash", command="ls -la"), trace) == 0
+        assert run_hook(GIT_SAFETY, payload("Bash", command="ls -la"), trace) == 0
+        assert run_hook(GIT_SAFETY, payload("Read", file_path="/tmp/x"), trace) == 0
+        verdicts = [(r["hook"], r["verdict"]) for r in load_records([str(trace)])]
+        assert verdicts == [
+            (SAFETY_BASH, "allow"),
+            (GIT_SAFETY, "skip"),
+            (GIT_SAFETY, "skip"),
+        ]
+
+    def test_shell_parse_counts_as_parse(self, trace):
+        command = "git status && " * 200 + "git log"
+        assert run_hook(GIT_SAFETY, payload("Bash", command=command), trace) == 0
+        (record,) = load_records([str(trace)])
+        assert record["verdict"] == "allow"
+        assert record["parse_ms"] > record["match_ms"]
+
+    def test_hook_without_check_is_done(self, trace):
+        stdin = payload(
+            "Write", event="PostToolUse", file_path="/tmp/app.py", content=""
+        )
+        assert run_hook(REMINDER, stdin, trace) == 0
+        (record,) = load_records([str(trace)])
+        assert record["verdict"] == "done"
+        assert record["event"] == "PostToolUse"
+
+    def test_disabled_writes_nothing(self, trace, monkeypatch):
+        monkeypatch.setenv("GUARDS_TELEMETRY", "0")
+        assert telemetry.telemetry_path() is None
+        assert telemetry.start(SAFETY_BASH, 0.0) is None
+
+    def test_disabled_hook_does_not_import_telemetry(self):
+        code = (
+            "import sys\n"
+            "from guardkit.prefilter import LiteralIndex\n"
+            "assert LiteralIndex([('rm', 'x')]).first('rm -rf /') == 'x'\n"
+            "print('guardkit.telemetry' in sys.modules)\n"
+        )
+        env = {k: v for k, v in os.environ.items() if k != "GUARDS_TELEMETRY"}
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            capture_output=True,
+            text=True,
+            env=env,
+            cwd=LIB_DIR,
+        )
+        assert result.stdout.strip() == "False", result.stderr
+
+    def test_entry_without_id_is_named_by_pattern(self, trace, monkeypatch):
+        from guardkit.prefilter import LiteralIndex
+
+        monkeypatch.setenv("GUARDS_TELEMETRY", str(trace))
+        monkeypatch.setattr(
+            telemetry, "_TRACE", telemetry.Trace(str(trace), SAFETY_BASH, 0.0)
+        )
+        LiteralIndex(
+            [("chmod", "a"), ("rm", "b")], ids=["chmod-rule", "rm-rule"]
+        ).first("rm x")
+        assert telemetry._TRACE.record["pattern"] == "rm-rule"
+        LiteralIndex([("rm", "b")]).first("rm x")
+        assert telemetry._TRACE.record["pattern"] == "rm"
+
+
+class TestFile:
+    """Test appending, rotation and reading."""
+
+    def test_rotation_keeps_backups(self, trace, monkeypatch):
+        monkeypatch.setenv("GUARDS_TELEMETRY_MAX_BYTES", "100")
+        for i in range(12):
+            append_record(str(trace), {"hook": "h", "i": i, "pad": "x" * 40})
+        files = trace_files(str(trace))
+        assert [Path(path).exists() for path in files] == [True] * 4
+        numbers = [record["i"] for record in load_records(files)]
+        assert numbers == sorted(numbers)
+        assert numbers[-1] == 11
+
+    def test_rotate_below_limit_is_noop(self, trace):
+        trace.write_text("{}\n")
+        rotate(str(trace), 1_000)
+        assert not Path(f"{trace}.1").exists()
+
+    def test_torn_lines_and_sessions(self, trace):
+        trace.write_text(
+            '{"hook": "a", "session": "s1"}\n{"hook": "b", "ses\n[1]\n{"hook": "c", "session": "s2"}\n'
+        )
+        assert [r["hook"] for r in load_records([str(trace)])] == ["a", "c"]
+        assert [r["hook"] for r in load_records([str(trace)], session="s2")] == ["c"]
+
+
+class TestSummary:
+    """Test aggregation of records."""
+
+    RECORDS = [
+        {"hook": "slow", "total_ms": 40.0, "startup_ms": 35.0, "parse_ms": 1.0,
+         "match_ms": 4.0, "verdict": "block", "pattern": "rm"},
+        {"hook": "slow", "total_ms": 30.0, "startup_ms": 29.0, "parse_ms": 1.0,
+         "match_ms": 0.0, "verdict": "skip", "pattern": None},
+        {"hook": "fast", "total_ms": 5.0, "startup_ms": 4.0, "parse_ms": 0.5,
+         "match_ms": 0.5, "verdict": "allow", "pattern": "git"},
+        {"hook": "fast", "total_ms": 6.0, "startup_ms": 5.0, "parse_ms": 0.5,
+         "match_ms": 0.5, "verdict": "block", "pattern": "rm"},
+    ]  # fmt: skip
+
+    def test_summarize(self):
+        summary = summarize(self.RECORDS)
+        assert summary["records"] == 4
+        assert summary["verdicts"] == {"block": 2, "skip": 1, "allow": 1}
+        slowest = summary["slowest_hooks"]
+        assert [entry["hook"] for entry in slowest] == ["slow", "fast"]
+        assert slowest[0]["total"] == 70.0
+        assert slowest[0]["mean_startup_ms"] == 32.0
+        assert slowest[0]["verdicts"] == {"block": 1, "skip": 1}
+        hottest = summary["hottest_patterns"][0]
+        assert hottest["pattern"] == "rm"
+        assert hottest["fired"] == 2
+        assert hottest["block"] == 2
+        assert hottest["hooks"] == ["slow", "fast"]
+
+    def test_top_limits_rows(self):
+        assert len(summarize(self.RECORDS, top=1)["slowest_hooks"]) == 1
+
+    def test_format_summary(self):
+        text = format_summary(summarize(self.RECORDS))
+        assert "4 records" in text
+        assert "block 2" in text
+        assert text.index("slow") < text.index("fast")
+
+    def test_cli(self, trace):
+        for record in self.RECORDS:
+            append_record(str(trace), record)
+        result = subprocess.run(
+            [
+                sys.executable,
+                str(LIB_DIR / "guard_telemetry.py"),
+                "--file",
+                str(trace),
+                "--json",
+            ],
+            capture_output=True,
+            text=True,
+        )
+        assert result.returncode == 0, result.stderr
+        assert json.loads(result.stdout)["records"] == 4
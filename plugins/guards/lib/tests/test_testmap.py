@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""Tests for the persistent module-to-test index."""
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from guardkit import testmap
+from guardkit.testmap import (
+    ModuleTestIndex,
+    find_tests,
+    module_pattern,
+    read_settings,
+)
+
+LIB_DIR = Path(__file__).resolve().parents[1]
+
+
+# Every test gets a private runtime directory (see conftest.py)
+pytestmark = pytest.mark.usefixtures("runtime")
+
+
+def make_project(root: Path, files: list[str], pytest_options: str = "") -> Path:
+    root.mkdir(parents=True, exist_ok=True)
+    pyproject = "[project]\nname = 'demo'\n"
+    if pytest_options:
+        pyproject += f"\n[tool.pytest.ini_options]\n{pytest_options}\n"
+    (root / "pyproject.toml").write_text(pyproject)
+    for name in files:
+        touch(root / name)
+    return root
+
+
+def touch(path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text("")
+    # Directory mtimes must differ from the indexed ones even on coarse clocks
+    stamp = os.stat(path.parent).st_mtime_ns + 1_000_000_000
+    os.utime(path.parent, ns=(stamp, stamp))
+
+
+def relative(root: Path, paths: list[str]) -> list[str]:
+    return sorted(os.path.relpath(path, root) for path in paths)
+
+
+class TestSettings:
+    """Test reading pytest options from pyproject.toml."""
+
+    def test_defaults(self, tmp_path):
+        settings = read_settings(str(make_project(tmp_path, [])))
+        assert settings.testpaths == ()
+        assert settings.python_files == ("test_*.py", "*_test.py")
+        assert ".*" in settings.norecursedirs
+
+    def test_string_and_list_options(self, tmp_path):
+        options = 'testpaths = ["tests"]\npython_files = "check_*.py *_spec.py"'
+        settings = read_settings(str(make_project(tmp_path, [], options)))
+        assert settings.testpaths == ("tests",)
+        assert settings.python_files == ("check_*.py", "*_spec.py")
+
+    def test_module_pattern(self):
+        pattern = module_pattern(("test_*.py", "*_test.py", "tests.py"))
+        assert testmap._module_of(pattern, "test_mod.py") == "mod"
+        assert testmap._module_of(pattern, "mod_test.py") == "mod"
+        assert testmap._module_of(pattern, "tests.py") is None
+        assert testmap._module_of(pattern, "mod.py") is None
+
+
+class TestLookup:
+    """Test matching source files to indexed tests."""
+
+    def test_layouts(self, tmp_path):
+        root = make_project(
+            tmp_path / "p",
+            [
+                "src/pkg/sub/deep.py",
+                "tests/unit/pkg/sub/test_deep.py",
+                "pkg/colocated.py",
+                "pkg/test_colocated.py",
+                "pkg/suffixed.py",
+                "tests/suffixed_test.py",
+                "lib/tool/runner.py",
+                "lib/tests/test_runner.py",
+            ],
+        )
+        assert relative(root, find_tests(str(root / "src/pkg/sub/deep.py"))) == [
+            "tests/unit/pkg/sub/test_deep.py"
+        ]
+        assert find_tests(str(root / "pkg/colocated.py"))
+        assert find_tests(str(root / "pkg/suffixed.py"))
+        assert find_tests(str(root / "lib/tool/runner.py"))
+
+    def test_other_package_does_not_match(self, tmp_path):
+        root = make_project(tmp_path / "p", ["tests/other/test_utils.py"])
+        assert find_tests(str(root / "src/pkg/utils.py")) == []
+        assert find_tests(str(root / "src/other/utils.py"))
+
+    def test_testpaths_limit_the_scan(self, tmp_path):
+        root = make_project(
+            tmp_path / "p",
+            ["tests/test_a.py", "scripts/test_b.py"],
+            'testpaths = ["tests"]',
+        )
+        index = ModuleTestIndex.build(str(root))
+        assert index.modules == {"a": ["tests/test_a.py"]}
+
+    def test_norecursedirs_and_virtualenvs(self, tmp_path):
+        root = make_project(
+            tmp_path / "p",
+            [
+                ".venv/lib/test_hidden.py",
+                "env/pyvenv.cfg",
+                "env/test_env.py",
+                "tests/test_a.py",
+            ],
+        )
+        assert set(ModuleTestIndex.build(str(root)).modules) == {"a"}
+
+    def test_custom_python_files(self, tmp_path):
+        root = make_project(
+            tmp_path / "p", ["tests/check_mod.py"], 'python_files = "check_*.py"'
+        )
+        assert find_tests(str(root / "mod.py"))
+
+    def test_outside_project(self, tmp_path):
+        assert find_tests(str(tmp_path / "loose" / "mod.py")) is None
+
+
+class TestPersistence:
+    """Test the saved index and its incremental refresh."""
+
+    def test_saved_and_reused(self, tmp_path, monkeypatch):
+        root = make_project(tmp_path / "p", ["tests/test_a.py"])
+        find_tests(str(root / "a.py"))
+        assert Path(testmap.index_path(str(root))).exists()
+
+        def fail(*_args):
+            raise AssertionError("rebuilt")
+
+        monkeypatch.setattr(ModuleTestIndex, "build", fail)
+        assert find_tests(str(root / "a.py"))
+
+    def test_new_test_found_by_rescanning_its_directory(self, tmp_path, monkeypatch):
+        root = make_project(tmp_path / "p", ["tests/test_a.py", "docs/readme.txt"])
+        assert find_tests(str(root / "b.py")) == []
+
+        touch(root / "tests/unit/test_b.py")
+        scanned = []
+        original = ModuleTestIndex._scan
+        monkeypatch.setattr(
+            ModuleTestIndex,
+            "_scan",
+            lambda self, d: scanned.append(d) or original(self, d),
+        )
+        assert relative(root, find_tests(str(root / "b.py"))) == [
+            "tests/unit/test_b.py"
+        ]
+        assert scanned == ["tests"]
+
+    def test_deleted_test_and_directory(self, tmp_path):
+        root = make_project(tmp_path / "p", ["tests/pkg/test_a.py"])
+        assert find_tests(str(root / "pkg/a.py"))
+        (root / "tests/pkg/test_a.py").unlink()
+        (root / "tests/pkg").rmdir()
+        assert find_tests(str(root / "pkg/a.py")) == []
+        index = ModuleTestIndex.load(str(root))
+        assert "tests/pkg" not in index.dirs
+
+    def test_pyproject_change_rebuilds(self, tmp_path):
+        root = make_project(tmp_path / "p", ["tests/check_a.py"])
+        assert find_tests(str(root / "a.py")) == []
+        make_project(root, [], 'python_files = "check_*.py"')
+        assert find_tests(str(root / "a.py"))
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""Tests for the on-disk guard verdict cache."""
+
+import os
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from guardkit.pipeline import GuardPipeline
+from guardkit.verdicts import (
+    VerdictCache,
+    open_verdict_cache,
+    policy_fingerprint,
+    verdict_key,
+)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = VerdictCache(str(tmp_path / "verdicts.sqlite3"))
+    yield cache
+    cache.close()
+
+
+class TestKeys:
+    """Test verdict keys and policy fingerprints."""
+
+    def test_description_is_ignored(self):
+        first = verdict_key(
+            "fp", "Bash", {"command": "ls", "description": "List files"}
+        )
+        second = verdict_key("fp", "Bash", {"command": "ls", "description": "Show dir"})
+        assert first == second
+
+    def test_command_and_tool_change_key(self):
+        key = verdict_key("fp", "Bash", {"command": "ls"})
+        assert key != verdict_key("fp", "Bash", {"command": "ls -la"})
+        assert key != verdict_key("fp", "Read", {"command": "ls"})
+        assert key != verdict_key("other", "Bash", {"command": "ls"})
+
+    def test_cwd_changes_key(self, tmp_path):
+        key = verdict_key("fp", "Bash", {"command": "ls"}, cwd=str(tmp_path))
+        assert key == verdict_key("fp", "Bash", {"command": "ls"}, cwd=str(tmp_path))
+        assert key != verdict_key(
+            "fp", "Bash", {"command": "ls"}, cwd=str(tmp_path / "sub")
+        )
+
+    def test_replaced_path_changes_key(self, tmp_path):
+        (tmp_path / "config.txt").write_text("name=demo\n")
+        (tmp_path / ".env").write_text("SECRET=1\n")
+        tool_input = {"command": "cat 'config.txt' | head -5"}
+        before = verdict_key("fp", "Bash", tool_input, cwd=str(tmp_path))
+
+        (tmp_path / "config.txt").unlink()
+        (tmp_path / "config.txt").symlink_to(".env")
+        assert verdict_key("fp", "Bash", tool_input, cwd=str(tmp_path)) != before
+
+    def test_file_path_changes_key(self, tmp_path):
+        target = tmp_path / "notes.txt"
+        tool_input = {"file_path": str(target)}
+        missing = verdict_key("fp", "Read", tool_input)
+        target.write_text("notes\n")
+        assert verdict_key("fp", "Read", tool_input) != missing
+
+    def test_fingerprint_changes_when_rule_changes(self, tmp_path):
+        rule = tmp_path / "rule.py"
+        rule.write_text("PATTERNS = ['rm']\n")
+        before = policy_fingerprint([str(rule)])
+        assert policy_fingerprint([str(rule)]) == before
+
+        rule.write_text("PATTERNS = ['rm', 'dd']\n")
+        os.utime(rule, ns=(0, rule.stat().st_mtime_ns + 1))
+        assert policy_fingerprint([str(rule)]) != before
+
+    def test_fingerprint_of_missing_rule(self, tmp_path):
+        missing = str(tmp_path / "missing.py")
+        assert policy_fingerprint([missing]) != policy_fingerprint([])
+
+
+class TestVerdictCache:
+    """Test lookups, storage and eviction."""
+
+    def test_miss(self, cache):
+        assert cache.lookup("k") == (False, None)
+
+    def test_block_and_allow_verdicts(self, cache):
+        cache.store("blocked", "BLOCKED: rm -rf")
+        cache.store("allowed", None)
+        assert cache.lookup("blocked") == (True, "BLOCKED: rm -rf")
+        assert cache.lookup("allowed") == (True, None)
+
+    def test_shared_between_connections(self, cache):
+        cache.store("k", None)
+        other = VerdictCache(cache.path)
+        try:
+            assert other.lookup("k") == (True, None)
+        finally:
+            other.close()
+
+    def test_evicts_least_recently_used(self, tmp_path):
+        cache = VerdictCache(str(tmp_path / "small.sqlite3"), max_entries=10)
+        try:
+            for i in range(200):
+                cache.store(f"k{i}", None)
+            cache.evict()
+            assert len(cache) == 10
+            assert cache.lookup("k199") == (True, None)
+            assert cache.lookup("k0") == (False, None)
+        finally:
+            cache.close()
+
+    def test_concurrent_writers(self, cache):
+        def write(worker: int) -> None:
+            own = VerdictCache(cache.path)
+            try:
+                for i in range(50):
+                    own.store(f"{worker}-{i}", None)
+            finally:
+                own.close()
+
+        threads = [threading.Thread(target=write, args=(n,)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert 0 < len(cache) <= 200
+
+    def test_disabled_by_env(self, monkeypatch):
+        monkeypatch.setenv("GUARDS_VERDICT_CACHE", "0")
+        assert open_verdict_cache() is None
+
+    def test_path_from_env(self, tmp_path, monkeypatch):
+        path = tmp_path / "custom.sqlite3"
+        monkeypatch.setenv("GUARDS_VERDICT_CACHE", str(path))
+        cache = open_verdict_cache()
+        assert cache is not None
+        cache.close()
+        assert path.exists()
+
+
+class TestPipelineCache:
+    """Test the guard pipeline with a verdict cache."""
+
+    def test_repeat_call_skips_rules(self, cache):
+        tool_input = {"command": "rm -rf /"}
+        reason = GuardPipeline().evaluate("Bash", tool_input, cache=cache)
+        assert reason and "rm -rf" in reason
+
+        fresh = GuardPipeline()
+        assert fresh.evaluate("Bash", tool_input, cache=cache) == reason
+        assert fresh._loader._modules == {}
+
+    def test_allow_verdict_cached(self, cache):
+        pipeline = GuardPipeline()
+        assert (
+            pipeline.evaluate("Bash", {"command": "git fetch origin"}, cache=cache)
+            is None
+        )
+        key = verdict_key(
+            pipeline.fingerprint(), "Bash", {"command": "git fetch origin"}
+        )
+        assert cache.lookup(key) == (True, None)
+
+    def test_rule_error_not_cached(self, cache, tmp_path):
+        (tmp_path / "broken.py").write_text(
+            "def check(tool_name, tool_input):\n    raise OSError('busy')\n"
+        )
+        pipeline = GuardPipeline(
+            ["broken.py"], guards_root=str(tmp_path), fast_lane_dir=str(tmp_path)
+        )
+        assert "broken.py failed" in pipeline.evaluate(
+            "Bash", {"command": "ls"}, cache=cache
+        )
+        key = verdict_key(pipeline.fingerprint(), "Bash", {"command": "ls"})
+        assert cache.lookup(key) == (False, None)
+
+    def test_symlink_swap_is_not_served_from_cache(self, cache, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        (tmp_path / ".env").write_text("SECRET=1\n")
+        (tmp_path / "config.txt").write_text("name=demo\n")
+        tool_input = {"command": "cat config.txt | head -5"}
+        pipeline = GuardPipeline()
+        assert pipeline.evaluate("Bash", tool_input, cache=cache) is None
+
+        (tmp_path / "config.txt").unlink()
+        os.symlink(".env", "config.txt")
+        reason = GuardPipeline().evaluate("Bash", tool_input, cache=cache)
+        assert reason and ".env" in reason
+
+    def test_cwd_reaches_rules(self, cache, tmp_path):
+        (tmp_path / ".env").write_text("SECRET=1\n")
+        (tmp_path / "config.txt").symlink_to(".env")
+        tool_input = {"command": "cat config.txt | head -5"}
+        reason = GuardPipeline().evaluate(
+            "Bash", tool_input, cache=cache, cwd=str(tmp_path)
+        )
+        assert reason and ".env" in reason
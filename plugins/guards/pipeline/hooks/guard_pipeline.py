@@ -0,0 +1,42 @@
+#!/usr/bin/env -S uv run --script
+# /// script
+# dependencies = ["cchooks"]
+# ///
+"""PreToolUse hook that runs all Bash guards as one pipeline.
+
+Loads each guard in guardkit.pipeline.BASH_RULES as a rule module, parses the
+command once and stops at the first rule that blocks. Verdicts are cached on
+disk (see guardkit.verdicts), so a repeated command skips loading the rules.
+"""
+
+import os
+import sys
+from functools import partial
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.realpath(__file__)), "..", "..", "lib")
+)
+
+from guardkit.hookio import run_pretooluse, skip_unless
+
+if __name__ == "__main__":
+    # Exit before loading the pipeline when the call is not a Bash command
+    skip_unless("PreToolUse", {"Bash"})
+
+from guardkit.pipeline import GuardPipeline
+from guardkit.verdicts import open_verdict_cache
+
+PIPELINE = GuardPipeline()
+
+
+def check(tool_name: str, tool_input: dict, cwd: str | None = None) -> str | None:
+    """Return the first block reason from the pipeline, or None to allow it."""
+    return PIPELINE.evaluate(tool_name, tool_input, cwd=cwd)
+
+
+def main() -> None:
+    run_pretooluse(partial(PIPELINE.evaluate, cache=open_verdict_cache()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+#!/usr/bin/env -S uv run --script
+# /// script
+# dependencies = ["cchooks"]
+# ///
+"""PostToolUse hook that formats, then type-checks, edited Python files.
+
+Replaces the separate python-format and python-typecheck hooks in pipeline
+mode (see guardkit.post_edit). With GUARDS_FORMAT_BATCH=1, edits are queued
+per session and processed together, concurrently, at Stop/SubagentStop.
+"""
+
+import os
+import sys
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.realpath(__file__)), "..", "..", "lib")
+)
+
+from guardkit.hookio import read_hook_input, skip_unless
+
+
+def main() -> None:
+    payload = read_hook_input()
+    if payload.event in ("Stop", "SubagentStop"):
+        # The end of a turn flushes the batch queue; nothing to do otherwise
+        if os.environ.get("GUARDS_FORMAT_BATCH", "0") in ("", "0"):
+            return
+        paths = None
+    else:
+        hook = skip_unless(
+            "PostToolUse", {"Write", "Edit"}, keywords=(".py",), field="file_path"
+        )
+        paths = [hook.text("file_path")]
+
+    # Imported after the fast path: they pull in subprocess
+    from guardkit import format_queue, post_edit
+
+    session_id = str(payload.data.get("session_id", ""))
+    if paths is None:
+        paths = format_queue.claim(session_id)
+    elif not paths[0].endswith(".py"):
+        return
+    elif format_queue.batch_enabled() and format_queue.try_enqueue(
+        session_id, paths[0]
+    ):
+        if not format_queue.should_flush(session_id):
+            print(f"Queued for formatting and type checking: {paths[0]}")
+            return
+        paths = format_queue.claim(session_id)
+
+    if paths:
+        print(post_edit.format_report(post_edit.run(paths)))
+
+
+if __name__ == "__main__":
+    main()
+    sys.exit(0)
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""Tests for the guard-pipeline PreToolUse hook."""
+
+import importlib.util
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "lib"))
+
+from guardkit.loader import import_script
+from guardkit.pipeline import BASH_RULES, GuardPipeline
+from guardkit.runtime import GUARDS_ROOT
+
+hook_path = Path(__file__).parent / "guard_pipeline.py"
+spec = importlib.util.spec_from_file_location("guard_pipeline", hook_path)
+if spec is None or spec.loader is None:
+    raise ImportError(f"Cannot load {hook_path}")
+guard_pipeline = importlib.util.module_from_spec(spec)
+sys.modules["guard_pipeline"] = guard_pipeline
+spec.loader.exec_module(guard_pipeline)
+
+check = guard_pipeline.check
+
+COMMANDS = [
+    "ls -la",
+    "rm -rf /",
+    "rm -rf /tmp/build",
+    "git status",
+    "git reset --hard HEAD~1",
+    "bash -c 'git push --force origin main'",
+    "gh pr view 12",
+    "gh api -X POST repos/o/r/issues",
+    "gh api repos/o/r/pulls/1/comments",
+    "cat .env",
+    "cat .env.example",
+    "python script.py",
+    "uv run pytest",
+    'git commit -m "add feature"',
+    'git commit -m "feat: add feature"',
+    "gemini -m gemini-2.5-pro 'hi'",
+    "echo hi | gemini -m gemini-3-pro-preview",
+]
+
+
+def individual_verdicts(command: str) -> list[str]:
+    tool_input = {"command": command}
+    reasons = []
+    for rule in BASH_RULES:
+        module = import_script(str(Path(GUARDS_ROOT) / rule))
+        reason = module.check("Bash", tool_input)
+        if reason:
+            reasons.append(reason)
+    return reasons
+
+
+class TestPipelineParity:
+    """The pipeline blocks exactly when some individual guard blocks."""
+
+    @pytest.mark.parametrize("command", COMMANDS)
+    def test_matches_individual_guards(self, command):
+        reasons = individual_verdicts(command)
+        result = check("Bash", {"command": command})
+        if reasons:
+            assert result == reasons[0]
+        else:
+            assert result is None
+
+
+class TestPipelineBehavior:
+    """Test ordering, shared parse and rule loading."""
+
+    def test_first_block_wins(self, tmp_path):
+        (tmp_path / "first.py").write_text(
+            "def check(tool_name, tool_input):\n    return 'first'\n"
+        )
+        (tmp_path / "second.py").write_text(
+            "def check(tool_name, tool_input):\n    raise AssertionError\n"
+        )
+        pipeline = GuardPipeline(["first.py", "second.py"], guards_root=str(tmp_path))
+        assert pipeline.evaluate("Bash", {"command": "ls"}) == "first"
+
+    def test_rules_share_one_parse(self, tmp_path):
+        rule = (
+            "from a_seen import SEEN\n"
+            "def check(tool_name, tool_input, parsed=None):\n"
+            "    SEEN.append(parsed)\n"
+            "    return None\n"
+        )
+        (tmp_path / "a_seen.py").write_text("SEEN = []\n")
+        (tmp_path / "a.py").write_text(rule)
+        (tmp_path / "b.py").write_text(rule)
+        sys.path.insert(0, str(tmp_path))
+        try:
+            pipeline = GuardPipeline(["a.py", "b.py"], guards_root=str(tmp_path))
+            pipeline.evaluate("Bash", {"command": "git status"})
+            seen = sys.modules["a_seen"].SEEN
+        finally:
+            sys.path.remove(str(tmp_path))
+            sys.modules.pop("a_seen", None)
+        assert len(seen) == 2
+        assert seen[0] is seen[1]
+        assert seen[0].tokens == ["git", "status"]
+
+    def test_missing_rule_blocks(self, tmp_path):
+        pipeline = GuardPipeline(["missing.py"], guards_root=str(tmp_path))
+        reason = pipeline.evaluate("Bash", {"command": "ls"})
+        assert reason.startswith("Guard rule missing.py failed: RuleLoadError(")
+
+    def test_raising_rule_blocks(self, tmp_path):
+        (tmp_path / "broken.py").write_text(
+            "def check(tool_name, tool_input):\n    raise RecursionError('deep')\n"
+        )
+        (tmp_path / "allow.py").write_text(
+            "def check(tool_name, tool_input):\n    return None\n"
+        )
+        pipeline = GuardPipeline(["allow.py", "broken.py"], guards_root=str(tmp_path))
+        reason = pipeline.evaluate("Bash", {"command": "ls"})
+        assert reason.startswith("Guard rule broken.py failed: RecursionError('deep')")
+
+    def test_non_bash_tool_is_passed_through(self):
+        assert check("Read", {"file_path": "README.md"}) is None
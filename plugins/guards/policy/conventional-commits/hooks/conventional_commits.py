@@ -18,9 +18,25 @@ Blocked bypass vectors:
 - Variable expansion in messages ($VAR)
 """
 
+import os
 import re
+import sys
 
-from cchooks import PreToolUseContext, create_context
+sys.path.insert(
+    0,
+    os.path.join(os.path.dirname(os.path.realpath(__file__)), "..", "..", "..", "lib"),
+)
+
+from guardkit.hookio import run_pretooluse, skip_unless
+
+if __name__ == "__main__":
+    # Exit before building the pattern tables when the call cannot concern this guard
+    skip_unless("PreToolUse", {"Bash"}, keywords=("git",))
+
+from guardkit.policy import Policy, load_policy
+from guardkit.shell import parse_script
+
+HOOKS_DIR = os.path.dirname(os.path.realpath(__file__))
 
 # Conventional commit pattern
 CONVENTIONAL_PATTERN = re.compile(
@@ -30,63 +46,31 @@ CONVENTIONAL_PATTERN = re.compile(
     r": .+"  # Required description
 )
 
-# Patterns that indicate git commit activity (including nested shells)
-COMMIT_INDICATORS = [
-    r"\bgit\s+commit\b",
-    r"\bgit\s+cherry-pick\b",
-    r"\bgit\s+revert\b",
-    r"\bgit\s+merge\b",
-    r"\bgit\s+am\b",
-    r"\bgit\s+commit-tree\b",
-]
-
-# Commands that take large text arguments where git references are OK
-# These commands often include documentation, PR descriptions, etc.
-SAFE_ARGUMENT_COMMANDS = [
-    r"^gh\s+pr\s+create\b",
-    r"^gh\s+pr\s+edit\b",
-    r"^gh\s+issue\s+create\b",
-    r"^gh\s+issue\s+edit\b",
-    r"^echo\b",
-    r"^printf\b",
-]
-
-# Blocked commit methods we cannot reliably validate
-# These patterns match git commit flags, not content inside -m messages
-BLOCKED_PATTERNS = [
-    (
-        r"git\s+commit\s+[^'\"]*(?:-F\s+\S+|--file[=\s]\S+)",
-        "Use -m flag instead of -F/--file for commit messages",
-    ),
-    (
-        r"git\s+commit\s+[^'\"]*(?:-C\s+\S+|--reuse-message[=\s]\S+)",
-        "Use -m flag instead of -C/--reuse-message",
-    ),
-    (
-        r"git\s+commit\s+[^'\"]*(?:-c\s+\S+|--reedit-message[=\s]\S+)",
-        "Use -m flag instead of -c/--reedit-message",
-    ),
-    (
-        r"git\s+commit\s+[^'\"]*(?:-t\s+\S+|--template[=\s]\S+)",
-        "Use -m flag instead of -t/--template",
-    ),
-    (
-        r"git\s+commit\s+[^'\"]*--no-verify\b",
-        "Cannot skip commit message verification with --no-verify",
-    ),
-    (r"\bgit\s+commit-tree\b", "Use 'git commit' instead of low-level commit-tree"),
-]
-
-# Commands that create commits but aren't 'git commit'
-OTHER_COMMIT_COMMANDS = [
-    (r"\bgit\s+merge\b", "git merge"),
-    (r"\bgit\s+cherry-pick\b", "git cherry-pick"),
-    (r"\bgit\s+revert\b", "git revert"),
-    (r"\bgit\s+am\b", "git am"),
-]
-
-
-def is_commit_command_context(command: str) -> bool:
+# Rules live in conventional-commits.policy.toml, merged with user and project
+# overlays; the module-level tables are the policy as loaded at import
+POLICY_NAME = "conventional-commits"
+POLICY = load_policy(POLICY_NAME, HOOKS_DIR)
+COMMIT_INDICATORS = POLICY.patterns("commit_indicators")
+SAFE_ARGUMENT_COMMANDS = POLICY.patterns("safe_argument_commands")
+BLOCKED_PATTERNS = POLICY.pairs("blocked")
+OTHER_COMMIT_COMMANDS = POLICY.pairs("other_commit_commands")
+
+# Matched in linear time however long the command is
+COMMIT_INDICATORS_INDEX = POLICY.index("commit_indicators")
+SAFE_ARGUMENT_COMMANDS_INDEX = POLICY.index("safe_argument_commands")
+BLOCKED_INDEX = POLICY.index("blocked")
+OTHER_COMMIT_COMMANDS_INDEX = POLICY.index("other_commit_commands")
+
+# Boolean short flags that may precede m in a cluster such as -am
+CLUSTER_FLAGS = frozenset("aeinopqsvz")
+
+
+def fast_lane_gates(cwd: str | None = None) -> list:
+    """Return the patterns of which a command this guard can block matches one."""
+    return [load_policy(POLICY_NAME, HOOKS_DIR, cwd).index("commit_indicators")]
+
+
+def is_commit_command_context(command: str, policy: Policy | None = None) -> bool:
     """Check if command is actually executing git commit, not just mentioning it.
 
     Commands like 'gh pr create --body "... git commit --amend ..."' should NOT
@@ -94,11 +78,8 @@ def is_commit_command_context(command: str) -> bool:
     """
     stripped = command.strip()
 
-    for pattern in SAFE_ARGUMENT_COMMANDS:
-        if re.match(pattern, stripped):
-            return False  # Not a commit context, skip validation
-
-    return True
+    # Not a commit context if it starts with one of these, skip validation
+    return not (policy or POLICY).index("safe_argument_commands").any(stripped)
 
 
 def extract_all_commands(cmd: str) -> list[str]:
@@ -117,19 +98,45 @@ def extract_all_commands(cmd: str) -> list[str]:
     return commands
 
 
-def find_commit_command(command: str) -> str | None:
+def find_commit_command(command: str, policy: Policy | None = None) -> str | None:
     """Find a git commit command in the full command string."""
     all_commands = extract_all_commands(command)
+    indicators = (policy or POLICY).index("commit_indicators")
 
     for cmd in all_commands:
-        for pattern in COMMIT_INDICATORS:
-            if re.search(pattern, cmd, re.IGNORECASE):
-                return cmd
+        if indicators.any(cmd):
+            return cmd
     return None
 
 
 def extract_messages(commit_cmd: str) -> list[str]:
-    """Extract all -m messages from a commit command."""
+    """Extract all -m messages from the git commands in a command string."""
+    script = parse_script(commit_cmd)
+    if not script.complete:
+        # Part of the command was not parsed, so read -m flags from the raw text
+        return extract_raw_messages(commit_cmd)
+
+    messages = []
+    for command in script.commands:
+        if command.name != "git":
+            continue
+        args = iter(command.args)
+        for arg in args:
+            if arg in ("-m", "--message"):
+                messages.append(next(args, ""))
+            elif arg.startswith("--message="):
+                messages.append(arg.split("=", 1)[1])
+            elif arg.startswith("-") and not arg.startswith("--") and "m" in arg:
+                # Short option cluster: -mMSG, -am MSG
+                index = arg.index("m")
+                if set(arg[1:index]) <= CLUSTER_FLAGS:
+                    messages.append(arg[index + 1 :] or next(args, ""))
+
+    return messages
+
+
+def extract_raw_messages(commit_cmd: str) -> list[str]:
+    """Extract -m messages from a command string that could not be parsed."""
     messages = []
 
     # Handle multiple patterns for -m flag
@@ -202,56 +209,48 @@ def has_dynamic_content(msg: str) -> bool:
     return False
 
 
-def main() -> None:
-    c = create_context()
-    if not isinstance(c, PreToolUseContext):
-        c.output.exit_success()
-
-    if c.tool_name != "Bash":
-        c.output.exit_success()
+def check(tool_name: str, tool_input: dict, cwd: str | None = None) -> str | None:
+    """Return the block reason for a tool call, or None to allow it."""
+    if tool_name != "Bash":
+        return None
 
-    command = c.tool_input.get("command", "")
+    command = tool_input.get("command", "")
+    # Reloaded only when a policy file changed
+    policy = load_policy(POLICY_NAME, HOOKS_DIR, cwd)
 
     # Skip validation for commands that just mention git in text arguments
     # (e.g., gh pr create --body "... git commit --amend ...")
-    if not is_commit_command_context(command):
-        c.output.exit_success()
+    if not is_commit_command_context(command, policy):
+        return None
 
     # Find any git commit command (including in nested shells)
-    commit_cmd = find_commit_command(command)
+    commit_cmd = find_commit_command(command, policy)
     if not commit_cmd:
-        c.output.exit_success()
-        return  # For type checker
+        return None
 
     # Check for blocked bypass patterns
-    for pattern, msg in BLOCKED_PATTERNS:
-        if re.search(pattern, commit_cmd):
-            c.output.exit_block(msg)
+    blocked = policy.index("blocked").first(commit_cmd)
+    if blocked:
+        return blocked
 
     # For non-commit commands (merge, cherry-pick, revert, am), allow without -m
     # These have auto-generated messages that PostToolUse will validate
-    for pattern, _cmd_name in OTHER_COMMIT_COMMANDS:
-        if re.search(pattern, commit_cmd):
-            # If they specify -m, we should validate it
-            messages = extract_messages(commit_cmd)
-            if messages:
-                # Validate the message
-                for msg in messages:
-                    if has_dynamic_content(msg):
-                        c.output.exit_block(
-                            "Commit message cannot contain command substitution or variables.\n"
-                            "Use a literal message string."
-                        )
-                # Only validate first message (subject line)
-                if not CONVENTIONAL_PATTERN.match(messages[0]):
-                    c.output.exit_block(
-                        f"Commit message must follow conventional commits format:\n"
-                        f"  type(scope): description\n\n"
-                        f"Types: feat|fix|docs|style|refactor|perf|test|build|ci|chore|revert\n\n"
-                        f"Got: '{messages[0]}'"
+    if policy.index("other_commit_commands").any(commit_cmd):
+        # If they specify -m, we should validate it
+        messages = extract_messages(commit_cmd)
+        if messages:
+            # Validate the message
+            for msg in messages:
+                if has_dynamic_content(msg):
+                    return (
+                        "Commit message cannot contain command substitution or variables.\n"
+                        "Use a literal message string."
                     )
-            # No -m flag on merge/cherry-pick/etc is OK (auto-message)
-            c.output.exit_success()
+            # Only validate first message (subject line)
+            if not CONVENTIONAL_PATTERN.match(messages[0]):
+                return _format_error(messages[0])
+        # No -m flag on merge/cherry-pick/etc is OK (auto-message)
+        return None
 
     # For git commit, extract and validate -m messages
     messages = extract_messages(commit_cmd)
@@ -259,7 +258,7 @@ def main() -> None:
     # Check for dynamic content in messages
     for msg in messages:
         if has_dynamic_content(msg):
-            c.output.exit_block(
+            return (
                 "Commit message cannot contain command substitution or variables.\n"
                 "Use a literal message string."
             )
@@ -268,39 +267,47 @@ def main() -> None:
         # No -m flag - check for special cases
         if "--amend" in commit_cmd:
             # Amending without message change is OK
-            c.output.exit_success()
+            return None
 
         if "--fixup" in commit_cmd or "--squash" in commit_cmd:
             # These auto-generate messages
-            c.output.exit_success()
+            return None
 
         # Check for heredoc patterns
         if "EOF" in command or "<<" in command:
-            c.output.exit_block(
+            return (
                 "Use -m flag with literal message instead of heredoc.\n"
                 'Example: git commit -m "feat: add feature"'
             )
 
         # No message provided - this will open an editor (which Claude can't use)
         # or fail. Let it through for PostToolUse to catch if needed.
-        c.output.exit_success()
+        return None
 
     # Validate first message (subject line) against conventional commits
     primary_message = messages[0]
 
     # Allow fixup!/squash! prefixes
     if primary_message.startswith(("fixup! ", "squash! ")):
-        c.output.exit_success()
+        return None
 
     if not CONVENTIONAL_PATTERN.match(primary_message):
-        c.output.exit_block(
-            f"Commit message must follow conventional commits format:\n"
-            f"  type(scope): description\n\n"
-            f"Types: feat|fix|docs|style|refactor|perf|test|build|ci|chore|revert\n\n"
-            f"Got: '{primary_message}'"
-        )
-
-    c.output.exit_success()
+        return _format_error(primary_message)
+
+    return None
+
+
+def _format_error(message: str) -> str:
+    return (
+        f"Commit message must follow conventional commits format:\n"
+        f"  type(scope): description\n\n"
+        f"Types: feat|fix|docs|style|refactor|perf|test|build|ci|chore|revert\n\n"
+        f"Got: '{message}'"
+    )
+
+
+def main() -> None:
+    run_pretooluse(check)
 
 
 if __name__ == "__main__":
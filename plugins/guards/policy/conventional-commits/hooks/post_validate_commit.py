@@ -10,10 +10,26 @@ catching any bypasses that slipped through the PreToolUse hook.
 If an invalid commit is detected, it is automatically reverted.
 """
 
+import os
+import sys
+
+sys.path.insert(
+    0,
+    os.path.join(os.path.dirname(os.path.realpath(__file__)), "..", "..", "..", "lib"),
+)
+
+from guardkit.hookio import read_hook_input, skip_unless
+
+if __name__ == "__main__":
+    # Every commit-creating command starts with "git"
+    skip_unless("PostToolUse", {"Bash"}, keywords=("git",))
+
 import re
 import subprocess
+import zlib
 
-from cchooks import PostToolUseContext, create_context
+from cchooks import PostToolUseContext
+from guardkit import gitobjects
 
 # Conventional commit pattern
 CONVENTIONAL_PATTERN = re.compile(
@@ -33,34 +49,27 @@ COMMIT_COMMANDS = [
 ]
 
 
-def get_latest_commit_message() -> str | None:
-    """Get the subject line of the most recent commit."""
-    try:
-        result = subprocess.run(
-            ["git", "log", "-1", "--format=%s"],
-            capture_output=True,
-            text=True,
-            timeout=5,
-        )
-        if result.returncode != 0:
-            return None
-        return result.stdout.strip()
-    except Exception:
-        return None
-
+def get_latest_commit() -> tuple[str, str] | None:
+    """Get the hash and subject line of the most recent commit.
 
-def get_commit_hash() -> str | None:
-    """Get the hash of the most recent commit."""
+    Reads them from the repository's files; unusual layouts fall back to one
+    ``git log`` call.
+    """
+    try:
+        return gitobjects.head_commit(os.getcwd())
+    except (gitobjects.UnsupportedRepositoryError, OSError, ValueError, zlib.error):
+        pass
     try:
         result = subprocess.run(
-            ["git", "rev-parse", "HEAD"],
+            ["git", "log", "-1", "--format=%H%n%s"],
             capture_output=True,
             text=True,
             timeout=5,
         )
         if result.returncode != 0:
             return None
-        return result.stdout.strip()[:8]
+        commit_hash, _, subject = result.stdout.strip().partition("\n")
+        return commit_hash, subject
     except Exception:
         return None
 
@@ -80,7 +89,7 @@ def revert_commit() -> bool:
 
 
 def main() -> None:
-    c = create_context()
+    c = read_hook_input().context()
     if not isinstance(c, PostToolUseContext):
         c.output.exit_success()
 
@@ -113,10 +122,11 @@ def main() -> None:
         c.output.exit_success()
 
     # Get the actual commit message
-    message = get_latest_commit_message()
-    if not message:
+    latest = get_latest_commit()
+    if not latest or not latest[1]:
         c.output.exit_success()
         return  # For type checker
+    commit_hash, message = latest
 
     # Allow merge commits (auto-generated)
     if message.startswith("Merge "):
@@ -135,13 +145,12 @@ def main() -> None:
         c.output.exit_success()
 
     # Invalid commit detected - revert it
-    commit_hash = get_commit_hash()
     reverted = revert_commit()
 
     if reverted:
         c.output.exit_continue(
             f"COMMIT REVERTED! Message doesn't follow conventional format.\n"
-            f"  Commit: {commit_hash}\n"
+            f"  Commit: {commit_hash[:8]}\n"
             f"  Got: '{message}'\n"
             f"  Expected: type(scope): description\n"
             f"  Types: feat|fix|docs|style|refactor|perf|test|build|ci|chore|revert\n\n"
@@ -111,6 +111,27 @@ class TestExtractMessages:
         msgs = extract_messages("git commit --amend")
         assert len(msgs) == 0
 
+    def test_messages_in_argument_order(self):
+        msgs = extract_messages("git commit -m 'feat: subject' -m \"body\"")
+        assert msgs == ["feat: subject", "body"]
+
+    def test_combined_short_flags(self):
+        assert extract_messages('git commit -am "fix: typo"') == ["fix: typo"]
+        assert extract_messages("git commit --message='docs: x'") == ["docs: x"]
+
+    def test_flag_text_inside_message(self):
+        msgs = extract_messages('git commit -m "fix: handle -m flag"')
+        assert msgs == ["fix: handle -m flag"]
+
+    def test_chained_commit(self):
+        msgs = extract_messages('git add . && git commit -m "feat: x"')
+        assert msgs == ["feat: x"]
+
+    def test_unparsed_command_read_as_text(self):
+        command = "{ " * 400 + "git commit -m 'bad message'" + "; }" * 400
+        assert extract_messages(command) == ["bad message"]
+        assert "bad message" in conventional_commits.check("Bash", {"command": command})
+
 
 class TestHasDynamicContent:
     """Test detection of dynamic content in messages."""
@@ -4,23 +4,22 @@
 # ///
 """PreToolUse hook to enforce uv usage in commands."""
 
+import os
 import re
+import sys
 
-from cchooks import PreToolUseContext, create_context
+sys.path.insert(
+    0,
+    os.path.join(os.path.dirname(os.path.realpath(__file__)), "..", "..", "..", "lib"),
+)
 
+from guardkit.hookio import run_pretooluse, skip_unless
 
-c = create_context()
+if __name__ == "__main__":
+    # Exit before compiling any pattern when the call cannot concern this guard
+    skip_unless("PreToolUse", {"Bash"})
 
-assert isinstance(c, PreToolUseContext)
-
-if c.tool_name != "Bash":
-    c.output.exit_success()
-
-command = c.tool_input.get("command", "")
-
-# Skip if already using uv
-if command.startswith(("uv ", "uvx ")):
-    c.output.exit_success()
+from guardkit.prefilter import LiteralIndex
 
 # Separator pattern for detecting commands after && || ; or at start
 SEP = r"(?:^|&&|\|\||;)\s*"
@@ -95,18 +94,49 @@ SHELL_WRAPPER_PATTERNS = [
     (r"""eval\s+['"][^'"]*\bpytest\b""", "pytest inside eval"),
 ]
 
-# Check standard patterns
-for cmd, (pattern, suggestion) in patterns.items():
-    if re.search(pattern, command):
-        c.output.exit_block(
-            f"Use '{suggestion}' instead of bare '{cmd}' in uv projects"
-        )
+# Matched in linear time however long the command is
+COMMAND_INDEX = LiteralIndex(
+    ((pattern, (cmd, suggestion)) for cmd, (pattern, suggestion) in patterns.items()),
+    linear=True,
+)
+SHELL_WRAPPER_INDEX = LiteralIndex(SHELL_WRAPPER_PATTERNS, re.IGNORECASE, linear=True)
+
+
+def fast_lane_gates(cwd: str | None = None) -> list:
+    """Return the patterns of which a command this guard can block matches one."""
+    return [COMMAND_INDEX, SHELL_WRAPPER_INDEX]
+
+
+def check(tool_name: str, tool_input: dict) -> str | None:
+    """Return the block reason for a tool call, or None to allow it."""
+    if tool_name != "Bash":
+        return None
 
-# Check shell wrapper bypass attempts
-for pattern, description in SHELL_WRAPPER_PATTERNS:
-    if re.search(pattern, command, re.IGNORECASE):
-        c.output.exit_block(
+    command = tool_input.get("command", "")
+
+    # Skip if already using uv
+    if command.startswith(("uv ", "uvx ")):
+        return None
+
+    # Check standard patterns
+    match = COMMAND_INDEX.first(command)
+    if match:
+        cmd, suggestion = match
+        return f"Use '{suggestion}' instead of bare '{cmd}' in uv projects"
+
+    # Check shell wrapper bypass attempts
+    description = SHELL_WRAPPER_INDEX.first(command)
+    if description:
+        return (
             f"Detected {description}. Use uv commands directly without shell wrappers."
         )
 
-c.output.exit_success()
+    return None
+
+
+def main() -> None:
+    run_pretooluse(check)
+
+
+if __name__ == "__main__":
+    main()
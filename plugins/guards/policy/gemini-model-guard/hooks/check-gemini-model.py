@@ -15,39 +15,48 @@ This hook scans the entire command for gemini invocations, catching:
 - Blocks: gemini --version, gemini --help (introspection)
 """
 
+import os
 import re
 import shlex
+import sys
+
+sys.path.insert(
+    0,
+    os.path.join(os.path.dirname(os.path.realpath(__file__)), "..", "..", "..", "lib"),
+)
+
+from guardkit.hookio import run_pretooluse, skip_unless
+
+if __name__ == "__main__":
+    # Exit before building the pattern tables when the call cannot concern this guard
+    skip_unless("PreToolUse", {"Bash"}, keywords=("gemini",))
+
+from guardkit.command import BashCommand
+from guardkit.policy import load_policy
+
+HOOKS_DIR = os.path.dirname(os.path.realpath(__file__))
+
+# Rules live in gemini-model-guard.policy.toml, merged with user and project
+# overlays; the module-level tables are the policy as loaded at import
+POLICY_NAME = "gemini-model-guard"
+POLICY = load_policy(POLICY_NAME, HOOKS_DIR)
+BLOCKED_FLAGS = POLICY.list("blocked_flags")
+ALLOWED_MODELS = POLICY.list("allowed_models")
+VARIABLE_INDIRECTION_PATTERNS = POLICY.pairs("variable_indirection")
+ENV_VAR_PATTERNS = POLICY.pairs("env_vars")
+
+# Matched in linear time however long the command is
+VARIABLE_INDIRECTION_INDEX = POLICY.index("variable_indirection")
+ENV_VAR_INDEX = POLICY.index("env_vars")
+
+# Any command this guard can block mentions gemini
+GEMINI_MENTION_PATTERN = re.compile("gemini", re.IGNORECASE)
+
+
+def fast_lane_gates(cwd: str | None = None) -> list:
+    """Return the patterns of which a command this guard can block matches one."""
+    return [GEMINI_MENTION_PATTERN]
 
-from cchooks import PreToolUseContext, create_context
-
-# Blocked introspection flags - these reveal CLI info or bypass model checks
-BLOCKED_FLAGS = ["--version", "-v", "--help", "-h"]
-
-# Allowed models - Gemini 3 only
-ALLOWED_MODELS = [
-    "gemini-3-pro-preview",
-    "gemini-3-flash-preview",
-]
-
-# Patterns for variable indirection that could bypass model detection
-VARIABLE_INDIRECTION_PATTERNS = [
-    # Shell variable substitution for model value
-    (r"--model[=\s]+\$", "variable substitution in --model"),
-    (r"-m\s+\$", "variable substitution in -m flag"),
-    # Command substitution for model value
-    (r"--model[=\s]+\$\(", "command substitution in --model"),
-    (r"-m\s+\$\(", "command substitution in -m flag"),
-    # Backtick command substitution
-    (r"--model[=\s]+`", "backtick substitution in --model"),
-    (r"-m\s+`", "backtick substitution in -m flag"),
-]
-
-# Environment variables that could set the model
-ENV_VAR_PATTERNS = [
-    (r"\bGEMINI_MODEL=\S*gemini-2", "GEMINI_MODEL env var set to Gemini 2.x"),
-    (r"\bGEMINI_MODEL_NAME=\S*gemini-2", "GEMINI_MODEL_NAME env var set to Gemini 2.x"),
-    (r"\bMODEL=\S*gemini-2", "MODEL env var may be set to Gemini 2.x"),
-]
 
 # Pattern to find gemini command invocations anywhere in the command
 # Matches after: start of string, separators (;&|), grouping (({`), newlines, pipes, whitespace
@@ -166,67 +175,74 @@ def is_gemini_2_model(model: str) -> bool:
     return bool(re.search(r"gemini-2", model, re.IGNORECASE))
 
 
-def has_blocked_flag(segment: str) -> str | None:
+def has_blocked_flag(
+    segment: str, blocked_flags: list[str] | None = None
+) -> str | None:
     """Check if segment contains a blocked introspection flag.
 
     Returns the blocked flag if found, None otherwise.
     """
+    blocked_flags = BLOCKED_FLAGS if blocked_flags is None else blocked_flags
     try:
         parts = shlex.split(segment)
     except ValueError:
         parts = segment.split()
 
     for part in parts:
-        if part in BLOCKED_FLAGS:
+        if part in blocked_flags:
             return part
     return None
 
 
-def main() -> None:
-    c = create_context()
-    if not isinstance(c, PreToolUseContext):
-        c.output.exit_success()
-
-    command = c.tool_input.get("command", "")
+def check(
+    tool_name: str,
+    tool_input: dict,
+    parsed: BashCommand | None = None,
+    cwd: str | None = None,
+) -> str | None:
+    """Return the block reason for a tool call, or None to allow it."""
+    command = tool_input.get("command", "")
+    parsed = parsed or BashCommand(command)
 
     # Quick check: if "gemini" not in command at all, skip
-    if "gemini" not in command.lower():
-        c.output.exit_success()
+    if "gemini" not in parsed.lower:
+        return None
+
+    # Reloaded only when a policy file changed
+    policy = load_policy(POLICY_NAME, HOOKS_DIR, cwd)
+    blocked_flags = policy.list("blocked_flags")
 
     # Check for environment variable bypasses first
-    for pattern, description in ENV_VAR_PATTERNS:
-        if re.search(pattern, command, re.IGNORECASE):
-            c.output.exit_block(
-                f"Blocked: {description}\n"
-                "Use Gemini 3 models only:\n"
-                "  GEMINI_MODEL=gemini-3-pro-preview (recommended)\n"
-                "  GEMINI_MODEL=gemini-3-flash-preview (faster/cheaper)"
-            )
+    description = policy.index("env_vars").first(command)
+    if description:
+        return (
+            f"Blocked: {description}\n"
+            "Use Gemini 3 models only:\n"
+            "  GEMINI_MODEL=gemini-3-pro-preview (recommended)\n"
+            "  GEMINI_MODEL=gemini-3-flash-preview (faster/cheaper)"
+        )
 
     # Find all gemini invocations in the command
-    segments = find_gemini_segments(command)
-
-    if not segments:
-        c.output.exit_success()
+    segments = find_gemini_segments(parsed.normalized)
 
     # Check each segment for problematic models or blocked flags
     for segment in segments:
         # Check for blocked introspection flags first
-        blocked_flag = has_blocked_flag(segment)
+        blocked_flag = has_blocked_flag(segment, blocked_flags)
         if blocked_flag:
-            c.output.exit_block(
+            return (
                 f"Gemini CLI flag '{blocked_flag}' is blocked.\n"
                 "Direct gemini CLI introspection is not allowed."
             )
 
         # Check for variable indirection (model value from variable/command)
-        for pattern, description in VARIABLE_INDIRECTION_PATTERNS:
-            if re.search(pattern, segment):
-                c.output.exit_block(
-                    f"Blocked: {description}\n"
-                    "Model must be specified directly as a literal string.\n"
-                    "Use: --model gemini-3-pro-preview or --model gemini-3-flash-preview"
-                )
+        description = policy.index("variable_indirection").first(segment)
+        if description:
+            return (
+                f"Blocked: {description}\n"
+                "Model must be specified directly as a literal string.\n"
+                "Use: --model gemini-3-pro-preview or --model gemini-3-flash-preview"
+            )
 
         model = extract_model_from_segment(segment)
 
@@ -234,14 +250,18 @@ def main() -> None:
             continue  # No model specified, will use default
 
         if is_gemini_2_model(model):
-            c.output.exit_block(
+            return (
                 f"Gemini model '{model}' is deprecated.\n"
                 "Use Gemini 3 models only:\n"
                 "  --model gemini-3-pro-preview (recommended)\n"
                 "  --model gemini-3-flash-preview (faster/cheaper)"
             )
 
-    c.output.exit_success()
+    return None
+
+
+def main() -> None:
+    run_pretooluse(check)
 
 
 if __name__ == "__main__":
@@ -11,9 +11,26 @@ was bypassed through an unforeseen method).
 This is a defense-in-depth measure.
 """
 
+import os
+import sys
+
+sys.path.insert(
+    0,
+    os.path.join(os.path.dirname(os.path.realpath(__file__)), "..", "..", "..", "lib"),
+)
+
+from guardkit.hookio import read_hook_input, skip_unless
+
+if __name__ == "__main__":
+    # The output is part of the payload, so a payload without "gemini" has
+    # nothing to warn about
+    if "gemini" not in skip_unless("PostToolUse", {"Bash"}).raw.lower():
+        sys.exit(0)
+
 import re
 
-from cchooks import PostToolUseContext, create_context
+from cchooks import PostToolUseContext
+from guardkit.prefilter import LiteralIndex
 
 # Patterns that suggest Gemini 2.x was used in output
 GEMINI_2_OUTPUT_PATTERNS = [
@@ -23,9 +40,16 @@ GEMINI_2_OUTPUT_PATTERNS = [
     r"Using model:.*2\.",
 ]
 
+# Tool output can be megabytes long, so match it in linear time
+GEMINI_2_OUTPUT_INDEX = LiteralIndex(
+    ((pattern, pattern) for pattern in GEMINI_2_OUTPUT_PATTERNS),
+    re.IGNORECASE,
+    linear=True,
+)
+
 
 def main() -> None:
-    c = create_context()
+    c = read_hook_input().context()
     if not isinstance(c, PostToolUseContext):
         c.output.exit_success()
 
@@ -40,14 +64,13 @@ def main() -> None:
         c.output.exit_success()
 
     # Check for Gemini 2.x patterns in output
-    for pattern in GEMINI_2_OUTPUT_PATTERNS:
-        if re.search(pattern, output, re.IGNORECASE):
-            # Don't block (command already ran), but warn
-            c.output.exit_continue(
-                "WARNING: Detected possible Gemini 2.x usage in command output.\n"
-                "Gemini 2.x models are deprecated. Please use Gemini 3 models.\n"
-                "If this was intentional bypass, please review the gemini-model-guard plugin."
-            )
+    if GEMINI_2_OUTPUT_INDEX.any(output):
+        # Don't block (command already ran), but warn
+        c.output.exit_continue(
+            "WARNING: Detected possible Gemini 2.x usage in command output.\n"
+            "Gemini 2.x models are deprecated. Please use Gemini 3 models.\n"
+            "If this was intentional bypass, please review the gemini-model-guard plugin."
+        )
 
     c.output.exit_success()
 
@@ -12,28 +12,55 @@ Escape hatch:
   Add "# clean-code-guard: disable" comment to bypass checks.
 
 Limitations:
-- Variable assignment pattern is intentionally broad and may have false positives
-  when a variable is assigned early and gemini is called much later with a
-  different variable that happens to have a similar name.
-- Regex patterns use non-greedy matching which may not handle all edge cases
-  with nested quotes perfectly.
+- Variable assignment check is intentionally broad and may have false positives
+  when a variable is assigned early and gemini is called much later with the
+  same variable for an unrelated purpose.
+- Quoted code is taken up to the next quote of the same kind, which may not
+  handle all edge cases with nested or escaped quotes perfectly.
+
+All patterns run in linear time, so commands of any length are checked.
 
 When in doubt, use the escape hatch and document why.
 """
 
+import os
 import re
+import sys
+
+sys.path.insert(
+    0,
+    os.path.join(os.path.dirname(os.path.realpath(__file__)), "..", "..", "..", "lib"),
+)
 
-from cchooks import PreToolUseContext, create_context
+from guardkit.hookio import run_pretooluse, skip_unless
+
+if __name__ == "__main__":
+    # Exit before compiling any pattern when the call cannot concern this guard
+    skip_unless("PreToolUse", {"Bash"}, keywords=("python", "gemini"))
+
+from guardkit import linear
 
 # Threshold for "simple" one-liner python -c scripts (characters)
 PYTHON_C_LENGTH_THRESHOLD = 100
 
-# Maximum command length to process (ReDoS protection)
-# Commands longer than this are skipped to prevent catastrophic backtracking
-MAX_COMMAND_LENGTH = 10000
-
 # Escape hatch pattern - if present, skip all checks
-DISABLE_PATTERN = re.compile(r"#\s*clean-code-guard:\s*disable", re.IGNORECASE)
+DISABLE_PATTERN = linear.compile(r"#\s*clean-code-guard:\s*disable", re.IGNORECASE)
+
+# python -c or uv run python -c followed by quoted code
+PYTHON_C_PATTERN = linear.compile(
+    r"""(?:uv\s+run\s+)?python[3]?\s+-c\s+(?:'[^']*'|"[^"]*")"""
+)
+
+# $(cat <<EOF or $(cat <<'EOF'
+GEMINI_HEREDOC_PATTERN = linear.compile(r"""\$\(cat\s+<<['"]?EOF""", re.IGNORECASE)
+
+# Variable assignment from command substitution, and a later use of a variable
+# e.g., CONTENT=$(cat file); gemini "$CONTENT"
+VAR_ASSIGN_PATTERN = re.compile(r"\b([A-Z_][A-Z0-9_]*)\s*=\s*\$\(", re.IGNORECASE)
+VAR_REFERENCE_PATTERN = re.compile(r"\$\{?([A-Z_][A-Z0-9_]*)", re.IGNORECASE)
+
+# Direct heredoc in gemini args
+DIRECT_HEREDOC_PATTERN = linear.compile(r"""gemini.*["']\$\(cat\s+<<""", re.IGNORECASE)
 
 
 def check_python_c_pattern(command: str) -> str | None:
@@ -42,20 +69,16 @@ def check_python_c_pattern(command: str) -> str | None:
     Allows simple one-liners but blocks multi-line or complex scripts.
 
     Limitations:
-    - Non-greedy matching may not handle all nested quote scenarios
+    - Code ends at the next quote of the same kind, so nested quotes may be cut short
     - Length threshold is a heuristic, not perfect
     """
-    # Pattern: python -c or uv run python -c followed by quoted code
-    python_c_pattern = re.compile(
-        r"""(?:uv\s+run\s+)?python[3]?\s+-c\s+(['"])(.*?)\1""",
-        re.DOTALL,
-    )
-
-    match = python_c_pattern.search(command)
+    match = PYTHON_C_PATTERN.search(command)
     if not match:
         return None
 
-    code = match.group(2)
+    # The code between the quote after -c and the next quote of the same kind
+    quoted = match.group()
+    code = quoted[quoted.index(quoted[-1]) + 1 : -1]
 
     # Allow simple one-liners (no newlines, short)
     if "\n" not in code and len(code) < PYTHON_C_LENGTH_THRESHOLD:
@@ -78,9 +101,8 @@ def check_gemini_heredoc_pattern(command: str) -> str | None:
 
     Limitations:
     - Variable assignment pattern is intentionally broad to catch the common
-      case of VAR=$(cat file); gemini "$VAR". This may false-positive if:
-      - Variable is assigned much earlier in a multi-command string
-      - A different variable with similar name is used
+      case of VAR=$(cat file); gemini "$VAR". This may false-positive if
+      the variable is assigned much earlier in a multi-command string.
     - Direct heredoc pattern may match literal strings containing the pattern
 
     Use escape hatch if you have a legitimate use case.
@@ -88,32 +110,50 @@ def check_gemini_heredoc_pattern(command: str) -> str | None:
     if "gemini" not in command.lower():
         return None
 
-    # Pattern 1: $(cat <<EOF or $(cat <<'EOF'
-    heredoc_pattern = re.compile(r"""\$\(cat\s+<<['"]?EOF""", re.IGNORECASE)
-
-    # Pattern 2: Variable assignment followed by gemini using that variable
-    # e.g., CONTENT=$(cat file); gemini "$CONTENT"
-    # Note: Intentionally broad - may have false positives
-    var_assign_pattern = re.compile(
-        r"""([A-Z_][A-Z0-9_]*)\s*=\s*\$\(.*?\).*?gemini.*?\$\{?\1\}?""",
-        re.DOTALL | re.IGNORECASE,
-    )
-
-    # Pattern 3: Direct heredoc in gemini args
-    direct_heredoc = re.compile(r"""gemini.*["']\$\(cat\s+<<""", re.IGNORECASE)
-
-    if heredoc_pattern.search(command):
+    if GEMINI_HEREDOC_PATTERN.search(command):
         return _gemini_block_message("heredoc")
 
-    if var_assign_pattern.search(command):
+    if _assigned_variable_passed_to_gemini(command):
         return _gemini_block_message("variable assignment")
 
-    if direct_heredoc.search(command):
+    if DIRECT_HEREDOC_PATTERN.search(command):
         return _gemini_block_message("heredoc")
 
     return None
 
 
+def _assigned_variable_passed_to_gemini(command: str) -> bool:
+    """Check for VAR=$(...) followed by ')', then gemini, then $VAR or ${VAR}.
+
+    Runs in linear time: each variable is only tracked from its first
+    assignment, and the ')' and gemini searches never rescan text.
+    """
+    lowered = command.lower()
+    # Position after which a use of each variable is passed to gemini
+    armed_at: dict[str, int] = {}
+    paren = gemini = -1
+    for match in VAR_ASSIGN_PATTERN.finditer(lowered):
+        name = match.group(1)
+        if name in armed_at:
+            continue
+        if paren < match.end():
+            paren = lowered.find(")", match.end())
+        if paren < 0:
+            break
+        if gemini <= paren:
+            gemini = lowered.find("gemini", paren + 1)
+        if gemini < 0:
+            break
+        armed_at[name] = gemini + len("gemini")
+
+    if not armed_at:
+        return False
+    return any(
+        match.group(1) in armed_at and match.start() >= armed_at[match.group(1)]
+        for match in VAR_REFERENCE_PATTERN.finditer(lowered)
+    )
+
+
 def _gemini_block_message(pattern_type: str) -> str:
     return (
         f"Gemini invocation with {pattern_type} is blocked.\n\n"
@@ -129,35 +169,23 @@ def _gemini_block_message(pattern_type: str) -> str:
     )
 
 
-def main() -> None:
-    c = create_context()
-    if not isinstance(c, PreToolUseContext):
-        c.output.exit_success()
-
-    if c.tool_name != "Bash":
-        c.output.exit_success()
-
-    command = c.tool_input.get("command", "")
+def check(tool_name: str, tool_input: dict) -> str | None:
+    """Return the block reason for a tool call, or None to allow it."""
+    if tool_name != "Bash":
+        return None
 
-    # ReDoS protection: skip very long commands to prevent catastrophic backtracking
-    if len(command) > MAX_COMMAND_LENGTH:
-        c.output.exit_success()
+    command = tool_input.get("command", "")
 
     # Check for escape hatch
     if DISABLE_PATTERN.search(command):
-        c.output.exit_success()
+        return None
 
-    # Check python -c pattern
-    python_block = check_python_c_pattern(command)
-    if python_block:
-        c.output.exit_block(python_block)
+    # Check python -c pattern, then gemini heredoc pattern
+    return check_python_c_pattern(command) or check_gemini_heredoc_pattern(command)
 
-    # Check gemini heredoc pattern
-    gemini_block = check_gemini_heredoc_pattern(command)
-    if gemini_block:
-        c.output.exit_block(gemini_block)
 
-    c.output.exit_success()
+def main() -> None:
+    run_pretooluse(check)
 
 
 if __name__ == "__main__":
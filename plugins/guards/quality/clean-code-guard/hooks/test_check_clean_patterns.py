@@ -21,7 +21,7 @@ check_python_c_pattern = check_clean_patterns.check_python_c_pattern
 check_gemini_heredoc_pattern = check_clean_patterns.check_gemini_heredoc_pattern
 DISABLE_PATTERN = check_clean_patterns.DISABLE_PATTERN
 PYTHON_C_LENGTH_THRESHOLD = check_clean_patterns.PYTHON_C_LENGTH_THRESHOLD
-MAX_COMMAND_LENGTH = check_clean_patterns.MAX_COMMAND_LENGTH
+check = check_clean_patterns.check
 
 
 class TestPythonCPattern:
@@ -194,24 +194,36 @@ class TestEscapeHatch:
         assert DISABLE_PATTERN.search(cmd) is None
 
 
-class TestReDoSProtection:
-    """Test ReDoS protection mechanisms."""
-
-    def test_max_command_length_constant(self):
-        """MAX_COMMAND_LENGTH should be defined and reasonable."""
-        assert MAX_COMMAND_LENGTH > 1000
-        assert MAX_COMMAND_LENGTH <= 100000
-
-    def test_long_command_handling(self):
-        """Very long commands should not cause issues."""
-        # Create a command longer than MAX_COMMAND_LENGTH
-        # The actual protection is in main(), but we verify the constant exists
-        long_cmd = "x" * (MAX_COMMAND_LENGTH + 100)
-        # These functions should handle long input without hanging
-        # (actual protection is length check in main before calling these)
-        # Just verify they don't crash
-        check_python_c_pattern(long_cmd[:1000])  # Truncated for safety
-        check_gemini_heredoc_pattern(long_cmd[:1000])
+class TestLongCommands:
+    """Long commands are checked in full, not skipped."""
+
+    def test_python_c_after_long_prefix_blocked(self):
+        cmd = "echo " + "x" * 100_000 + "; python -c 'import os\nprint(1)'"
+        assert check("Bash", {"command": cmd}) is not None
+
+    def test_variable_assignment_after_long_prefix_blocked(self):
+        cmd = "A=$(true); " * 10_000 + 'CONTENT=$(cat f); gemini "$CONTENT"'
+        assert check("Bash", {"command": cmd}) is not None
+
+    def test_many_assignments_without_gemini_use_allowed(self):
+        cmd = "A=$(true); " * 10_000 + 'gemini "review" @file.md'
+        assert check("Bash", {"command": cmd}) is None
+
+
+class TestVariableAssignment:
+    """Test the assigned-variable check against its documented matches."""
+
+    def test_variable_used_before_gemini_allowed(self):
+        cmd = 'CONTENT=$(cat file); echo "$CONTENT" | gemini -o text "Review"'
+        assert check_gemini_heredoc_pattern(cmd) is None
+
+    def test_different_variable_allowed(self):
+        cmd = 'CONTENT=$(cat file); gemini "$CONTENT_TYPE"'
+        assert check_gemini_heredoc_pattern(cmd) is None
+
+    def test_later_assignment_of_same_variable_blocked(self):
+        cmd = 'X=$(a); gemini -h; X=$(cat f); gemini "$X"'
+        assert check_gemini_heredoc_pattern(cmd) is not None
 
 
 class TestEdgeCases:
@@ -2,30 +2,57 @@
 # /// script
 # dependencies = ["cchooks"]
 # ///
-"""PostToolUse hook to auto-format Python files with ruff."""
-
-import subprocess
-
-from cchooks import PostToolUseContext, create_context
-
-
-c = create_context()
-assert isinstance(c, PostToolUseContext)
-
-if c.tool_name in ("Write", "Edit") and c.tool_input.get("file_path", "").endswith(".py"):
-    file_path = c.tool_input["file_path"]
+"""PostToolUse hook to auto-format Python files with ruff.
+
+With GUARDS_FORMAT_BATCH=1, edited files are queued per session instead and
+formatted with one ruff call at Stop/SubagentStop (see guardkit.format_queue).
+"""
+
+import os
+import sys
+
+sys.path.insert(
+    0,
+    os.path.join(os.path.dirname(os.path.realpath(__file__)), "..", "..", "..", "lib"),
+)
+
+from guardkit.hookio import read_hook_input, skip_unless
+
+payload = read_hook_input()
+if payload.event in ("Stop", "SubagentStop"):
+    # The end of a turn flushes the batch queue; nothing to do otherwise
+    if os.environ.get("GUARDS_FORMAT_BATCH", "0") in ("", "0"):
+        sys.exit(0)
+    from guardkit import format_queue
+
+    report = format_queue.flush(str(payload.data.get("session_id", "")))
+    if report:
+        print(report)
+    sys.exit(0)
+
+hook = skip_unless(
+    "PostToolUse", {"Write", "Edit"}, keywords=(".py",), field="file_path"
+)
+file_path = hook.text("file_path")
+
+if file_path.endswith(".py"):
+    from guardkit import format_queue
+
+    session_id = str(hook.data.get("session_id", ""))
+    if format_queue.batch_enabled() and format_queue.try_enqueue(session_id, file_path):
+        if not format_queue.should_flush(session_id):
+            print(f"Queued for formatting: {file_path}")
+            sys.exit(0)
+        report = format_queue.flush(session_id)
+        if report:
+            print(report)
+        sys.exit(0)
 
     # Use uvx ruff directly - no Makefile dependency
-    result = subprocess.run(
-        ["uvx", "ruff", "format", file_path],
-        check=False,
-        capture_output=True,
-        text=True,
-    )
-
-    if result.returncode == 0:
+    ok, output = format_queue.format_files([file_path])
+    if ok:
         print(f"Formatted: {file_path}")
     else:
-        print(f"Format warning: {result.stderr}")
+        print(f"Format warning: {output}")
 
-c.output.exit_success()
+sys.exit(0)
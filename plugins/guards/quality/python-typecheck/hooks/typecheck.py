@@ -4,28 +4,32 @@
 # ///
 """PostToolUse hook to run type checking after Python file edits."""
 
-import subprocess
+import os
+import sys
 
-from cchooks import PostToolUseContext, create_context
+sys.path.insert(
+    0,
+    os.path.join(os.path.dirname(os.path.realpath(__file__)), "..", "..", "..", "lib"),
+)
 
+from guardkit.hookio import skip_unless
 
-c = create_context()
-assert isinstance(c, PostToolUseContext)
+hook = skip_unless(
+    "PostToolUse", {"Write", "Edit"}, keywords=(".py",), field="file_path"
+)
+file_path = hook.text("file_path")
 
-if c.tool_name in ("Write", "Edit") and c.tool_input.get("file_path", "").endswith(".py"):
-    file_path = c.tool_input["file_path"]
+if file_path.endswith(".py"):
+    from guardkit.pyright import typecheck
 
-    # Use uvx pyright directly - no Makefile dependency
-    result = subprocess.run(
-        ["uvx", "pyright", file_path],
-        check=False,
-        capture_output=True,
-        text=True,
-    )
-
-    if result.returncode == 0:
+    # Ask the project's persistent language server; uvx pyright runs directly
+    # when it is disabled or unavailable
+    passed, output = typecheck(file_path)
+    if passed:
         print("Type check passed")
+    elif passed is None:
+        print(f"Type check skipped: {output}")
     else:
-        print(f"Type errors:\n{result.stdout}")
+        print(f"Type errors:\n{output}")
 
-c.output.exit_success()
+sys.exit(0)
@@ -7,10 +7,22 @@
 from __future__ import annotations
 
 import os
-from pathlib import Path
+import sys
+
+sys.path.insert(
+    0,
+    os.path.join(os.path.dirname(os.path.realpath(__file__)), "..", "..", "..", "lib"),
+)
+
+from guardkit.hookio import read_hook_input, skip_unless
 
-from cchooks import PostToolUseContext, create_context
+if __name__ == "__main__":
+    # Only new Python files can need a reminder
+    skip_unless("PostToolUse", {"Write"}, keywords=(".py",), field="file_path")
+
+from pathlib import Path
 
+from guardkit import testmap
 
 SKIP_BASENAMES = {"__init__.py", "conftest.py"}
 
@@ -20,7 +32,9 @@ def should_remind_about_tests(file_path: str) -> bool:
         return False
 
     basename = os.path.basename(file_path)
-    if basename.startswith("test_") or basename in SKIP_BASENAMES:
+    if basename.startswith("test_") or basename.endswith("_test.py"):
+        return False
+    if basename in SKIP_BASENAMES:
         return False
 
     parts = Path(file_path).parts
@@ -43,24 +57,21 @@ def possible_test_paths(file_path: str) -> list[str]:
 
 
 def has_corresponding_test(file_path: str) -> bool:
-    return any(os.path.exists(path) for path in possible_test_paths(file_path))
+    if any(os.path.exists(path) for path in possible_test_paths(file_path)):
+        return True
+    # Tests under testpaths, mirrored packages or *_test.py names
+    try:
+        return bool(testmap.find_tests(file_path))
+    except OSError:
+        return False
 
 
 def main() -> None:
-    c = create_context()
-    assert isinstance(c, PostToolUseContext)
-
-    if c.tool_name != "Write":
-        c.output.exit_success()
-
-    file_path = c.tool_input.get("file_path", "")
-    if not should_remind_about_tests(file_path):
-        c.output.exit_success()
-
-    if not has_corresponding_test(file_path):
+    file_path = read_hook_input().text("file_path")
+    if should_remind_about_tests(file_path) and not has_corresponding_test(file_path):
         print(f"Reminder: Consider adding tests for {os.path.basename(file_path)}")
 
-    c.output.exit_success()
+    sys.exit(0)
 
 
 if __name__ == "__main__":
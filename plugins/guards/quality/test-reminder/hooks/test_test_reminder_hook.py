@@ -35,3 +35,23 @@ def test_reminder_hook_exposes_test_detection_helper() -> None:
     assert module.should_remind_about_tests("src/service.py") is True
     assert module.should_remind_about_tests("tests/test_service.py") is False
     assert module.should_remind_about_tests("src/conftest.py") is False
+
+
+def test_reminder_hook_finds_tests_through_project_index(tmp_path, monkeypatch) -> None:
+    monkeypatch.setenv("GUARDS_RUNTIME_DIR", str(tmp_path / "rt"))
+    module = load_hook_module()
+    (tmp_path / "pyproject.toml").write_text(
+        '[tool.pytest.ini_options]\ntestpaths = ["tests"]\n'
+    )
+    (tmp_path / "tests" / "unit" / "pkg").mkdir(parents=True)
+    (tmp_path / "tests" / "unit" / "pkg" / "service_test.py").write_text("")
+
+    assert (
+        module.has_corresponding_test(str(tmp_path / "src" / "pkg" / "service.py"))
+        is True
+    )
+    assert (
+        module.has_corresponding_test(str(tmp_path / "src" / "pkg" / "other.py"))
+        is False
+    )
+    assert module.should_remind_about_tests("src/service_test.py") is False
@@ -4,42 +4,38 @@
 # ///
 """Block dangerous gh CLI commands, allow only safe read operations."""
 
+import os
 import re
 import shlex
+import sys
 
-from cchooks import PreToolUseContext, create_context
-
-# Safe patterns for gh api - read-only operations
-# Note: Leading slash is stripped before matching
-ALLOWED_API_PATTERNS = [
-    # PR comments (inline/review comments)
-    r"^repos/[^/]+/[^/]+/pulls/\d+/comments$",
-    # Issue/PR conversation comments
-    r"^repos/[^/]+/[^/]+/issues/\d+/comments$",
-    # Single comment by ID (issues/comments/{id} works for both issue and PR comments)
-    r"^repos/[^/]+/[^/]+/issues/comments/\d+$",
-    # Single PR review comment by ID
-    r"^repos/[^/]+/[^/]+/pulls/comments/\d+$",
-    # PR reviews
-    r"^repos/[^/]+/[^/]+/pulls/\d+/reviews$",
-    # Specific review comments
-    r"^repos/[^/]+/[^/]+/pulls/\d+/reviews/\d+/comments$",
-    # PR details
-    r"^repos/[^/]+/[^/]+/pulls/\d+$",
-    # Issue details
-    r"^repos/[^/]+/[^/]+/issues/\d+$",
-    # Commit comments
-    r"^repos/[^/]+/[^/]+/commits/[a-f0-9]+/comments$",
-    # Repository info
-    r"^repos/[^/]+/[^/]+$",
-    # List PRs/issues (useful for searching)
-    r"^repos/[^/]+/[^/]+/pulls$",
-    r"^repos/[^/]+/[^/]+/issues$",
-    # PR files (for reviewing changes)
-    r"^repos/[^/]+/[^/]+/pulls/\d+/files$",
-    # Commits on a PR
-    r"^repos/[^/]+/[^/]+/pulls/\d+/commits$",
-]
+sys.path.insert(
+    0,
+    os.path.join(os.path.dirname(os.path.realpath(__file__)), "..", "..", "..", "lib"),
+)
+
+from guardkit.hookio import run_pretooluse, skip_unless
+
+if __name__ == "__main__":
+    # Exit before building the pattern tables when the call cannot concern this guard
+    skip_unless("PreToolUse", {"Bash"}, keywords=("gh",))
+
+from guardkit import linear
+from guardkit.command import BashCommand
+from guardkit.prefilter import LiteralIndex
+from guardkit.routes import RouteError, RouteLayer, RouteTrie, load_layers
+from guardkit.runtime import config_dir
+
+HOOKS_DIR = os.path.dirname(os.path.realpath(__file__))
+
+# Safe endpoints, methods and query parameters are declared in route files,
+# later files replacing routes of earlier ones:
+#   gh-api-routes.json next to this hook (read-only operations)
+#   $XDG_CONFIG_HOME/rbw-guards/gh-api-routes.json (user, any method)
+#   <project>/.claude/gh-api-routes.json (project, read-only methods only)
+ROUTES_FILE_NAME = "gh-api-routes.json"
+DEFAULT_ROUTES_FILE = os.path.join(HOOKS_DIR, ROUTES_FILE_NAME)
+READ_ONLY_METHODS = frozenset({"GET", "HEAD"})
 
 # Dangerous HTTP methods to block
 DANGEROUS_METHODS = ["POST", "PUT", "PATCH", "DELETE"]
@@ -71,155 +67,235 @@ BLOCKED_SUBCOMMANDS = [
     (r"\bgh\s+cache\s+delete\b", "gh cache delete requires manual approval"),
     # GraphQL mutations (can do anything)
     (
-        r"\bgh\s+api\s+graphql\b.{0,2000}?\bmutation\b",
+        r"\bgh\s+api\s+graphql\b.*\bmutation\b",
         "GraphQL mutations require manual approval",
     ),
 ]
 
+# Prefilter: only run patterns whose required literals occur in the command,
+# in linear time however long the command is
+BLOCKED_SUBCOMMANDS_INDEX = LiteralIndex(
+    BLOCKED_SUBCOMMANDS, re.IGNORECASE | re.DOTALL, linear=True
+)
+
 # Pattern for bash -c / sh -c / eval containing gh commands
-SHELL_WRAPPER_PATTERN = re.compile(
+SHELL_WRAPPER_PATTERN = linear.compile(
     r"""(?:(?:ba)?sh\s+-c|eval)\s+['"].*\bgh\s+""",
     re.IGNORECASE,
 )
 
 # Pattern for heredoc with gh commands
-HEREDOC_GH_PATTERN = re.compile(
+HEREDOC_GH_PATTERN = linear.compile(
     r"<<-?\s*['\"]?\w+['\"]?.*\bgh\s+",
     re.DOTALL | re.IGNORECASE,
 )
 
 
+# Any command this guard can block runs gh
+GH_COMMAND_PATTERN = re.compile(r"\bgh\b", re.IGNORECASE)
+
+
+def fast_lane_gates(cwd: str | None = None) -> list:
+    """Return the patterns of which a command this guard can block matches one."""
+    return [GH_COMMAND_PATTERN]
+
+
+# gh api flags that take an argument
+FLAGS_WITH_ARGS = frozenset({
+    "-X", "--method", "-H", "--header", "-f", "--raw-field", "-F", "--field",
+    "--input", "--jq", "-q", "--template", "-t", "--hostname", "--cache", "-p", "--preview",
+})  # fmt: skip
+
+# Flags adding request parameters: gh sends them as a POST body unless a
+# method is given, and as query parameters for GET
+FIELD_FLAGS = frozenset({"-f", "--raw-field", "-F", "--field"})
+
+
+def route_table(cwd: str | None = None) -> RouteTrie:
+    """Return the merged routes of the shipped, user and project route files."""
+    project = cwd or os.getcwd()
+    return load_layers((
+        RouteLayer(DEFAULT_ROUTES_FILE),
+        RouteLayer(os.path.join(config_dir(), ROUTES_FILE_NAME)),
+        RouteLayer(os.path.join(project, ".claude", ROUTES_FILE_NAME), READ_ONLY_METHODS),
+    ))  # fmt: skip
+
+
 def extract_endpoint(parts: list[str]) -> str | None:
     """Extract the API endpoint from parsed command parts."""
     skip_next = False
-    # Flags that take arguments
-    flags_with_args = {"-X", "-H", "-f", "-F", "--jq", "-q", "--template", "-t"}
 
     for part in parts[2:]:  # Skip "gh" and "api"
         if skip_next:
             skip_next = False
             continue
         if part.startswith("-"):
-            if part in flags_with_args:
+            if part in FLAGS_WITH_ARGS:
                 skip_next = True
             continue
         return part
     return None
 
 
+def _flag_values(parts: list[str], flags: frozenset[str]) -> list[str]:
+    """Return the arguments given to ``flags``, as ``-X POST``, ``--method=POST`` or ``-XPOST``."""
+    values = []
+    for i, part in enumerate(parts):
+        if part in flags:
+            if i + 1 < len(parts):
+                values.append(parts[i + 1])
+            continue
+        name, sep, value = part.partition("=")
+        if sep and name in flags and name.startswith("--"):
+            values.append(value)
+        elif part[:2] in flags and len(part) > 2 and not part.startswith("--"):
+            values.append(part[2:])
+    return values
+
+
+def request_method(parts: list[str]) -> str:
+    """Return the HTTP method gh api will use, as gh chooses it."""
+    methods = _flag_values(parts, frozenset({"-X", "--method"}))
+    if methods:
+        return methods[-1].upper()
+    if _flag_values(parts, FIELD_FLAGS | {"--input"}):
+        return "POST"
+    return "GET"
+
+
+def query_parameters(endpoint: str, parts: list[str], method: str) -> list[str]:
+    """Return the names of the query parameters of a request."""
+    _, _, query = endpoint.partition("?")
+    names = [pair.partition("=")[0] for pair in query.split("&") if pair]
+    if method in READ_ONLY_METHODS:
+        names += [field.partition("=")[0] for field in _flag_values(parts, FIELD_FLAGS)]
+    return names
+
+
 def check_for_dangerous_method(parts: list[str]) -> str | None:
     """Check if command uses a dangerous HTTP method. Returns method if found."""
-    for i, part in enumerate(parts):
-        if part == "-X" and i + 1 < len(parts):
-            method = parts[i + 1].upper()
-            if method in DANGEROUS_METHODS:
-                return method
-    return None
+    method = request_method(parts)
+    return method if method in DANGEROUS_METHODS else None
 
 
 def check_blocked_subcommands(command: str) -> str | None:
     """Check if command contains blocked gh subcommands. Returns reason if blocked."""
-    for pattern, reason in BLOCKED_SUBCOMMANDS:
-        if re.search(pattern, command, re.IGNORECASE | re.DOTALL):
-            return reason
-    return None
+    return BLOCKED_SUBCOMMANDS_INDEX.first(command)
+
 
+def check_gh_api(
+    command: str, parts: list[str] | None = None, cwd: str | None = None
+) -> str | None:
+    """Validate gh api commands. Returns reason if blocked."""
+    if parts is None:
+        try:
+            parts = shlex.split(command)
+        except ValueError:
+            return "Could not parse gh api command"
 
-def check_gh_api(command: str, c: PreToolUseContext) -> None:
-    """Validate gh api commands."""
+    # Extract the API endpoint
+    endpoint = extract_endpoint(parts)
+    method = request_method(parts)
     try:
-        parts = shlex.split(command)
-    except ValueError:
-        c.output.exit_block("Could not parse gh api command")
-        return
+        routes = route_table(cwd)
+    except RouteError as e:
+        return f"gh api route file is invalid, fix it to auto-allow gh api calls:\n{e}"
+
+    # Strip leading slash for consistent matching
+    endpoint = endpoint.lstrip("/") if endpoint is not None else None
+    route = routes.match(endpoint.partition("?")[0]) if endpoint is not None else None
 
     # Check for dangerous HTTP methods
-    dangerous_method = check_for_dangerous_method(parts)
-    if dangerous_method:
-        c.output.exit_block(
-            f"gh api with {dangerous_method} method requires manual approval. "
+    if method in DANGEROUS_METHODS and (route is None or method not in route.methods):
+        return (
+            f"gh api with {method} method requires manual approval. "
             "Only GET requests for PR comments are auto-allowed."
         )
-        return
 
-    # Extract the API endpoint
-    endpoint = extract_endpoint(parts)
     if endpoint is None:
-        c.output.exit_block("Could not determine gh api endpoint")
-        return
-
-    # Strip leading slash for consistent matching
-    endpoint = endpoint.lstrip("/")
-
-    # Check if endpoint matches allowed patterns
-    for pattern in ALLOWED_API_PATTERNS:
-        if re.match(pattern, endpoint):
-            c.output.exit_success()
+        return "Could not determine gh api endpoint"
+
+    if route is None:
+        return (
+            f"gh api endpoint '{endpoint}' is not in the allowed list.\n"
+            "Allowed: PR comments, issue comments, and PR reviews (read-only).\n"
+            f"Add a route to ~/.config/rbw-guards/{ROUTES_FILE_NAME} or "
+            f".claude/{ROUTES_FILE_NAME} if this is a safe read operation."
+        )
 
-    c.output.exit_block(
-        f"gh api endpoint '{endpoint}' is not in the allowed list.\n"
-        "Allowed: PR comments, issue comments, and PR reviews (read-only).\n"
-        "Add to ALLOWED_API_PATTERNS in the hook if this is a safe read operation."
-    )
+    if method not in route.methods:
+        return (
+            f"gh api {method} is not allowed for '{endpoint}' (route {route.pattern})."
+        )
 
+    if route.query is not None:
+        for name in query_parameters(endpoint, parts, method):
+            if name not in route.query:
+                return (
+                    f"gh api query parameter '{name}' is not allowed for '{endpoint}' "
+                    f"(route {route.pattern})."
+                )
+    return None
 
-def main() -> None:
-    c = create_context()
-    if not isinstance(c, PreToolUseContext):
-        c.output.exit_success()
 
-    command = c.tool_input.get("command", "")
+def check(
+    tool_name: str,
+    tool_input: dict,
+    parsed: BashCommand | None = None,
+    cwd: str | None = None,
+) -> str | None:
+    """Return the block reason for a tool call, or None to allow it."""
+    command = tool_input.get("command", "")
+    parsed = parsed or BashCommand(command)
 
     # Quick check: if "gh" not in command, skip
-    if "gh" not in command.lower():
-        c.output.exit_success()
+    if "gh" not in parsed.lower:
+        return None
 
     # Check for shell wrapper bypass attempts (bash -c, eval)
     if SHELL_WRAPPER_PATTERN.search(command):
-        c.output.exit_block(
+        return (
             "gh commands inside bash -c or eval require manual approval.\n"
             "Run gh commands directly without shell wrappers."
         )
-        return
 
     # Check for heredoc bypass
     if HEREDOC_GH_PATTERN.search(command):
-        c.output.exit_block(
+        return (
             "Heredoc with gh commands requires manual approval.\n"
             f"Command: {command}\n"
             "Run gh commands directly without heredocs."
         )
-        return
 
     # Check for blocked subcommands first
     blocked_reason = check_blocked_subcommands(command)
     if blocked_reason:
-        c.output.exit_block(
+        return (
             f"BLOCKED: {blocked_reason}\n"
             f"Command: {command}\n"
             "If this operation is truly needed, ask the user for explicit permission."
         )
-        return
 
     # Check if this is a gh api command
-    # Use shlex to properly handle quoted arguments (e.g., --jq '.[] | .body')
-    try:
-        parts = shlex.split(command)
-        # Find 'gh' followed by 'api' in the command parts
-        for i, part in enumerate(parts):
-            if part == "gh" and i + 1 < len(parts) and parts[i + 1] == "api":
-                # Reconstruct the gh api command from this point
-                # (shlex already handled the quoting correctly)
-                check_gh_api(command, c)
-                return
-    except ValueError:
-        # If shlex fails, fall back to simple check
+    if parsed.tokens is None or not parsed.script.complete:
+        # If the command cannot be tokenized or parsed, fall back to simple check
         if re.search(r"\bgh\s+api\b", command):
-            check_gh_api(command, c)
-            return
+            return check_gh_api(command, cwd=cwd)
+        return None
+
+    # Validate each 'gh api' invocation on its own argv, so chained commands
+    # (cd repo && gh api ...) and wrappers (timeout 5 gh api ...) are handled
+    for gh_command in parsed.script.find("gh", "api"):
+        reason = check_gh_api(command, list(gh_command.argv), cwd)
+        if reason:
+            return reason
 
     # For other gh commands not explicitly blocked, allow them
-    c.output.exit_success()
+    return None
+
+
+def main() -> None:
+    run_pretooluse(check)
 
 
 if __name__ == "__main__":
@@ -2,6 +2,7 @@
 """Tests for the gh-api-guard PreToolUse hook."""
 
 import importlib.util
+import json
 import sys
 from pathlib import Path
 
@@ -82,6 +83,24 @@ class TestCheckForDangerousMethod:
         parts = ["gh", "api", "-X", "post", "repos/owner/repo"]
         assert check_for_dangerous_method(parts) == "POST"
 
+    def test_method_flag_forms(self):
+        assert (
+            check_for_dangerous_method(["gh", "api", "--method", "PUT", "x"]) == "PUT"
+        )
+        assert (
+            check_for_dangerous_method(["gh", "api", "--method=delete", "x"])
+            == "DELETE"
+        )
+        assert check_for_dangerous_method(["gh", "api", "-XPATCH", "x"]) == "PATCH"
+
+    def test_fields_imply_post(self):
+        parts = ["gh", "api", "repos/owner/repo/issues/1/comments", "-f", "body=hi"]
+        assert check_for_dangerous_method(parts) == "POST"
+        assert (
+            check_for_dangerous_method(["gh", "api", "-X", "GET", "x", "-F", "a=1"])
+            is None
+        )
+
 
 class TestCheckBlockedSubcommands:
     """Test detection of blocked gh subcommands."""
@@ -158,5 +177,86 @@ class TestJqPipeHandling:
         assert endpoint == "repos/owner/repo/issues"
 
 
+class TestChainedCommands:
+    """Test that each gh api call is validated on its own arguments."""
+
+    def test_endpoint_after_cd(self):
+        command = "cd repo && gh api repos/owner/repo/pulls/1/comments"
+        assert check_gh_api_module.check("Bash", {"command": command}) is None
+
+    def test_wrapped_gh_api(self):
+        command = "timeout 10 gh api repos/owner/repo/pulls/1"
+        assert check_gh_api_module.check("Bash", {"command": command}) is None
+
+    def test_second_call_checked(self):
+        command = "gh api repos/owner/repo/pulls/1 && gh api -X DELETE repos/owner/repo"
+        reason = check_gh_api_module.check("Bash", {"command": command})
+        assert reason is not None
+        assert "DELETE" in reason
+
+    def test_disallowed_endpoint_in_substitution(self):
+        command = 'echo "$(gh api user/keys)"'
+        reason = check_gh_api_module.check("Bash", {"command": command})
+        assert reason is not None
+        assert "user/keys" in reason
+
+    def test_unparsed_command_checked_as_text(self):
+        command = "{ " * 400 + "gh api -X POST repos/o/r/issues" + "; }" * 400
+        reason = check_gh_api_module.check("Bash", {"command": command})
+        assert reason is not None
+        assert "POST" in reason
+
+
+class TestRouteFiles:
+    """Test the declarative allowlist and its user and project overrides."""
+
+    @pytest.fixture
+    def dirs(self, tmp_path, monkeypatch):
+        user = tmp_path / "config"
+        project = tmp_path / "project"
+        (project / ".claude").mkdir(parents=True)
+        user.mkdir()
+        monkeypatch.setenv("GUARDS_CONFIG_DIR", str(user))
+        return user, project
+
+    def check(self, command, cwd):
+        return check_gh_api_module.check("Bash", {"command": command}, cwd=str(cwd))
+
+    def test_query_parameters(self, dirs):
+        _, project = dirs
+        assert (
+            self.check("gh api 'repos/o/r/pulls?state=open&per_page=5'", project)
+            is None
+        )
+        assert (
+            self.check("gh api -X GET repos/o/r/pulls/1/files -f per_page=100", project)
+            is None
+        )
+        reason = self.check("gh api 'repos/o/r/pulls?token=x'", project)
+        assert "token" in reason
+
+    def test_user_routes_may_allow_writes(self, dirs):
+        user, project = dirs
+        pattern = "repos/{o}/{r}/issues/{n:int}/comments"
+        routes = {"routes": [{"path": pattern, "methods": ["POST"]}]}
+        (user / "gh-api-routes.json").write_text(json.dumps(routes))
+        assert (
+            self.check("gh api repos/o/r/issues/1/comments -f body=hi", project) is None
+        )
+        assert "GET" in self.check("gh api repos/o/r/issues/1/comments", project)
+
+    def test_project_routes_are_read_only(self, dirs):
+        _, project = dirs
+        routes = {"routes": [{"path": "user", "methods": ["GET", "DELETE"]}]}
+        (project / ".claude/gh-api-routes.json").write_text(json.dumps(routes))
+        assert self.check("gh api user", project) is None
+        assert "DELETE" in self.check("gh api -X DELETE user", project)
+
+    def test_invalid_route_file_blocks(self, dirs):
+        user, project = dirs
+        (user / "gh-api-routes.json").write_text("{")
+        assert "invalid" in self.check("gh api repos/o/r", project)
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
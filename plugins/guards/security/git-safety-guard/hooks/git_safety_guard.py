@@ -4,172 +4,125 @@
 # ///
 """PreToolUse hook to block destructive git commands."""
 
+import os
 import re
-import shlex
-
-from cchooks import PreToolUseContext, create_context
-
-
-c = create_context()
-assert isinstance(c, PreToolUseContext)
-
-if c.tool_name != "Bash":
-    c.output.exit_success()
-
-command = c.tool_input.get("command", "")
-
-# Safe patterns - allow these even if they match blocked patterns
-SAFE_PATTERNS = [
-    r"git\s+checkout\s+-b\s",  # Creating a new branch
-    r"git\s+checkout\s+--orphan\s",  # Creating orphan branch
-    r"git\s+restore\s+--staged",  # Unstaging files (safe)
-    r"git\s+clean\s+.*(-n|--dry-run)",  # Dry run mode
-]
-
-# Destructive patterns - block these
-BLOCKED_PATTERNS = [
-    # Working directory destruction
-    (
-        r"git\s+checkout\s+--\s",
-        "git checkout -- discards uncommitted changes permanently",
-    ),
-    (
-        r"git\s+restore\s+(?!--staged)\S",
-        "git restore overwrites working directory files",
-    ),
-    (r"git\s+reset\s+--hard", "git reset --hard destroys all uncommitted work"),
-    (r"git\s+reset\s+--merge", "git reset --merge can lose uncommitted changes"),
-    (r"git\s+clean\s+-[a-zA-Z]*f", "git clean -f permanently deletes untracked files"),
-    # Remote/history destruction
-    (
-        r"git\s+push\s+.*--force",
-        "git push --force rewrites remote history (use new commits instead)",
-    ),
-    (
-        r"git\s+push\s+(?:.*\s)?-[a-zA-Z]*f(?:\s|$)",
-        "git push -f destroys remote history",
-    ),
-    (r"git\s+push\s+.*--delete", "git push --delete removes remote branches/tags"),
-    (r"git\s+push\s+\S+\s+:\S", "git push origin :ref deletes remote refs"),
-    (r"git\s+branch\s+-D", "git branch -D force-deletes without merge check"),
-    # Saved work destruction
-    (
-        r"git\s+stash\s+(drop|clear)",
-        "git stash drop/clear permanently deletes saved work",
-    ),
-    # Recovery destruction
-    (
-        r"git\s+reflog\s+(expire|delete)",
-        "git reflog expire/delete removes recovery safety net",
-    ),
-    (
-        r"git\s+gc\s+--prune=now",
-        "git gc --prune=now immediately removes unreferenced objects",
-    ),
-    # History rewriting
-    (r"git\s+filter-branch", "git filter-branch rewrites entire repository history"),
-    (r"git\s+filter-repo", "git filter-repo rewrites entire repository history"),
-    # Reference manipulation (alternative to branch deletion)
-    (r"git\s+update-ref\s+-d", "git update-ref -d deletes references directly"),
-    (r"git\s+update-ref\s+--delete", "git update-ref --delete removes references"),
-    # Worktree destruction
-    (
-        r"git\s+worktree\s+remove\s+.*?--force",
-        "git worktree remove --force can lose work",
-    ),
-    # Submodule destruction
-    (
-        r"git\s+submodule\s+deinit\s+.*?--force",
-        "git submodule deinit --force removes submodule data",
-    ),
-    # Rebase (rewrites history)
-    (
-        r"git\s+rebase\b(?!\s+--(abort|continue|skip))",
-        "git rebase rewrites commit history",
-    ),
-]
+import sys
+
+sys.path.insert(
+    0,
+    os.path.join(os.path.dirname(os.path.realpath(__file__)), "..", "..", "..", "lib"),
+)
+
+from guardkit.hookio import run_pretooluse, skip_unless
+
+if __name__ == "__main__":
+    # Exit before building the pattern tables when the call cannot concern this guard
+    skip_unless("PreToolUse", {"Bash"}, keywords=("git",))
+
+from guardkit import linear
+from guardkit.command import BashCommand
+from guardkit.policy import load_policy
+
+HOOKS_DIR = os.path.dirname(os.path.realpath(__file__))
+
+# Rules live in git-safety-guard.policy.toml, merged with user and project
+# overlays; the module-level tables are the policy as loaded at import
+POLICY_NAME = "git-safety-guard"
+POLICY = load_policy(POLICY_NAME, HOOKS_DIR)
+SAFE_PATTERNS = POLICY.patterns("safe")
+BLOCKED_PATTERNS = POLICY.pairs("blocked")
+
+# Prefilter: only run patterns whose required literals occur in the command,
+# in linear time however long the command is
+SAFE_INDEX = POLICY.index("safe")
+BLOCKED_INDEX = POLICY.index("blocked")
+HEREDOC_INDEX = POLICY.index("heredoc")
 
 # Pattern for bash -c / sh -c / eval containing git commands
-SHELL_WRAPPER_PATTERN = re.compile(
+SHELL_WRAPPER_PATTERN = linear.compile(
     r"""(?:(?:ba)?sh\s+-c|eval)\s+['"].*\bgit\s+""",
     re.IGNORECASE,
 )
 
 # Pattern for heredoc syntax: <<EOF, <<'EOF', <<"EOF", <<-EOF
-HEREDOC_PATTERN = re.compile(r"<<-?\s*['\"]?(\w+)['\"]?")
-
-# Check for shell wrapper bypass attempts
-if SHELL_WRAPPER_PATTERN.search(command):
-    # Extract the inner command using shlex for proper quote handling
-    try:
-        parts = shlex.split(command)
-        # Find 'bash -c', 'sh -c', or 'eval' followed by the inner command
-        for i, part in enumerate(parts):
-            if (
-                part in ("bash", "sh")
-                and i + 1 < len(parts)
-                and parts[i + 1] == "-c"
-                and i + 2 < len(parts)
-            ):
-                inner_command = parts[i + 2]
-                # Check if inner command contains dangerous git operations
-                for pattern, reason in BLOCKED_PATTERNS:
-                    if re.search(pattern, inner_command):
-                        c.output.exit_block(
-                            f"BLOCKED: {reason} (detected inside shell wrapper)\n"
-                            f"Command: {command}\n"
-                            "If this operation is truly needed, ask the user for explicit permission."
-                        )
-            elif part == "eval" and i + 1 < len(parts):
-                inner_command = parts[i + 1]
-                # Check if inner command contains dangerous git operations
-                for pattern, reason in BLOCKED_PATTERNS:
-                    if re.search(pattern, inner_command):
-                        c.output.exit_block(
-                            f"BLOCKED: {reason} (detected inside shell wrapper)\n"
-                            f"Command: {command}\n"
-                            "If this operation is truly needed, ask the user for explicit permission."
-                        )
-    except ValueError:
-        # If shlex parsing fails, fall back to blocking the shell wrapper entirely
-        c.output.exit_block(
-            "Shell wrappers with git commands require manual approval.\n"
-            f"Command: {command}\n"
-            "Run git commands directly without shell wrappers."
-        )
+HEREDOC_PATTERN = linear.compile(r"<<-?\s*['\"]?(\w+)['\"]?")
 
-# Check for heredoc bypass attempts
-if HEREDOC_PATTERN.search(command):
-    # Heredocs can contain git commands that bypass quote-based detection
-    # Since we can't reliably extract heredoc content from the command string alone,
-    # we block any bash/sh with heredoc that mentions git
-    if re.search(
-        r"(ba)?sh\s+.{0,500}?<<.{0,500}?git\s+", command, re.DOTALL | re.IGNORECASE
-    ) or re.search(
-        r"<<.{0,500}?\n.{0,500}?\bgit\s+", command, re.DOTALL | re.IGNORECASE
-    ):
-        c.output.exit_block(
+
+def fast_lane_gates(cwd: str | None = None) -> list:
+    """Return the patterns of which a command this guard can block matches one."""
+    blocked_index = load_policy(POLICY_NAME, HOOKS_DIR, cwd).index("blocked")
+    return [blocked_index, SHELL_WRAPPER_PATTERN, HEREDOC_PATTERN]
+
+
+def check(
+    tool_name: str,
+    tool_input: dict,
+    parsed: BashCommand | None = None,
+    cwd: str | None = None,
+) -> str | None:
+    """Return the block reason for a tool call, or None to allow it."""
+    if tool_name != "Bash":
+        return None
+
+    command = tool_input.get("command", "")
+    parsed = parsed or BashCommand(command)
+    # Reloaded only when a policy file changed
+    policy = load_policy(POLICY_NAME, HOOKS_DIR, cwd)
+    blocked_index = policy.index("blocked")
+
+    # Check for shell wrapper bypass attempts
+    if SHELL_WRAPPER_PATTERN.search(command):
+        # The inner commands come from the structured parse of the command
+        if not parsed.script.complete:
+            # If the command cannot be parsed, fall back to blocking the shell wrapper entirely
+            return (
+                "Shell wrappers with git commands require manual approval.\n"
+                f"Command: {command}\n"
+                "Run git commands directly without shell wrappers."
+            )
+        # Inner commands of 'bash -c', 'sh -c', or 'eval', at any nesting depth
+        for inner_command in parsed.wrapped_commands:
+            # Check if inner command contains dangerous git operations
+            reason = blocked_index.first(inner_command)
+            if reason:
+                return (
+                    f"BLOCKED: {reason} (detected inside shell wrapper)\n"
+                    f"Command: {command}\n"
+                    "If this operation is truly needed, ask the user for explicit permission."
+                )
+
+    # Check for heredoc bypass attempts: heredocs can contain git commands that
+    # bypass quote-based detection, see the policy's heredoc table
+    if HEREDOC_PATTERN.search(command) and policy.index("heredoc").any(command):
+        return (
             "BLOCKED: Heredoc with git commands requires manual approval.\n"
             f"Command: {command}\n"
             "Heredocs can hide destructive git operations. "
             "If this operation is truly needed, ask the user for explicit permission."
         )
 
-# Check if command matches any safe pattern
-safe_match = any(re.search(pattern, command) for pattern in SAFE_PATTERNS)
+    # Check if command matches any safe pattern
+    safe_match = policy.index("safe").any(command)
 
-# Check all blocked patterns
-for pattern, reason in BLOCKED_PATTERNS:
-    if re.search(pattern, command):
+    # Check blocked patterns whose required literals occur in the command
+    for _match, reason in blocked_index.search(command):
         # If the ENTIRE command is just a safe operation, allow it
         # But if there are chained dangerous commands, block
         if safe_match and not any(sep in command for sep in ["&&", "||", ";", "|"]):
             # Safe pattern matched and no command chaining - this is a safe variant
             continue
-        c.output.exit_block(
+        return (
             f"BLOCKED: {reason}\n"
             f"Command: {command}\n"
             "If this operation is truly needed, ask the user for explicit permission."
         )
 
-c.output.exit_success()
+    return None
+
+
+def main() -> None:
+    run_pretooluse(check)
+
+
+if __name__ == "__main__":
+    main()
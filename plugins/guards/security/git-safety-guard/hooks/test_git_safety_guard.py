@@ -1,10 +1,27 @@
 #!/usr/bin/env python3
 """Tests for the git-safety-guard PreToolUse hook."""
 
+import importlib.util
 import re
+import sys
+import time
+from pathlib import Path
 
 import pytest
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[3] / "lib"))
+
+from guardkit.linear import LinearPattern
+
+# Import from the file
+hook_path = Path(__file__).parent / "git_safety_guard.py"
+spec = importlib.util.spec_from_file_location("git_safety_guard", hook_path)
+if spec is None or spec.loader is None:
+    raise ImportError(f"Cannot load {hook_path}")
+git_safety_guard = importlib.util.module_from_spec(spec)
+sys.modules["git_safety_guard"] = git_safety_guard
+spec.loader.exec_module(git_safety_guard)
+
 # Define patterns directly for testing (mirrors the hook's patterns)
 SAFE_PATTERNS = [
     r"git\s+checkout\s+-b\s",  # Creating a new branch
@@ -316,5 +333,38 @@ class TestHeredocPatterns:
         assert re.search(r"<<.*\n.*\bgit\s+", cmd, re.DOTALL | re.IGNORECASE)
 
 
+class TestHeredocPolicy:
+    """Test the hook's heredoc checks, which run from the policy's heredoc table."""
+
+    @pytest.mark.parametrize(
+        "cmd",
+        [
+            "bash <<EOF\ngit reset --hard\nEOF",
+            "cat <<'EOF' | sh\necho 'starting'\ngit push --force origin main\nEOF",
+            "BASH <<-EOF\n\tGIT stash clear\nEOF",
+        ],
+    )
+    def test_heredoc_with_git_blocked(self, cmd):
+        reason = git_safety_guard.check("Bash", {"command": cmd})
+        assert reason and "Heredoc with git commands" in reason
+
+    def test_heredoc_without_git_allowed(self):
+        cmd = "cat <<EOF\nhello world\nEOF"
+        assert git_safety_guard.check("Bash", {"command": cmd}) is None
+
+    def test_heredoc_patterns_are_linear(self):
+        rules = git_safety_guard.POLICY.tables["heredoc"].rules
+        assert [rule.id for rule in rules] == ["shell-heredoc-git", "heredoc-body-git"]
+        assert isinstance(git_safety_guard.HEREDOC_PATTERN, LinearPattern)
+        entries = git_safety_guard.HEREDOC_INDEX.entries
+        assert all(isinstance(pattern, LinearPattern) for pattern, _reason in entries)
+
+    def test_long_heredoc_is_fast(self):
+        cmd = "sh <<EOF\n" + "x " * 50_000 + "\nEOF"
+        started = time.perf_counter()
+        assert git_safety_guard.check("Bash", {"command": cmd}) is None
+        assert time.perf_counter() - started < 2
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -4,9 +4,63 @@
 # ///
 """PreToolUse hook to prevent reading .env files via any method."""
 
+import os
 import re
+import sys
 
-from cchooks import PreToolUseContext, create_context
+sys.path.insert(
+    0,
+    os.path.join(os.path.dirname(os.path.realpath(__file__)), "..", "..", "..", "lib"),
+)
+
+from guardkit.envfiles import SAFE, EnvFileClassifier, mentions_link, path_words
+from guardkit.hookio import run_pretooluse, skip_unless
+
+if __name__ == "__main__":
+    # Exit before compiling any pattern when the call cannot concern this guard
+    HOOK = skip_unless("PreToolUse", {"Read", "Grep", "Bash"})
+    if HOOK.tool_name == "Bash":
+        COMMAND = HOOK.text("command")
+        if ".env" not in COMMAND.lower() and not mentions_link(COMMAND):
+            sys.exit(0)
+
+from guardkit.command import BashCommand
+from guardkit.policy import load_policy
+
+HOOKS_DIR = os.path.dirname(os.path.realpath(__file__))
+
+# Commands whose file arguments are resolved through symlinks: file readers,
+# copies, searches and shells
+LINK_READING_COMMANDS = frozenset(
+    {
+        "cat",
+        "head",
+        "tail",
+        "less",
+        "more",
+        "bat",
+        "view",
+        "vim",
+        "nvim",
+        "nano",
+        "emacs",
+    }
+    | {"code", "sed", "awk", "perl", "ruby", "python", "python3", "node", "source", "."}
+    | {
+        "xargs",
+        "tee",
+        "dd",
+        "hexdump",
+        "xxd",
+        "od",
+        "strings",
+        "iconv",
+        "base64",
+        "cut",
+    }
+    | {"sort", "uniq", "wc", "diff", "comm", "paste", "join", "file", "cp", "mv", "scp"}
+    | {"rsync", "grep", "rg", "ag", "ack", "bash", "sh", "zsh", "tac", "nl", "jq"}
+)
 
 # Patterns for env files that should be protected
 # Matches: .env, .env.local, .env.production, .env.*, etc.
@@ -26,89 +80,57 @@ SAFE_ENV_PATTERNS = [
     r"\.env\.defaults$",
 ]
 
-# Bash commands that read file contents
-FILE_READING_COMMANDS = [
-    "cat",
-    "head",
-    "tail",
-    "less",
-    "more",
-    "bat",
-    "view",
-    "vim",
-    "nvim",
-    "nano",
-    "emacs",
-    "code",
-    "sed",
-    "awk",
-    "perl",
-    "ruby",
-    "python",
-    "node",
-    "source",
-    "\\.",  # source shorthand (escaped for regex)
-    "eval",
-    "xargs",
-    "tee",
-    "dd",
-    "hexdump",
-    "xxd",
-    "od",
-    "strings",
-    "iconv",
-    "base64",
-    "cut",
-    "sort",
-    "uniq",
-    "wc",
-    "diff",
-    "comm",
-    "paste",
-    "join",
-    "file",
-]
+# Template names are allowed whatever their case
+ENV_FILES = EnvFileClassifier(ENV_FILE_PATTERNS, SAFE_ENV_PATTERNS, re.IGNORECASE)
+
+# Bash commands that read file contents live in protect-env.policy.toml, merged
+# with user and project overlays; this is the list as loaded at import
+POLICY_NAME = "protect-env"
+FILE_READING_COMMANDS = load_policy(POLICY_NAME, HOOKS_DIR).list(
+    "file_reading_commands"
+)
 
 BLOCK_MESSAGE = (
     "Access to '{path}' is blocked. "
     "Environment files may contain secrets and should not be read by AI assistants."
 )
 
+# A Bash command this guard can block mentions .env or a symlinked path; the
+# fast lane rejects every symlinked path itself
+ENV_MENTION_PATTERN = re.compile(r"\.env", re.IGNORECASE)
+
+
+def fast_lane_gates(cwd: str | None = None) -> list:
+    """Return the patterns of which a command this guard can block matches one."""
+    return [ENV_MENTION_PATTERN]
+
 
 def is_safe_env_file(path: str) -> bool:
     """Check if path is a safe template file (e.g., .env.example)."""
-    for pattern in SAFE_ENV_PATTERNS:
-        if re.search(pattern, path, re.IGNORECASE):
-            return True
-    return False
+    return ENV_FILES.classify_name(path) == SAFE
 
 
 def matches_env_file(path: str) -> bool:
-    """Check if a path matches any env file pattern."""
-    # Allow safe template files
-    if is_safe_env_file(path):
-        return False
-
-    for pattern in ENV_FILE_PATTERNS:
-        if re.search(pattern, path):
-            return True
-    return False
+    """Check if a path matches any env file pattern (safe templates excluded)."""
+    return ENV_FILES.is_env_name(path)
 
 
-def check_read_tool(tool_input: dict) -> str | None:
+def check_read_tool(tool_input: dict, cwd: str | None = None) -> str | None:
     """Check Read tool for .env file access."""
     file_path = tool_input.get("file_path", "")
-    if matches_env_file(file_path):
-        return BLOCK_MESSAGE.format(path=file_path)
+    blocked = ENV_FILES.protected(file_path, cwd)
+    if blocked:
+        return BLOCK_MESSAGE.format(path=blocked)
     return None
 
 
-def check_grep_tool(tool_input: dict) -> str | None:
+def check_grep_tool(tool_input: dict, cwd: str | None = None) -> str | None:
     """Check Grep tool for .env file access."""
     # Check the path parameter
     path = tool_input.get("path", "")
-    if matches_env_file(path):
-        return BLOCK_MESSAGE.format(path=path)
+    blocked = ENV_FILES.protected(path, cwd)
+    if blocked:
+        return BLOCK_MESSAGE.format(path=blocked)
 
     # Check glob patterns that might target .env files
     glob_pattern = tool_input.get("glob", "")
@@ -126,15 +148,30 @@ def check_grep_tool(tool_input: dict) -> str | None:
     return None
 
 
-def check_bash_command(tool_input: dict) -> str | None:
+def check_bash_command(
+    tool_input: dict, parsed: BashCommand | None = None, cwd: str | None = None
+) -> str | None:
     """Check Bash command for .env file access."""
     command = tool_input.get("command", "")
     if not command:
         return None
 
-    # Quick check - if no .env anywhere in command, it's safe
-    if ".env" not in command.lower():
-        return None
+    if ".env" in command.lower():
+        # Reloaded only when a policy file changed
+        readers = load_policy(POLICY_NAME, HOOKS_DIR, cwd).list("file_reading_commands")
+        reason = check_env_names(command, readers)
+        if reason:
+            return reason
+
+    return check_linked_env_files(parsed or BashCommand(command), cwd)
+
+
+def check_env_names(
+    command: str, file_reading_commands: list[str] | None = None
+) -> str | None:
+    """Check a command that mentions .env for reads of env files by name."""
+    if file_reading_commands is None:
+        file_reading_commands = FILE_READING_COMMANDS
 
     # CRITICAL: Check for shell metacharacter bypasses
     # These patterns detect various obfuscation techniques that bypass simple string matching
@@ -179,7 +216,7 @@ def check_bash_command(tool_input: dict) -> str | None:
         command_lower = command.lower()
 
         # Build regex pattern for file-reading commands
-        cmd_pattern = r"(?:^|[|&;]\s*|[\s])(" + "|".join(FILE_READING_COMMANDS) + r")\s"
+        cmd_pattern = r"(?:^|[|&;]\s*|[\s])(" + "|".join(file_reading_commands) + r")\s"
 
         if re.search(cmd_pattern, command_lower):
             return BLOCK_MESSAGE.format(path=env_in_command[0])
@@ -209,26 +246,58 @@ def check_bash_command(tool_input: dict) -> str | None:
     return None
 
 
-def main() -> None:
-    c = create_context()
-    assert isinstance(c, PreToolUseContext)
+def check_linked_env_files(parsed: BashCommand, cwd: str | None = None) -> str | None:
+    """Check file arguments and ``<`` inputs that are links to env files.
+
+    If the command cannot be parsed completely, every word of its text is
+    checked instead.
+    """
+    if not parsed.script.complete:
+        return _check_linked_paths(path_words(parsed.text), cwd)
+    for simple in parsed.script.commands:
+        paths = [
+            redirect.target
+            for redirect in simple.redirects
+            if redirect.op.lstrip("0123456789") in ("<", "<>")
+        ]
+        if simple.name in LINK_READING_COMMANDS:
+            paths += [arg for arg in simple.args if not arg.startswith("-")]
+        reason = _check_linked_paths(paths, cwd)
+        if reason:
+            return reason
+    return None
+
+
+def _check_linked_paths(paths: list[str], cwd: str | None) -> str | None:
+    for path in paths:
+        target = ENV_FILES.resolved_env_path(path, cwd)
+        if target:
+            return BLOCK_MESSAGE.format(path=f"{path} -> {target}")
+    return None
 
-    tool_name = c.tool_name
-    tool_input = c.tool_input
 
-    block_reason: str | None = None
+def check(
+    tool_name: str,
+    tool_input: dict,
+    parsed: BashCommand | None = None,
+    cwd: str | None = None,
+) -> str | None:
+    """Return the block reason for a tool call, or None to allow it.
 
+    Relative paths are resolved against ``cwd``, by default the current
+    directory.
+    """
     if tool_name == "Read":
-        block_reason = check_read_tool(tool_input)
-    elif tool_name == "Grep":
-        block_reason = check_grep_tool(tool_input)
-    elif tool_name == "Bash":
-        block_reason = check_bash_command(tool_input)
+        return check_read_tool(tool_input, cwd)
+    if tool_name == "Grep":
+        return check_grep_tool(tool_input, cwd)
+    if tool_name == "Bash":
+        return check_bash_command(tool_input, parsed, cwd)
+    return None
 
-    if block_reason:
-        c.output.exit_block(block_reason)
 
-    c.output.exit_success()
+def main() -> None:
+    run_pretooluse(check)
 
 
 if __name__ == "__main__":
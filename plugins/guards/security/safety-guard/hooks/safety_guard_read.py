@@ -4,18 +4,21 @@
 # ///
 """PreToolUse hook to prevent reading .env files (except examples/templates)."""
 
-import re
+import os
+import sys
 
-from cchooks import PreToolUseContext, create_context
+sys.path.insert(
+    0,
+    os.path.join(os.path.dirname(os.path.realpath(__file__)), "..", "..", "..", "lib"),
+)
 
+from guardkit.hookio import run_pretooluse, skip_unless
 
-c = create_context()
-assert isinstance(c, PreToolUseContext)
+if __name__ == "__main__":
+    # Exit before compiling any pattern when the call cannot concern this guard
+    skip_unless("PreToolUse", {"Read"})
 
-if c.tool_name != "Read":
-    c.output.exit_success()
-
-file_path = c.tool_input.get("file_path", "")
+from guardkit.envfiles import EnvFileClassifier
 
 # Safe patterns - allow these .env files
 SAFE_PATTERNS = [
@@ -25,11 +28,6 @@ SAFE_PATTERNS = [
     r"\.env\.dist$",
 ]
 
-# Check safe patterns first
-for pattern in SAFE_PATTERNS:
-    if re.search(pattern, file_path):
-        c.output.exit_success()
-
 # Block patterns for env files
 ENV_PATTERNS = [
     r"\.env$",           # Exactly .env
@@ -37,12 +35,35 @@ ENV_PATTERNS = [
     r"\.envrc$",        # .envrc files
 ]
 
-for pattern in ENV_PATTERNS:
-    if re.search(pattern, file_path):
-        c.output.exit_block(
-            f"Reading '{file_path}' is blocked.\n"
+ENV_FILES = EnvFileClassifier(ENV_PATTERNS, SAFE_PATTERNS)
+
+
+def check(tool_name: str, tool_input: dict, cwd: str | None = None) -> str | None:
+    """Return the block reason for a tool call, or None to allow it.
+
+    A relative path is resolved against ``cwd``, by default the current
+    directory.
+    """
+    if tool_name != "Read":
+        return None
+
+    file_path = tool_input.get("file_path", "")
+
+    # Safe templates are allowed by name; links are judged by their target
+    blocked = ENV_FILES.protected(file_path, cwd)
+    if blocked:
+        return (
+            f"Reading '{blocked}' is blocked.\n"
             "Environment files may contain secrets and should not be read by AI assistants.\n"
             "If you need to see the structure, check .env.example instead."
         )
 
-c.output.exit_success()
+    return None
+
+
+def main() -> None:
+    run_pretooluse(check)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,16 @@
 #!/usr/bin/env python3
 from __future__ import annotations
 
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
+import os
 from pathlib import Path
 import sys
 
 REPO_ROOT = Path(__file__).resolve().parent.parent
 sys.path.insert(0, str(REPO_ROOT))
 
+from src.convert.cache import ParseCache
 from src.convert.converters.codex import convert_claude_to_codex
 from src.convert.parser import load_claude_plugin
 from src.convert.types import CodexAgentFile, CodexBundle, CodexPromptFile
@@ -58,10 +62,13 @@ def _collect_bundle() -> CodexBundle:
     seen_agents: dict[str, str] = {}
     seen_prompts: dict[str, str] = {}
 
-    for manifest_path in sorted(REPO_ROOT.glob("plugins/**/.claude-plugin/plugin.json")):
-        plugin_root = manifest_path.parent.parent
-        plugin = load_claude_plugin(str(plugin_root))
-        bundle = convert_claude_to_codex(plugin)
+    plugin_roots = [
+        str(manifest_path.parent.parent)
+        for manifest_path in sorted(
+            REPO_ROOT.glob("plugins/**/.claude-plugin/plugin.json")
+        )
+    ]
+    for bundle in _convert_plugins(plugin_roots):
         for agent in bundle.agents:
             if agent.name in seen_agents:
                 raise ValueError(
@@ -82,6 +89,21 @@ def _collect_bundle() -> CodexBundle:
     return CodexBundle(agents=agents, prompts=prompts)
 
 
+def _convert_plugins(plugin_roots: list[str]) -> Iterator[CodexBundle]:
+    """Load and convert plugins across processes, yielding bundles in input order."""
+    workers = min(len(plugin_roots), os.cpu_count() or 1)
+    if workers <= 1:
+        yield from map(_convert_plugin, plugin_roots)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(_convert_plugin, plugin_roots)
+
+
+def _convert_plugin(plugin_root: str) -> CodexBundle:
+    with ParseCache() as cache:
+        return convert_claude_to_codex(load_claude_plugin(plugin_root, cache))
+
+
 def _remove_stale_generated_files(
     *,
     manifest_path: Path,
@@ -109,7 +131,9 @@ def _remove_stale_generated_files(
         stale_path.unlink()
 
 
-def _write_manifest(output_dir: Path, manifest_path: Path, file_names: set[str]) -> None:
+def _write_manifest(
+    output_dir: Path, manifest_path: Path, file_names: set[str]
+) -> None:
     output_dir.mkdir(parents=True, exist_ok=True)
     manifest_path.write_text(
         "".join(f"{name}\n" for name in sorted(file_names)),
@@ -7,6 +7,9 @@
 # Usage:
 #   ./setup-hooks.sh           # Install to global ~/.claude/settings.json
 #   ./setup-hooks.sh --project # Install to current project's .claude/settings.json
+#   ./setup-hooks.sh --daemon  # Route guard hooks through the persistent guard daemon
+#   ./setup-hooks.sh --pipeline # Run all Bash guards as one guard-pipeline hook
+#   ./setup-hooks.sh --dispatch # Run all PreToolUse hooks concurrently from one hook
 
 set -e
 
@@ -20,6 +23,9 @@ NC='\033[0m' # No Color
 # Parse arguments
 INSTALL_MODE="global"
 CHECK_MODE="false"
+DAEMON_MODE="false"
+PIPELINE_MODE="false"
+DISPATCH_MODE="false"
 for arg in "$@"; do
     case $arg in
         --project|-p)
@@ -34,13 +40,28 @@ for arg in "$@"; do
             CHECK_MODE="true"
             shift
             ;;
+        --daemon|-d)
+            DAEMON_MODE="true"
+            shift
+            ;;
+        --pipeline)
+            PIPELINE_MODE="true"
+            shift
+            ;;
+        --dispatch)
+            DISPATCH_MODE="true"
+            shift
+            ;;
         --help|-h)
-            echo "Usage: $0 [--global|--project|--check]"
+            echo "Usage: $0 [--global|--project|--check] [--daemon|--dispatch] [--pipeline]"
             echo ""
             echo "Options:"
             echo "  --global, -g   Install hooks to ~/.claude/settings.json (default)"
             echo "  --project, -p  Install hooks to <project>/.claude/settings.json"
             echo "  --check, -c    Check if hooks are in sync (exit 0=sync, 1=desync)"
+            echo "  --daemon, -d   Run guard hooks via the persistent guard daemon client"
+            echo "  --pipeline     Replace the individual Bash guards with one guard-pipeline hook"
+            echo "  --dispatch     Run all PreToolUse hooks concurrently from one guard-dispatch hook"
             echo "  --help, -h     Show this help message"
             exit 0
             ;;
@@ -52,6 +73,13 @@ for arg in "$@"; do
     esac
 done
 
+# The dispatcher runs guards in-process itself, so the daemon client would only
+# add a hop
+if [[ "$DAEMON_MODE" == "true" && "$DISPATCH_MODE" == "true" ]]; then
+    echo -e "${RED}--daemon and --dispatch cannot be combined${NC}"
+    exit 1
+fi
+
 # Find project root (look for .git directory)
 find_project_root() {
     local dir="$PWD"
@@ -75,11 +103,14 @@ if [[ "$INSTALL_MODE" == "project" ]]; then
     SETTINGS_DIR="$PROJECT_ROOT/.claude"
     SETTINGS_FILE="$SETTINGS_DIR/settings.json"
     SCOPE_LABEL="PROJECT: $PROJECT_ROOT"
+    DISPATCH_REGISTRY_ARG="$SETTINGS_DIR/guard-dispatch.json"
 else
     SETTINGS_DIR="$HOME/.claude"
     SETTINGS_FILE="$SETTINGS_DIR/settings.json"
     SCOPE_LABEL="GLOBAL: ~/.claude/settings.json"
+    DISPATCH_REGISTRY_ARG="~/.claude/guard-dispatch.json"
 fi
+DISPATCH_REGISTRY="$SETTINGS_DIR/guard-dispatch.json"
 
 BACKUP_FILE=""
 TEMP_FILES=()
@@ -157,6 +188,16 @@ while IFS= read -r -d '' hooks_file; do
     HOOKS_FILES+=("$hooks_file")
 done < <(find "$MARKETPLACE_ROOT/plugins" -name "hooks.json" -path "*/hooks/*" -print0 2>/dev/null)
 
+# The guard pipeline duplicates the individual Bash guards, so only one of the
+# two is ever installed
+GUARD_PIPELINE_HOOKS="$MARKETPLACE_ROOT/plugins/guards/pipeline/hooks/hooks.json"
+if [[ "$PIPELINE_MODE" != "true" ]]; then
+    for i in "${!HOOKS_FILES[@]}"; do
+        [[ "${HOOKS_FILES[$i]}" == "$GUARD_PIPELINE_HOOKS" ]] && unset 'HOOKS_FILES[i]'
+    done
+    HOOKS_FILES=("${HOOKS_FILES[@]}")
+fi
+
 if [[ ${#HOOKS_FILES[@]} -eq 0 ]]; then
     echo -e "${RED}No hooks.json files found in plugins${NC}"
     exit 1
@@ -212,16 +253,58 @@ done
 
 # Aggregate hooks by event type
 AGGREGATED=$(jq -s '
-    reduce .[] as $item ({hooks: {SessionStart: [], PreToolUse: [], PostToolUse: []}};
+    reduce .[] as $item ({hooks: {SessionStart: [], PreToolUse: [], PostToolUse: [], Stop: [], SubagentStop: []}};
         .hooks.SessionStart += ($item.hooks.SessionStart // []) |
         .hooks.PreToolUse += ($item.hooks.PreToolUse // []) |
-        .hooks.PostToolUse += ($item.hooks.PostToolUse // [])
+        .hooks.PostToolUse += ($item.hooks.PostToolUse // []) |
+        .hooks.Stop += ($item.hooks.Stop // []) |
+        .hooks.SubagentStop += ($item.hooks.SubagentStop // [])
     )
 ' "$TEMP_FILE") || {
     echo -e "${RED}Error aggregating hooks${NC}"
     exit 1
 }
 
+# Pipeline mode: drop the Bash entries of the guards that guard-pipeline runs
+# as rules (security/ and policy/, see BASH_RULES in guardkit/pipeline.py), and
+# the python-format and python-typecheck hooks its post-edit stage replaces
+if [[ "$PIPELINE_MODE" == "true" ]]; then
+    AGGREGATED=$(echo "$AGGREGATED" | jq '
+        def without_post_edit_hooks:
+            map(.hooks |= map(select(.command // "" | test("/plugins/guards/quality/python-(format|typecheck)/") | not)))
+            | map(select(.hooks | length > 0));
+        .hooks.PreToolUse |= (map(
+            if .matcher == "Bash"
+            then .hooks |= map(select(.command // "" | test("/plugins/guards/(security|policy)/") | not))
+            else . end
+        ) | map(select(.hooks | length > 0))) |
+        .hooks.PostToolUse |= without_post_edit_hooks |
+        .hooks.Stop |= without_post_edit_hooks |
+        .hooks.SubagentStop |= without_post_edit_hooks
+    ') || {
+        echo -e "${RED}Error applying pipeline mode${NC}"
+        exit 1
+    }
+fi
+
+# Daemon mode: route PreToolUse guard scripts through the thin guard client,
+# which evaluates them in a long-lived guardd process instead of a fresh
+# interpreter per tool call (see plugins/guards/lib/README.md)
+if [[ "$DAEMON_MODE" == "true" ]]; then
+    GUARD_CLIENT="$MARKETPLACE_ROOT_RELATIVE/plugins/guards/lib/guard_client.py"
+    AGGREGATED=$(echo "$AGGREGATED" | jq --arg client "$GUARD_CLIENT" '
+        .hooks.PreToolUse |= map(.hooks |= map(
+            if (.command // "" | test("/plugins/guards/.+\\.py$"))
+            then .command = "\($client) \(.command)"
+            else . end
+        ))
+    ') || {
+        echo -e "${RED}Error applying daemon mode${NC}"
+        exit 1
+    }
+    [[ "$CHECK_MODE" != "true" ]] && echo "Guard hooks routed through: $GUARD_CLIENT"
+fi
+
 # Helper function to expand ~ and validate script exists
 validate_script_exists() {
     local cmd_path="$1"
@@ -238,7 +321,7 @@ if [[ "$CHECK_MODE" == "true" ]]; then
             echo "VALIDATION_ERROR: Script not found: $cmd_path"
             exit 1
         fi
-    done < <(echo "$AGGREGATED" | jq -r '.. | .command? // empty | gsub("^\"|\"$"; "")')
+    done < <(echo "$AGGREGATED" | jq -r '.. | .command? // empty | gsub("^\"|\"$"; "") | split(" ")[]')
 else
     echo -e "${BLUE}Validating hook scripts...${NC}"
     ERRORS=0
@@ -262,7 +345,7 @@ else
                 fi
             fi
         fi
-    done < <(echo "$AGGREGATED" | jq -r '.. | .command? // empty | gsub("^\"|\"$"; "")')
+    done < <(echo "$AGGREGATED" | jq -r '.. | .command? // empty | gsub("^\"|\"$"; "") | split(" ")[]')
 
     if [[ $ERRORS -gt 0 ]]; then
         echo -e "${RED}  $ERRORS error(s) found - some hooks may not work${NC}"
@@ -274,6 +357,25 @@ else
     echo ""
 fi
 
+# Dispatch mode: move the PreToolUse entries into a registry file read by one
+# guard-dispatch hook, which runs them concurrently (see
+# plugins/guards/lib/README.md)
+DISPATCH_ENTRIES=""
+if [[ "$DISPATCH_MODE" == "true" ]]; then
+    GUARD_DISPATCH="$MARKETPLACE_ROOT_RELATIVE/plugins/guards/lib/guard_dispatch.py"
+    DISPATCH_ENTRIES=$(echo "$AGGREGATED" | jq '{hooks: {PreToolUse: .hooks.PreToolUse}}')
+    AGGREGATED=$(echo "$AGGREGATED" | jq --arg command "$GUARD_DISPATCH $DISPATCH_REGISTRY_ARG" '
+        .hooks.PreToolUse = [{
+            matcher: "*",
+            hooks: [{type: "command", command: $command, timeout: ([.hooks.PreToolUse[].hooks[].timeout // 60] | max // 60)}]
+        }]
+    ') || {
+        echo -e "${RED}Error applying dispatch mode${NC}"
+        exit 1
+    }
+    [[ "$CHECK_MODE" != "true" ]] && echo "PreToolUse hooks dispatched from: $DISPATCH_REGISTRY"
+fi
+
 # Extract just the hooks object for merging
 HOOKS_ONLY=$(echo "$AGGREGATED" | jq '.hooks')
 
@@ -284,12 +386,18 @@ if [[ "$CHECK_MODE" == "true" ]]; then
     # Get what we would write (normalized)
     NEW_HOOKS=$(echo "$HOOKS_ONLY" | jq -S '.')
 
+    # In dispatch mode the registry file must match as well
+    if [[ -n "$DISPATCH_ENTRIES" ]]; then
+        CURRENT_REGISTRY=$(jq -S '.' "$DISPATCH_REGISTRY" 2>/dev/null || true)
+        [[ "$CURRENT_REGISTRY" == "$(echo "$DISPATCH_ENTRIES" | jq -S '.')" ]] || NEW_HOOKS="registry out of sync"
+    fi
+
     if [[ "$CURRENT_HOOKS" == "$NEW_HOOKS" ]]; then
         echo "SYNC_OK"
         exit 0
     else
         echo "SYNC_NEEDED"
-        echo "Run: ./scripts/setup-hooks.sh $([ "$INSTALL_MODE" == "project" ] && echo "--project" || echo "--global")"
+        echo "Run: ./scripts/setup-hooks.sh $([ "$INSTALL_MODE" == "project" ] && echo "--project" || echo "--global")$([ "$DAEMON_MODE" == "true" ] && echo " --daemon")$([ "$PIPELINE_MODE" == "true" ] && echo " --pipeline")$([ "$DISPATCH_MODE" == "true" ] && echo " --dispatch")"
         exit 1
     fi
 fi
@@ -309,15 +417,25 @@ echo "$MERGED" | jq '.' > "$TEMP_SETTINGS" || {
     exit 1
 }
 
+# Write the dispatch registry before the settings that point at it
+if [[ -n "$DISPATCH_ENTRIES" ]]; then
+    TEMP_REGISTRY=$(mktemp)
+    TEMP_FILES+=("$TEMP_REGISTRY")
+    echo "$DISPATCH_ENTRIES" | jq '.' > "$TEMP_REGISTRY"
+    mv "$TEMP_REGISTRY" "$DISPATCH_REGISTRY"
+fi
+
 # Move temp file to settings (atomic)
 mv "$TEMP_SETTINGS" "$SETTINGS_FILE"
 
 # Count hooks by type
 SESSION_START=$(echo "$AGGREGATED" | jq '[.hooks.SessionStart[] | .hooks | length] | add // 0')
-PRE_BASH=$(echo "$AGGREGATED" | jq '[.hooks.PreToolUse[] | select(.matcher == "Bash") | .hooks | length] | add // 0')
-PRE_READ=$(echo "$AGGREGATED" | jq '[.hooks.PreToolUse[] | select(.matcher == "Read") | .hooks | length] | add // 0')
+PRE_BASH=$(echo "${DISPATCH_ENTRIES:-$AGGREGATED}" | jq '[.hooks.PreToolUse[] | select(.matcher == "Bash") | .hooks | length] | add // 0')
+PRE_READ=$(echo "${DISPATCH_ENTRIES:-$AGGREGATED}" | jq '[.hooks.PreToolUse[] | select(.matcher == "Read") | .hooks | length] | add // 0')
 POST_WRITE_EDIT=$(echo "$AGGREGATED" | jq '[.hooks.PostToolUse[] | select(.matcher == "Write|Edit") | .hooks | length] | add // 0')
 POST_WRITE=$(echo "$AGGREGATED" | jq '[.hooks.PostToolUse[] | select(.matcher == "Write") | .hooks | length] | add // 0')
+STOP=$(echo "$AGGREGATED" | jq '[.hooks.Stop[] | .hooks | length] | add // 0')
+SUBAGENT_STOP=$(echo "$AGGREGATED" | jq '[.hooks.SubagentStop[] | .hooks | length] | add // 0')
 
 echo ""
 echo -e "${GREEN}Hooks configured successfully!${NC}"
@@ -333,6 +451,8 @@ echo "  PreToolUse (Bash):        $PRE_BASH hook(s)"
 echo "  PreToolUse (Read):        $PRE_READ hook(s)"
 echo "  PostToolUse (Write|Edit): $POST_WRITE_EDIT hook(s)"
 echo "  PostToolUse (Write):      $POST_WRITE hook(s)"
+echo "  Stop:                     $STOP hook(s)"
+echo "  SubagentStop:             $SUBAGENT_STOP hook(s)"
 echo ""
 
 if [[ "$INSTALL_MODE" == "project" ]]; then
@@ -0,0 +1,165 @@
+"""On-disk cache of parsed plugin sources.
+
+Agents, commands and skills are markdown files whose YAML frontmatter is
+parsed on every run. The cache keeps, per source file, the parsed frontmatter
+and the stripped body in a SQLite database under the user cache directory.
+
+An entry is used when the file's size and mtime match the ones it was stored
+with. When only the mtime differs (a checkout or a touch), the content hash is
+compared instead and the entry is kept if it still matches. Entries written
+by another ``PARSER_VERSION`` are ignored, and a cache that cannot be opened
+or written only makes the run parse every file.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from typing import Any
+
+from .frontmatter import parse_frontmatter
+
+# Bump when frontmatter parsing or body normalization changes
+PARSER_VERSION = 1
+
+APP_NAME = "rbw-convert"
+DATABASE_NAME = "parse-cache.sqlite3"
+
+# An mtime this close to when an entry was stored may hide a later write in
+# the same timestamp tick, so such entries are checked by hash
+_RACY_NS = 2_000_000_000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sources (
+    path TEXT PRIMARY KEY,
+    version INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    stored_ns INTEGER NOT NULL,
+    sha256 TEXT NOT NULL,
+    data TEXT NOT NULL,
+    body TEXT NOT NULL
+)
+"""
+
+
+def cache_dir() -> str:
+    """Return the directory of the parse cache (not created)."""
+    path = os.environ.get("CONVERT_CACHE_DIR")
+    if path:
+        return path
+    xdg = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return os.path.join(xdg, APP_NAME)
+
+
+def parse_source(content: bytes) -> tuple[dict[str, Any], str]:
+    """Parse a source file's bytes into (frontmatter, stripped body)."""
+    raw = content.decode("utf-8").replace("\r\n", "\n").replace("\r", "\n")
+    data, body = parse_frontmatter(raw)
+    return data, body.strip()
+
+
+class ParseCache:
+    """Parsed frontmatter and bodies of source files, validated by stat and hash."""
+
+    def __init__(self, directory: str | None = None) -> None:
+        self.path = os.path.join(directory or cache_dir(), DATABASE_NAME)
+        self.hits = 0
+        self.misses = 0
+        self._db: sqlite3.Connection | None = None
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._db = sqlite3.connect(self.path, timeout=10)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(_SCHEMA)
+        except (OSError, sqlite3.Error):
+            self.close()
+
+    def __enter__(self) -> ParseCache:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Write pending entries and close the database."""
+        if self._db is None:
+            return
+        try:
+            self._db.commit()
+            self._db.close()
+        except sqlite3.Error:
+            pass  # The entries are parsed again next run
+        self._db = None
+
+    def parse(self, file_path: str) -> tuple[dict[str, Any], str]:
+        """Return (frontmatter, stripped body) of a markdown source file."""
+        path = os.path.abspath(file_path)
+        stat = os.stat(path)
+        row = self._lookup(path)
+        if row is not None:
+            size, mtime_ns, stored_ns, sha256, data, body = row
+            if (
+                size == stat.st_size
+                and mtime_ns == stat.st_mtime_ns
+                and mtime_ns + _RACY_NS < stored_ns
+            ):
+                self.hits += 1
+                return json.loads(data), body
+
+        with open(path, "rb") as f:
+            content = f.read()
+        digest = hashlib.sha256(content).hexdigest()
+        if row is not None and sha256 == digest:
+            self.hits += 1
+            self._store(path, stat, digest, data, body)
+            return json.loads(data), body
+
+        self.misses += 1
+        parsed, body = parse_source(content)
+        try:
+            data = json.dumps(parsed)
+        except (TypeError, ValueError):
+            return parsed, body  # Frontmatter with values JSON cannot hold
+        self._store(path, stat, digest, data, body)
+        return parsed, body
+
+    def _lookup(self, path: str) -> tuple | None:
+        if self._db is None:
+            return None
+        try:
+            return self._db.execute(
+                "SELECT size, mtime_ns, stored_ns, sha256, data, body FROM sources"
+                " WHERE path = ? AND version = ?",
+                (path, PARSER_VERSION),
+            ).fetchone()
+        except sqlite3.Error:
+            return None
+
+    def _store(
+        self, path: str, stat: os.stat_result, sha256: str, data: str, body: str
+    ) -> None:
+        if self._db is None:
+            return
+        try:
+            self._db.execute(
+                "INSERT OR REPLACE INTO sources VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    path,
+                    PARSER_VERSION,
+                    stat.st_size,
+                    stat.st_mtime_ns,
+                    time.time_ns(),
+                    sha256,
+                    data,
+                    body,
+                ),
+            )
+        except sqlite3.Error:
+            pass  # Parsed again next run
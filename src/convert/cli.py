@@ -6,13 +6,15 @@ import argparse
 import os
 import sys
 
+from .cache import ParseCache
 from .converters.codex import convert_claude_to_codex
 from .converters.opencode import convert_claude_to_opencode
 from .converters.pi import convert_claude_to_pi
 from .parser import load_claude_plugin
-from .writers.codex import write_codex_bundle
-from .writers.opencode import write_opencode_bundle
-from .writers.pi import write_pi_bundle
+from .writers.build import BuildManifest, BuildSummary, options_hash, plugin_source_hash
+from .writers.codex import codex_manifest_path, write_codex_bundle
+from .writers.opencode import opencode_manifest_path, write_opencode_bundle
+from .writers.pi import pi_manifest_path, write_pi_bundle
 
 TARGETS = ("codex", "opencode", "pi")
 
@@ -66,10 +68,20 @@ def main(argv: list[str] | None = None) -> None:
         action=argparse.BooleanOptionalAction,
         help="Infer agent temperature from name/description (default: true)",
     )
+    parser.add_argument(
+        "--cache",
+        default=True,
+        action=argparse.BooleanOptionalAction,
+        help="Reuse parsed sources from the parse cache (default: true)",
+    )
 
     args = parser.parse_args(argv)
 
-    plugin = load_claude_plugin(args.source)
+    if args.cache:
+        with ParseCache() as cache:
+            plugin = load_claude_plugin(args.source, cache)
+    else:
+        plugin = load_claude_plugin(args.source)
     output_root = os.path.abspath(args.output) if args.output else os.getcwd()
     pi_home = _expand(args.pi_home) or os.path.join(
         os.path.expanduser("~"), ".pi", "agent"
@@ -94,7 +106,7 @@ def main(argv: list[str] | None = None) -> None:
             continue
 
         root = _resolve_target_output(target, output_root, pi_home)
-        _run_conversion(
+        summary = _run_conversion(
             target,
             plugin,
             root,
@@ -102,7 +114,7 @@ def main(argv: list[str] | None = None) -> None:
             agent_mode=args.agent_mode,
             infer_temperature=args.infer_temperature,
         )
-        print(f"Converted {plugin.manifest.name} to {target} at {root}")
+        print(f"Converted {plugin.manifest.name} to {target} at {root} ({summary})")
 
 
 def _run_conversion(
@@ -113,21 +125,40 @@ def _run_conversion(
     permissions: str,
     agent_mode: str,
     infer_temperature: bool,
-) -> None:
+) -> BuildSummary:
+    options: dict[str, object] = {}
     if target == "opencode":
-        bundle = convert_claude_to_opencode(
-            plugin,
-            agent_mode=agent_mode,
-            infer_temperature=infer_temperature,
-            permissions=permissions,
-        )
-        write_opencode_bundle(output_root, bundle)
+        options = {
+            "agent_mode": agent_mode,
+            "infer_temperature": infer_temperature,
+            "permissions": permissions,
+        }
+        manifest_path = opencode_manifest_path(output_root)
     elif target == "codex":
-        bundle = convert_claude_to_codex(plugin)
-        write_codex_bundle(output_root, bundle)
-    elif target == "pi":
-        bundle = convert_claude_to_pi(plugin)
-        write_pi_bundle(output_root, bundle)
+        manifest_path = codex_manifest_path(output_root)
+    else:
+        manifest_path = pi_manifest_path(output_root)
+
+    build = BuildManifest(
+        manifest_path,
+        plugin.manifest.name,
+        plugin_source_hash(plugin),
+        options_hash(target, output_root, **options),
+    )
+    if not build.is_current():
+        if target == "opencode":
+            bundle = convert_claude_to_opencode(
+                plugin,
+                agent_mode=agent_mode,
+                infer_temperature=infer_temperature,
+                permissions=permissions,
+            )
+            write_opencode_bundle(output_root, bundle, build)
+        elif target == "codex":
+            write_codex_bundle(output_root, convert_claude_to_codex(plugin), build)
+        elif target == "pi":
+            write_pi_bundle(output_root, convert_claude_to_pi(plugin), build)
+    return build.finish()
 
 
 def _resolve_target_output(
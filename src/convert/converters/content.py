@@ -3,6 +3,8 @@
 from __future__ import annotations
 
 import re
+from bisect import bisect_right
+from collections.abc import Callable, Sequence
 from typing import Literal
 
 # Unix paths that should never be rewritten as slash commands
@@ -43,7 +45,174 @@ def sanitize_description(value: str, max_length: int = 1024) -> str:
     return normalized[: max(0, max_length - len(ellipsis))].rstrip() + ellipsis
 
 
-# --- Pi content transforms ---
+# --- Single-pass rewriting ---
+
+# Where a rewrite happens: plain Markdown, a fenced code block or an inline code span
+Context = Literal["prose", "fenced", "inline"]
+
+# Renders the groups of a rule's match, or returns None to keep the matched text
+Renderer = Callable[[tuple, Context], str | None]
+
+# Fenced code blocks, closed by a fence of the same character or the end of the
+# body, and single-line inline code spans
+_CODE_PATTERN = re.compile(
+    r"^ {0,3}(?P<fence>`{3,}|~{3,})[^\n]*\n.*?(?:^ {0,3}(?P=fence)[`~]*[ \t]*$|\Z)"
+    r"|(?P<ticks>`+)[^`\n](?:[^\n]*?[^`\n])??(?P=ticks)(?!`)",
+    re.MULTILINE | re.DOTALL,
+)
+
+# Slash commands such as /review or /workflows:plan, not paths or URLs
+_SLASH_PATTERN = r"(?i:(?<![:\w])/([a-z][a-z0-9_:-]*?)(?=[\s,.\"')\]}`]|$))"
+
+
+class RuleTable:
+    """Ordered rewrite rules applied to a body in a single scan.
+
+    All rules are combined into one alternation, so the body is scanned once
+    instead of once per rule; at any position the earliest rule wins. Text a
+    rule produces is rewritten by the rules after it, as if each rule had made
+    its own pass. The body is first split into code regions so that renderers
+    know whether a match lies in prose, a fenced block or an inline code span.
+    Patterns are matched with ``re.MULTILINE``; other flags are set inline.
+
+    Each rule is ``(name, pattern, starts)``: ``starts`` lists every character
+    a match can begin with, ``^`` standing for a line start, or is empty if a
+    match can begin anywhere. When every rule has ``starts``, the scan is gated
+    on those characters, so most positions are skipped with a single test.
+    """
+
+    def __init__(self, rules: Sequence[tuple[str, str, str]]) -> None:
+        self.names = [name for name, _pattern, _starts in rules]
+        self._patterns = [pattern for _name, pattern, _starts in rules]
+        self.starts = [starts for _name, _pattern, starts in rules]
+        self._scanners: dict[
+            int, tuple[re.Pattern[str], dict[int, tuple[int, int]]]
+        ] = {}
+
+    def _scanner(
+        self, first: int
+    ) -> tuple[re.Pattern[str], dict[int, tuple[int, int]]]:
+        """Return the combined pattern of the rules from ``first`` on and its groups.
+
+        The groups map the number of each rule's outer group to the rule's
+        index and its number of inner groups.
+        """
+        scanner = self._scanners.get(first)
+        if scanner is None:
+            parts = []
+            groups = {}
+            group = 1
+            leading: set[str] | None = set()
+            for index in range(first, len(self._patterns)):
+                pattern = self._patterns[index]
+                inner = re.compile(pattern).groups
+                parts.append(f"({pattern})")
+                groups[group] = (index, inner)
+                group += 1 + inner
+                starts = self.starts[index]
+                leading = (
+                    None if not starts or leading is None else leading | set(starts)
+                )
+            combined = "|".join(parts)
+            if leading:
+                gates = ["^"] if "^" in leading else []
+                chars = "".join(sorted(leading - {"^"}))
+                if chars:
+                    gates.append(f"(?=[{re.escape(chars)}])")
+                combined = f"(?:{'|'.join(gates)})(?:{combined})"
+            scanner = (re.compile(combined, re.MULTILINE), groups)
+            self._scanners[first] = scanner
+        return scanner
+
+    def rewrite(self, body: str, renderers: dict[str, Renderer]) -> str:
+        """Rewrite ``body`` with the rendering function of each rule name."""
+        regions: list[tuple[int, int, Context]] = []
+        starts: list[int] = []
+
+        def context_at(position: int) -> Context:
+            # Code regions are only needed once a rule matches
+            if not starts and not regions:
+                regions.extend(
+                    (m.start(), m.end(), "fenced" if m.group("fence") else "inline")
+                    for m in _CODE_PATTERN.finditer(body)
+                )
+                starts.extend(start for start, _end, _kind in regions)
+                if not regions:
+                    regions.append((-1, -1, "prose"))
+                    starts.append(-1)
+            index = bisect_right(starts, position) - 1
+            if index >= 0 and position < regions[index][1]:
+                return regions[index][2]
+            return "prose"
+
+        return self._rewrite(body, 0, renderers, context_at)
+
+    def _rewrite(
+        self,
+        text: str,
+        first: int,
+        renderers: dict[str, Renderer],
+        context_at: Callable[[int], Context],
+    ) -> str:
+        scanner, groups = self._scanner(first)
+
+        def replace(m: re.Match) -> str:
+            index, inner = groups[m.lastindex]
+            context = context_at(m.start())
+            rendered = renderers[self.names[index]](
+                m.groups()[m.lastindex : m.lastindex + inner], context
+            )
+            output = m.group(0) if rendered is None else rendered
+            if index + 1 < len(self._patterns):
+                output = self._rewrite(
+                    output, index + 1, renderers, lambda _position: context
+                )
+            return output
+
+        return scanner.sub(replace, text)
+
+
+def _code_name(name: str, context: Context) -> str:
+    """Quote a name as code, unless it already sits inside an inline code span."""
+    return name if context == "inline" else f"`{name}`"
+
+
+def _task_agent(agent_name: str) -> str:
+    final_segment = agent_name.split(":")[-1] if ":" in agent_name else agent_name
+    return normalize_name(final_segment)
+
+
+# --- Codex content transforms ---
+
+CODEX_RULES = RuleTable(
+    [
+        (
+            "task-call",
+            r"(?s:Task\(\s*subagent_type:\s*\"([a-z][a-z0-9:_-]*)\"\s*,"
+            r"\s*prompt:\s*\"(.*?)\"\s*\))",
+            "T",
+        ),
+        (
+            "numbered-task",
+            r"^(\s*)Task\s+\d+\s*:\s*([a-z][a-z0-9:_-]*)\s*(?:→|->|=>)\s*\"([^\"]+)\"",
+            "^",
+        ),
+        ("listed-task", r"^(\s*-?\s*)Task\s+([a-z][a-z0-9:_-]*)\(([^)]*)\)", "^"),
+        ("inline-task", r"\bTask\s+([a-z][a-z0-9:_-]*)\(([^)]*)\)", "T"),
+        ("ask-user", r"\bAskUserQuestion\b", "A"),
+        ("task-tool", r"\bTask tool\b", "T"),
+        ("task-calls", r"\bTask calls\b", "T"),
+        ("task-call-phrase", r"\bTask call\b", "T"),
+        ("slash-command", _SLASH_PATTERN, "/"),
+        ("claude-dir", r"\.claude/", "."),
+        (
+            "agent-ref",
+            r"(?i:@([a-z][a-z0-9-]*-(?:agent|reviewer|researcher|analyst|specialist|oracle"
+            r"|sentinel|guardian|strategist)))",
+            "@",
+        ),
+    ]
+)
 
 
 def transform_content_for_codex(
@@ -55,60 +224,24 @@ def transform_content_for_codex(
     unknown_slash_behavior: Literal["prompt", "preserve"] = "preserve",
 ) -> str:
     """Transform Claude Code content to Codex-compatible content."""
-    result = body
     prompt_targets = prompt_targets or {}
     skill_targets = skill_targets or {}
     agent_targets = agent_targets or {}
 
-    def _render_task(prefix: str, agent_name: str, args: str) -> str:
-        final_segment = agent_name.split(":")[-1] if ":" in agent_name else agent_name
-        normalized = normalize_name(final_segment)
-        target_name = agent_targets.get(normalized, normalized)
+    def _render_task(prefix: str, agent_name: str, args: str, context: Context) -> str:
+        normalized = _task_agent(agent_name)
+        target_name = _code_name(agent_targets.get(normalized, normalized), context)
         trimmed_args = re.sub(r"\s+", " ", args.strip())
         if trimmed_args:
             return (
-                f"{prefix}Spawn the `{target_name}` agent with this task: "
-                f"{trimmed_args}."
+                f"{prefix}Spawn the {target_name} agent with this task: {trimmed_args}."
             )
-        return f"{prefix}Spawn the `{target_name}` agent."
+        return f"{prefix}Spawn the {target_name} agent."
 
-    def _replace_task(m: re.Match) -> str:
-        return _render_task(m.group(1), m.group(2), m.group(3))
-
-    result = re.sub(
-        r"Task\(\s*subagent_type:\s*\"([a-z][a-z0-9:_-]*)\"\s*,\s*prompt:\s*\"(.*?)\"\s*\)",
-        lambda m: _render_task("", m.group(1), m.group(2)),
-        result,
-        flags=re.DOTALL,
-    )
-    result = re.sub(
-        r"^(\s*)Task\s+\d+\s*:\s*([a-z][a-z0-9:_-]*)\s*(?:→|->|=>)\s*\"([^\"]+)\"",
-        _replace_task,
-        result,
-        flags=re.MULTILINE,
-    )
-    result = re.sub(
-        r"^(\s*-?\s*)Task\s+([a-z][a-z0-9:_-]*)\(([^)]*)\)",
-        _replace_task,
-        result,
-        flags=re.MULTILINE,
-    )
-    result = re.sub(
-        r"\bTask\s+([a-z][a-z0-9:_-]*)\(([^)]*)\)",
-        lambda m: _render_task("", m.group(1), m.group(2)),
-        result,
-    )
-    result = re.sub(r"\bAskUserQuestion\b", "ask the user directly", result)
-    result = re.sub(r"\bTask tool\b", "agent spawning", result)
-    result = re.sub(r"\bTask calls\b", "agent spawns", result)
-    result = re.sub(r"\bTask call\b", "agent spawn", result)
-
-    def _replace_slash(m: re.Match) -> str:
-        command_name = m.group(1)
-        if "/" in command_name:
-            return m.group(0)
-        if command_name in _UNIX_PATH_PREFIXES:
-            return m.group(0)
+    def _render_slash(groups: tuple, context: Context) -> str | None:
+        command_name = groups[0]
+        if "/" in command_name or command_name in _UNIX_PATH_PREFIXES:
+            return None
 
         normalized_name = normalize_name(command_name)
         if normalized_name in prompt_targets:
@@ -116,91 +249,83 @@ def transform_content_for_codex(
         if normalized_name in skill_targets:
             return f"the {skill_targets[normalized_name]} skill"
         if unknown_slash_behavior == "preserve":
-            return m.group(0)
+            return None
         return f"/prompts:{normalized_name}"
 
-    result = re.sub(
-        r"(?<![:\w])/([a-z][a-z0-9_:-]*?)(?=[\s,.\"')\]}`]|$)",
-        _replace_slash,
-        result,
-        flags=re.IGNORECASE,
+    def _render_agent_ref(groups: tuple, context: Context) -> str:
+        normalized = normalize_name(groups[0])
+        return f"{_code_name(agent_targets.get(normalized, normalized), context)} agent"
+
+    return CODEX_RULES.rewrite(
+        body,
+        {
+            "task-call": lambda g, context: _render_task("", g[0], g[1], context),
+            "numbered-task": lambda g, context: _render_task(g[0], g[1], g[2], context),
+            "listed-task": lambda g, context: _render_task(g[0], g[1], g[2], context),
+            "inline-task": lambda g, context: _render_task("", g[0], g[1], context),
+            "ask-user": lambda g, context: "ask the user directly",
+            "task-tool": lambda g, context: "agent spawning",
+            "task-calls": lambda g, context: "agent spawns",
+            "task-call-phrase": lambda g, context: "agent spawn",
+            "slash-command": _render_slash,
+            "claude-dir": lambda g, context: ".codex/",
+            "agent-ref": _render_agent_ref,
+        },
     )
 
-    result = result.replace("~/.claude/", "~/.codex/")
-    result = result.replace(".claude/", ".codex/")
-
-    def _replace_agent_ref(m: re.Match) -> str:
-        normalized = normalize_name(m.group(1))
-        agent_name = agent_targets.get(normalized, normalized)
-        return f"`{agent_name}` agent"
-
-    result = re.sub(
-        r"@([a-z][a-z0-9-]*-(?:agent|reviewer|researcher|analyst|specialist|oracle|sentinel|guardian|strategist))",
-        _replace_agent_ref,
-        result,
-        flags=re.IGNORECASE,
-    )
-
-    return result
-
 
 # --- Pi content transforms ---
 
+_PI_TODOS = "file-based todos (todos/ + /skill:todo-create)"
+
+PI_RULES = RuleTable(
+    [
+        ("listed-task", r"^(\s*-?\s*)Task\s+([a-z][a-z0-9:-]*)\(([^)]*)\)", "^"),
+        ("ask-user", r"\bAskUserQuestion\b", "A"),
+        ("todo-write", r"\bTodoWrite\b", "T"),
+        ("todo-read", r"\bTodoRead\b", "T"),
+        ("slash-command", _SLASH_PATTERN, "/"),
+    ]
+)
 
-def transform_content_for_pi(body: str) -> str:
-    """Transform Claude Code content to Pi-compatible content."""
-    result = body
 
+def _render_pi_task(groups: tuple, context: Context) -> str:
     # Task agent-name(args) -> Run subagent with agent="name" and task="args"
-    def _replace_task(m: re.Match) -> str:
-        prefix = m.group(1)
-        agent_name = m.group(2)
-        args = m.group(3)
-        final_segment = agent_name.split(":")[-1] if ":" in agent_name else agent_name
-        skill_name = normalize_name(final_segment)
-        trimmed_args = re.sub(r"\s+", " ", args.strip())
-        if trimmed_args:
-            return f'{prefix}Run subagent with agent="{skill_name}" and task="{trimmed_args}".'
-        return f'{prefix}Run subagent with agent="{skill_name}".'
-
-    result = re.sub(
-        r"^(\s*-?\s*)Task\s+([a-z][a-z0-9:-]*)\(([^)]*)\)",
-        _replace_task,
-        result,
-        flags=re.MULTILINE,
+    prefix, agent_name, args = groups
+    skill_name = _task_agent(agent_name)
+    trimmed_args = re.sub(r"\s+", " ", args.strip())
+    if trimmed_args:
+        return (
+            f'{prefix}Run subagent with agent="{skill_name}" and task="{trimmed_args}".'
+        )
+    return f'{prefix}Run subagent with agent="{skill_name}".'
+
+
+def _render_pi_slash(groups: tuple, context: Context) -> str | None:
+    command_name = groups[0]
+    if "/" in command_name or command_name in _UNIX_PATH_PREFIXES:
+        return None
+    if command_name.startswith("skill:"):
+        skill_name = command_name[len("skill:") :]
+        return f"/skill:{normalize_name(skill_name)}"
+    without_prefix = (
+        command_name[len("prompts:") :]
+        if command_name.startswith("prompts:")
+        else command_name
     )
+    return f"/{normalize_name(without_prefix)}"
 
-    # Claude-specific tool references
-    result = re.sub(r"\bAskUserQuestion\b", "ask_user_question", result)
-    result = re.sub(
-        r"\bTodoWrite\b", "file-based todos (todos/ + /skill:todo-create)", result
-    )
-    result = re.sub(
-        r"\bTodoRead\b", "file-based todos (todos/ + /skill:todo-create)", result
-    )
 
-    # Slash commands
-    def _replace_slash(m: re.Match) -> str:
-        command_name = m.group(1)
-        if "/" in command_name:
-            return m.group(0)
-        if command_name in _UNIX_PATH_PREFIXES:
-            return m.group(0)
-        if command_name.startswith("skill:"):
-            skill_name = command_name[len("skill:") :]
-            return f"/skill:{normalize_name(skill_name)}"
-        without_prefix = (
-            command_name[len("prompts:") :]
-            if command_name.startswith("prompts:")
-            else command_name
-        )
-        return f"/{normalize_name(without_prefix)}"
+_PI_RENDERERS: dict[str, Renderer] = {
+    "listed-task": _render_pi_task,
+    # Claude-specific tool references
+    "ask-user": lambda g, context: "ask_user_question",
+    "todo-write": lambda g, context: _PI_TODOS,
+    "todo-read": lambda g, context: _PI_TODOS,
+    "slash-command": _render_pi_slash,
+}
 
-    result = re.sub(
-        r"(?<![:\w])/([a-z][a-z0-9_:-]*?)(?=[\s,.\"')\]}`]|$)",
-        _replace_slash,
-        result,
-        flags=re.IGNORECASE,
-    )
 
-    return result
+def transform_content_for_pi(body: str) -> str:
+    """Transform Claude Code content to Pi-compatible content."""
+    return PI_RULES.rewrite(body, _PI_RENDERERS)
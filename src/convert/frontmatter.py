@@ -25,16 +25,46 @@ def parse_frontmatter(
 
     yaml_text = "\n".join(lines[1:end_index])
     body = "\n".join(lines[end_index + 1 :])
+    return _parse_yaml(yaml_text), body
 
+
+def read_frontmatter(file_path: str) -> tuple[dict[str, Any], int]:
+    """Parse the YAML frontmatter of a markdown file without reading its body.
+
+    Reads line by line and stops at the closing ``---``. Returns (data,
+    body_position), where body_position is the file position that
+    ``read_body`` starts from; the pair matches ``parse_frontmatter`` of the
+    whole file.
+    """
+    with open(file_path, encoding="utf-8") as f:
+        if f.readline().strip() != "---":
+            return {}, 0
+
+        header: list[str] = []
+        while True:
+            line = f.readline()
+            if not line:
+                return {}, 0
+            if line.strip() == "---":
+                return _parse_yaml("".join(header).removesuffix("\n")), f.tell()
+            header.append(line)
+
+
+def read_body(file_path: str, body_position: int) -> str:
+    """Read the body of a markdown file from a position given by ``read_frontmatter``."""
+    with open(file_path, encoding="utf-8") as f:
+        f.seek(body_position)
+        return f.read()
+
+
+def _parse_yaml(yaml_text: str) -> dict[str, Any]:
     try:
         parsed = yaml.safe_load(yaml_text)
-        data = parsed if isinstance(parsed, dict) else {}
-        return data, body
+        return parsed if isinstance(parsed, dict) else {}
     except yaml.YAMLError:
         # Fallback: parse simple key: value lines manually.
         # Handles frontmatter with unquoted colons in values (common in descriptions).
-        data = _parse_simple_yaml(yaml_text)
-        return data, body
+        return _parse_simple_yaml(yaml_text)
 
 
 def _parse_simple_yaml(text: str) -> dict[str, Any]:
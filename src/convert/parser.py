@@ -1,8 +1,11 @@
 from __future__ import annotations
 
 import os
+from collections.abc import Callable
+from functools import partial
 
-from .frontmatter import parse_frontmatter
+from .cache import ParseCache
+from .frontmatter import read_body, read_frontmatter
 from .types import (
     ClaudeAgent,
     ClaudeCommand,
@@ -14,12 +17,14 @@ from .types import (
     ClaudePlugin,
     ClaudeSkill,
 )
-from .writers.files import path_exists, read_json, read_text, walk_files
+from .writers.files import path_exists, read_json, walk_files
 
 PLUGIN_MANIFEST = os.path.join(".claude-plugin", "plugin.json")
 
 
-def load_claude_plugin(input_path: str) -> ClaudePlugin:
+def load_claude_plugin(
+    input_path: str, cache: ParseCache | None = None
+) -> ClaudePlugin:
     root = _resolve_claude_root(input_path)
     manifest_path = os.path.join(root, PLUGIN_MANIFEST)
     raw_manifest = read_json(manifest_path)
@@ -29,9 +34,9 @@ def load_claude_plugin(input_path: str) -> ClaudePlugin:
     command_dirs = _resolve_component_dirs(root, "commands", manifest.commands)
     skill_dirs = _resolve_component_dirs(root, "skills", manifest.skills)
 
-    agents = _load_agents(agent_dirs)
-    commands = _load_commands(command_dirs)
-    skills = _load_skills(skill_dirs)
+    agents = _load_agents(agent_dirs, cache)
+    commands = _load_commands(command_dirs, cache)
+    skills = _load_skills(skill_dirs, cache)
     hooks = _load_hooks(root, manifest.hooks)
     mcp_servers = _load_mcp_servers(root, manifest)
 
@@ -92,12 +97,11 @@ def _to_path_list(value: str | list[str] | None) -> list[str]:
     return [value]
 
 
-def _load_agents(agent_dirs: list[str]) -> list[ClaudeAgent]:
+def _load_agents(agent_dirs: list[str], cache: ParseCache | None) -> list[ClaudeAgent]:
     files = _collect_markdown_files(agent_dirs)
     agents: list[ClaudeAgent] = []
     for file_path in files:
-        raw = read_text(file_path)
-        data, body = parse_frontmatter(raw, file_path)
+        data, body = _read_component(file_path, cache)
         name = data.get("name") or os.path.splitext(os.path.basename(file_path))[0]
         agents.append(
             ClaudeAgent(
@@ -105,19 +109,20 @@ def _load_agents(agent_dirs: list[str]) -> list[ClaudeAgent]:
                 description=data.get("description"),
                 capabilities=data.get("capabilities"),
                 model=data.get("model"),
-                body=body.strip(),
+                body=body,
                 source_path=file_path,
             )
         )
     return agents
 
 
-def _load_commands(command_dirs: list[str]) -> list[ClaudeCommand]:
+def _load_commands(
+    command_dirs: list[str], cache: ParseCache | None
+) -> list[ClaudeCommand]:
     files = _collect_markdown_files(command_dirs)
     commands: list[ClaudeCommand] = []
     for file_path in files:
-        raw = read_text(file_path)
-        data, body = parse_frontmatter(raw, file_path)
+        data, body = _read_component(file_path, cache)
         name = data.get("name") or os.path.splitext(os.path.basename(file_path))[0]
         allowed_tools = _parse_allowed_tools(data.get("allowed-tools"))
         disable = True if data.get("disable-model-invocation") is True else None
@@ -129,20 +134,36 @@ def _load_commands(command_dirs: list[str]) -> list[ClaudeCommand]:
                 model=data.get("model"),
                 allowed_tools=allowed_tools,
                 disable_model_invocation=disable,
-                body=body.strip(),
+                body=body,
                 source_path=file_path,
             )
         )
     return commands
 
 
-def _load_skills(skill_dirs: list[str]) -> list[ClaudeSkill]:
+def _read_component(
+    file_path: str, cache: ParseCache | None
+) -> tuple[dict, str | Callable[[], str]]:
+    if cache is not None:
+        return cache.parse(file_path)
+    data, body_position = read_frontmatter(file_path)
+    return data, partial(_read_stripped_body, file_path, body_position)
+
+
+def _read_stripped_body(file_path: str, body_position: int) -> str:
+    return read_body(file_path, body_position).strip()
+
+
+def _load_skills(skill_dirs: list[str], cache: ParseCache | None) -> list[ClaudeSkill]:
     entries = _collect_files(skill_dirs)
     skill_files = [f for f in entries if os.path.basename(f) == "SKILL.md"]
     skills: list[ClaudeSkill] = []
     for file_path in skill_files:
-        raw = read_text(file_path)
-        data, _ = parse_frontmatter(raw, file_path)
+        data = (
+            cache.parse(file_path)[0]
+            if cache is not None
+            else read_frontmatter(file_path)[0]
+        )
         name = data.get("name") or os.path.basename(os.path.dirname(file_path))
         disable = True if data.get("disable-model-invocation") is True else None
         skills.append(
@@ -1,8 +1,27 @@
 from __future__ import annotations
 
+from collections.abc import Callable
 from dataclasses import dataclass, field
 
 
+class LazyText:
+    """A dataclass text field that may be given as a loader, called on first access."""
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self._attr = "_" + name
+
+    def __get__(self, instance: object, owner: type | None = None) -> str:
+        if instance is None:
+            raise AttributeError(self._attr[1:])
+        value = instance.__dict__[self._attr]
+        if callable(value):
+            value = instance.__dict__[self._attr] = value()
+        return value
+
+    def __set__(self, instance: object, value: str | Callable[[], str]) -> None:
+        instance.__dict__[self._attr] = value
+
+
 # --- Claude plugin types ---
 
 
@@ -34,7 +53,7 @@ class ClaudeManifest:
 @dataclass
 class ClaudeAgent:
     name: str
-    body: str
+    body: LazyText = LazyText()
     source_path: str
     description: str | None = None
     capabilities: list[str] | None = None
@@ -44,7 +63,7 @@ class ClaudeAgent:
 @dataclass
 class ClaudeCommand:
     name: str
-    body: str
+    body: LazyText = LazyText()
     source_path: str
     description: str | None = None
     argument_hint: str | list | dict | None = None
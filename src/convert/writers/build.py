@@ -0,0 +1,226 @@
+"""Build manifests for incremental conversion.
+
+A converted plugin is recorded in a manifest next to its outputs, keyed by
+plugin name, with the hash of its sources, ``CONVERTER_VERSION``, the hash of
+the conversion options and the hash of every file written. A later run whose
+sources, version and options match, and whose recorded outputs are intact,
+skips conversion; otherwise the plugin is converted and only outputs whose
+content changed are written. Outputs a plugin no longer produces are removed,
+except shared files such as ``opencode.json`` that other tools also edit.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import stat
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from ..types import ClaudePlugin
+from .files import ensure_dir, walk_files
+
+# Bump when a converter or writer changes its output for the same sources
+CONVERTER_VERSION = 1
+
+MANIFEST_NAME = ".convert-manifest.json"
+
+
+@dataclass
+class BuildSummary:
+    converted: int = 0
+    skipped: int = 0
+    removed: int = 0
+
+    def __str__(self) -> str:
+        return f"{self.converted} converted, {self.skipped} skipped, {self.removed} removed"
+
+
+def plugin_source_hash(plugin: ClaudePlugin) -> str:
+    """Hash everything a conversion reads: the parsed plugin and its skill files."""
+    digest = hashlib.sha256(repr(plugin).encode("utf-8"))
+    for skill in plugin.skills:
+        for file_path in walk_files(skill.source_dir):
+            digest.update(os.path.relpath(file_path, skill.source_dir).encode("utf-8"))
+            digest.update(_file_hash(file_path).encode("ascii"))
+    return digest.hexdigest()
+
+
+def options_hash(target: str, output_root: str, **options: object) -> str:
+    key = {"target": target, "output_root": output_root, **options}
+    return hashlib.sha256(json.dumps(key, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class BuildManifest:
+    """The outputs of one plugin in one output root, written only when changed.
+
+    Without a manifest path nothing is recorded, and writers still skip
+    outputs whose content is unchanged.
+    """
+
+    def __init__(
+        self,
+        manifest_path: str | None = None,
+        key: str = "",
+        source_hash: str = "",
+        options_hash: str = "",
+    ) -> None:
+        self.manifest_path = manifest_path
+        self._root = (
+            os.path.dirname(os.path.abspath(manifest_path)) if manifest_path else ""
+        )
+        self.key = key
+        self.source_hash = source_hash
+        self.options_hash = options_hash
+        self.summary = BuildSummary()
+        self._builds = _load_builds(manifest_path) if manifest_path else {}
+        self._previous = self._builds.get(key, {})
+        # Output paths, relative to the manifest, and the hashes written this run
+        self._outputs: dict[str, str] = {}
+        self._shared: set[str] = set()
+
+    def is_current(self) -> bool:
+        """True if the recorded build of these sources is intact; its outputs count as skipped."""
+        previous = self._previous
+        if not previous or [
+            previous.get("source"),
+            previous.get("converter"),
+            previous.get("options"),
+        ] != [self.source_hash, CONVERTER_VERSION, self.options_hash]:
+            return False
+        outputs = previous.get("outputs", {})
+        for relative, output_hash in outputs.items():
+            path = self._absolute(relative)
+            if not os.path.isfile(path) or _file_hash(path) != output_hash:
+                return False
+        self._outputs = dict(outputs)
+        self._shared = set(previous.get("shared", []))
+        self.summary.skipped += len(outputs)
+        return True
+
+    def write_text(self, file_path: str, content: str, shared: bool = False) -> bool:
+        """Write ``content`` unless the file already holds it; True if written."""
+        return self.write_bytes(file_path, content.encode("utf-8"), shared=shared)
+
+    def write_bytes(
+        self,
+        file_path: str,
+        content: bytes,
+        mode: int | None = None,
+        shared: bool = False,
+    ) -> bool:
+        relative = self._relative(file_path)
+        self._outputs[relative] = hashlib.sha256(content).hexdigest()
+        if shared:
+            self._shared.add(relative)
+
+        written = not _holds(file_path, content)
+        if written:
+            ensure_dir(os.path.dirname(file_path))
+            with open(file_path, "wb") as f:
+                f.write(content)
+            self.summary.converted += 1
+        else:
+            self.summary.skipped += 1
+        if mode is not None and stat.S_IMODE(
+            os.stat(file_path).st_mode
+        ) != stat.S_IMODE(mode):
+            os.chmod(file_path, stat.S_IMODE(mode))
+        return written
+
+    def would_change(self, file_path: str, content: str) -> bool:
+        """True if writing ``content`` would change the file, for backups before a write."""
+        return os.path.exists(file_path) and not _holds(
+            file_path, content.encode("utf-8")
+        )
+
+    def copy_tree(
+        self, src: str, dst: str, transform: Callable[[str], str] | None = None
+    ) -> None:
+        """Mirror ``src`` into ``dst``, optionally transforming .md file content."""
+        expected: set[str] = set()
+        for source in walk_files(src):
+            dest = os.path.join(dst, os.path.relpath(source, src))
+            expected.add(dest)
+            with open(source, "rb") as f:
+                content = f.read()
+            if transform is not None and source.endswith(".md"):
+                text = content.decode("utf-8").replace("\r\n", "\n").replace("\r", "\n")
+                transformed = transform(text)
+                if transformed != text:
+                    content = transformed.encode("utf-8")
+            self.write_bytes(dest, content, mode=os.stat(source).st_mode)
+
+        for existing in walk_files(dst):
+            if existing not in expected:
+                os.remove(existing)
+                self.summary.removed += 1
+
+    def finish(self) -> BuildSummary:
+        """Remove outputs the plugin no longer produces and save the manifest."""
+        if self.manifest_path is None:
+            return self.summary
+
+        shared = set(self._previous.get("shared", []))
+        for relative, output_hash in self._previous.get("outputs", {}).items():
+            if relative in self._outputs or relative in shared:
+                continue
+            path = self._absolute(relative)
+            if os.path.isfile(path) and _file_hash(path) == output_hash:
+                os.remove(path)
+                self.summary.removed += 1
+                self._remove_empty_parents(path)
+            elif os.path.exists(path):
+                print(f"Keeping edited stale output {path}")
+
+        build = {
+            "source": self.source_hash,
+            "converter": CONVERTER_VERSION,
+            "options": self.options_hash,
+            "outputs": dict(sorted(self._outputs.items())),
+            "shared": sorted(self._shared),
+        }
+        if build != self._previous:
+            self._builds[self.key] = build
+            ensure_dir(os.path.dirname(self.manifest_path))
+            with open(self.manifest_path, "w", encoding="utf-8") as f:
+                json.dump({"builds": self._builds}, f, indent=2, sort_keys=True)
+                f.write("\n")
+        return self.summary
+
+    def _relative(self, file_path: str) -> str:
+        if self.manifest_path is None:
+            return file_path
+        return os.path.relpath(os.path.abspath(file_path), self._root)
+
+    def _absolute(self, relative: str) -> str:
+        return os.path.normpath(os.path.join(self._root, relative))
+
+    def _remove_empty_parents(self, path: str) -> None:
+        parent = os.path.dirname(path)
+        while parent.startswith(self._root + os.sep) and not os.listdir(parent):
+            os.rmdir(parent)
+            parent = os.path.dirname(parent)
+
+
+def _load_builds(manifest_path: str) -> dict[str, dict]:
+    try:
+        with open(manifest_path, encoding="utf-8") as f:
+            builds = json.load(f)["builds"]
+    except (OSError, ValueError, KeyError, TypeError):
+        return {}
+    return builds if isinstance(builds, dict) else {}
+
+
+def _holds(file_path: str, content: bytes) -> bool:
+    try:
+        with open(file_path, "rb") as f:
+            return f.read() == content
+    except OSError:
+        return False
+
+
+def _file_hash(file_path: str) -> str:
+    with open(file_path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
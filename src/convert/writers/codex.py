@@ -9,13 +9,17 @@ from ..types import (
     CodexBundle,
     CodexPromptFile,
 )
-from .files import ensure_dir, path_exists, read_text, sanitize_path_name, write_text
+from .build import MANIFEST_NAME, BuildManifest
+from .files import ensure_dir, path_exists, read_text, sanitize_path_name
 
 MANAGED_AGENT_HEADER_PREFIX = "# Generated from "
 MANAGED_PROMPT_COMMENT_PREFIX = "<!-- Generated from "
 
 
-def write_codex_bundle(output_root: str, bundle: CodexBundle) -> None:
+def write_codex_bundle(
+    output_root: str, bundle: CodexBundle, build: BuildManifest | None = None
+) -> None:
+    build = build or BuildManifest()
     paths = _resolve_codex_paths(output_root)
     ensure_dir(paths["root"])
     ensure_dir(paths["agents_dir"])
@@ -27,7 +31,7 @@ def write_codex_bundle(output_root: str, bundle: CodexBundle) -> None:
             raise FileExistsError(
                 f"Refusing to overwrite unmanaged Codex agent file: {dest}"
             )
-        write_text(dest, render_codex_agent_file(agent, output_root))
+        build.write_text(dest, render_codex_agent_file(agent, output_root))
 
     for prompt in bundle.prompts:
         dest = os.path.join(
@@ -37,7 +41,11 @@ def write_codex_bundle(output_root: str, bundle: CodexBundle) -> None:
             raise FileExistsError(
                 f"Refusing to overwrite unmanaged Codex prompt file: {dest}"
             )
-        write_text(dest, render_codex_prompt_file(prompt, output_root))
+        build.write_text(dest, render_codex_prompt_file(prompt, output_root))
+
+
+def codex_manifest_path(output_root: str) -> str:
+    return os.path.join(_resolve_codex_paths(output_root)["root"], MANIFEST_NAME)
 
 
 def render_codex_agent_file(agent: CodexAgentFile, output_root: str) -> str:
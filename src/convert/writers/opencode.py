@@ -4,28 +4,31 @@ import json
 import os
 
 from ..types import OpenCodeBundle, OpenCodeConfig
+from .build import MANIFEST_NAME, BuildManifest
 from .files import (
     backup_file,
-    copy_dir,
     ensure_dir,
     path_exists,
     read_json,
     sanitize_path_name,
-    write_text,
 )
 
 
-def write_opencode_bundle(output_root: str, bundle: OpenCodeBundle) -> None:
+def write_opencode_bundle(
+    output_root: str, bundle: OpenCodeBundle, build: BuildManifest | None = None
+) -> None:
+    build = build or BuildManifest()
     paths = _resolve_opencode_paths(output_root)
     ensure_dir(paths["root"])
 
     had_existing_config = path_exists(paths["config_path"])
-    bp = backup_file(paths["config_path"])
-    if bp:
-        print(f"Backed up existing config to {bp}")
-
     merged = _merge_opencode_config(paths["config_path"], bundle.config)
-    _write_config_json(paths["config_path"], merged)
+    config = json.dumps(merged, indent=2) + "\n"
+    if build.would_change(paths["config_path"], config):
+        bp = backup_file(paths["config_path"])
+        if bp:
+            print(f"Backed up existing config to {bp}")
+    build.write_text(paths["config_path"], config, shared=True)
     if had_existing_config:
         print(
             "Merged plugin config into existing opencode.json (user settings preserved)"
@@ -40,7 +43,7 @@ def write_opencode_bundle(output_root: str, bundle: OpenCodeBundle) -> None:
             )
             continue
         seen_agents.add(safe_name)
-        write_text(
+        build.write_text(
             os.path.join(paths["agents_dir"], f"{safe_name}.md"),
             agent.content + "\n",
         )
@@ -49,26 +52,31 @@ def write_opencode_bundle(output_root: str, bundle: OpenCodeBundle) -> None:
         dest = os.path.join(
             paths["command_dir"], f"{sanitize_path_name(cmd_file.name)}.md"
         )
-        cmd_bp = backup_file(dest)
-        if cmd_bp:
-            print(f"Backed up existing command file to {cmd_bp}")
-        write_text(dest, cmd_file.content + "\n")
+        if build.would_change(dest, cmd_file.content + "\n"):
+            cmd_bp = backup_file(dest)
+            if cmd_bp:
+                print(f"Backed up existing command file to {cmd_bp}")
+        build.write_text(dest, cmd_file.content + "\n")
 
     if bundle.plugins:
         for plugin in bundle.plugins:
-            write_text(
+            build.write_text(
                 os.path.join(paths["plugins_dir"], plugin.name),
                 plugin.content + "\n",
             )
 
     if bundle.skill_dirs:
         for skill in bundle.skill_dirs:
-            copy_dir(
+            build.copy_tree(
                 skill.source_dir,
                 os.path.join(paths["skills_dir"], sanitize_path_name(skill.name)),
             )
 
 
+def opencode_manifest_path(output_root: str) -> str:
+    return _resolve_opencode_paths(output_root)["manifest_path"]
+
+
 def _resolve_opencode_paths(output_root: str) -> dict[str, str]:
     base = os.path.basename(output_root)
     if base in ("opencode", ".opencode"):
@@ -79,6 +87,7 @@ def _resolve_opencode_paths(output_root: str) -> dict[str, str]:
             "plugins_dir": os.path.join(output_root, "plugins"),
             "skills_dir": os.path.join(output_root, "skills"),
             "command_dir": os.path.join(output_root, "commands"),
+            "manifest_path": os.path.join(output_root, MANIFEST_NAME),
         }
 
     return {
@@ -88,6 +97,7 @@ def _resolve_opencode_paths(output_root: str) -> dict[str, str]:
         "plugins_dir": os.path.join(output_root, ".opencode", "plugins"),
         "skills_dir": os.path.join(output_root, ".opencode", "skills"),
         "command_dir": os.path.join(output_root, ".opencode", "commands"),
+        "manifest_path": os.path.join(output_root, ".opencode", MANIFEST_NAME),
     }
 
 
@@ -159,10 +169,3 @@ def _config_to_dict(config: OpenCodeConfig) -> dict:
     if config.tools:
         d["tools"] = config.tools
     return d
-
-
-def _write_config_json(path: str, data: dict) -> None:
-    ensure_dir(os.path.dirname(path))
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2)
-        f.write("\n")
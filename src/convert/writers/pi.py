@@ -5,14 +5,13 @@ import os
 
 from ..converters.content import transform_content_for_pi
 from ..types import PiBundle
+from .build import MANIFEST_NAME, BuildManifest
 from .files import (
     backup_file,
-    copy_skill_dir,
     ensure_dir,
     path_exists,
     read_text,
     sanitize_path_name,
-    write_text,
 )
 
 PI_AGENTS_BLOCK_START = "<!-- BEGIN COMPOUND PI TOOL MAP -->"
@@ -31,7 +30,10 @@ Compatibility notes:
 - MCPorter config path: .pi/compound-engineering/mcporter.json (project) or ~/.pi/agent/compound-engineering/mcporter.json (global)"""
 
 
-def write_pi_bundle(output_root: str, bundle: PiBundle) -> None:
+def write_pi_bundle(
+    output_root: str, bundle: PiBundle, build: BuildManifest | None = None
+) -> None:
+    build = build or BuildManifest()
     paths = _resolve_pi_paths(output_root)
 
     ensure_dir(paths["skills_dir"])
@@ -39,20 +41,20 @@ def write_pi_bundle(output_root: str, bundle: PiBundle) -> None:
     ensure_dir(paths["extensions_dir"])
 
     for prompt in bundle.prompts:
-        write_text(
+        build.write_text(
             os.path.join(paths["prompts_dir"], f"{sanitize_path_name(prompt.name)}.md"),
             prompt.content + "\n",
         )
 
     for skill in bundle.skill_dirs:
-        copy_skill_dir(
+        build.copy_tree(
             skill.source_dir,
             os.path.join(paths["skills_dir"], sanitize_path_name(skill.name)),
             transform_content_for_pi,
         )
 
     for skill in bundle.generated_skills:
-        write_text(
+        build.write_text(
             os.path.join(
                 paths["skills_dir"], sanitize_path_name(skill.name), "SKILL.md"
             ),
@@ -60,18 +62,24 @@ def write_pi_bundle(output_root: str, bundle: PiBundle) -> None:
         )
 
     for extension in bundle.extensions:
-        write_text(
+        build.write_text(
             os.path.join(paths["extensions_dir"], extension.name),
             extension.content + "\n",
         )
 
     if bundle.mcporter_config:
-        bp = backup_file(paths["mcporter_config_path"])
-        if bp:
-            print(f"Backed up existing MCPorter config to {bp}")
-        _write_mcporter_json(paths["mcporter_config_path"], bundle.mcporter_config)
+        mcporter = _render_mcporter_json(bundle.mcporter_config)
+        if build.would_change(paths["mcporter_config_path"], mcporter):
+            bp = backup_file(paths["mcporter_config_path"])
+            if bp:
+                print(f"Backed up existing MCPorter config to {bp}")
+        build.write_text(paths["mcporter_config_path"], mcporter)
 
-    _ensure_pi_agents_block(paths["agents_path"])
+    _ensure_pi_agents_block(paths["agents_path"], build)
+
+
+def pi_manifest_path(output_root: str) -> str:
+    return _resolve_pi_paths(output_root)["manifest_path"]
 
 
 def _resolve_pi_paths(output_root: str) -> dict[str, str]:
@@ -86,6 +94,7 @@ def _resolve_pi_paths(output_root: str) -> dict[str, str]:
                 output_root, "compound-engineering", "mcporter.json"
             ),
             "agents_path": os.path.join(output_root, "AGENTS.md"),
+            "manifest_path": os.path.join(output_root, MANIFEST_NAME),
         }
 
     return {
@@ -96,20 +105,18 @@ def _resolve_pi_paths(output_root: str) -> dict[str, str]:
             output_root, ".pi", "compound-engineering", "mcporter.json"
         ),
         "agents_path": os.path.join(output_root, "AGENTS.md"),
+        "manifest_path": os.path.join(output_root, ".pi", MANIFEST_NAME),
     }
 
 
-def _ensure_pi_agents_block(file_path: str) -> None:
+def _ensure_pi_agents_block(file_path: str, build: BuildManifest) -> None:
     block = _build_pi_agents_block()
 
     if not path_exists(file_path):
-        write_text(file_path, block + "\n")
+        build.write_text(file_path, block + "\n", shared=True)
         return
 
-    existing = read_text(file_path)
-    updated = _upsert_block(existing, block)
-    if updated != existing:
-        write_text(file_path, updated)
+    build.write_text(file_path, _upsert_block(read_text(file_path), block), shared=True)
 
 
 def _build_pi_agents_block() -> str:
@@ -134,8 +141,7 @@ def _upsert_block(existing: str, block: str) -> str:
     return existing.rstrip() + "\n\n" + block + "\n"
 
 
-def _write_mcporter_json(file_path: str, config) -> None:
-    ensure_dir(os.path.dirname(file_path))
+def _render_mcporter_json(config) -> str:
     data = {"mcpServers": {}}
     for name, server in config.mcp_servers.items():
         entry: dict = {}
@@ -151,6 +157,4 @@ def _write_mcporter_json(file_path: str, config) -> None:
             entry["headers"] = server.headers
         data["mcpServers"][name] = entry
 
-    with open(file_path, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2)
-        f.write("\n")
+    return json.dumps(data, indent=2) + "\n"
@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+import sys
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.convert.cli import main
+from src.convert.writers.build import BuildManifest
+
+
+@pytest.fixture
+def plugin_root(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    monkeypatch.setenv("CONVERT_CACHE_DIR", str(tmp_path / "cache"))
+    root = tmp_path / "plugin"
+    files = {
+        ".claude-plugin/plugin.json": '{"name": "core", "version": "1.0.0"}',
+        "agents/reviewer.md": "---\ndescription: Reviews\n---\nReview the diff.\n",
+        "commands/review.md": "---\ndescription: Review\n---\nRun a review.\n",
+        "commands/ship.md": "---\ndescription: Ship\n---\nShip it.\n",
+        "skills/notes/SKILL.md": "---\nname: notes\ndescription: Notes\n---\nUse notes.\n",
+        "skills/notes/run.sh": "#!/bin/sh\n",
+    }
+    for relative, text in files.items():
+        (root / relative).parent.mkdir(parents=True, exist_ok=True)
+        (root / relative).write_text(text, encoding="utf-8")
+    (root / "skills/notes/run.sh").chmod(0o755)
+    return root
+
+
+def _convert(
+    plugin_root: Path, output: Path, capsys: pytest.CaptureFixture[str]
+) -> list[str]:
+    main(
+        [
+            str(plugin_root),
+            "--to",
+            "all",
+            "-o",
+            str(output),
+            "--pi-home",
+            str(output / ".pi"),
+        ]
+    )
+    return [line.split(" (")[-1] for line in capsys.readouterr().out.splitlines()]
+
+
+def _mtimes(output: Path) -> dict[str, int]:
+    return {
+        str(path): path.stat().st_mtime_ns
+        for path in output.rglob("*")
+        if path.is_file() and path.name != ".convert-manifest.json"
+    }
+
+
+def test_unchanged_sources_skip_conversion_and_writes(
+    plugin_root: Path, tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    output = tmp_path / "out"
+    first = _convert(plugin_root, output, capsys)
+    assert all(line.endswith("0 skipped, 0 removed)") for line in first)
+    mtimes = _mtimes(output)
+
+    second = _convert(plugin_root, output, capsys)
+    assert all(line.startswith("0 converted,") for line in second)
+    assert _mtimes(output) == mtimes
+    assert os.access(output / ".opencode/skills/notes/run.sh", os.X_OK)
+
+
+def test_changed_sources_rewrite_only_changed_outputs(
+    plugin_root: Path, tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    output = tmp_path / "out"
+    _convert(plugin_root, output, capsys)
+    prompt = output / ".codex/prompts/review.md"
+    prompt_mtime = prompt.stat().st_mtime_ns
+
+    (plugin_root / "agents/reviewer.md").write_text(
+        "---\ndescription: Reviews\n---\nReview every diff.\n", encoding="utf-8"
+    )
+    (plugin_root / "commands/ship.md").unlink()
+    summaries = _convert(plugin_root, output, capsys)
+
+    assert summaries[0] == "1 converted, 1 skipped, 1 removed)"
+    assert "Review every diff." in (output / ".codex/agents/reviewer.toml").read_text()
+    assert prompt.stat().st_mtime_ns == prompt_mtime
+    assert not (output / ".codex/prompts/ship.md").exists()
+    assert not (output / ".pi/prompts/ship.md").exists()
+    assert not (output / ".opencode/commands/ship.md").exists()
+
+
+def test_edited_outputs_are_rebuilt_and_shared_files_kept(
+    plugin_root: Path, tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    output = tmp_path / "out"
+    _convert(plugin_root, output, capsys)
+    agent = output / ".codex/agents/reviewer.toml"
+    expected = agent.read_text()
+    agent.write_text(expected + "# edited\n", encoding="utf-8")
+
+    summaries = _convert(plugin_root, output, capsys)
+
+    assert summaries[0] == "1 converted, 2 skipped, 0 removed)"
+    assert agent.read_text() == expected
+    manifest = json.loads((output / ".opencode/.convert-manifest.json").read_text())
+    assert manifest["builds"]["core"]["shared"] == ["../opencode.json"]
+
+
+def test_build_manifest_removes_only_unedited_stale_outputs(tmp_path: Path) -> None:
+    manifest_path = str(tmp_path / "out" / ".convert-manifest.json")
+    build = BuildManifest(manifest_path, "core", "a", "o")
+    build.write_text(str(tmp_path / "out/kept/old.md"), "old\n")
+    build.write_text(str(tmp_path / "out/gone/old.md"), "old\n")
+    build.finish()
+    (tmp_path / "out/kept/old.md").write_text("edited\n", encoding="utf-8")
+
+    build = BuildManifest(manifest_path, "core", "b", "o")
+    assert not build.is_current()
+    assert build.finish().removed == 1
+    assert (tmp_path / "out/kept/old.md").exists()
+    assert not (tmp_path / "out/gone").exists()
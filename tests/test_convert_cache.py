@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.convert import cache as cache_module
+from src.convert.cache import ParseCache
+from src.convert.parser import load_claude_plugin
+
+AGENT = "---\nname: reviewer\ndescription: Reviews\n---\n\nReview the diff.\n"
+
+
+def _write_old(path: Path, text: str) -> None:
+    path.write_text(text, encoding="utf-8")
+    os.utime(path, ns=(1_000_000_000, 1_000_000_000))
+
+
+def test_parse_cache_reuses_entries_by_stat_and_hash(tmp_path: Path) -> None:
+    source = tmp_path / "reviewer.md"
+    _write_old(source, AGENT)
+
+    with ParseCache(str(tmp_path / "cache")) as cache:
+        assert cache.parse(str(source)) == (
+            {"name": "reviewer", "description": "Reviews"},
+            "Review the diff.",
+        )
+    with ParseCache(str(tmp_path / "cache")) as cache:
+        cache.parse(str(source))
+        # Same content with a new mtime is checked by hash
+        os.utime(source, ns=(2_000_000_000, 2_000_000_000))
+        cache.parse(str(source))
+        assert (cache.hits, cache.misses) == (2, 0)
+
+        _write_old(source, AGENT.replace("the diff", "every diff"))
+        assert cache.parse(str(source))[1] == "Review every diff."
+        assert cache.misses == 1
+
+
+def test_parse_cache_checks_recent_files_by_hash(tmp_path: Path) -> None:
+    source = tmp_path / "reviewer.md"
+    source.write_text(AGENT, encoding="utf-8")
+
+    with ParseCache(str(tmp_path / "cache")) as cache:
+        cache.parse(str(source))
+        stat = source.stat()
+        # A write within the same mtime tick keeps size and mtime
+        source.write_text(AGENT.replace("diff", "code"), encoding="utf-8")
+        os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        assert cache.parse(str(source))[1] == "Review the code."
+
+
+def test_parse_cache_ignores_other_parser_versions(tmp_path: Path, monkeypatch) -> None:
+    source = tmp_path / "reviewer.md"
+    _write_old(source, AGENT)
+    with ParseCache(str(tmp_path / "cache")) as cache:
+        cache.parse(str(source))
+
+    monkeypatch.setattr(cache_module, "PARSER_VERSION", cache_module.PARSER_VERSION + 1)
+    with ParseCache(str(tmp_path / "cache")) as cache:
+        cache.parse(str(source))
+        assert cache.misses == 1
+
+
+def test_parse_cache_without_database_still_parses(tmp_path: Path) -> None:
+    source = tmp_path / "reviewer.md"
+    _write_old(source, "---\ncreated: 2024-01-01\n---\nBody\n")
+    (tmp_path / "blocked").write_text("", encoding="utf-8")
+
+    with ParseCache(str(tmp_path / "blocked")) as cache:
+        data, body = cache.parse(str(source))
+        assert body == "Body"
+        assert str(data["created"]) == "2024-01-01"
+        assert cache.parse(str(source)) == (data, body)
+
+
+def test_load_claude_plugin_with_cache_matches_uncached(tmp_path: Path) -> None:
+    plugin_root = tmp_path / "plugin"
+    (plugin_root / ".claude-plugin").mkdir(parents=True)
+    (plugin_root / ".claude-plugin" / "plugin.json").write_text(
+        '{"name": "core", "version": "1.0.0"}', encoding="utf-8"
+    )
+    for directory, text in (
+        ("agents/reviewer.md", AGENT),
+        ("commands/review.md", "---\nallowed-tools: Read, Grep\n---\r\nRun it.\r\n"),
+        (
+            "skills/notes/SKILL.md",
+            "---\nname: notes\ndescription: Notes\n---\nUse notes.\n",
+        ),
+    ):
+        (plugin_root / directory).parent.mkdir(parents=True, exist_ok=True)
+        _write_old(plugin_root / directory, text)
+
+    expected = load_claude_plugin(str(plugin_root))
+    for _ in range(2):
+        with ParseCache(str(tmp_path / "cache")) as cache:
+            assert load_claude_plugin(str(plugin_root), cache) == expected
+    assert cache.hits == 3
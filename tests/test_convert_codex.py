@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from pathlib import Path
+import re
 import sys
 
 import pytest
@@ -8,7 +9,15 @@ import pytest
 sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
 from src.convert.converters.codex import convert_claude_to_codex
-from src.convert.converters.content import transform_content_for_codex
+from src.convert.converters.content import (
+    CODEX_RULES,
+    PI_RULES,
+    RuleTable,
+    transform_content_for_codex,
+    transform_content_for_pi,
+)
+from src.convert.frontmatter import parse_frontmatter, read_body, read_frontmatter
+from src.convert.parser import load_claude_plugin
 from src.convert.types import (
     ClaudeAgent,
     ClaudeCommand,
@@ -61,6 +70,89 @@ def test_transform_content_for_codex_rewrites_claude_specific_syntax() -> None:
     assert ".codex/settings.json" in transformed
 
 
+def test_transform_content_for_codex_rewrites_rule_output_and_code() -> None:
+    body = "\n".join(
+        [
+            'Task(subagent_type: "core:planner", prompt: "run /review on .claude/x")',
+            "```bash",
+            "Task core:review:security-sentinel(scan the diff)",
+            "cat .claude/settings.json",
+            "```",
+            "Ask `@security-sentinel` or @security-sentinel via `/review`.",
+            "Keep /tmp/out and /usr/bin/env as they are.",
+        ]
+    )
+
+    transformed = transform_content_for_codex(
+        body,
+        prompt_targets={"review": "review"},
+        agent_targets={"security-sentinel": "sentinel"},
+    )
+
+    assert transformed.splitlines() == [
+        "Spawn the `planner` agent with this task: run /prompts:review on .codex/x.",
+        "```bash",
+        "Spawn the `sentinel` agent with this task: scan the diff.",
+        "cat .codex/settings.json",
+        "```",
+        "Ask `sentinel agent` or `sentinel` agent via `/prompts:review`.",
+        "Keep /tmp/out and /usr/bin/env as they are.",
+    ]
+
+
+# Markdown shipped in this repository, where every rule has matches to check
+RULE_CORPUS = [
+    path.read_text(encoding="utf-8")
+    for path in sorted(Path(__file__).resolve().parents[1].glob("plugins/**/*.md"))
+] + [
+    'Task(subagent_type: "core:planner", prompt: "x")\n  Task 1: core:planner -> "plan"',
+    "- Task core:review(x) or Task core:review(y), AskUserQuestion, TodoWrite, TodoRead",
+    "the Task tool, Task calls and a Task call; /review, .claude/ and @SECURITY-Sentinel",
+]
+
+
+@pytest.mark.parametrize("table", [CODEX_RULES, PI_RULES], ids=["codex", "pi"])
+def test_rule_starts_cover_every_match(table: RuleTable) -> None:
+    matched = set()
+    for name, pattern, starts in zip(table.names, table._patterns, table.starts):
+        assert starts, f"{name} has no gate characters"
+        for text in RULE_CORPUS:
+            for match in re.finditer(pattern, text, re.MULTILINE):
+                position = match.start()
+                at_line_start = position == 0 or text[position - 1] == "\n"
+                gated = text[position] in starts or ("^" in starts and at_line_start)
+                assert gated, name
+                matched.add(name)
+    assert matched == set(table.names)
+
+
+@pytest.mark.parametrize("table", [CODEX_RULES, PI_RULES], ids=["codex", "pi"])
+def test_rule_gate_does_not_change_rewrites(table: RuleTable) -> None:
+    ungated = RuleTable(
+        [(name, pattern, "") for name, pattern in zip(table.names, table._patterns)]
+    )
+    renderers = {
+        name: lambda groups, context, name=name: f"<{name}>" for name in table.names
+    }
+    for text in RULE_CORPUS:
+        assert table.rewrite(text, renderers) == ungated.rewrite(text, renderers)
+
+
+def test_transform_content_for_pi_rewrites_in_one_pass() -> None:
+    body = "\n".join(
+        [
+            "- Task core:review:security-sentinel(check /prompts:review)",
+            "Use TodoWrite, then AskUserQuestion and /skill:Deep-Research.",
+        ]
+    )
+
+    assert transform_content_for_pi(body).splitlines() == [
+        '- Run subagent with agent="security-sentinel" and task="check /review".',
+        "Use file-based todos (todos/ + /skill:todo-create), then ask_user_question "
+        "and /skill:deep-research.",
+    ]
+
+
 def test_convert_claude_to_codex_generates_custom_agents_and_prompts() -> None:
     plugin = ClaudePlugin(
         root="/tmp/plugin",
@@ -141,7 +233,9 @@ def test_convert_claude_to_codex_generates_custom_agents_and_prompts() -> None:
     rendered_prompt = render_codex_prompt_file(review_prompt, "/tmp")
     assert 'description: "Perform a deep review"' in rendered_prompt
     assert 'argument-hint: "[PR]"' in rendered_prompt
-    assert "<!-- Generated from plugin/commands/workflows/review.md -->" in rendered_prompt
+    assert (
+        "<!-- Generated from plugin/commands/workflows/review.md -->" in rendered_prompt
+    )
 
 
 def test_convert_claude_to_codex_rejects_reserved_and_colliding_names() -> None:
@@ -225,7 +319,9 @@ def test_convert_claude_to_codex_stringifies_structured_argument_hints() -> None
     assert 'argument-hint: "optional: specific issue to fix"' in rendered
 
 
-def test_write_codex_bundle_writes_custom_agent_and_prompt_files(tmp_path: Path) -> None:
+def test_write_codex_bundle_writes_custom_agent_and_prompt_files(
+    tmp_path: Path,
+) -> None:
     bundle = CodexBundle(
         agents=[
             CodexAgentFile(
@@ -310,3 +406,53 @@ def test_write_codex_bundle_rejects_unmanaged_prompt_overwrite(tmp_path: Path) -
 
     with pytest.raises(FileExistsError, match="unmanaged Codex prompt file"):
         write_codex_bundle(str(tmp_path), bundle)
+
+
+@pytest.mark.parametrize(
+    "raw",
+    [
+        "---\nname: reviewer\ndescription: Checks: diffs\n---\n\nReview it.\n",
+        "---\r\nname: crlf\r\n---\r\nBody\r\n---\r\nMore\r\n",
+        "---\nname: empty\n---",
+        "---\nname: unterminated\n\nBody\n",
+        "No frontmatter\n---\n",
+        "",
+    ],
+)
+def test_read_frontmatter_matches_parse_frontmatter(tmp_path: Path, raw: str) -> None:
+    path = tmp_path / "component.md"
+    path.write_bytes(raw.encode("utf-8"))
+
+    data, body_position = read_frontmatter(str(path))
+
+    expected = parse_frontmatter(path.read_text(encoding="utf-8"))
+    assert (data, read_body(str(path), body_position)) == expected
+
+
+def test_load_claude_plugin_reads_bodies_on_first_access(tmp_path: Path) -> None:
+    (tmp_path / ".claude-plugin").mkdir()
+    (tmp_path / ".claude-plugin" / "plugin.json").write_text(
+        '{"name": "core", "version": "1.0.0"}', encoding="utf-8"
+    )
+    (tmp_path / "agents").mkdir()
+    agent_path = tmp_path / "agents" / "reviewer.md"
+    agent_path.write_text(
+        "---\ndescription: Reviews\n---\n\nOld body\n", encoding="utf-8"
+    )
+
+    plugin = load_claude_plugin(str(tmp_path))
+    agent_path.write_text(
+        "---\ndescription: Reviews\n---\n\nNew body\n", encoding="utf-8"
+    )
+
+    [agent] = plugin.agents
+    assert (agent.name, agent.description) == ("reviewer", "Reviews")
+    assert agent.body == "New body"
+    agent_path.unlink()
+    assert agent.body == "New body"
+    assert agent == ClaudeAgent(
+        name="reviewer",
+        description="Reviews",
+        body="New body",
+        source_path=str(agent_path),
+    )
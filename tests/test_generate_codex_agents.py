@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import importlib.util
+from pathlib import Path
+import sys
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT))
+
+spec = importlib.util.spec_from_file_location(
+    "generate_codex_agents", REPO_ROOT / "scripts" / "generate_codex_agents.py"
+)
+generate_codex_agents = importlib.util.module_from_spec(spec)
+sys.modules["generate_codex_agents"] = generate_codex_agents
+spec.loader.exec_module(generate_codex_agents)
+
+
+def test_collect_bundle_in_processes_matches_serial(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setenv("CONVERT_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(generate_codex_agents.os, "cpu_count", lambda: 1)
+    serial = generate_codex_agents._collect_bundle()
+
+    monkeypatch.setattr(generate_codex_agents.os, "cpu_count", lambda: 4)
+    parallel = generate_codex_agents._collect_bundle()
+
+    assert parallel == serial
+    assert [agent.name for agent in parallel.agents]
+
+
+def test_collect_bundle_reports_first_collision_in_manifest_order(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setenv("CONVERT_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(generate_codex_agents.os, "cpu_count", lambda: 4)
+    for plugin in ("a", "b", "c"):
+        root = tmp_path / "plugins" / plugin
+        (root / ".claude-plugin").mkdir(parents=True)
+        (root / ".claude-plugin" / "plugin.json").write_text(
+            f'{{"name": "{plugin}", "version": "1.0.0"}}', encoding="utf-8"
+        )
+        (root / "agents").mkdir()
+        (root / "agents" / "reviewer.md").write_text("Review.\n", encoding="utf-8")
+    monkeypatch.setattr(generate_codex_agents, "REPO_ROOT", tmp_path)
+
+    with pytest.raises(
+        ValueError, match=r"plugins/a/agents/reviewer\.md and .*plugins/b/"
+    ):
+        generate_codex_agents._collect_bundle()